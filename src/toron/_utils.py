@@ -523,6 +523,103 @@ class SequenceHash(object):
         return self.hash_obj.hexdigest()
 
 
+class ChunkedSequenceHash(object):
+    """An object to calculate a checksum from a sequence of integers
+    using a separate digest for each fixed-size range (or "chunk") of
+    values.
+
+    Values must follow the same rules as :class:`SequenceHash` (a
+    strictly increasing sequence of non-negative, 8-byte integers).
+    Each value belongs to the chunk ``value // chunk_size``. The
+    chunk digests are combined--along with their chunk numbers--into
+    a single, top-level digest::
+
+        >>> index_ids = [0, 1, 2, 5, 6, 12288, 12290]
+        >>>
+        >>> index_hash = ChunkedSequenceHash(index_ids)
+        >>>
+        >>> index_hash.get_hexdigest()
+        '150247b56c8af52ec9f5f5e850197b2a820d71f81160689d86035173980a88d6'
+
+    Because a chunk's digest depends only on the values inside its
+    range, a stored set of chunk digests can be brought up-to-date by
+    re-hashing only those chunks whose values have changed::
+
+        >>> chunk_digests = [
+        ...     (0, ChunkedSequenceHash.digest_chunk([0, 1, 2, 5, 6])),
+        ...     (3, ChunkedSequenceHash.digest_chunk([12288, 12290])),
+        ... ]
+        >>> ChunkedSequenceHash.combine_digests(chunk_digests)
+        '150247b56c8af52ec9f5f5e850197b2a820d71f81160689d86035173980a88d6'
+    """
+    chunk_size: int = 4096
+
+    def __init__(self, iterable: Optional[Iterable[int]] = None) -> None:
+        self._hash_obj = hashlib.sha256()
+        self._chunk_hash_obj = hashlib.sha256()
+        self._chunk_id = -1
+        self._prev_value = -1
+
+        if iterable:
+            for value in iterable:
+                self.add_value(value)
+
+    def add_value(self, value: int) -> None:
+        """Update the current digest with an additional integer."""
+        if not value > self._prev_value:
+            raise ValueError(
+                'illegal value - values must be a strictly increasing '
+                'sequence starting at 0 or greater'
+            )
+
+        try:
+            value_bytes = value.to_bytes(length=8, byteorder='big')
+        except OverflowError as e:  # <- Int too big (more than 8 bytes).
+            raise ValueError(e)
+
+        chunk_id = value // self.chunk_size
+        if chunk_id != self._chunk_id:
+            if self._chunk_id != -1:
+                self._hash_obj.update(
+                    self._chunk_id.to_bytes(length=8, byteorder='big')
+                    + self._chunk_hash_obj.digest()
+                )
+            self._chunk_hash_obj = hashlib.sha256()
+            self._chunk_id = chunk_id
+
+        self._chunk_hash_obj.update(value_bytes)
+        self._prev_value = value
+
+    def get_hexdigest(self) -> str:
+        """Return the current digest as a hexadecimal string."""
+        hash_obj = self._hash_obj.copy()  # Copy to leave chunk open.
+        if self._chunk_id != -1:
+            hash_obj.update(
+                self._chunk_id.to_bytes(length=8, byteorder='big')
+                + self._chunk_hash_obj.digest()
+            )
+        return hash_obj.hexdigest()
+
+    @staticmethod
+    def digest_chunk(values: Iterable[int]) -> bytes:
+        """Return the digest for the ordered *values* of a single chunk."""
+        hash_obj = hashlib.sha256()
+        for value in values:
+            hash_obj.update(value.to_bytes(length=8, byteorder='big'))
+        return hash_obj.digest()
+
+    @staticmethod
+    def combine_digests(chunk_digests: Iterable[Tuple[int, bytes]]) -> str:
+        """Return the hexadecimal digest for an iterable of
+        ``(chunk_id, digest)`` pairs ordered by chunk_id (empty chunks
+        must be omitted).
+        """
+        hash_obj = hashlib.sha256()
+        for chunk_id, digest in chunk_digests:
+            hash_obj.update(chunk_id.to_bytes(length=8, byteorder='big') + digest)
+        return hash_obj.hexdigest()
+
+
 def splitmix64(x: int) -> int:
     """Hash 64-bit *x* and return a pseudo-random 64-bit integer digest.
 
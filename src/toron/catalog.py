@@ -0,0 +1,268 @@
+"""Folder-level catalog of node and link metadata.
+
+A catalog is a sidecar SQLite database that records the unique_id,
+index_hash, and domain of every ``.toron`` file in a directory tree
+along with the metadata for each node's incoming links. Once built,
+questions about the graph (like finding a translation path between
+two nodes) can be answered without opening the node files.
+
+.. code-block:: python
+
+    >>> from toron.catalog import Catalog
+    >>> catalog = Catalog('mydata/')
+    >>> catalog.refresh()
+    Counter({'added': 3})
+    >>> catalog.find_path('mydata/a.toron', 'mydata/c.toron')
+    ['mydata/a.toron', 'mydata/b.toron', 'mydata/c.toron']
+"""
+import logging
+import os
+import sqlite3
+from collections import Counter, deque
+from contextlib import closing
+
+from ._typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from .space import bind_file
+
+
+applogger = logging.getLogger(f'app-{__name__}')
+
+
+CATALOG_FILENAME = '.toron-catalog'
+
+
+_schema_script = """
+    CREATE TABLE IF NOT EXISTS main.node (
+        node_id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        unique_id TEXT NOT NULL,
+        index_hash TEXT,
+        domain TEXT
+    );
+
+    CREATE INDEX IF NOT EXISTS main.node_unique_id_idx
+        ON node(unique_id);
+
+    CREATE TABLE IF NOT EXISTS main.link (
+        node_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        other_unique_id TEXT NOT NULL,
+        other_index_hash TEXT,
+        is_default INTEGER NOT NULL CHECK (is_default IN (0, 1)),
+        is_locally_complete INTEGER NOT NULL CHECK (is_locally_complete IN (0, 1)),
+        FOREIGN KEY(node_id) REFERENCES node(node_id) ON DELETE CASCADE
+    );
+
+    CREATE INDEX IF NOT EXISTS main.link_node_id_idx
+        ON link(node_id);
+"""
+
+
+class Catalog(object):
+    """A sidecar catalog of the nodes stored in *directory*.
+
+    The catalog database is stored in the given *directory* (using
+    the name ``.toron-catalog``) unless a different *catalog_path*
+    is given. Node paths are stored relative to *directory*.
+    """
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        catalog_path: Optional[Union[str, os.PathLike]] = None,
+    ) -> None:
+        if not os.path.isdir(directory):
+            raise NotADirectoryError(f'not a directory: {directory!r}')
+
+        self.directory = os.fspath(directory)
+        self.catalog_path = os.fspath(
+            catalog_path or os.path.join(self.directory, CATALOG_FILENAME)
+        )
+
+        with closing(self._connect()) as con:
+            con.executescript(_schema_script)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return a connection to the catalog database."""
+        con = sqlite3.connect(self.catalog_path)
+        con.execute('PRAGMA foreign_keys=ON')
+        return con
+
+    def _scan_directory(self) -> Dict[str, Tuple[int, int]]:
+        """Return a dict of relative paths and ``(mtime_ns, size)``
+        values for all node files in the directory tree.
+        """
+        found = {}
+        for dirpath, dirnames, filenames in os.walk(self.directory):
+            dirnames.sort()  # Sort in place for a deterministic walk.
+            for filename in sorted(filenames):
+                if not filename.endswith('.toron'):
+                    continue  # <- Skip to next item.
+
+                full_path = os.path.join(dirpath, filename)
+                stat = os.stat(full_path)
+                rel_path = os.path.relpath(full_path, self.directory)
+                found[rel_path.replace(os.sep, '/')] = (stat.st_mtime_ns, stat.st_size)
+        return found
+
+    def _load_node(
+        self,
+        cur: sqlite3.Cursor,
+        path: str,
+        mtime_ns: int,
+        size: int,
+    ) -> None:
+        """Read metadata from node file at *path* and save it to the
+        catalog (replacing any existing record for *path*).
+        """
+        node = bind_file(os.path.join(self.directory, path), mode='ro')
+        with node._managed_cursor() as node_cur:
+            property_repo = node._dal.PropertyRepository(node_cur)
+            unique_id = node.unique_id
+            index_hash = property_repo.get('index_hash')
+            domain = node.domain
+            links = node._dal.LinkRepository(node_cur).get_all()
+
+        cur.execute('DELETE FROM main.node WHERE path=?', (path,))
+        cur.execute(
+            """
+                INSERT INTO main.node (path, mtime_ns, size, unique_id, index_hash, domain)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (path, mtime_ns, size, unique_id, index_hash, domain),
+        )
+        node_id = cur.lastrowid
+        cur.executemany(
+            """
+                INSERT INTO main.link (node_id, name, other_unique_id, other_index_hash,
+                                       is_default, is_locally_complete)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            ((node_id, link.name, link.other_unique_id, link.other_index_hash,
+              link.is_default, link.is_locally_complete) for link in links),
+        )
+
+    def refresh(self) -> Dict[str, int]:
+        """Scan the directory tree and update the catalog.
+
+        Only files that are new or whose modification time or size
+        has changed are opened and read. Records for files that no
+        longer exist are removed. Returns a counter of ``'added'``,
+        ``'updated'``, ``'removed'``, ``'unchanged'``, and ``'failed'``
+        files.
+        """
+        counter: Dict[str, int] = Counter()
+        found = self._scan_directory()
+
+        with closing(self._connect()) as con:
+            cur = con.cursor()
+            cur.execute('SELECT path, mtime_ns, size FROM main.node')
+            cataloged = {path: (mtime_ns, size) for path, mtime_ns, size in cur}
+
+            try:
+                for path in cataloged.keys() - found.keys():
+                    cur.execute('DELETE FROM main.node WHERE path=?', (path,))
+                    counter['removed'] += 1
+
+                for path, (mtime_ns, size) in found.items():
+                    status = cataloged.get(path)
+                    if status == (mtime_ns, size):
+                        counter['unchanged'] += 1
+                        continue  # <- Skip to next item.
+
+                    try:
+                        self._load_node(cur, path, mtime_ns, size)
+                    except Exception as err:
+                        applogger.warning(f'unable to read {path!r}: {err}')
+                        counter['failed'] += 1
+                        continue  # <- Skip to next item.
+
+                    counter['updated' if status else 'added'] += 1
+
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+
+        return counter
+
+    def _get_unique_id(self, cur: sqlite3.Cursor, ref: str) -> str:
+        """Return the unique_id for *ref* (a path or unique_id)."""
+        if os.path.isabs(ref) or os.path.exists(ref):
+            path = os.path.relpath(ref, self.directory).replace(os.sep, '/')
+        else:
+            path = ref.replace(os.sep, '/')
+
+        cur.execute(
+            'SELECT unique_id FROM main.node WHERE path=? OR unique_id=? LIMIT 1',
+            (path, ref),
+        )
+        row = cur.fetchone()
+        if not row:
+            raise KeyError(f'no cataloged node matching {ref!r}')
+        return row[0]
+
+    def find_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Return the shortest list of node file paths that can be used
+        to translate data from *source* to *target* or None if there is
+        no such path. The *source* and *target* may be given as file
+        paths or as unique_id values.
+
+        A hop is usable when the target node has a default link whose
+        ``other_index_hash`` matches the current index_hash of the
+        source node.
+        """
+        with closing(self._connect()) as con:
+            cur = con.cursor()
+            source_uid = self._get_unique_id(cur, source)
+            target_uid = self._get_unique_id(cur, target)
+
+            cur.execute('SELECT unique_id, path FROM main.node ORDER BY path')
+            paths: Dict[str, str] = {}
+            for unique_id, path in cur:
+                paths.setdefault(unique_id, path)
+
+            # Get adjacency list of usable links (as "other -> node").
+            cur.execute("""
+                SELECT DISTINCT other.unique_id, trg.unique_id
+                FROM main.link
+                JOIN main.node AS trg USING (node_id)
+                JOIN main.node AS other
+                    ON other.unique_id=link.other_unique_id
+                    AND other.index_hash=link.other_index_hash
+                WHERE link.is_default=1
+            """)
+            adjacent: Dict[str, List[str]] = {}
+            for other_uid, trg_uid in cur:
+                adjacent.setdefault(other_uid, []).append(trg_uid)
+
+        # Breadth-first search for the shortest path.
+        previous: Dict[str, Optional[str]] = {source_uid: None}
+        queue = deque([source_uid])
+        while queue:
+            current = queue.popleft()
+            if current == target_uid:
+                break
+
+            for next_uid in sorted(adjacent.get(current, [])):
+                if next_uid not in previous:
+                    previous[next_uid] = current
+                    queue.append(next_uid)
+        else:  # IF NO BREAK!
+            return None  # <- EXIT!
+
+        # Walk back from target to build list of node paths.
+        nodes = []
+        uid: Optional[str] = target_uid
+        while uid is not None:
+            nodes.append(os.path.join(self.directory, paths[uid]))
+            uid = previous[uid]
+        nodes.reverse()
+        return nodes
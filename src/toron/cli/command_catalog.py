@@ -0,0 +1,52 @@
+"""Implementation for "catalog" command."""
+import argparse
+import logging
+
+from ..catalog import Catalog
+from .common import ExitCode
+
+
+applogger = logging.getLogger('app-toron')
+
+
+def build_catalog(args: argparse.Namespace) -> ExitCode:
+    """Build or refresh the catalog for the directory 'filepath'."""
+    try:
+        catalog = Catalog(args.filepath)
+    except NotADirectoryError:
+        applogger.error(f'cancelled: {args.filepath!r} is not a directory')
+        return ExitCode.ERR
+
+    counter = catalog.refresh()
+    applogger.info(
+        f"cataloged {counter['added']} new, {counter['updated']} updated, "
+        f"and {counter['unchanged']} unchanged files"
+    )
+    if counter['removed']:
+        applogger.info(f"removed {counter['removed']} missing files")
+    if counter['failed']:
+        applogger.warning(f"unable to read {counter['failed']} files")
+    return ExitCode.OK
+
+
+def write_path_to_stdout(args: argparse.Namespace) -> ExitCode:
+    """Write the shortest translation path between two nodes."""
+    try:
+        catalog = Catalog(args.filepath)
+    except NotADirectoryError:
+        applogger.error(f'cancelled: {args.filepath!r} is not a directory')
+        return ExitCode.ERR
+
+    try:
+        path = catalog.find_path(args.source, args.target)
+    except KeyError as err:
+        applogger.error(err.args[0])
+        return ExitCode.ERR
+
+    if path is None:
+        applogger.error(f'no path found from {args.source!r} to {args.target!r}')
+        return ExitCode.ERR
+
+    for filepath in path:
+        args.stdout.write(f'{filepath}\n')
+    return ExitCode.OK
@@ -1,6 +1,5 @@
 """Implementation for "index" command."""
 import argparse
-import csv
 import logging
 import os
 import re
@@ -8,8 +7,10 @@ import uuid
 from itertools import chain, islice
 from .._typing import Iterator, List, TYPE_CHECKING
 
+from ..data_service import generate_weight_rows
 from .common import (
     ExitCode,
+    PipelinedCSVReader,
     is_streamed,
     csv_stdout_writer,
     cli_bind_file,
@@ -28,7 +29,7 @@ applogger = logging.getLogger('app-toron')
 
 def read_from_stdin(args: argparse.Namespace, node: 'DataSpace') -> ExitCode:
     """Insert index records read from stdin stream."""
-    reader = csv.reader(args.stdin)
+    reader = iter(PipelinedCSVReader(args.stdin))
     sample_rows = list(islice(reader, 10))
     iterator: Iterator[List] = chain(sample_rows, reader)
 
@@ -84,15 +85,17 @@ def write_to_stdout(args: argparse.Namespace, node: 'DataSpace') -> ExitCode:
         groups = node._dal.WeightGroupRepository(cur1).get_all()
         groups = sorted(groups, key=lambda g: (g.id!=default_id, g.name))
         weight_group_names = [group.name for group in groups]
-        weight_group_ids = [group.id for group in groups]
 
-        # Define a helper function to get weight values (needs separate cursor).
-        _get_weight_obj = node._dal.WeightRepository(cur2).get_by_weight_group_id_and_index_id
-        def get_weight_value(group_id, index_id):
-            try:
-                return _get_weight_obj(group_id, index_id).value
-            except KeyError:
-                return 0.0 if index_id == 0 else None
+        # Get weight rows (weight repository needs separate cursor).
+        if 'generate_weight_rows' in node._dal.optimizations:
+            generate_rows = node._dal.optimizations['generate_weight_rows']
+        else:
+            generate_rows = generate_weight_rows
+        weight_rows = generate_rows(
+            weight_group_ids=[group.id for group in groups],
+            index_repo=index_repo,
+            weight_repo=node._dal.WeightRepository(cur2),
+        )
 
         # Prepare domain text for header row.
         if domain_value:
@@ -108,11 +111,11 @@ def write_to_stdout(args: argparse.Namespace, node: 'DataSpace') -> ExitCode:
             ))
 
             # Write data rows.
-            for index in index_repo.find_all():
+            for index, weight_vals in weight_rows:
                 writer.writerow(chain(
                     [index_id_to_code(index.id, unique_id_bytes)],
                     index.labels,
-                    (get_weight_value(grp_id, index.id) for grp_id in weight_group_ids),
+                    weight_vals,
                 ))
                 row_count += 1
 
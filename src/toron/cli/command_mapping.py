@@ -1,6 +1,5 @@
 """Implementation for "mapping" command."""
 import argparse
-import csv
 import logging
 import os
 import uuid
@@ -28,7 +27,7 @@ from .._typing import (
 
 from .. import DataSpace
 from ..data_models import Link
-from ..data_service import generate_mapping_elements
+from ..data_service import generate_mapping_rows
 from ..mapper import (
     get_mapping_value_position,
     Mapper,
@@ -41,6 +40,7 @@ from .._utils import (
 )
 from .common import (
     ExitCode,
+    PipelinedCSVReader,
     is_streamed,
     csv_stdout_writer,
     index_code_to_id,
@@ -392,7 +392,7 @@ def read_from_stdin(
 
     # Normalize and load mapping data.
     data = normalize_mapping_data(
-        node1, node2, args.link, csv.reader(args.stdin)
+        node1, node2, args.link, PipelinedCSVReader(args.stdin)
     )
     mapper = Mapper(node1, node2, data)
 
@@ -410,11 +410,18 @@ def read_from_stdin(
     if not args.allow_incomplete and not mapper.is_fully_matched():
         raise ToronError('mapping is incomplete, no records loaded')
 
+    # Insert new mappings or update existing mappings.
+    if args.update:
+        load_mappings = DataSpace.update_mappings2
+    else:
+        load_mappings = DataSpace.insert_mappings2
+
     # Insert mappings into FILE2.
     if args.direction in {'both', 'right'}:
         applogger.info(f'loading mappings: FILE1 -> FILE2')
         mappings = mapper.iter_mappings('node2')
-        node2.insert_mappings2(
+        load_mappings(
+            node2,
             node1,
             args.link,
             data=mappings,
@@ -430,7 +437,8 @@ def read_from_stdin(
     if args.direction in {'both', 'left'}:
         applogger.info(f'loading mappings: FILE1 <- FILE2')
         mappings = mapper.iter_mappings('node1')
-        node1.insert_mappings2(
+        load_mappings(
+            node1,
             node2,
             args.link,
             data=mappings,
@@ -526,33 +534,37 @@ def write_to_stdout(
                 ambiguous_header,
             ))
 
-            generator = generate_mapping_elements(
+            # Get mapping rows (use optimized version when available).
+            if 'generate_mapping_rows' in target_node._dal.optimizations:
+                generate_rows = target_node._dal.optimizations['generate_mapping_rows']
+            else:
+                generate_rows = generate_mapping_rows
+
+            generator = generate_rows(
                 link_name=args.link,
                 trg_index_repo=trg_index_repo,
                 trg_link_repo=trg_link_repo,
                 trg_mapping_repo=trg_mapping_repo,
                 src_index_repo=src_index_repo,
                 src_prop_repo=src_prop_repo,
+                aux_trg_index_repo=target_node._dal.IndexRepository(trg_cur2),
+                aux_src_index_repo=source_node._dal.IndexRepository(src_cur2),
             )
 
-            aux_src_index_repo = source_node._dal.IndexRepository(src_cur2)
-            aux_trg_index_repo = target_node._dal.IndexRepository(trg_cur2)
             src_id_bytes = uuid.UUID(src_unique_id).bytes
             trg_id_bytes = uuid.UUID(trg_unique_id).bytes
 
             # Write data rows.
-            src_labels: Tuple[Optional[str], ...]
-            trg_labels: Tuple[Optional[str], ...]
-            for src_index, trg_index, level, value in generator:
+            src_index_code: Optional[str]
+            trg_index_code: Optional[str]
+            for src_index, src_labels, value, trg_index, trg_labels, level in generator:
                 # Since source labels come from a separate node, it's possible
-                # to have orphan references. A `KeyError` indicates that an
+                # to have orphan references. Missing labels indicate that an
                 # index in the source node has been deleted after the mapping
                 # was created (the mapping is now "stale") which results in
                 # some missing records.
                 if src_index is not None:
-                    try:
-                        src_labels = aux_src_index_repo.get(src_index).labels
-                    except KeyError:
+                    if src_labels is None:
                         src_labels = src_label_no_values
                         counter['invalid_source_index'] += 1
                     src_index_code = index_id_to_code(src_index, src_id_bytes)
@@ -565,7 +577,6 @@ def write_to_stdout(
                 # mapping records (unlike source labels). So it's not
                 # possible to have orphan references.
                 if trg_index is not None:
-                    trg_labels = aux_trg_index_repo.get(trg_index).labels
                     trg_index_code = index_id_to_code(trg_index, trg_id_bytes)
                 else:
                     trg_labels = trg_label_no_values
@@ -574,10 +585,10 @@ def write_to_stdout(
 
                 writer.writerow(chain(
                     (src_index_code,),
-                    src_labels,
+                    cast(Tuple[Optional[str], ...], src_labels),
                     (value,
                      trg_index_code),
-                    trg_labels,
+                    cast(Tuple[Optional[str], ...], trg_labels),
                     get_ambiguous(level, trg_label_names),
                 ))
                 counter['row_count'] += 1
@@ -1,12 +1,12 @@
 """Implementation for "quantity" command."""
 import argparse
-import csv
 import logging
 import os
 from .._typing import TYPE_CHECKING
 
 from .common import (
     ExitCode,
+    PipelinedCSVReader,
     is_streamed,
     csv_stdout_writer,
     cli_bind_file,
@@ -22,7 +22,7 @@ applogger = logging.getLogger('app-toron')
 
 def read_from_stdin(args: argparse.Namespace, node: 'DataSpace') -> ExitCode:
     """Load quantity records read from stdin stream."""
-    reader = csv.reader(args.stdin)
+    reader = PipelinedCSVReader(args.stdin)
 
     try:
         node.insert_quantities2(
@@ -0,0 +1,299 @@
+"""Implementation for "translate" command."""
+import argparse
+import csv
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from .._typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from .._utils import (
+    ToronError,
+    check_type,
+    verify_columns_set,
+)
+from ..data_models import ProportionArrays, get_proportion_slices
+from ..data_service import make_get_link_id_func
+from .common import (
+    ExitCode,
+    cli_bind_file,
+)
+
+if TYPE_CHECKING:
+    from .. import DataSpace
+
+
+applogger = logging.getLogger('app-toron')
+
+
+def _make_get_link_id(
+    target: 'DataSpace',
+    source: 'DataSpace',
+    link_name: Optional[str] = None,
+) -> Tuple[Callable[[Dict[str, str]], int], List[int]]:
+    """Return a function that selects the link_id to use for a given
+    dictionary of attributes and a list of all link_ids it can return.
+
+    When *link_name* is given, that link is used for all attributes.
+    Otherwise, links are selected by their attribute selectors (the
+    same way as :meth:`NodeReader.translate`) and the default link is
+    used for attributes that match no selector.
+    """
+    with source._managed_cursor() as cursor:
+        property_repo = source._dal.PropertyRepository(cursor)
+        source_unique_id = check_type(property_repo.get('unique_id'), str)
+        source_index_hash = check_type(property_repo.get('index_hash'), str)
+
+    with target._managed_cursor() as cursor:
+        link_repo = target._dal.LinkRepository(cursor)
+        link = target._get_link(source_unique_id, link_name, link_repo)
+        if link.other_index_hash != source_index_hash \
+                or not link.is_locally_complete:
+            raise ToronError(f'link {link.name!r} is not complete')
+
+        if link_name:
+            link_id = link.id
+            return (lambda attributes: link_id), [link_id]  # <- EXIT!
+
+        try:
+            get_link_id = make_get_link_id_func(
+                ref=source_unique_id,
+                link_repo=link_repo,
+                other_index_hash=source_index_hash,
+            )
+        except RuntimeError as err:
+            raise ToronError(str(err))
+
+        link_ids = [
+            x.id for x in link_repo.find_by_other_unique_id(source_unique_id)
+            if x.other_index_hash == source_index_hash
+                and (x.is_default or (x.is_locally_complete and x.selectors))
+        ]
+        return get_link_id, link_ids
+
+
+class BatchTranslator(object):
+    """Translate CSV files from the index of *source* to the index of
+    *target*.
+
+    The source index, the proportions of each usable link (as CSR
+    arrays), and the target index are loaded once when the translator
+    is created so that many files can be translated without querying
+    the nodes again.
+
+    When *value_column* is given, input files contain a single value
+    column and all other non-index columns are attributes that are
+    used to select links (see :meth:`NodeReader.translate`). Otherwise,
+    all non-index columns are value columns.
+    """
+    def __init__(
+        self,
+        target: 'DataSpace',
+        source: 'DataSpace',
+        link_name: Optional[str] = None,
+        value_column: Optional[str] = None,
+    ) -> None:
+        self.value_column = value_column
+        self.get_link_id, link_ids = _make_get_link_id(target, source, link_name)
+
+        with source._managed_cursor() as cursor:
+            self.source_columns = list(source._dal.LabelManager(cursor).get_columns())
+            self.source_ids: Dict[Tuple[str, ...], int] = {
+                x.labels: x.id for x in source._dal.IndexRepository(cursor).find_all()
+            }
+
+        with target._managed_cursor() as cursor:
+            mapping_repo = target._dal.MappingRepository(cursor)
+            self.link_arrays: Dict[int, ProportionArrays] = {
+                link_id: mapping_repo.get_proportion_arrays(link_id)
+                for link_id in link_ids
+            }
+            self.target_columns = list(target._dal.LabelManager(cursor).get_columns())
+            self.target_labels: Dict[int, Tuple[str, ...]] = {
+                x.id: x.labels for x in target._dal.IndexRepository(cursor).find_all()
+            }
+
+    def translate_file(self, input_path: str, output_path: str) -> Dict[str, int]:
+        """Translate the CSV file at *input_path* and write the results
+        to *output_path*.
+
+        The input file must contain the index columns of the source
+        node (and the value column, if one was given). Empty values
+        are treated as zero and values of the source node's undefined
+        record remain undefined. Returns a counter of ``'read'``,
+        ``'unmatched'``, and ``'written'`` records.
+        """
+        counter: Dict[str, int] = Counter()
+        source_ids = self.source_ids  # Assign locally to reduce dot-lookups.
+
+        # Sum values by attributes and source index id.
+        with open(input_path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            required_columns = list(self.source_columns)
+            if self.value_column:
+                required_columns.append(self.value_column)
+            try:
+                verify_columns_set(header, required_columns, allow_extras=True)
+            except ValueError as err:
+                raise ToronError(f'{input_path!r}: {err}')
+
+            label_pos = [header.index(x) for x in self.source_columns]
+            other_pos = [i for i, x in enumerate(header) if x not in self.source_columns]
+            if self.value_column:
+                value_pos = [header.index(self.value_column)]
+                attr_pos = [i for i in other_pos if i not in value_pos]
+            else:
+                value_pos = other_pos
+                attr_pos = []
+
+            totals: Dict[Tuple[str, ...], Dict[int, List[float]]] = {}
+            for row in reader:
+                counter['read'] += 1
+                index_id = source_ids.get(tuple(row[i] for i in label_pos))
+                if index_id is None:
+                    counter['unmatched'] += 1
+                    continue  # <- Skip to next item.
+
+                try:
+                    values = [float(row[i]) if row[i] else 0.0 for i in value_pos]
+                except ValueError as err:
+                    raise ToronError(f'{input_path!r}, line {reader.line_num}: {err}')
+
+                group = totals.setdefault(tuple(row[i] for i in attr_pos), {})
+                total = group.get(index_id)
+                if total is None:
+                    group[index_id] = values
+                else:
+                    group[index_id] = [a + b for a, b in zip(total, values)]
+
+        # Distribute totals to target index ids using the CSR arrays of
+        # the link selected by each group's attributes.
+        attr_names = [header[i] for i in attr_pos]
+        results: Dict[Tuple[str, ...], Dict[int, List[float]]] = {}
+        index_ids: Sequence[int]
+        proportions: Sequence[float]
+        for attr_values, group in totals.items():
+            attributes = {k: v for k, v in zip(attr_names, attr_values) if v}
+            arrays = self.link_arrays[self.get_link_id(attributes)]
+            result_group = results.setdefault(attr_values, {})
+            for other_index_id, values in group.items():
+                if other_index_id == 0:  # Undefined values remain undefined.
+                    index_ids, proportions = [0], [1.0]
+                else:
+                    index_ids, proportions = get_proportion_slices(arrays, other_index_id)
+
+                for index_id, proportion in zip(index_ids, proportions):
+                    result = result_group.get(index_id)
+                    shares = [x * proportion for x in values]
+                    if result is None:
+                        result_group[index_id] = shares
+                    else:
+                        result_group[index_id] = [a + b for a, b in zip(result, shares)]
+
+        # Write translated records ordered by target index id.
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(self.target_columns + attr_names + [header[i] for i in value_pos])
+            target_labels = self.target_labels
+            for attr_values, result_group in results.items():
+                for index_id in sorted(result_group):
+                    writer.writerow(
+                        target_labels[index_id] + attr_values + tuple(result_group[index_id])
+                    )
+                    counter['written'] += 1
+
+        return counter
+
+
+_worker_translator: Optional[BatchTranslator] = None
+
+
+def _init_worker(
+    target_path: str,
+    source_path: str,
+    link_name: Optional[str],
+    value_column: Optional[str],
+) -> None:
+    """Initialize a translator once for each worker process."""
+    global _worker_translator
+    _worker_translator = BatchTranslator(
+        target=cli_bind_file(target_path, mode='ro'),
+        source=cli_bind_file(source_path, mode='ro'),
+        link_name=link_name,
+        value_column=value_column,
+    )
+
+
+def _translate_in_worker(input_path: str, output_path: str) -> Dict[str, int]:
+    """Translate a single file using the worker's translator."""
+    return check_type(_worker_translator, BatchTranslator).translate_file(
+        input_path, output_path
+    )
+
+
+def translate_files(args: argparse.Namespace) -> ExitCode:
+    """Translate input files from the index of 'source' to the index
+    of 'filepath' and write the results to 'output_dir'.
+    """
+    if not os.path.isdir(args.output_dir):
+        applogger.error(f'cancelled: {args.output_dir!r} is not a directory')
+        return ExitCode.ERR
+
+    jobs = []
+    output_names: Dict[str, str] = {}
+    for input_path in args.files:
+        name = os.path.basename(input_path)
+        if name in output_names:
+            applogger.error(
+                f'cancelled: {output_names[name]!r} and {input_path!r} would '
+                f'both be written to {name!r}'
+            )
+            return ExitCode.ERR
+        output_names[name] = input_path
+
+        output_path = os.path.join(args.output_dir, name)
+        if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+            applogger.error(f'cancelled: output would overwrite {input_path!r}')
+            return ExitCode.ERR
+        jobs.append((input_path, output_path))
+
+    target = cli_bind_file(args.filepath, mode='ro')
+    source = cli_bind_file(args.source, mode='ro')
+
+    if args.jobs > 1 and len(jobs) > 1:
+        # Verify the nodes and links before any work is started (the
+        # translators themselves are only loaded in worker processes).
+        _make_get_link_id(target, source, args.link)
+        with ProcessPoolExecutor(
+            max_workers=args.jobs,
+            initializer=_init_worker,
+            initargs=(args.filepath, args.source, args.link, args.value_column),
+        ) as executor:
+            counters = list(executor.map(_translate_in_worker, *zip(*jobs)))
+    else:
+        translator = BatchTranslator(target, source, args.link, args.value_column)
+        counters = [translator.translate_file(*job) for job in jobs]
+
+    total: Dict[str, int] = Counter()
+    for (input_path, output_path), counter in zip(jobs, counters):
+        if counter['unmatched']:
+            applogger.warning(
+                f"{input_path}: skipped {counter['unmatched']} records "
+                f"not matching the source index"
+            )
+        total.update(counter)
+
+    applogger.info(
+        f"translated {len(jobs)} file{'s' if len(jobs) != 1 else ''}, "
+        f"written {total['written']} record{'s' if total['written'] != 1 else ''}"
+    )
+    return ExitCode.OK
@@ -12,13 +12,18 @@ from collections import Counter
 from contextlib import contextmanager
 from dataclasses import astuple, dataclass
 from enum import IntEnum
+from itertools import islice
+from queue import Full, Queue
 from struct import Struct
+from threading import Event, Thread
+from time import perf_counter
 from .. import bind_file, ToronError
 from .._typing import (
     Any,
     Dict,
     Generator,
     Iterable,
+    Iterator,
     List,
     Literal,
     Mapping,
@@ -73,6 +78,102 @@ def csv_stdout_writer(
             pass
 
 
+applogger = logging.getLogger('app-toron')
+
+
+class PipelinedCSVReader(object):
+    """Iterable of CSV rows parsed from *stream* in a separate thread.
+
+    Rows are parsed in chunks of *chunk_size* rows by a producer
+    thread and handed to the consuming thread (the one writing to
+    the database) over a queue that holds up to *max_chunks* chunks.
+    When the queue is full, parsing waits until the consumer catches
+    up. Errors raised while parsing are re-raised in the consuming
+    thread.
+
+    .. code-block:: python
+
+        >>> reader = PipelinedCSVReader(sys.stdin)
+        >>> node.insert_quantities2(value_column='counts', data=reader)
+
+    After iteration, the number of rows and the time spent in each
+    stage are stored in the ``stats`` dictionary (and logged at the
+    DEBUG level): ``'parse_time'`` is time spent parsing,
+    ``'parse_wait'`` is time the parser waited on a full queue (the
+    writer is the bottleneck), and ``'write_wait'`` is time the
+    consumer waited on an empty queue (the parser is the bottleneck).
+    """
+    def __init__(
+        self,
+        stream: Iterable[str],
+        chunk_size: int = 1000,
+        max_chunks: int = 16,
+    ) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._max_chunks = max_chunks
+        self.stats: Dict[str, float] = {
+            'rows': 0,
+            'parse_time': 0.0,
+            'parse_wait': 0.0,
+            'write_wait': 0.0,
+        }
+
+    def _produce(self, queue: Queue, stop: Event) -> None:
+        """Parse chunks of rows and put them on the *queue* (runs in
+        the producer thread).
+        """
+        def put(item: Any) -> None:
+            while not stop.is_set():
+                try:
+                    queue.put(item, timeout=0.1)
+                    return  # <- EXIT!
+                except Full:
+                    pass
+
+        try:
+            reader = csv.reader(self._stream)
+            while not stop.is_set():
+                start = perf_counter()
+                chunk = list(islice(reader, self._chunk_size))
+                self.stats['parse_time'] += perf_counter() - start
+                if not chunk:
+                    break
+
+                start = perf_counter()
+                put(chunk)
+                self.stats['parse_wait'] += perf_counter() - start
+            put(None)  # End of stream.
+        except Exception as err:
+            put(err)
+
+    def __iter__(self) -> Iterator[List[str]]:
+        queue: Queue = Queue(maxsize=self._max_chunks)
+        stop = Event()
+        thread = Thread(target=self._produce, args=(queue, stop), daemon=True)
+        thread.start()
+        try:
+            while True:
+                start = perf_counter()
+                item = queue.get()
+                self.stats['write_wait'] += perf_counter() - start
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                self.stats['rows'] += len(item)
+                yield from item
+            thread.join()
+        finally:
+            stop.set()  # Signal producer to stop if iteration ended early.
+            applogger.debug(
+                f"parsed {self.stats['rows']} CSV rows in "
+                f"{self.stats['parse_time']:.2f}s (waited "
+                f"{self.stats['parse_wait']:.2f}s on writer, writer waited "
+                f"{self.stats['write_wait']:.2f}s on parser)"
+            )
+
+
 def cli_bind_file(
     filepath: str, *, mode: Literal['ro', 'rw', 'rwc']
 ) -> 'DataSpace':
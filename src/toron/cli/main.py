@@ -18,6 +18,7 @@ from .. import (
 )
 from . import (
     command_add,
+    command_catalog,
     command_info,
     command_index,
     command_update,
@@ -26,6 +27,7 @@ from . import (
     command_quantity,
     command_mapping,
     command_init,
+    command_translate,
 )
 from .common import (
     ExitCode,
@@ -44,6 +46,16 @@ def non_negative_int(string: str) -> int:
     return integer
 
 
+def positive_int(string: str) -> int:
+    """Custom argparse type validator for positive integers."""
+    integer = int(string)
+    if integer < 1:
+        raise argparse.ArgumentTypeError(
+            f'value must be 1 or greater, got {integer}'
+        )
+    return integer
+
+
 def get_parser() -> argparse.ArgumentParser:
     """Get argument parser for Toron command line interface."""
 
@@ -514,11 +526,89 @@ def get_parser() -> argparse.ArgumentParser:
     parser_mapping.add_argument('--allow-incomplete',
                                 action='store_true',
                                 help='load matches even if the mapping is incomplete')
+    parser_mapping.add_argument('--update',
+                                action='store_true',
+                                help='update existing mappings, only changed records are written')
     parser_mapping.set_defaults(
         func=command_mapping.process_mapping_action,
         direction='both',
     )
 
+    ####################################################################
+    # Subcommand: translate
+    ####################################################################
+    parser_translate = subparsers.add_parser(
+        'translate',
+        help='translate CSV files to the index of FILE',
+        description=('Translate CSV files from the index of SOURCE to the '
+                     'index of TARGET. Each input file must contain the '
+                     'index columns of SOURCE, other columns are treated '
+                     'as values (or, when a value column is given, as '
+                     'attributes used to select links). Results are '
+                     'written to DIR using the same file names.'),
+        prog='toron TARGET translate',  # <- Replaces "FILE" with "TARGET".
+    )
+    parser_translate.add_argument('files', nargs='+',
+                                  help='CSV files to translate',
+                                  metavar='INPUT')
+    parser_translate.add_argument('--from', required=True, dest='source',
+                                  help='file of the source node',
+                                  metavar='SOURCE')
+    parser_translate.add_argument('-o', '--output-dir', required=True,
+                                  help='directory to write translated files',
+                                  metavar='DIR')
+    parser_translate.add_argument('--link',
+                                  help='name of link to use (default: default link)',
+                                  metavar='NAME')
+    parser_translate.add_argument('--value-column',
+                                  help='name of value column, other columns are attributes',
+                                  metavar='NAME')
+    parser_translate.add_argument('--jobs', type=positive_int, default=1,
+                                  help='number of worker processes (default: 1)',
+                                  metavar='N')
+    parser_translate.set_defaults(func=command_translate.translate_files)
+
+    ####################################################################
+    # Subcommand: catalog
+    ####################################################################
+    parser_catalog = subparsers.add_parser(
+        'catalog',
+        help='build or query a directory catalog',
+        description=('Build or query a catalog of the Toron files in a '
+                     'directory tree (FILE must be a directory).'),
+        prog='toron DIR catalog',  # <- Replaces "FILE" with "DIR".
+    )
+    parser_catalog_subparsers = parser_catalog.add_subparsers(
+        dest='action',
+        required=True,
+        metavar='ACTION',
+    )
+
+    # Subcommand: catalog build
+    parser_catalog_build = parser_catalog_subparsers.add_parser(
+        'build',
+        help='build or refresh catalog',
+        description=('Build a catalog of the Toron files in DIR or refresh '
+                     'an existing catalog (only new or modified files are '
+                     'read).'),
+    )
+    parser_catalog_build.set_defaults(func=command_catalog.build_catalog)
+
+    # Subcommand: catalog path
+    parser_catalog_path = parser_catalog_subparsers.add_parser(
+        'path',
+        help='find translation path between files',
+        description=('Write the shortest sequence of files that can be used '
+                     'to translate data from SOURCE to TARGET.'),
+    )
+    parser_catalog_path.add_argument('source',
+                                     help='source file or unique id',
+                                     metavar='SOURCE')
+    parser_catalog_path.add_argument('target',
+                                     help='target file or unique id',
+                                     metavar='TARGET')
+    parser_catalog_path.set_defaults(func=command_catalog.write_path_to_stdout)
+
     ####################################################################
     # Subcommand: info
     ####################################################################
@@ -5,11 +5,13 @@ import sqlite3
 from itertools import chain
 import toron._datetime as datetime
 from toron._typing import (
+    Dict,
+    List,
     Optional,
 )
 
 from . import schema
-from toron._utils import BitFlags
+from toron._utils import BitFlags, ChunkedSequenceHash, SequenceHash
 
 
 ########################################################################
@@ -223,6 +225,181 @@ def v030_to_v031_step01_properties(cursor: sqlite3.Cursor) -> None:
     """)
 
 
+########################################################################
+# Schema Migrations for 0.3.1 to 0.3.2
+########################################################################
+
+def v031_to_v032_step01_link_csr_table(cursor: sqlite3.Cursor) -> None:
+    """Add 'link_csr' table for 0.3.1 to 0.3.2 migration."""
+    # Table starts empty--CSR arrays are built when they are first
+    # requested.
+    cursor.execute("""
+        CREATE TABLE main.link_csr(
+            link_id INTEGER PRIMARY KEY,
+            other_index_ids BLOB NOT NULL,
+            offsets BLOB NOT NULL,
+            index_ids BLOB NOT NULL,
+            proportions BLOB NOT NULL,
+            FOREIGN KEY(link_id) REFERENCES link(link_id) ON DELETE CASCADE
+        )
+    """)
+
+
+def v031_to_v032_step02_link_stats_table(cursor: sqlite3.Cursor) -> None:
+    """Add 'link_stats' and 'mapping_revision' tables for 0.3.1 to
+    0.3.2 migration.
+    """
+    # Table starts empty--stats are counted when first requested.
+    cursor.execute("""
+        CREATE TABLE main.link_stats(
+            link_id INTEGER PRIMARY KEY,
+            index_id_count INTEGER NOT NULL,
+            other_index_id_count INTEGER NOT NULL,
+            FOREIGN KEY(link_id) REFERENCES link(link_id) ON DELETE CASCADE
+        )
+    """)
+
+    # Assign a revision to every existing link that has mappings
+    # (triggers replace them when mappings change afterward).
+    cursor.execute("""
+        CREATE TABLE main.mapping_revision(
+            link_id INTEGER PRIMARY KEY,
+            revision BLOB,
+            FOREIGN KEY(link_id) REFERENCES link(link_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO main.mapping_revision (link_id, revision)
+        SELECT link_id, randomblob(16)
+        FROM main.link
+        WHERE EXISTS (SELECT 1 FROM main.mapping WHERE mapping.link_id=link.link_id)
+    """)
+
+
+def v031_to_v032_step03_mapping_index(cursor: sqlite3.Cursor) -> None:
+    """Add index on 'mapping' columns 'index_id' and 'link_id' for 0.3.1
+    to 0.3.2 migration.
+    """
+    cursor.execute(
+        'CREATE INDEX main.mapping_index_id_idx ON mapping(index_id, link_id)'
+    )
+
+
+def v031_to_v032_step04_coverage_tables(cursor: sqlite3.Cursor) -> None:
+    """Add 'weight_group_coverage' and 'link_coverage' tables for 0.3.1
+    to 0.3.2 migration.
+    """
+    cursor.execute("""
+        CREATE TABLE main.weight_group_coverage(
+            weight_group_id INTEGER PRIMARY KEY,
+            index_id_count INTEGER NOT NULL,
+            FOREIGN KEY(weight_group_id) REFERENCES weight_group(weight_group_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE main.link_coverage(
+            link_id INTEGER PRIMARY KEY,
+            index_id_count INTEGER NOT NULL,
+            FOREIGN KEY(link_id) REFERENCES link(link_id) ON DELETE CASCADE
+        )
+    """)
+
+    # Count existing records (triggers keep counts current afterward).
+    cursor.execute("""
+        INSERT INTO main.weight_group_coverage (weight_group_id, index_id_count)
+        SELECT weight_group_id, COUNT(weight.index_id)
+        FROM main.weight_group
+        LEFT JOIN main.weight USING (weight_group_id)
+        GROUP BY weight_group_id
+    """)
+    cursor.execute("""
+        INSERT INTO main.link_coverage (link_id, index_id_count)
+        SELECT link_id, COUNT(DISTINCT NULLIF(mapping.index_id, 0))
+        FROM main.link
+        LEFT JOIN main.mapping USING (link_id)
+        GROUP BY link_id
+    """)
+
+
+def v031_to_v032_step05_index_hash_chunks(cursor: sqlite3.Cursor) -> None:
+    """Add 'index_hash_chunk' and 'link_hash_chunk' tables, rebuild the
+    'index_hash' property, and convert link hashes for 0.3.1 to 0.3.2
+    migration.
+    """
+    cursor.execute("""
+        CREATE TABLE main.index_hash_chunk(
+            chunk_id INTEGER PRIMARY KEY,
+            digest BLOB
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE main.link_hash_chunk(
+            link_id INTEGER NOT NULL,
+            chunk_id INTEGER NOT NULL,
+            digest BLOB,
+            PRIMARY KEY (link_id, chunk_id),
+            FOREIGN KEY(link_id) REFERENCES link(link_id) ON DELETE CASCADE
+        )
+    """)
+
+    # Hash existing index_id values by chunk and save the new index_hash.
+    chunk_size = ChunkedSequenceHash.chunk_size
+    cursor.execute('SELECT index_id FROM main.label_index ORDER BY index_id')
+    chunks: Dict[int, List[int]] = {}
+    for (index_id,) in cursor:  # Unpack single item in `for` clause.
+        chunks.setdefault(index_id // chunk_size, []).append(index_id)
+    chunk_digests = [
+        (chunk_id, ChunkedSequenceHash.digest_chunk(index_ids))
+        for chunk_id, index_ids in chunks.items()
+    ]
+    cursor.executemany(
+        'INSERT INTO main.index_hash_chunk (chunk_id, digest) VALUES (?, ?)',
+        chunk_digests,
+    )
+    cursor.execute(
+        "INSERT OR REPLACE INTO main.property (key, value) VALUES ('index_hash', ?)",
+        (json.dumps(ChunkedSequenceHash.combine_digests(chunk_digests)),),
+    )
+
+    # Add a chunk for each range of other_index_id values used by a
+    # link (digests are NULL so they are hashed when first needed).
+    cursor.execute(f"""
+        INSERT INTO main.link_hash_chunk (link_id, chunk_id, digest)
+        SELECT DISTINCT link_id, other_index_id / {chunk_size}, NULL
+        FROM main.mapping
+    """)
+
+    # Convert link hashes that still match the other_index_id values of
+    # their mappings (other hashes are left as-is and can be updated by
+    # re-linking or by reloading the mappings).
+    cursor.execute('SELECT link_id, other_index_hash FROM main.link')
+    for link_id, other_index_hash in cursor.fetchall():
+        cursor.execute(
+            """
+                SELECT DISTINCT other_index_id
+                FROM main.mapping
+                WHERE link_id=? AND other_index_id > 0
+                ORDER BY other_index_id
+            """,
+            (link_id,),
+        )
+        other_index_ids = [0] + [row[0] for row in cursor.fetchall()]
+        if SequenceHash(other_index_ids).get_hexdigest() != other_index_hash:
+            continue  # <- Skip to next item.
+
+        cursor.execute(
+            'UPDATE main.link SET other_index_hash=? WHERE link_id=?',
+            (ChunkedSequenceHash(other_index_ids).get_hexdigest(), link_id),
+        )
+
+    # Update schema version number.
+    cursor.execute("""
+        UPDATE main.property
+        SET value='"0.3.2"'
+        WHERE key='toron_schema_version'
+    """)
+
+
 ########################################################################
 # Main "Apply Migrations" Function
 ########################################################################
@@ -240,7 +417,7 @@ def apply_migrations(
     toron_schema_version = cursor.fetchone()[0]
 
     # Exit without changes if schema already uses the latest version.
-    if toron_schema_version == '0.3.1' or toron_schema_version == '"0.3.1"':
+    if toron_schema_version == '0.3.2' or toron_schema_version == '"0.3.2"':
         return  # <- EXIT!
 
     if mode == 'ro':
@@ -266,16 +443,33 @@ def apply_migrations(
         schema.drop_schema_constraints(cursor)
 
         if toron_schema_version in {'0.2.0', '"0.2.0"'}:
-            # Apply 0.2.0 -> 0.3.1 migrations.
+            # Apply 0.2.0 -> 0.3.2 migrations.
             v020_to_v030_step01_link_table(cursor)
             v020_to_v030_step02_relation_table(cursor, whole_space_level)
             v020_to_v030_step03_quantity_table(cursor)
             v020_to_v030_step04_rename_label_tables(cursor)
             v020_to_v030_step05_properties(cursor)
             v030_to_v031_step01_properties(cursor)
+            v031_to_v032_step01_link_csr_table(cursor)
+            v031_to_v032_step02_link_stats_table(cursor)
+            v031_to_v032_step03_mapping_index(cursor)
+            v031_to_v032_step04_coverage_tables(cursor)
+            v031_to_v032_step05_index_hash_chunks(cursor)
         elif toron_schema_version in {'0.3.0', '"0.3.0"'}:
-            # Apply 0.3.0 -> 0.3.1 migrations.
+            # Apply 0.3.0 -> 0.3.2 migrations.
             v030_to_v031_step01_properties(cursor)
+            v031_to_v032_step01_link_csr_table(cursor)
+            v031_to_v032_step02_link_stats_table(cursor)
+            v031_to_v032_step03_mapping_index(cursor)
+            v031_to_v032_step04_coverage_tables(cursor)
+            v031_to_v032_step05_index_hash_chunks(cursor)
+        elif toron_schema_version in {'0.3.1', '"0.3.1"'}:
+            # Apply 0.3.1 -> 0.3.2 migrations.
+            v031_to_v032_step01_link_csr_table(cursor)
+            v031_to_v032_step02_link_stats_table(cursor)
+            v031_to_v032_step03_mapping_index(cursor)
+            v031_to_v032_step04_coverage_tables(cursor)
+            v031_to_v032_step05_index_hash_chunks(cursor)
 
         # Check integrity, re-create constraints, and commit transaction.
         schema.verify_foreign_key_check(cursor)
@@ -1,14 +1,48 @@
 """Data service functions optimized for DAL1 backend."""
 
+import sqlite3
+
+from collections import Counter
+from itertools import chain, compress
+from json import dumps as json_dumps
+from math import isinf, isnan
+
 from toron._typing import (
     Callable,
     Dict,
+    Generator,
+    Iterable,
     List,
+    Literal,
     Optional,
+    Sequence,
+    Tuple,
+    cast,
+    TYPE_CHECKING,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+from ..data_models import Index, Link, WeightGroup
+from .._utils import BitFlags, ChunkedSequenceHash
+from ..data_service import (
+    MappingRow,
+    count_stale_other_index_ids as _count_stale_other_index_ids,
+    generate_mapping_rows as _generate_mapping_rows,
+    load_index_records as _load_index_records,
+    update_index_records as _update_index_records,
+)
 from .repositories import (
+    AttributeGroupRepository,
     IndexRepository,
+    LinkRepository,
+    LocationRepository,
+    MappingRepository,
+    PropertyRepository,
+    QuantityRepository,
+    StructureRepository,
+    WeightRepository,
 )
 from .schema import (
     format_identifier,
@@ -114,7 +148,1505 @@ def calculate_granularity(
     return cursor.fetchone()[0]
 
 
+def _get_main_database_path(cursor: sqlite3.Cursor) -> str:
+    """Return file path of the cursor's main database or an empty
+    string if the database is not stored on drive.
+    """
+    cursor.execute('PRAGMA main.database_list')
+    return next((row[2] for row in cursor if row[1] == 'main'), '')
+
+
+def generate_mapping_rows(
+    link_name: Optional[str],
+    trg_index_repo: IndexRepository,
+    trg_link_repo: LinkRepository,
+    trg_mapping_repo: MappingRepository,
+    src_index_repo: IndexRepository,
+    src_prop_repo: PropertyRepository,
+    aux_trg_index_repo: IndexRepository,
+    aux_src_index_repo: IndexRepository,
+) -> Generator[MappingRow, None, None]:
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.generate_mapping_rows()`` function.
+        Instead of looking up labels one record at a time, the source
+        node's database is attached to the target node's connection
+        and each group of elements is selected with a single query.
+        Unmatched elements are selected using anti-joins.
+
+        The source node must be stored on drive (so its database can
+        be attached). When it is not, or when it cannot be attached,
+        the normal function is used instead.
+
+    Get mapping elements with the labels of their index records.
+    """
+    link = None
+    unique_id = cast(str, src_prop_repo.get('unique_id'))
+    for cw in trg_link_repo.find_by_other_unique_id(unique_id):
+        if cw.name == link_name:
+            link = cw
+
+    # Get source database file (non-public interface).
+    src_path = _get_main_database_path(src_index_repo._cursor)
+
+    connection = trg_mapping_repo._cursor.connection
+    cursor = connection.cursor()
+    is_attached = False
+    if link and src_path:
+        try:
+            cursor.execute('ATTACH DATABASE ? AS toron_mapping_source', (src_path,))
+            is_attached = True
+        except sqlite3.OperationalError:
+            pass  # Cannot attach within a transaction, etc.
+
+    if not is_attached:
+        cursor.close()
+        yield from _generate_mapping_rows(
+            link_name=link_name,
+            trg_index_repo=trg_index_repo,
+            trg_link_repo=trg_link_repo,
+            trg_mapping_repo=trg_mapping_repo,
+            src_index_repo=src_index_repo,
+            src_prop_repo=src_prop_repo,
+            aux_trg_index_repo=aux_trg_index_repo,
+            aux_src_index_repo=aux_src_index_repo,
+        )
+        return  # <- EXIT!
+
+    link = cast(Link, link)
+    src_columns = [f'src.{format_identifier(x)}'
+                   for x in src_index_repo.get_label_names()]
+    trg_columns = [f'trg.{format_identifier(x)}'
+                   for x in trg_index_repo.get_label_names()]
+    src_stop = 2 + len(src_columns)
+    trg_start = src_stop + 3
+
+    def make_row(record):
+        src_id = record[0]
+        src_labels = tuple(record[2:src_stop]) if record[1] else None
+        value = record[src_stop]
+        trg_id = record[src_stop + 1]
+        trg_labels = tuple(record[trg_start:-1]) if record[trg_start - 1] else None
+        return (src_id, src_labels, value, trg_id, trg_labels, record[-1])
+
+    def select_clause(src_id: str, value: str, trg_id: str, level: str) -> str:
+        columns = [src_id, 'src.index_id IS NOT NULL', *src_columns, value,
+                   trg_id, 'trg.index_id IS NOT NULL', *trg_columns, level]
+        return f"SELECT {', '.join(columns)}"
+
+    try:
+        # Yield undefined-to-undefined record (always considered matched).
+        sql = select_clause(src_id='0', value='0.0', trg_id='0', level='NULL') + """
+            FROM (SELECT 1)
+            LEFT JOIN toron_mapping_source.label_index src ON src.index_id=0
+            LEFT JOIN main.label_index trg ON trg.index_id=0
+        """
+        cursor.execute(sql)
+        yield make_row(cursor.fetchone())
+
+        # Yield matched records.
+        sql = select_clause(
+            src_id='mapping.other_index_id',
+            value='mapping.mapping_value',
+            trg_id='mapping.index_id',
+            level='mapping.mapping_level',
+        ) + """
+            FROM main.mapping
+            LEFT JOIN toron_mapping_source.label_index src
+                ON src.index_id=mapping.other_index_id
+            LEFT JOIN main.label_index trg
+                ON trg.index_id=mapping.index_id
+            WHERE mapping.link_id=?
+        """
+        cursor.execute(sql, (link.id,))
+        for record in cursor:
+            yield make_row(record)
+
+        # If target is not complete, yield unmatched right-side elements.
+        if not link.is_locally_complete:
+            sql = select_clause(
+                src_id='NULL', value='NULL', trg_id='trg.index_id', level='NULL'
+            ) + """
+                FROM main.label_index trg
+                LEFT JOIN toron_mapping_source.label_index src ON 0
+                WHERE trg.index_id != 0 AND trg.index_id NOT IN (
+                    SELECT index_id FROM main.mapping WHERE link_id=?
+                )
+                ORDER BY trg.index_id
+            """
+            cursor.execute(sql, (link.id,))
+            for record in cursor:
+                yield make_row(record)
+
+        # If source index is different, yield unmatched left-side elements.
+        if src_prop_repo.get('index_hash') != link.other_index_hash:
+            sql = select_clause(
+                src_id='src.index_id', value='NULL', trg_id='NULL', level='NULL'
+            ) + """
+                FROM toron_mapping_source.label_index src
+                LEFT JOIN main.label_index trg ON 0
+                WHERE src.index_id != 0 AND src.index_id NOT IN (
+                    SELECT other_index_id FROM main.mapping WHERE link_id=?
+                )
+                ORDER BY src.index_id
+            """
+            cursor.execute(sql, (link.id,))
+            for record in cursor:
+                yield make_row(record)
+    finally:
+        cursor.close()
+        connection.execute('DETACH DATABASE toron_mapping_source')
+
+
+def count_stale_other_index_ids(
+    link_id: int,
+    trg_mapping_repo: MappingRepository,
+    src_index_repo: IndexRepository,
+) -> int:
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.count_stale_other_index_ids()`` function.
+        Instead of loading the source node's index_id values into a
+        set, the source node's database is attached to the target
+        node's connection and the stale values are counted with a
+        single EXCEPT query.
+
+        The source node must be stored on drive (so its database can
+        be attached). When it is not, or when it cannot be attached,
+        the normal function is used instead.
+
+    Return the number of distinct 'other_index_id' values used by
+    the link's mappings that no longer exist in the source index.
+    """
+    # Get source database file (non-public interface).
+    src_path = _get_main_database_path(src_index_repo._cursor)
+
+    connection = trg_mapping_repo._cursor.connection
+    cursor = connection.cursor()
+    is_attached = False
+    if src_path:
+        try:
+            cursor.execute('ATTACH DATABASE ? AS toron_mapping_source', (src_path,))
+            is_attached = True
+        except sqlite3.OperationalError:
+            pass  # Cannot attach within a transaction, etc.
+
+    if not is_attached:
+        cursor.close()
+        return _count_stale_other_index_ids(  # <- EXIT!
+            link_id=link_id,
+            trg_mapping_repo=trg_mapping_repo,
+            src_index_repo=src_index_repo,
+        )
+
+    try:
+        cursor.execute(
+            """
+                SELECT COUNT(*) FROM (
+                    SELECT other_index_id FROM main.mapping WHERE link_id=?
+                    EXCEPT
+                    SELECT index_id FROM toron_mapping_source.label_index
+                )
+            """,
+            (link_id,),
+        )
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        connection.execute('DETACH DATABASE toron_mapping_source')
+
+
+def generate_weight_rows(
+    weight_group_ids: Sequence[int],
+    index_repo: IndexRepository,
+    weight_repo: WeightRepository,
+) -> Generator[Tuple[Index, List[Optional[float]]], None, None]:
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.generate_weight_rows()`` function.
+        Instead of looking up each weight individually, the weights
+        are pivoted into columns using a single query (a LEFT JOIN
+        with conditional aggregation grouped by index_id).
+
+    Yield index records with a list of their weight values for
+    each of the given *weight_group_ids* (in the same order).
+    """
+    label_columns = [
+        f'label_index.{format_identifier(x)}' for x in index_repo.get_label_names()
+    ]
+    weight_columns = [
+        'MAX(CASE WHEN weight.weight_group_id=? THEN weight.weight_value END)'
+    ] * len(weight_group_ids)
+    placeholders = ', '.join('?' * len(weight_group_ids))
+
+    # Grouping by the INTEGER PRIMARY KEY lets SQLite stream rows in
+    # index_id order without building a temporary b-tree.
+    sql = f"""
+        SELECT label_index.index_id, {', '.join(label_columns + weight_columns)}
+        FROM main.label_index
+        LEFT JOIN main.weight
+            ON weight.index_id=label_index.index_id
+            AND weight.weight_group_id IN ({placeholders})
+        GROUP BY label_index.index_id
+        ORDER BY label_index.index_id
+    """
+    parameters = list(weight_group_ids) * 2
+
+    label_stop = 1 + len(label_columns)
+    cursor = weight_repo._cursor  # Get cursor (non-public interface).
+    cursor.execute(sql, parameters)
+    for record in cursor:
+        index = Index(record[0], *record[1:label_stop])
+        weight_vals = list(record[label_stop:])
+        if index.id == 0:
+            weight_vals = [0.0 if x is None else x for x in weight_vals]
+        yield (index, weight_vals)
+
+
+def get_index_frame(index_repo: IndexRepository) -> 'pd.DataFrame':
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.get_index_frame()`` function. It builds
+        the DataFrame directly from the query results without making
+        an ``Index`` object for each record.
+
+    Return a pandas DataFrame of index records with an 'index_id'
+    column followed by the label columns.
+    """
+    import pandas as pd
+
+    cursor = index_repo._cursor  # Get cursor (non-public interface).
+    cursor.execute('SELECT * FROM main.label_index')
+    columns = [x[0] for x in cursor.description]
+    return pd.DataFrame.from_records(cursor, columns=columns)
+
+
+def load_index_records(
+    data: Iterable[Sequence],
+    label_positions: Sequence[int],
+    index_id_position: Optional[int],
+    weight_positions: Dict[int, WeightGroup],
+    index_repo: IndexRepository,
+    weight_repo: WeightRepository,
+    on_label_conflict: Literal['abort', 'ignore', 'replace'] = 'abort',
+    on_weight_conflict: Literal['abort', 'ignore', 'replace'] = 'abort',
+) -> Dict[str, int]:
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.load_index_records()`` function.
+        Instead of adding and querying records one row at a time,
+        rows are loaded into a temporary staging table and then
+        resolved with set-based statements: new labels are added
+        with a single ``INSERT ... SELECT`` and weights are written
+        with a single UPSERT.
+
+        When replaced labels could interact with other rows in a way
+        that depends on the order in which rows are applied (see
+        comments below), the staged rows are passed to the normal
+        function instead.
+
+    Load index labels and weights from *data* rows and return a
+    counter of the actions taken.
+    """
+    for name, value in [('on_label_conflict', on_label_conflict),
+                        ('on_weight_conflict', on_weight_conflict)]:
+        if value not in ('abort', 'ignore', 'replace'):
+            raise ValueError(
+                f"{name} must be 'abort', 'ignore', or 'replace'; "
+                f"got {value!r}"
+            )
+
+    cursor = index_repo._cursor  # Get cursor (non-public interface).
+    label_columns = [format_identifier(x) for x in index_repo.get_label_names()]
+    staged_labels = [f'lbl{i}' for i in range(len(label_positions))]
+    staged_weights = [f'wt{i}' for i in range(len(weight_positions))]
+    weight_groups = list(weight_positions.values())
+
+    # Create staging table.
+    cursor.execute('DROP TABLE IF EXISTS temp.index_staging')
+    cursor.execute(f"""
+        CREATE TEMP TABLE index_staging (
+            row_num INTEGER PRIMARY KEY,
+            given_id INTEGER,
+            index_id INTEGER{''.join(f', {x} TEXT' for x in staged_labels)}
+            {''.join(f', {x} REAL' for x in staged_weights)}
+        )
+    """)
+
+    counter: Counter = Counter()
+
+    def generate_staged_rows():
+        for row in data:
+            if not row:
+                continue  # <- Skip to next item.
+
+            labels = tuple(row[pos] for pos in label_positions)
+            if '' in labels:
+                counter['empty_labels'] += 1
+                continue  # <- Skip to next item.
+
+            raw_index_id = '' if index_id_position is None else row[index_id_position]
+            given_id = None if raw_index_id == '' else int(raw_index_id)
+
+            weights = []
+            for position in weight_positions:
+                weight_value = row[position]
+                if weight_value is None or weight_value == '':
+                    weights.append(None)
+                    continue  # <- Skip to next item.
+
+                weight_value = float(weight_value)
+                if isnan(weight_value) or isinf(weight_value):
+                    counter['not_realnum'] += 1
+                    weights.append(None)
+                else:
+                    weights.append(weight_value)
+
+            yield (given_id, given_id) + labels + tuple(weights)
+
+    # Load rows into the staging table (consumes *data* as a stream).
+    qmarks = ', '.join('?' * (2 + len(staged_labels) + len(staged_weights)))
+    cursor.executemany(
+        f'INSERT INTO temp.index_staging VALUES (NULL, {qmarks})',
+        generate_staged_rows(),
+    )
+
+    # When replacing labels, check for rows whose outcome depends on
+    # the order in which they are applied (an index_id whose labels
+    # are replaced given more than once or new labels that match the
+    # old or new labels of a replaced record). If found, the staged
+    # rows are passed to the normal function instead.
+    if on_label_conflict == 'replace' and index_id_position is not None \
+            and staged_labels:
+        given_matches = ' AND '.join(
+            f'label_index.{a}=s.{b}' for a, b in zip(label_columns, staged_labels)
+        )
+        new_matches = ' AND '.join(
+            f'label_index.{a}=t.{b}' for a, b in zip(label_columns, staged_labels)
+        )
+        new_given = ' AND '.join(f's.{x}=t.{x}' for x in staged_labels)
+        replaced = f"""
+            FROM temp.index_staging s
+            JOIN main.label_index ON label_index.index_id=s.given_id
+            WHERE NOT ({given_matches})
+        """
+        cursor.execute(f"""
+            SELECT EXISTS (
+                SELECT 1 FROM temp.index_staging
+                WHERE given_id IN (SELECT s.given_id {replaced})
+                GROUP BY given_id
+                HAVING COUNT(*) > 1
+            ) OR EXISTS (
+                SELECT 1 {replaced} AND EXISTS (
+                    SELECT 1 FROM temp.index_staging t
+                    WHERE t.given_id IS NULL
+                        AND (({new_matches}) OR ({new_given}))
+                )
+            )
+        """)
+        if cursor.fetchone()[0]:
+            weight_start = 1 + len(staged_labels)
+            cursor.execute(f"""
+                SELECT given_id, {', '.join(staged_labels + staged_weights)}
+                FROM temp.index_staging
+                ORDER BY row_num
+            """)
+            staged_rows = [('' if row[0] is None else row[0],) + row[1:]
+                           for row in cursor.fetchall()]
+            cursor.execute('DROP TABLE temp.index_staging')
+            counter.update(_load_index_records(
+                data=staged_rows,
+                label_positions=range(1, weight_start),
+                index_id_position=0,
+                weight_positions={weight_start + i: group
+                                  for i, group in enumerate(weight_groups)},
+                index_repo=index_repo,
+                weight_repo=weight_repo,
+                on_label_conflict=on_label_conflict,
+                on_weight_conflict=on_weight_conflict,
+            ))
+            return +counter  # <- EXIT!
+
+    # Add new labels (in input order) and resolve index_id values.
+    # Duplicates are removed before inserting because 'label_index'
+    # uses AUTOINCREMENT and rows skipped by an ON CONFLICT clause
+    # would still advance its sequence.
+    if staged_labels:
+        matches = ' AND '.join(
+            f'label_index.{a}=index_staging.{b}'
+            for a, b in zip(label_columns, staged_labels)
+        )
+        cursor.execute(f"""
+            INSERT INTO main.label_index ({', '.join(label_columns)})
+            SELECT {', '.join(staged_labels)}
+            FROM temp.index_staging
+            WHERE given_id IS NULL AND NOT EXISTS (
+                SELECT 1 FROM main.label_index WHERE {matches}
+            )
+            GROUP BY {', '.join(staged_labels)}
+            ORDER BY MIN(row_num)
+        """)
+        counter['label_inserted'] += cursor.rowcount
+
+        cursor.execute(f"""
+            UPDATE temp.index_staging
+            SET index_id=(SELECT index_id FROM main.label_index WHERE {matches})
+            WHERE given_id IS NULL
+        """)
+
+    # Resolve rows that were given by index_id.
+    if index_id_position is not None:
+        cursor.execute(
+            'CREATE INDEX temp.index_staging_given_id ON index_staging(given_id)'
+        )
+        cursor.execute("""
+            SELECT given_id FROM temp.index_staging
+            WHERE given_id IS NOT NULL AND given_id NOT IN (
+                SELECT index_id FROM main.label_index
+            )
+            ORDER BY row_num
+            LIMIT 1
+        """)
+        missing = cursor.fetchone()
+        if missing:
+            raise KeyError(f'no index with id of {missing[0]}')
+
+        if staged_labels:
+            matches = ' AND '.join(
+                f'label_index.{a}=s.{b}' for a, b in zip(label_columns, staged_labels)
+            )
+            mismatched = f"""
+                FROM temp.index_staging s
+                JOIN main.label_index ON label_index.index_id=s.given_id
+                WHERE NOT ({matches})
+            """
+            if on_label_conflict == 'abort':
+                cursor.execute(
+                    f"SELECT s.given_id, {', '.join(staged_labels)} {mismatched} "
+                    f"ORDER BY s.row_num LIMIT 1"
+                )
+                conflict = cursor.fetchone()
+                if conflict:
+                    index_id, *labels = conflict
+                    raise ValueError(
+                        f'index_id {index_id} and labels {tuple(labels)!r} '
+                        f'do not match {index_repo.get(index_id)!r}'
+                    )
+            else:
+                cursor.execute(f'SELECT COUNT(*) {mismatched}')
+                num_mismatched = cursor.fetchone()[0]
+                if num_mismatched and on_label_conflict == 'ignore':
+                    counter['label_ignored'] += num_mismatched
+                elif num_mismatched and on_label_conflict == 'replace':
+                    cursor.execute(f"""
+                        UPDATE main.label_index
+                        SET ({', '.join(label_columns)}) = (
+                            SELECT {', '.join(staged_labels)}
+                            FROM temp.index_staging s
+                            WHERE s.given_id=label_index.index_id
+                            ORDER BY s.row_num DESC
+                            LIMIT 1
+                        )
+                        WHERE index_id IN (SELECT s.given_id {mismatched})
+                    """)
+                    counter['label_replaced'] += num_mismatched
+
+    # Write weights with a single statement.
+    if weight_groups:
+        weight_rows = ' UNION ALL '.join(
+            f'SELECT row_num, {pos} AS pos, {group.id} AS weight_group_id, '
+            f'index_id, {col} AS weight_value FROM temp.index_staging '
+            f'WHERE {col} IS NOT NULL AND index_id IS NOT NULL'
+            for pos, (group, col) in enumerate(zip(weight_groups, staged_weights))
+        )
+
+        cursor.execute(f"""
+            SELECT index_id, weight_value FROM ({weight_rows})
+            WHERE index_id=0 OR weight_value < 0.0
+            ORDER BY row_num, pos
+            LIMIT 1
+        """)
+        invalid = cursor.fetchone()
+        if invalid and invalid[0] == 0:
+            msg = f'cannot assign weight to the undefined record (index_id 0)'
+            raise ValueError(msg)
+        elif invalid:
+            raise ValueError(f'value cannot be negative, got {invalid[1]!r}')
+
+        # Rows conflict with existing weights or with earlier rows
+        # (numbered using a window partitioned by weight group and
+        # index_id).
+        conflicting = f"""
+            SELECT row_num, pos, weight_group_id, index_id
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY weight_group_id, index_id
+                    ORDER BY row_num, pos
+                ) AS occurrence
+                FROM ({weight_rows})
+            ) AS a
+            WHERE occurrence > 1 OR EXISTS (
+                SELECT 1 FROM main.weight b
+                WHERE b.index_id=a.index_id AND b.weight_group_id=a.weight_group_id
+            )
+        """
+        if on_weight_conflict == 'abort':
+            cursor.execute(f'{conflicting} ORDER BY row_num, pos LIMIT 1')
+            conflict = cursor.fetchone()
+            if conflict:
+                group = weight_groups[conflict[1]]
+                raise ValueError(
+                    f'weight group {group.name!r} already has a '
+                    f'value for {index_repo.get(conflict[3])!r}'
+                )
+            num_conflicting = 0
+        else:
+            cursor.execute(f'SELECT COUNT(*) FROM ({conflicting})')
+            num_conflicting = cursor.fetchone()[0]
+
+        if on_weight_conflict == 'replace':
+            on_conflict = 'DO UPDATE SET weight_value=excluded.weight_value'
+        else:
+            on_conflict = 'DO NOTHING'
+
+        cursor.execute(f"""
+            INSERT INTO main.weight (weight_group_id, index_id, weight_value)
+            SELECT weight_group_id, index_id, weight_value
+            FROM ({weight_rows})
+            WHERE true
+            ORDER BY row_num, pos
+            ON CONFLICT (index_id, weight_group_id) {on_conflict}
+        """)
+        if on_weight_conflict == 'replace':
+            counter['weight_inserted'] += cursor.rowcount - num_conflicting
+            counter['weight_replaced'] += num_conflicting
+        else:
+            counter['weight_inserted'] += cursor.rowcount
+            counter['weight_ignored'] += num_conflicting
+
+    cursor.execute('DROP TABLE temp.index_staging')
+    return +counter  # Unary plus removes zero counts.
+
+
+def load_weight_records(
+    data: Iterable[Sequence],
+    columns: Sequence[str],
+    value_column: str,
+    weight_group_id: int,
+    index_repo: IndexRepository,
+    weight_repo: WeightRepository,
+    on_conflict: Literal['abort', 'ignore', 'replace', 'sum'] = 'abort',
+) -> Dict[str, int]:
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.load_weight_records()`` function.
+        Instead of querying for each row's index record, rows are
+        loaded into a temporary staging table and joined to the
+        ``label_index`` table. Skipped rows are counted with
+        aggregate queries and weights are written with a single
+        UPSERT.
+
+    Load weight values from *data* rows into the given weight
+    group and return a counter of the actions taken.
+    """
+    weight_repo._verify_on_conflict(on_conflict)  # Non-public interface.
+
+    cursor = weight_repo._cursor  # Get cursor (non-public interface).
+    label_names = index_repo.get_label_names()
+    label_columns = [format_identifier(x) for x in label_names]
+    label_positions = [columns.index(x) for x in label_names]
+    staged_labels = [f'lbl{i}' for i in range(len(label_names))]
+    value_position = columns.index(value_column)
+    if 'index_id' in columns:
+        index_id_position: Optional[int] = columns.index('index_id')
+    else:
+        index_id_position = None
+
+    # Create staging table.
+    cursor.execute('DROP TABLE IF EXISTS temp.weight_staging')
+    cursor.execute(f"""
+        CREATE TEMP TABLE weight_staging (
+            row_num INTEGER PRIMARY KEY,
+            given_id INTEGER,
+            index_id INTEGER{''.join(f', {x} TEXT' for x in staged_labels)},
+            weight_value REAL
+        )
+    """)
+
+    counter: Counter = Counter()
+
+    def generate_staged_rows():
+        for row in data:
+            weight_value = row[value_position]
+            if not isinstance(weight_value, float):
+                try:
+                    weight_value = float(weight_value)
+                except (ValueError, TypeError):
+                    counter['not_realnum'] += 1
+                    continue  # <- Skip to next item.
+
+            if isnan(weight_value) or isinf(weight_value):
+                counter['not_realnum'] += 1
+                continue  # <- Skip to next item.
+
+            given_id = None if index_id_position is None else row[index_id_position]
+            labels = tuple(row[pos] for pos in label_positions)
+            yield (given_id,) + labels + (weight_value,)
+
+    # Load rows into the staging table (consumes *data* as a stream).
+    qmarks = ', '.join('?' * (len(staged_labels) + 2))
+    cursor.executemany(
+        f"""
+            INSERT INTO temp.weight_staging
+                (given_id, {''.join(f'{x}, ' for x in staged_labels)}weight_value)
+            VALUES ({qmarks})
+        """,
+        generate_staged_rows(),
+    )
+
+    # Resolve index_id values by joining on all label columns and
+    # count the rows that cannot be loaded.
+    matches = ' AND '.join(
+        [f'label_index.{a}=weight_staging.{b}' for a, b in zip(label_columns, staged_labels)]
+    ) or 'true'
+    if index_id_position is not None:
+        cursor.execute(f"""
+            UPDATE temp.weight_staging
+            SET index_id=given_id
+            WHERE EXISTS (
+                SELECT 1 FROM main.label_index
+                WHERE label_index.index_id=weight_staging.given_id AND {matches}
+            )
+        """)
+        cursor.execute("""
+            SELECT
+                TOTAL(label_index.index_id IS NULL),
+                TOTAL(label_index.index_id IS NOT NULL AND s.index_id IS NULL),
+                TOTAL(s.index_id=0),
+                TOTAL(s.index_id>0)
+            FROM temp.weight_staging s
+            LEFT JOIN main.label_index ON label_index.index_id=s.given_id
+        """)
+        no_index, mismatch, undefined_record, num_records = cursor.fetchone()
+        counter['no_index'] += int(no_index)
+        counter['mismatch'] += int(mismatch)
+    else:
+        cursor.execute(f"""
+            UPDATE temp.weight_staging
+            SET index_id=(SELECT index_id FROM main.label_index WHERE {matches})
+        """)
+        cursor.execute("""
+            SELECT TOTAL(index_id IS NULL), TOTAL(index_id=0), TOTAL(index_id>0)
+            FROM temp.weight_staging
+        """)
+        no_match, undefined_record, num_records = cursor.fetchone()
+        counter['no_match'] += int(no_match)
+    counter['undefined_record'] += int(undefined_record)
+
+    # Check for invalid values and, when aborting on conflict, for rows
+    # that conflict with existing weights or with earlier rows (numbered
+    # using a window partitioned by index_id).
+    if on_conflict == 'abort':
+        is_conflicting = """
+            OR occurrence > 1 OR EXISTS (
+                SELECT 1 FROM main.weight b
+                WHERE b.weight_group_id=? AND b.index_id=a.index_id
+            )
+        """
+        parameters: Tuple = (weight_group_id,)
+    else:
+        is_conflicting = ''
+        parameters = ()
+
+    cursor.execute(
+        f"""
+            SELECT row_num, given_id, index_id, {''.join(f'{x}, ' for x in staged_labels)}weight_value
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY index_id ORDER BY row_num
+                ) AS occurrence
+                FROM temp.weight_staging
+                WHERE index_id > 0
+            ) AS a
+            WHERE weight_value < 0.0 {is_conflicting}
+            ORDER BY row_num
+            LIMIT 1
+        """,
+        parameters,
+    )
+    invalid = cursor.fetchone()
+    if invalid:
+        _, given_id, index_id, *labels, weight_value = invalid
+        values = dict(zip(label_names, labels), index_id=given_id)
+        values[value_column] = weight_value
+        record = tuple(values[x] for x in columns if x in values)
+        error: Exception
+        try:
+            weight_repo._verify_weight(index_id, weight_value)
+            error = weight_repo._make_insert_error(
+                sqlite3.IntegrityError('UNIQUE constraint failed'),
+                weight_group_id,
+                index_id,
+            )
+        except ValueError as err:
+            error = err
+        raise Exception(f'{error}; this error occured on record: {record!r}')
+
+    # Get the highest weight_id (new records are always greater).
+    cursor.execute('SELECT MAX(weight_id) FROM main.weight')
+    max_weight_id = cursor.fetchone()[0] or 0
+
+    upsert_clauses = {
+        'abort': '',
+        'ignore': 'ON CONFLICT (index_id, weight_group_id) DO NOTHING',
+        'replace': (
+            'ON CONFLICT (index_id, weight_group_id) '
+            'DO UPDATE SET weight_value=excluded.weight_value'
+        ),
+        'sum': (
+            'ON CONFLICT (index_id, weight_group_id) '
+            'DO UPDATE SET weight_value=weight_value+excluded.weight_value'
+        ),
+    }
+    cursor.execute(
+        f"""
+            INSERT INTO main.weight (weight_group_id, index_id, weight_value)
+            SELECT ?, index_id, weight_value
+            FROM temp.weight_staging
+            WHERE index_id > 0
+            ORDER BY row_num
+            {upsert_clauses[on_conflict]}
+        """,
+        (weight_group_id,),
+    )
+    num_changed = cursor.rowcount
+
+    cursor.execute(
+        'SELECT COUNT(*) FROM main.weight WHERE weight_id > ?',
+        (max_weight_id,),
+    )
+    num_inserted = cursor.fetchone()[0]
+    counter['inserted'] += num_inserted
+    if on_conflict == 'ignore':
+        counter['skipped'] += int(num_records) - num_changed
+    elif on_conflict == 'replace':
+        counter['overwritten'] += num_changed - num_inserted
+    elif on_conflict == 'sum':
+        counter['summed'] += num_changed - num_inserted
+
+    cursor.execute('DROP TABLE temp.weight_staging')
+    return +counter  # Unary plus removes zero counts.
+
+
+def load_quantity_records(
+    data: Iterable[Sequence],
+    columns: Sequence[str],
+    value_column: str,
+    attributes_to_load: Sequence[str],
+    domain: str,
+    index_repo: IndexRepository,
+    location_repo: LocationRepository,
+    attribute_repo: AttributeGroupRepository,
+    quantity_repo: QuantityRepository,
+    structure_repo: StructureRepository,
+    allow_invalid_label: bool = False,
+    allow_invalid_partition: bool = False,
+    on_existing: Literal['abort', 'ignore', 'replace', 'sum'] = 'abort',
+) -> Dict[str, int]:
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.load_quantity_records()`` function.
+        Instead of validating and adding records one row at a time,
+        rows are loaded into a temporary staging table. Partitions
+        are checked by comparing bit patterns, labels are checked
+        with a semi-join against ``label_index``, locations and
+        attribute groups are added with ``INSERT OR IGNORE ...
+        SELECT`` statements, and quantities are written with a
+        single UPSERT.
+
+    Load quantity values from *data* rows and return a counter of
+    the actions taken.
+    """
+    if on_existing not in ('abort', 'ignore', 'replace', 'sum'):
+        raise ValueError(
+            f"--on-existing must be 'abort', 'ignore', "
+            f"'replace', or 'sum'; got {on_existing!r}"
+        )
+
+    cursor = quantity_repo._cursor  # Get cursor (non-public interface).
+    label_names = location_repo.get_label_names()  # In storage order.
+    label_columns = [format_identifier(x) for x in label_names]
+    label_positions = [columns.index(x) for x in label_names]
+    attribute_positions = [(x, columns.index(x)) for x in attributes_to_load]
+    value_position = columns.index(value_column)
+    if 'domain' in columns:
+        domain_position: Optional[int] = columns.index('domain')
+    else:
+        domain_position = None
+    staged_labels = [f'lbl{i}' for i in range(len(label_names))]
+
+    # Create staging table (the 'quantity_value' column has no type
+    # affinity so values are converted when inserted into 'quantity').
+    cursor.execute('DROP TABLE IF EXISTS temp.quantity_staging')
+    cursor.execute(f"""
+        CREATE TEMP TABLE quantity_staging (
+            row_num INTEGER PRIMARY KEY,
+            {''.join(f'{x} TEXT, ' for x in staged_labels)}
+            attributes TEXT,
+            quantity_value,
+            bits INTEGER,
+            is_invalid_partition INTEGER,
+            is_invalid_label INTEGER,
+            location_id INTEGER,
+            attribute_group_id INTEGER
+        )
+    """)
+
+    counter: Counter = Counter()
+
+    def generate_staged_rows():
+        for row in data:
+            # If 'domain' is given, it must match `space.domain`.
+            if domain_position is not None and row[domain_position] != domain:
+                raise ValueError(
+                    f"domain must be {domain!r}, got: {row[domain_position]!r}"
+                )
+
+            attr_dict = {k: row[pos] for k, pos in attribute_positions if row[pos]}
+            if not attr_dict:
+                counter['no_attrs'] += 1
+                continue  # <- Skip to next item.
+
+            labels = tuple(row[pos] for pos in label_positions)
+            attributes = json_dumps(attr_dict, sort_keys=True)
+            yield labels + (attributes, row[value_position])
+
+    # Load rows into the staging table (consumes *data* as a stream).
+    qmarks = ', '.join('?' * (len(staged_labels) + 2))
+    cursor.executemany(
+        f"""
+            INSERT INTO temp.quantity_staging
+                ({''.join(f'{x}, ' for x in staged_labels)}attributes, quantity_value)
+            VALUES ({qmarks})
+        """,
+        generate_staged_rows(),
+    )
+
+    # Get bit patterns of non-empty labels and check them against the
+    # bit patterns of the defined partitions.
+    bits_expr = ' | '.join(
+        f"(({x} != '') << {i})" for i, x in enumerate(staged_labels)
+    ) or '0'
+    cursor.execute(f'UPDATE temp.quantity_staging SET bits={bits_expr}')
+
+    structure_bits = ' | '.join(
+        f'({x} << {i})' for i, x in enumerate(label_columns)
+    ) or '0'
+
+    # Build semi-join for each bit pattern (matching non-empty labels).
+    cursor.execute('SELECT DISTINCT bits FROM temp.quantity_staging')
+    label_checks = []
+    for (bits,) in cursor.fetchall():
+        matches = ''.join(
+            f' AND label_index.{a}=quantity_staging.{b}'
+            for i, (a, b) in enumerate(zip(label_columns, staged_labels))
+            if bits & (1 << i)
+        )
+        label_checks.append(
+            f'WHEN {bits} THEN NOT EXISTS '
+            f'(SELECT 1 FROM main.label_index WHERE true{matches})'
+        )
+
+    if label_checks:
+        cursor.execute(f"""
+            UPDATE temp.quantity_staging
+            SET is_invalid_partition=bits NOT IN (
+                    SELECT {structure_bits} FROM main.label_structure
+                ),
+                is_invalid_label=CASE bits {' '.join(label_checks)} END
+        """)
+
+    cursor.execute("""
+        SELECT TOTAL(is_invalid_partition), TOTAL(is_invalid_label), COUNT(*)
+        FROM temp.quantity_staging
+    """)
+    invalid_partition, invalid_label, num_records = cursor.fetchone()
+    if allow_invalid_partition:
+        counter['invalid_category'] += int(invalid_partition)
+    if allow_invalid_label:
+        counter['invalid_label'] += int(invalid_label)
+
+    if (invalid_partition and not allow_invalid_partition) \
+            or (invalid_label and not allow_invalid_label):
+        cursor.execute(
+            f"""
+                SELECT is_invalid_partition, {', '.join(staged_labels)}
+                FROM temp.quantity_staging
+                WHERE (is_invalid_partition AND NOT ?)
+                    OR (is_invalid_label AND NOT ?)
+                ORDER BY row_num
+                LIMIT 1
+            """,
+            (allow_invalid_partition, allow_invalid_label),
+        )
+        is_invalid_partition, *labels = cursor.fetchone()
+        if is_invalid_partition and not allow_invalid_partition:
+            # This error message can be user facing so it
+            # includes more context that it otherwise might.
+            formatted_names = ', '.join(
+                repr(x) for x in compress(label_names, BitFlags(labels))
+            )
+            raise ValueError(
+                f'no matching partition:\n'
+                f'   names: {{{formatted_names}}}\n'
+                f'  record: {labels!r}'
+            )
+        raise ValueError(
+            f'invalid labels, not present in index:\n'
+            f'  record: {[x for x in labels if x]!r}'
+        )
+
+    # Add missing locations and attribute groups (in input order).
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO main.label_location ({', '.join(label_columns)})
+        SELECT {', '.join(staged_labels)}
+        FROM temp.quantity_staging
+        ORDER BY row_num
+    """)
+    cursor.execute("""
+        INSERT OR IGNORE INTO main.attribute_group (attributes)
+        SELECT attributes
+        FROM temp.quantity_staging
+        ORDER BY row_num
+    """)
+
+    matches = ' AND '.join(
+        f'label_location.{a}=quantity_staging.{b}'
+        for a, b in zip(label_columns, staged_labels)
+    )
+    cursor.execute(f"""
+        UPDATE temp.quantity_staging
+        SET location_id=(
+                SELECT _location_id FROM main.label_location WHERE {matches}
+            ),
+            attribute_group_id=(
+                SELECT attribute_group_id FROM main.attribute_group
+                WHERE attributes=quantity_staging.attributes
+            )
+    """)
+
+    # Rows conflict with existing quantities or with earlier rows
+    # (numbered using a window partitioned by location and attributes).
+    if on_existing == 'abort':
+        cursor.execute("""
+            SELECT 1
+            FROM (
+                SELECT location_id, attribute_group_id, ROW_NUMBER() OVER (
+                    PARTITION BY location_id, attribute_group_id
+                    ORDER BY row_num
+                ) AS occurrence
+                FROM temp.quantity_staging
+            ) AS a
+            WHERE occurrence > 1 OR EXISTS (
+                SELECT 1 FROM main.quantity b
+                WHERE b._location_id=a.location_id
+                    AND b.attribute_group_id=a.attribute_group_id
+            )
+            LIMIT 1
+        """)
+        if cursor.fetchone():
+            raise ValueError(
+                'data contains quantities for locations and '
+                'attributes that have already been loaded; use '
+                '--on-existing to change load behavior'
+            )
+
+    # Get the highest quantity_id (new records are always greater).
+    cursor.execute('SELECT MAX(quantity_id) FROM main.quantity')
+    max_quantity_id = cursor.fetchone()[0] or 0
+
+    upsert_clauses = {
+        'abort': '',
+        'ignore': 'ON CONFLICT (_location_id, attribute_group_id) DO NOTHING',
+        'replace': (
+            'ON CONFLICT (_location_id, attribute_group_id) '
+            'DO UPDATE SET quantity_value=excluded.quantity_value'
+        ),
+        'sum': (
+            'ON CONFLICT (_location_id, attribute_group_id) '
+            'DO UPDATE SET quantity_value=quantity_value+excluded.quantity_value'
+        ),
+    }
+    cursor.execute(f"""
+        INSERT INTO main.quantity (_location_id, attribute_group_id, quantity_value)
+        SELECT location_id, attribute_group_id, quantity_value
+        FROM temp.quantity_staging
+        WHERE true
+        ORDER BY row_num
+        {upsert_clauses[on_existing]}
+    """)
+
+    cursor.execute(
+        'SELECT COUNT(*) FROM main.quantity WHERE quantity_id > ?',
+        (max_quantity_id,),
+    )
+    num_inserted = cursor.fetchone()[0]
+    counter['inserted'] += num_inserted
+
+    # Every row that was not inserted was resolved as a conflict.
+    existing_key = {
+        'ignore': 'existing_ignored',
+        'replace': 'existing_replaced',
+        'sum': 'existing_summed',
+    }.get(on_existing)
+    if existing_key:
+        counter[existing_key] += num_records - num_inserted
+
+    cursor.execute('DROP TABLE temp.quantity_staging')
+    return +counter  # Unary plus removes zero counts.
+
+
+def update_index_records(
+    data: Iterable[Sequence],
+    columns: Sequence[str],
+    index_repo: IndexRepository,
+    weight_repo: WeightRepository,
+    mapping_repo: MappingRepository,
+    merge_on_conflict: bool = False,
+) -> Dict[str, int]:
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.update_index_records()`` function.
+        Rows are loaded into a temporary staging table and conflicts
+        are found by joining new labels to the ``label_index`` table
+        in a single query. Merges are applied with grouped queries
+        and records are updated with a single UPDATE statement.
+
+        When the result could depend on the order in which rows are
+        applied (an index_id given more than once, repeated labels,
+        new labels matching another record being updated, or rows
+        for the undefined record), the staged rows are passed to the
+        normal function instead.
+
+    Update index records using the ``index_id`` and label values
+    in *data* rows and return a counter of the actions taken.
+    """
+    cursor = index_repo._cursor  # Get cursor (non-public interface).
+    label_names = index_repo.get_label_names()
+    label_columns = [format_identifier(x) for x in label_names]
+    label_positions = [columns.index(x) for x in label_names]
+    staged_labels = [f'lbl{i}' for i in range(len(label_names))]
+    index_id_position = columns.index('index_id')
+
+    # Create staging table.
+    cursor.execute('DROP TABLE IF EXISTS temp.index_update_staging')
+    cursor.execute(f"""
+        CREATE TEMP TABLE index_update_staging (
+            row_num INTEGER PRIMARY KEY,
+            index_id INTEGER{''.join(f', {x} TEXT' for x in staged_labels)}
+        )
+    """)
+
+    counter: Counter = Counter()
+
+    def generate_staged_rows():
+        for row in data:
+            if '' in row:
+                counter['empty_str'] += 1
+                continue  # <- Skip to next item.
+
+            labels = tuple(row[pos] for pos in label_positions)
+            yield (row[index_id_position],) + labels
+
+    # Load rows into the staging table (consumes *data* as a stream).
+    qmarks = ', '.join('?' * (len(staged_labels) + 1))
+    cursor.executemany(
+        f"""
+            INSERT INTO temp.index_update_staging
+                (index_id{''.join(f', {x}' for x in staged_labels)})
+            VALUES ({qmarks})
+        """,
+        generate_staged_rows(),
+    )
+    cursor.execute("""
+        CREATE INDEX temp.index_update_staging_idx
+            ON index_update_staging(index_id)
+    """)
+
+    # Check for rows whose outcome depends on the order in which they
+    # are applied (only rows for existing index records are checked).
+    matches = ' AND '.join(
+        [f'label_index.{a}=s.{b}' for a, b in zip(label_columns, staged_labels)]
+    ) or 'true'
+    existing = 'index_id IN (SELECT index_id FROM main.label_index)'
+    cursor.execute(f"""
+        SELECT EXISTS (
+            SELECT 1 FROM temp.index_update_staging
+            WHERE {existing}
+            GROUP BY index_id
+            HAVING COUNT(*) > 1 OR index_id=0
+        ) OR EXISTS (
+            SELECT 1 FROM temp.index_update_staging
+            WHERE {existing}
+            GROUP BY {', '.join(staged_labels) or 'NULL'}
+            HAVING COUNT(*) > 1
+        ) OR EXISTS (
+            SELECT 1
+            FROM temp.index_update_staging s
+            JOIN main.label_index ON {matches}
+            JOIN temp.index_update_staging t ON t.index_id=label_index.index_id
+        )
+    """)
+    if cursor.fetchone()[0]:
+        cursor.execute(f"""
+            SELECT index_id{''.join(f', {x}' for x in staged_labels)}
+            FROM temp.index_update_staging
+            ORDER BY row_num
+        """)
+        staged_rows = cursor.fetchall()
+        cursor.execute('DROP TABLE temp.index_update_staging')
+        counter.update(_update_index_records(
+            data=staged_rows,
+            columns=['index_id'] + list(label_names),
+            index_repo=index_repo,
+            weight_repo=weight_repo,
+            mapping_repo=mapping_repo,
+            merge_on_conflict=merge_on_conflict,
+        ))
+        return +counter  # <- EXIT!
+
+    # Count and remove rows that do not match an existing record.
+    cursor.execute(f"""
+        DELETE FROM temp.index_update_staging
+        WHERE NOT {existing}
+    """)
+    counter['no_index'] += cursor.rowcount
+
+    # Find existing records that conflict with the new labels.
+    cursor.execute(f"""
+        SELECT s.index_id, label_index.index_id
+        FROM temp.index_update_staging s
+        JOIN main.label_index ON {matches}
+        ORDER BY s.row_num
+    """)
+    conflicts = cursor.fetchall()
+    if conflicts:
+        if not merge_on_conflict:
+            index_id, matching_id = conflicts[0]
+            raise ValueError(
+                f"cannot update index_id {index_id}, new labels "
+                f"conflict with the existing index_id {matching_id}.\n"
+                f"\n"
+                f"To merge these records use 'space.update_index(..., "
+                f"merge_on_conflict=True)'."
+            )
+
+        # Pair each conflicting record (and each target) with its target.
+        cursor.execute('DROP TABLE IF EXISTS temp.index_merge')
+        cursor.execute("""
+            CREATE TEMP TABLE index_merge (
+                index_id INTEGER PRIMARY KEY,
+                target INTEGER NOT NULL
+            )
+        """)
+        cursor.executemany(
+            'INSERT INTO temp.index_merge VALUES (?, ?)',
+            chain(
+                ((matching_id, index_id) for index_id, matching_id in conflicts),
+                ((index_id, index_id) for index_id, _ in conflicts),
+            ),
+        )
+        weight_repo._merge_staged_index_ids()  # Non-public interface.
+        mapping_repo._merge_staged_index_ids()  # Non-public interface.
+        cursor.execute("""
+            DELETE FROM main.label_index
+            WHERE index_id IN (
+                SELECT index_id FROM temp.index_merge WHERE index_id != target
+            )
+        """)
+        counter['merged'] += cursor.rowcount
+        cursor.execute('DROP TABLE temp.index_merge')
+
+    # Apply new labels to all staged records.
+    if label_columns:
+        cursor.execute(f"""
+            UPDATE main.label_index
+            SET ({', '.join(label_columns)}) = (
+                SELECT {', '.join(staged_labels)}
+                FROM temp.index_update_staging
+                WHERE index_update_staging.index_id=label_index.index_id
+            )
+            WHERE index_id IN (SELECT index_id FROM temp.index_update_staging)
+        """)
+        counter['updated'] += cursor.rowcount
+
+    cursor.execute('DROP TABLE temp.index_update_staging')
+    return +counter  # Unary plus removes zero counts.
+
+
+def delete_index_records(
+    index_ids: Iterable[int],
+    index_repo: IndexRepository,
+    weight_repo: WeightRepository,
+    link_repo: LinkRepository,
+    mapping_repo: MappingRepository,
+) -> Dict[str, int]:
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.delete_index_records()`` function.
+        The given ids are loaded into a temporary table and records
+        are removed with ``DELETE ... WHERE index_id IN (...)``
+        statements. Proportions are recomputed in a single statement
+        for only those ``(link_id, other_index_id)`` pairs that lost
+        a mapping.
+
+    Delete index records and associated weights and mappings for
+    the given *index_ids* and return a counter of deleted records.
+    """
+    cursor = index_repo._cursor  # Get cursor (non-public interface).
+
+    # Create staging table and load ids (duplicates are ignored).
+    cursor.execute('DROP TABLE IF EXISTS temp.index_delete_staging')
+    cursor.execute("""
+        CREATE TEMP TABLE index_delete_staging (
+            row_num INTEGER PRIMARY KEY,
+            index_id INTEGER NOT NULL UNIQUE
+        )
+    """)
+    cursor.executemany(
+        'INSERT OR IGNORE INTO temp.index_delete_staging (index_id) VALUES (?)',
+        ((index_id,) for index_id in index_ids),
+    )
+
+    # For now, prevent index deletion when there are ambiguous mappings
+    # (see the normal delete_index_record() function for details).
+    fully_specified_level = bytes(BitFlags([1] * len(index_repo.get_label_names())))
+    cursor.execute(
+        """
+            SELECT s.index_id
+            FROM main.mapping
+            JOIN temp.index_delete_staging s USING (index_id)
+            WHERE mapping.mapping_level != ?
+            ORDER BY s.row_num
+            LIMIT 1
+        """,
+        (fully_specified_level,),
+    )
+    ambiguous = cursor.fetchone()
+    if ambiguous:
+        raise ValueError(
+            f'cannot delete index_id {ambiguous[0]}, some associated '
+            f'mappings are ambiguous\n'
+            f'\n'
+            f'Links with ambiguous mappings must be removed '
+            f'before deleting index records. Afterwards, these '
+            f'links can be re-added.'
+        )
+
+    # Remove associated weight records.
+    cursor.execute("""
+        DELETE FROM main.weight
+        WHERE index_id IN (SELECT index_id FROM temp.index_delete_staging)
+    """)
+
+    # Get affected pairs and remove associated mapping records.
+    cursor.execute('DROP TABLE IF EXISTS temp.index_delete_affected')
+    cursor.execute("""
+        CREATE TEMP TABLE index_delete_affected AS
+            SELECT DISTINCT link_id, other_index_id
+            FROM main.mapping
+            JOIN temp.index_delete_staging USING (index_id)
+    """)
+    cursor.execute('SELECT DISTINCT link_id FROM temp.index_delete_affected')
+    link_ids = [row[0] for row in cursor.fetchall()]
+    with mapping_repo._deferred_link_caches(link_ids):  # Non-public interface.
+        cursor.execute("""
+            DELETE FROM main.mapping
+            WHERE index_id IN (SELECT index_id FROM temp.index_delete_staging)
+        """)
+
+        # Rebuild proportions for remaining mappings of affected pairs.
+        cursor.execute("""
+            UPDATE main.mapping
+            SET proportion=(
+                SELECT CASE
+                    WHEN mapping.other_index_id=0 THEN 0.0
+                    WHEN SUM(sub.mapping_value)=0 THEN 1.0 / COUNT(*)
+                    ELSE mapping.mapping_value / SUM(sub.mapping_value)
+                END
+                FROM main.mapping AS sub
+                WHERE sub.link_id=mapping.link_id
+                    AND sub.other_index_id=mapping.other_index_id
+            )
+            WHERE (link_id, other_index_id) IN (
+                SELECT link_id, other_index_id FROM temp.index_delete_affected
+            )
+        """)
+
+    # Remove existing Index records.
+    cursor.execute("""
+        DELETE FROM main.label_index
+        WHERE index_id IN (SELECT index_id FROM temp.index_delete_staging)
+    """)
+    counter: Counter = Counter()
+    counter['deleted'] += cursor.rowcount
+
+    cursor.execute('DROP TABLE temp.index_delete_affected')
+    cursor.execute('DROP TABLE temp.index_delete_staging')
+    return +counter  # Unary plus removes zero counts.
+
+
+def refresh_index_hash_property(
+    index_repo: IndexRepository,
+    prop_repo: PropertyRepository,
+) -> None:
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.refresh_index_hash_property()`` function.
+        Instead of re-hashing every index_id value, it re-hashes only
+        the ranges of values that have been marked as changed in the
+        'index_hash_chunk' table (see ``ChunkedSequenceHash``) and
+        combines the stored digests.
+
+    Update 'index_hash' property to reflect current index_id values.
+    """
+    cursor = index_repo._cursor  # Get cursor (non-public interface).
+    chunk_size = ChunkedSequenceHash.chunk_size
+
+    # Re-hash changed chunks (and remove chunks that are now empty).
+    cursor.execute('SELECT chunk_id FROM main.index_hash_chunk WHERE digest IS NULL')
+    for chunk_id in [row[0] for row in cursor.fetchall()]:
+        cursor.execute(
+            """
+                SELECT index_id
+                FROM main.label_index
+                WHERE index_id >= ? AND index_id < ?
+                ORDER BY index_id
+            """,
+            (chunk_id * chunk_size, (chunk_id + 1) * chunk_size),
+        )
+        index_ids = [row[0] for row in cursor.fetchall()]
+        if not index_ids:
+            cursor.execute(
+                'DELETE FROM main.index_hash_chunk WHERE chunk_id=?', (chunk_id,)
+            )
+            continue  # <- Skip to next item.
+
+        cursor.execute(
+            'UPDATE main.index_hash_chunk SET digest=? WHERE chunk_id=?',
+            (ChunkedSequenceHash.digest_chunk(index_ids), chunk_id),
+        )
+
+    # Combine chunk digests to build the full index_hash.
+    cursor.execute(
+        'SELECT chunk_id, digest FROM main.index_hash_chunk ORDER BY chunk_id'
+    )
+    index_hash = ChunkedSequenceHash.combine_digests(cursor.fetchall())
+    try:
+        prop_repo.add('index_hash', index_hash)
+    except Exception:
+        prop_repo.update('index_hash', index_hash)
+
+
+def get_other_index_hash(
+    link_id: int,
+    mapping_repo: MappingRepository,
+) -> str:
+    """
+    .. note::
+
+        This is an optimized, drop-in replacement for the normal
+        ``toron.data_service.get_other_index_hash()`` function.
+        Instead of re-hashing every other_index_id value, it re-hashes
+        only the ranges of values that have been marked as changed in
+        the 'link_hash_chunk' table and combines the stored digests.
+
+    Return the 'other_index_hash' for the other_index_id values
+    currently used by the mappings of the given link.
+    """
+    cursor = mapping_repo._cursor  # Get cursor (non-public interface).
+    chunk_size = ChunkedSequenceHash.chunk_size
+
+    # The undefined other_index_id (0) is always included in the hash.
+    cursor.execute(
+        'INSERT OR IGNORE INTO main.link_hash_chunk VALUES (?, 0, NULL)',
+        (link_id,),
+    )
+
+    # Re-hash changed chunks (and remove chunks that are now empty).
+    cursor.execute(
+        'SELECT chunk_id FROM main.link_hash_chunk '
+        'WHERE link_id=? AND digest IS NULL',
+        (link_id,),
+    )
+    for chunk_id in [row[0] for row in cursor.fetchall()]:
+        cursor.execute(
+            """
+                SELECT DISTINCT other_index_id
+                FROM main.mapping
+                WHERE link_id=? AND other_index_id > 0
+                    AND other_index_id >= ? AND other_index_id < ?
+                ORDER BY other_index_id
+            """,
+            (link_id, chunk_id * chunk_size, (chunk_id + 1) * chunk_size),
+        )
+        other_index_ids = [row[0] for row in cursor.fetchall()]
+        if chunk_id == 0:
+            other_index_ids.insert(0, 0)
+        elif not other_index_ids:
+            cursor.execute(
+                'DELETE FROM main.link_hash_chunk WHERE link_id=? AND chunk_id=?',
+                (link_id, chunk_id),
+            )
+            continue  # <- Skip to next item.
+
+        cursor.execute(
+            'UPDATE main.link_hash_chunk SET digest=? '
+            'WHERE link_id=? AND chunk_id=?',
+            (ChunkedSequenceHash.digest_chunk(other_index_ids), link_id, chunk_id),
+        )
+
+    # Combine chunk digests to build the full other_index_hash.
+    cursor.execute(
+        'SELECT chunk_id, digest FROM main.link_hash_chunk '
+        'WHERE link_id=? ORDER BY chunk_id',
+        (link_id,),
+    )
+    return ChunkedSequenceHash.combine_digests(cursor.fetchall())
+
+
 # Define `optimizations` dictionary for optional function optimizations.
 optimizations: Dict[str, Callable] = {
     'calculate_granularity': calculate_granularity,
+    'count_stale_other_index_ids': count_stale_other_index_ids,
+    'delete_index_records': delete_index_records,
+    'generate_mapping_rows': generate_mapping_rows,
+    'generate_weight_rows': generate_weight_rows,
+    'get_index_frame': get_index_frame,
+    'get_other_index_hash': get_other_index_hash,
+    'load_index_records': load_index_records,
+    'load_quantity_records': load_quantity_records,
+    'load_weight_records': load_weight_records,
+    'refresh_index_hash_property': refresh_index_hash_property,
+    'update_index_records': update_index_records,
 }
@@ -1,8 +1,12 @@
 """IndexRepository and related objects using SQLite."""
 
+import array
 import sqlite3
+import sys
+from collections import Counter
+from contextlib import contextmanager
 from dataclasses import asdict
-from itertools import chain, repeat
+from itertools import chain, islice, repeat
 from json import dumps as json_dumps
 
 from toron._typing import (
@@ -11,6 +15,7 @@ from toron._typing import (
     Iterator,
     Iterable,
     List,
+    Literal,
     Optional,
     Sequence,
     Tuple,
@@ -31,11 +36,46 @@ from ..data_models import (
     AttributeGroup, BaseAttributeGroupRepository,
     Quantity, BaseQuantityRepository,
     Link, BaseLinkRepository,
-    MappingRecord, BaseMappingRepository,
+    MappingRecord, BaseMappingRepository, ProportionArrays,
     JsonTypes, BasePropertyRepository,
 )
 
 
+def _cache_record(cache: Dict[Any, Any], key: Any, record: Any, maxsize: int) -> None:
+    """Add *record* to *cache* and remove the oldest entry when the
+    number of entries would exceed *maxsize*.
+    """
+    if maxsize <= 0:
+        return  # <- EXIT!
+
+    if len(cache) >= maxsize:
+        del cache[next(iter(cache))]  # Dicts preserve insertion order.
+    cache[key] = record
+
+
+def _stage_index_merge(
+    cursor: sqlite3.Cursor, index_ids: Union[Iterable[int], int], target: int
+) -> None:
+    """Create a temporary 'index_merge' table that pairs each of the
+    given *index_ids* (and *target* itself) with the *target* id.
+    """
+    if not isinstance(index_ids, Iterable):
+        index_ids = [index_ids]
+    index_ids = {target}.union(index_ids)  # Always include target in ids.
+
+    cursor.execute('DROP TABLE IF EXISTS temp.index_merge')
+    cursor.execute("""
+        CREATE TEMP TABLE index_merge (
+            index_id INTEGER PRIMARY KEY,
+            target INTEGER NOT NULL
+        )
+    """)
+    cursor.executemany(
+        'INSERT INTO temp.index_merge VALUES (?, ?)',
+        ((index_id, target) for index_id in index_ids),
+    )
+
+
 class IndexRepository(BaseIndexRepository):
     def __init__(self, cursor: sqlite3.Cursor) -> None:
         """Initialize a new IndexRepository instance."""
@@ -199,9 +239,16 @@ class IndexRepository(BaseIndexRepository):
 
 
 class LocationRepository(BaseLocationRepository):
-    def __init__(self, cursor: sqlite3.Cursor) -> None:
-        """Initialize a new LocationRepository instance."""
+    def __init__(self, cursor: sqlite3.Cursor, cache_size: int = 16384) -> None:
+        """Initialize a new LocationRepository instance.
+
+        Records returned by ``get_by_labels_add_if_missing()`` are
+        cached for the lifetime of the instance (up to *cache_size*
+        entries).
+        """
         self._cursor = cursor
+        self._cache_size = cache_size
+        self._labels_cache: Dict[Tuple[Tuple[str, str], ...], Location] = {}
 
     def add(self, label: str, *labels: str) -> None:
         """Add a record to the repository."""
@@ -234,12 +281,14 @@ class LocationRepository(BaseLocationRepository):
             WHERE _location_id=?
         """
         self._cursor.execute(sql, record.labels + (record.id,))
+        self._labels_cache.clear()
 
     def delete_and_cascade(self, id: int) -> None:
         """Delete a Location and any associated Quantity records."""
         self._cursor.execute(
             'DELETE FROM main.label_location WHERE _location_id=?', (id,)
         )
+        self._labels_cache.clear()
 
     def get_label_names(self) -> List[str]:
         """Get a list of label column names."""
@@ -276,6 +325,21 @@ class LocationRepository(BaseLocationRepository):
         )
         return (Location(*record) for record in self._cursor)
 
+    def get_by_labels_add_if_missing(self, labels: dict) -> Location:
+        """Return the location that matches given *labels* dict. If
+        there is no matching location, a new location is added and then
+        returned.
+
+        Results are cached by their label items so repeated calls do
+        not query the database.
+        """
+        key = tuple(labels.items())
+        location = self._labels_cache.get(key)
+        if location is None:
+            location = super().get_by_labels_add_if_missing(labels)
+            _cache_record(self._labels_cache, key, location, self._cache_size)
+        return location
+
 
 class StructureRepository(BaseStructureRepository):
     def __init__(self, cursor: sqlite3.Cursor) -> None:
@@ -533,28 +597,247 @@ class WeightRepository(BaseWeightRepository):
 
     def weight_group_is_complete(self, weight_group_id: int) -> bool:
         """Return True if there's a weight for every index record."""
-        # Query returns `1` if it finds an index without a weight.
+        # The 'weight_group_coverage' count is maintained by triggers so
+        # it can be compared to the number of index records (minus one
+        # for the undefined record) without scanning the weights.
         self._cursor.execute(
             """
-                SELECT 1
-                FROM main.label_index a
-                WHERE NOT EXISTS (
-                    SELECT 1
-                    FROM main.weight b
-                    WHERE b.weight_group_id=? AND a.index_id=b.index_id
-                ) AND a.index_id != 0
-                LIMIT 1
+                SELECT COALESCE((
+                    SELECT index_id_count
+                    FROM main.weight_group_coverage
+                    WHERE weight_group_id=?
+                ), 0) = (SELECT COUNT(*) - 1 FROM main.label_index)
             """,
             (weight_group_id,),
         )
-        incomplete = bool(self._cursor.fetchall())
-        return not incomplete
+        return bool(self._cursor.fetchone()[0])
+
+    def merge_by_index_id(
+        self, index_ids: Union[Iterable[int], int], target: int
+    ) -> None:
+        """Merge weight records by given index_id values."""
+        _stage_index_merge(self._cursor, index_ids, target)
+        self._merge_staged_index_ids()
+        self._cursor.execute('DROP TABLE temp.index_merge')
+
+    def _merge_staged_index_ids(self) -> None:
+        """Merge weight records using the pairs of ``index_id`` and
+        ``target`` values in the temporary 'index_merge' table.
+
+        Every target must also be paired with itself. Weights are
+        summed by group and target with a single grouped query, old
+        records are deleted, and the sums are inserted for the
+        target index_id values (in the order they were first found
+        when ordered by index_id).
+        """
+        self._cursor.execute('DROP TABLE IF EXISTS temp.merged_weight')
+        self._cursor.execute("""
+            CREATE TEMP TABLE merged_weight AS
+                SELECT weight_group_id, target, SUM(weight_value) AS weight_value
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        ORDER BY index_id, weight_id
+                    ) AS seq
+                    FROM main.weight
+                    JOIN temp.index_merge USING (index_id)
+                )
+                GROUP BY weight_group_id, target
+                ORDER BY MIN(seq)
+        """)
+        self._cursor.execute("""
+            DELETE FROM main.weight
+            WHERE index_id IN (SELECT index_id FROM temp.index_merge)
+        """)
+        self._cursor.execute("""
+            INSERT INTO main.weight (weight_group_id, index_id, weight_value)
+            SELECT weight_group_id, target, weight_value
+            FROM temp.merged_weight
+            ORDER BY rowid
+        """)
+        self._cursor.execute('DROP TABLE temp.merged_weight')
+
+    @staticmethod
+    def _verify_on_conflict(on_conflict: str) -> None:
+        """Raise ValueError if *on_conflict* is not a valid option."""
+        if on_conflict not in ('abort', 'ignore', 'replace', 'sum'):
+            raise ValueError(
+                f"on_conflict must be 'abort', 'ignore', 'replace', or "
+                f"'sum'; got {on_conflict!r}"
+            )
+
+    @staticmethod
+    def _verify_weight(index_id: int, value: float) -> None:
+        """Raise ValueError if record cannot be added as a weight."""
+        if index_id == 0:
+            msg = f'cannot assign weight to the undefined record (index_id 0)'
+            raise ValueError(msg)
+
+        if value < 0.0:
+            msg = f'value cannot be negative, got {value!r}'
+            raise ValueError(msg)
+
+    @staticmethod
+    def _make_insert_error(
+        err: sqlite3.IntegrityError, weight_group_id: int, index_id: int
+    ) -> Exception:
+        """Return an error to raise for a failed insert of a record."""
+        msg = str(err).upper()
+        if 'UNIQUE' in msg:
+            return Exception(
+                f"a weight record already exists for weight_group_id "
+                f"{weight_group_id} and index_id {index_id}; change load "
+                f"behavior by setting on_conflict to 'ignore', "
+                f"'replace', or 'sum'"
+            )
+        elif 'FOREIGN KEY' in msg:
+            return ValueError(
+                f'no group or index matching weight_group_id '
+                f'{weight_group_id} or index_id {index_id}'
+            )
+        return err  # If not one of the known conditions, use error as-is.
+
+    _upsert_sql = {
+        'abort': """
+            INSERT INTO main.weight (weight_group_id, index_id, weight_value)
+            VALUES (?, ?, ?)
+        """,
+        'ignore': """
+            INSERT INTO main.weight (weight_group_id, index_id, weight_value)
+            VALUES (?, ?, ?)
+            ON CONFLICT (index_id, weight_group_id) DO NOTHING
+        """,
+        'replace': """
+            INSERT INTO main.weight (weight_group_id, index_id, weight_value)
+            VALUES (?, ?, ?)
+            ON CONFLICT (index_id, weight_group_id)
+                DO UPDATE SET weight_value=excluded.weight_value
+        """,
+        'sum': """
+            INSERT INTO main.weight (weight_group_id, index_id, weight_value)
+            VALUES (?, ?, ?)
+            ON CONFLICT (index_id, weight_group_id)
+                DO UPDATE SET weight_value=weight_value+excluded.weight_value
+        """,
+    }
+
+    _update_sql = {
+        'replace': """
+            UPDATE main.weight SET weight_value=?
+            WHERE weight_group_id=? AND index_id=?
+        """,
+        'sum': """
+            UPDATE main.weight SET weight_value=weight_value+?
+            WHERE weight_group_id=? AND index_id=?
+        """,
+    }
+
+    def add_or_resolve(
+        self,
+        weight_group_id: int,
+        index_id: int,
+        value: float,
+        on_conflict: Literal['abort', 'ignore', 'replace', 'sum'] = 'abort',
+    ) -> Literal['inserted', 'skipped', 'overwritten', 'summed']:
+        """Add a record to the repository or resolve conflict.
+
+        Conflicts are resolved by the insert statement itself (see
+        ``BaseWeightRepository.add_or_resolve()`` for details).
+        """
+        self._verify_on_conflict(on_conflict)
+        self._verify_weight(index_id, value)
+
+        # An UPSERT that updates a record also reports one change, so
+        # conflicts to overwrite or sum are resolved in two steps: the
+        # record is inserted if there is no conflict (the rowcount
+        # tells if it was added), otherwise the existing record is
+        # updated.
+        if on_conflict in ('replace', 'sum'):
+            insert_sql = self._upsert_sql['ignore']
+        else:
+            insert_sql = self._upsert_sql[on_conflict]
+
+        try:
+            self._cursor.execute(insert_sql, (weight_group_id, index_id, value))
+        except sqlite3.IntegrityError as err:
+            raise self._make_insert_error(err, weight_group_id, index_id)
+
+        if self._cursor.rowcount:
+            return 'inserted'  # <- EXIT!
+
+        if on_conflict == 'ignore':
+            return 'skipped'  # <- EXIT!
+
+        self._cursor.execute(
+            self._update_sql[on_conflict],
+            (value, weight_group_id, index_id),
+        )
+        return 'overwritten' if on_conflict == 'replace' else 'summed'
+
+    def add_or_resolve_many(
+        self,
+        weight_group_id: int,
+        data: Iterable[Tuple[int, float]],
+        on_conflict: Literal['abort', 'ignore', 'replace', 'sum'] = 'abort',
+    ) -> Dict[str, int]:
+        """Add ``(index_id, value)`` records for the given weight group
+        or resolve conflicts using a single batched UPSERT statement.
+        Returns a counter of result codes.
+        """
+        self._verify_on_conflict(on_conflict)
+
+        # Track the current record to use in error messages (records
+        # are consumed one at a time by executemany()).
+        num_records = 0
+        current: Tuple[int, float] = (0, 0.0)
+
+        def generate_parameters():
+            nonlocal num_records, current
+            for index_id, value in data:
+                current = (index_id, value)
+                self._verify_weight(index_id, value)
+                num_records += 1
+                yield (weight_group_id, index_id, value)
+
+        # Get the highest weight_id (new records are always greater).
+        self._cursor.execute('SELECT MAX(weight_id) FROM main.weight')
+        max_weight_id = self._cursor.fetchone()[0] or 0
+
+        try:
+            self._cursor.executemany(
+                self._upsert_sql[on_conflict],
+                generate_parameters(),
+            )
+        except sqlite3.IntegrityError as err:
+            raise self._make_insert_error(err, weight_group_id, current[0])
+
+        num_changed = self._cursor.rowcount
+        self._cursor.execute(
+            'SELECT COUNT(*) FROM main.weight WHERE weight_id > ?',
+            (max_weight_id,),
+        )
+        num_inserted = self._cursor.fetchone()[0]
+
+        counter: Counter = Counter({'inserted': num_inserted})
+        if on_conflict == 'ignore':
+            counter['skipped'] = num_records - num_changed
+        elif on_conflict == 'replace':
+            counter['overwritten'] = num_changed - num_inserted
+        elif on_conflict == 'sum':
+            counter['summed'] = num_changed - num_inserted
+        return +counter  # Unary plus removes zero counts.
 
 
 class AttributeGroupRepository(BaseAttributeGroupRepository):
-    def __init__(self, cursor: sqlite3.Cursor) -> None:
-        """Initialize a new repository instance."""
+    def __init__(self, cursor: sqlite3.Cursor, cache_size: int = 16384) -> None:
+        """Initialize a new repository instance.
+
+        Records returned by ``get_by_value_add_if_missing()`` are
+        cached for the lifetime of the instance (up to *cache_size*
+        entries).
+        """
         self._cursor = cursor
+        self._cache_size = cache_size
+        self._value_cache: Dict[str, AttributeGroup] = {}
 
     def add(self, value: Dict[str, str]) -> None:
         """Add a record to the repository."""
@@ -591,12 +874,14 @@ class AttributeGroupRepository(BaseAttributeGroupRepository):
             'UPDATE main.attribute_group SET attributes=? WHERE attribute_group_id=?',
             (json_dumps(attributes, sort_keys=True), record.id),
         )
+        self._value_cache.clear()
 
     def delete_and_cascade(self, id: int) -> None:
         """Delete an AttributeGroup and any associated Quantity records."""
         self._cursor.execute(
             'DELETE FROM main.attribute_group WHERE attribute_group_id=?', (id,)
         )
+        self._value_cache.clear()
 
     def get_by_value(self, value: Dict[str, str]) -> AttributeGroup:
         """Get the record matching the given value."""
@@ -609,6 +894,21 @@ class AttributeGroupRepository(BaseAttributeGroupRepository):
             raise KeyError(f'no attribute group matching {value!r}')
         return AttributeGroup(*record)
 
+    def get_by_value_add_if_missing(self, value: Dict[str, str]) -> AttributeGroup:
+        """Return the attribute-group that matches given value. If there
+        is no matching attribute-group, a new record is added and then
+        returned.
+
+        Results are cached by their canonical JSON text so repeated
+        calls do not query the database.
+        """
+        key = json_dumps(value, sort_keys=True)
+        attribute_group = self._value_cache.get(key)
+        if attribute_group is None:
+            attribute_group = super().get_by_value_add_if_missing(value)
+            _cache_record(self._value_cache, key, attribute_group, self._cache_size)
+        return attribute_group
+
     def find_all(self) -> Iterable[AttributeGroup]:
         """Get all records in the repository."""
         self._cursor.execute('SELECT * FROM main.attribute_group')
@@ -981,6 +1281,40 @@ class MappingRepository(BaseMappingRepository):
         """Initialize a new repository instance."""
         self._cursor = cursor
 
+    @contextmanager
+    def _deferred_link_caches(self, link_ids: Iterable[int]) -> Iterator[None]:
+        """Context manager to invalidate the caches of the given links
+        once for a bulk statement instead of once for every row.
+
+        While the context is active, the links' revisions are NULL (the
+        link cache triggers skip these links). On exit, their CSR arrays
+        and stats are removed and new revisions are assigned.
+        """
+        self._cursor.executemany(
+            """
+                INSERT INTO main.mapping_revision VALUES (?, NULL)
+                ON CONFLICT (link_id) DO UPDATE SET revision=NULL
+            """,
+            ((link_id,) for link_id in set(link_ids)),
+        )
+        try:
+            yield
+        finally:
+            self._cursor.execute("""
+                DELETE FROM main.link_csr WHERE link_id IN (
+                    SELECT link_id FROM main.mapping_revision WHERE revision IS NULL
+                )
+            """)
+            self._cursor.execute("""
+                DELETE FROM main.link_stats WHERE link_id IN (
+                    SELECT link_id FROM main.mapping_revision WHERE revision IS NULL
+                )
+            """)
+            self._cursor.execute("""
+                UPDATE main.mapping_revision SET revision=randomblob(16)
+                WHERE revision IS NULL
+            """)
+
     if sqlite3.sqlite_version_info >= (3, 32, 0):
         def add(
             self,
@@ -1067,6 +1401,115 @@ class MappingRepository(BaseMappingRepository):
             )
             self._cursor.execute(sql, parameters)
 
+    @staticmethod
+    def _validate_many(
+        rows: Iterable[Tuple[int, int, int, bytes, float]]
+    ) -> Iterator[Tuple[int, int, int, float, bytes]]:
+        """Validate rows and yield parameters in column order."""
+        convert_values = sqlite3.sqlite_version_info < (3, 32, 0)
+        checked_levels = set()
+        for link_id, other_index_id, index_id, mapping_level, value in rows:
+            if int(other_index_id) == 0 and int(index_id) == 0:
+                raise ValueError(f'cannot add mapping for undefined-to-undefined record')
+
+            # Mapping levels repeat heavily, only check each one once.
+            if mapping_level not in checked_levels:
+                if not isinstance(mapping_level, bytes):
+                    raise TypeError(f'mapping_level must be bytes, got {mapping_level!r}')
+                checked_levels.add(mapping_level)
+
+            # Prior to SQLite 3.32.0, column affinity was not always applied
+            # before computing CHECK constraints (see `add()` method).
+            if convert_values:
+                other_index_id = int(other_index_id)
+                value = float(value)
+
+            yield (link_id, other_index_id, index_id, value, mapping_level)
+
+    def add_many(
+        self,
+        rows: Iterable[Tuple[int, int, int, bytes, float]],
+        *,
+        staged: bool = False,
+    ) -> int:
+        """Add multiple records to the repository and return the count
+        of records added.
+
+        Each row must contain *link_id*, *other_index_id*, *index_id*,
+        *mapping_level*, and *value* items (in that order). Records are
+        inserted in batches using ``executemany()``.
+
+        When *staged* is True, rows are loaded into an unconstrained
+        temporary table first and then merged into the mapping table
+        with a single ``INSERT ... SELECT`` statement. The merged rows
+        are ordered by the table's unique key so that its index is
+        built by appending rather than by random insertion.
+        """
+        batch_size = 5000
+        parameters = self._validate_many(rows)
+        count = 0
+
+        if not staged:
+            sql = """
+                INSERT INTO main.mapping (
+                    link_id,
+                    other_index_id,
+                    index_id,
+                    mapping_value,
+                    mapping_level
+                )
+                VALUES (?, ?, ?, ?, ?)
+            """
+            batch = list(islice(parameters, batch_size))
+            while batch:
+                with self._deferred_link_caches(x[0] for x in batch):
+                    self._cursor.executemany(sql, batch)
+                count += len(batch)
+                batch = list(islice(parameters, batch_size))
+            return count  # <- EXIT!
+
+        self._cursor.execute("""
+            CREATE TEMPORARY TABLE mapping_staging (
+                link_id INTEGER,
+                other_index_id INTEGER,
+                index_id INTEGER,
+                mapping_value REAL,
+                mapping_level BLOB
+            )
+        """)
+        try:
+            sql = 'INSERT INTO temp.mapping_staging VALUES (?, ?, ?, ?, ?)'
+            batch = list(islice(parameters, batch_size))
+            while batch:
+                self._cursor.executemany(sql, batch)
+                count += len(batch)
+                batch = list(islice(parameters, batch_size))
+
+            self._cursor.execute('SELECT DISTINCT link_id FROM temp.mapping_staging')
+            link_ids = [row[0] for row in self._cursor.fetchall()]
+            with self._deferred_link_caches(link_ids):
+                self._cursor.execute("""
+                    INSERT INTO main.mapping (
+                        link_id,
+                        other_index_id,
+                        index_id,
+                        mapping_value,
+                        mapping_level
+                    )
+                    SELECT
+                        link_id,
+                        other_index_id,
+                        index_id,
+                        mapping_value,
+                        mapping_level
+                    FROM temp.mapping_staging
+                    ORDER BY link_id, other_index_id, index_id, mapping_level
+                """)
+        finally:
+            self._cursor.execute('DROP TABLE temp.mapping_staging')
+
+        return count
+
     def get(self, id: int) -> MappingRecord:
         """Get a record from the repository.
 
@@ -1130,12 +1573,160 @@ class MappingRepository(BaseMappingRepository):
             )
             self._cursor.execute(sql, parameters)
 
+    def update_many(self, records: Iterable[MappingRecord]) -> int:
+        """Update multiple records in the repository and return the
+        count of records updated.
+
+        Records are updated in batches using ``executemany()``.
+        """
+        # Prior to SQLite 3.32.0, column affinity was not always applied
+        # before computing CHECK constraints (see `update()` method).
+        convert_values = sqlite3.sqlite_version_info < (3, 32, 0)
+
+        sql = """
+            UPDATE main.mapping
+            SET link_id=?,
+                other_index_id=?,
+                index_id=?,
+                mapping_level=?,
+                mapping_value=?,
+                proportion=?
+            WHERE mapping_id=?
+        """
+        parameters = (
+            (
+                record.link_id,
+                int(record.other_index_id) if convert_values else record.other_index_id,
+                record.index_id,
+                record.mapping_level,
+                float(record.value) if convert_values else record.value,
+                record.proportion,
+                record.id,
+            )
+            for record in records
+        )
+
+        # Caches are invalidated once per batch for the links records are
+        # assigned to (if a record is moved from another link, the row
+        # triggers invalidate that link too).
+        batch_size = 5000
+        count = 0
+        batch = list(islice(parameters, batch_size))
+        while batch:
+            with self._deferred_link_caches(x[0] for x in batch):
+                self._cursor.executemany(sql, batch)
+                count += self._cursor.rowcount
+            batch = list(islice(parameters, batch_size))
+        return count
+
     def delete(self, id: int) -> None:
         """Delete a record from the repository."""
         self._cursor.execute(
             'DELETE FROM main.mapping WHERE mapping_id=?', (id,)
         )
 
+    def delete_many(self, ids: Iterable[int]) -> int:
+        """Delete multiple records from the repository and return the
+        count of records deleted.
+
+        The ids are loaded into a temporary table and records are
+        removed with a single ``DELETE ... WHERE mapping_id IN (...)``
+        statement.
+        """
+        self._cursor.execute('DROP TABLE IF EXISTS temp.mapping_delete_ids')
+        self._cursor.execute(
+            'CREATE TEMP TABLE mapping_delete_ids (mapping_id INTEGER PRIMARY KEY)'
+        )
+        try:
+            self._cursor.executemany(
+                'INSERT OR IGNORE INTO temp.mapping_delete_ids VALUES (?)',
+                ((id,) for id in ids),
+            )
+            self._cursor.execute("""
+                SELECT DISTINCT link_id
+                FROM main.mapping
+                WHERE mapping_id IN (SELECT mapping_id FROM temp.mapping_delete_ids)
+            """)
+            link_ids = [row[0] for row in self._cursor.fetchall()]
+            with self._deferred_link_caches(link_ids):
+                self._cursor.execute("""
+                    DELETE FROM main.mapping
+                    WHERE mapping_id IN (SELECT mapping_id FROM temp.mapping_delete_ids)
+                """)
+                count = self._cursor.rowcount
+        finally:
+            self._cursor.execute('DROP TABLE temp.mapping_delete_ids')
+        return count
+
+    def merge_by_index_id(
+        self, index_ids: Union[Iterable[int], int], target: int
+    ) -> None:
+        """Merge mapping records by given index_id values."""
+        _stage_index_merge(self._cursor, index_ids, target)
+        self._merge_staged_index_ids()
+        self._cursor.execute('DROP TABLE temp.index_merge')
+
+    def _merge_staged_index_ids(self) -> None:
+        """Merge mapping records using the pairs of ``index_id`` and
+        ``target`` values in the temporary 'index_merge' table.
+
+        Every target must also be paired with itself. Values and
+        proportions are summed with a single grouped query (if any
+        summed proportion is NULL, the result is NULL), old records
+        are deleted, and the sums are inserted for the target
+        index_id values (in the order they were first found when
+        ordered by index_id).
+        """
+        self._cursor.execute('DROP TABLE IF EXISTS temp.merged_mapping')
+        self._cursor.execute("""
+            CREATE TEMP TABLE merged_mapping AS
+                SELECT
+                    link_id,
+                    other_index_id,
+                    target,
+                    mapping_level,
+                    SUM(mapping_value) AS mapping_value,
+                    CASE WHEN COUNT(proportion)=COUNT(*)
+                        THEN SUM(proportion)
+                    END AS proportion
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        ORDER BY index_id, mapping_id
+                    ) AS seq
+                    FROM main.mapping
+                    JOIN temp.index_merge USING (index_id)
+                )
+                GROUP BY link_id, other_index_id, target, mapping_level
+                ORDER BY MIN(seq)
+        """)
+        self._cursor.execute('SELECT DISTINCT link_id FROM temp.merged_mapping')
+        link_ids = [row[0] for row in self._cursor.fetchall()]
+        with self._deferred_link_caches(link_ids):
+            self._cursor.execute("""
+                DELETE FROM main.mapping
+                WHERE index_id IN (SELECT index_id FROM temp.index_merge)
+            """)
+            self._cursor.execute("""
+                INSERT INTO main.mapping (
+                    link_id,
+                    other_index_id,
+                    index_id,
+                    mapping_level,
+                    mapping_value,
+                    proportion
+                )
+                SELECT
+                    link_id,
+                    other_index_id,
+                    target,
+                    mapping_level,
+                    mapping_value,
+                    proportion
+                FROM temp.merged_mapping
+                ORDER BY rowid
+            """)
+        self._cursor.execute('DROP TABLE temp.merged_mapping')
+
     def find_distinct_other_index_ids(
         self,
         link_id: int,
@@ -1209,22 +1800,20 @@ class MappingRepository(BaseMappingRepository):
 
     def mapping_is_complete(self, link_id: int) -> bool:
         """Return True if there's a mapping for every index record."""
-        # In the following SQL, the `EXISTS` operator stops the nested query
-        # early (confirmed by Richard Hipp on a mailing list 2016-03-05).
+        # The 'link_coverage' count is maintained by triggers so it can
+        # be compared to the number of index records (minus one for the
+        # undefined record) without scanning the mappings.
         self._cursor.execute(
             """
-                -- Determine if index_id set is complete (no missing records).
-                SELECT NOT EXISTS (
-                    -- Select index_id values not in link's mappings.
-                    SELECT index_id FROM main.label_index WHERE index_id != 0
-                    EXCEPT
-                    SELECT index_id FROM main.mapping WHERE link_id = ?
-                )
+                SELECT COALESCE((
+                    SELECT index_id_count
+                    FROM main.link_coverage
+                    WHERE link_id=?
+                ), 0) = (SELECT COUNT(*) - 1 FROM main.label_index)
             """,
             (link_id,),
         )
-        is_complete = self._cursor.fetchone()[0]
-        return bool(is_complete)
+        return bool(self._cursor.fetchone()[0])
 
     def get_distinct_mapping_levels(self, link_id: int) -> List[bytes]:
         """Return a list of distinct mapping levels used by a link."""
@@ -1236,6 +1825,240 @@ class MappingRepository(BaseMappingRepository):
         self._cursor.execute(sql, (link_id,))
         return [row[0] for row in self._cursor]
 
+    if sqlite3.sqlite_version_info >= (3, 33, 0):
+        _refresh_proportions_sql = """
+            UPDATE main.mapping
+            SET proportion=CASE
+                WHEN mapping.other_index_id=0 THEN 0.0
+                WHEN totals.value_sum=0 THEN 1.0 / totals.value_count
+                ELSE mapping.mapping_value / totals.value_sum
+            END
+            FROM (
+                SELECT
+                    other_index_id,
+                    SUM(mapping_value) AS value_sum,
+                    COUNT(*) AS value_count
+                FROM main.mapping
+                WHERE link_id=:link_id{other_index_id_clause}
+                GROUP BY other_index_id
+            ) AS totals
+            WHERE mapping.link_id=:link_id
+                AND mapping.other_index_id=totals.other_index_id
+        """
+    else:
+        # Prior to SQLite 3.33.0, the UPDATE-FROM syntax was not
+        # available so a correlated subquery is used instead.
+        _refresh_proportions_sql = """
+            UPDATE main.mapping
+            SET proportion=(
+                SELECT CASE
+                    WHEN mapping.other_index_id=0 THEN 0.0
+                    WHEN SUM(sub.mapping_value)=0 THEN 1.0 / COUNT(*)
+                    ELSE mapping.mapping_value / SUM(sub.mapping_value)
+                END
+                FROM main.mapping AS sub
+                WHERE sub.link_id=mapping.link_id
+                    AND sub.other_index_id=mapping.other_index_id
+            )
+            WHERE link_id=:link_id{other_index_id_clause}
+        """
+
+    def refresh_proportions_for_link(
+        self, link_id: int, other_index_ids: Optional[Iterable[int]] = None
+    ) -> None:
+        """Refresh proportions for all records with matching link_id.
+
+        If *other_index_ids* is given, only records with matching
+        other_index_id values are refreshed.
+        """
+        if other_index_ids is None:
+            with self._deferred_link_caches([link_id]):
+                sql = self._refresh_proportions_sql.format(other_index_id_clause='')
+                self._cursor.execute(sql, {'link_id': link_id})
+
+            # Every proportion is now defined, so the link's CSR arrays
+            # and stats are saved as part of the same write operation.
+            arrays = self._build_proportion_arrays(link_id)
+            self._store_proportion_arrays(link_id, arrays)
+            self.get_mapping_stats(link_id)
+            return  # <- EXIT!
+
+        with self._deferred_link_caches([link_id]):
+            # Refresh in batches to stay below SQLite's host parameter limit.
+            other_index_ids = iter(other_index_ids)
+            batch = list(islice(other_index_ids, 900))
+            while batch:
+                qmarks = ', '.join(f':id{i}' for i in range(len(batch)))
+                sql = self._refresh_proportions_sql.format(
+                    other_index_id_clause=f' AND other_index_id IN ({qmarks})'
+                )
+                parameters = {f'id{i}': x for i, x in enumerate(batch)}
+                parameters['link_id'] = link_id
+                self._cursor.execute(sql, parameters)
+                batch = list(islice(other_index_ids, 900))
+
+    def _save_cache(self, sql: str, parameters: Sequence[Any]) -> None:
+        """Execute *sql* to save derived values (CSR arrays or stats).
+
+        Inside a transaction, values are saved as part of the active
+        write operation. Otherwise, they are saved with a single
+        autocommit statement--if the file cannot be written (it was
+        opened as read-only or is locked by another connection), the
+        values are not saved and will be built again when needed.
+        """
+        if self._cursor.connection.in_transaction:
+            self._cursor.execute(sql, parameters)
+            return  # <- EXIT!
+
+        try:
+            self._cursor.execute(sql, parameters)
+        except sqlite3.OperationalError:
+            pass
+
+    def get_mapping_stats(self, link_id: int) -> Dict[str, int]:
+        """Return counts of distinct ``index_id`` and ``other_index_id``
+        values used by the link's mappings (the undefined record is
+        always counted).
+
+        Counts are loaded from the 'link_stats' table. If they have not
+        been stored yet, they are counted with a single aggregate query
+        and saved for later calls. Stored counts are removed when the
+        link's mappings change and saved again when its proportions
+        are fully refreshed.
+        """
+        self._cursor.execute(
+            """
+                SELECT index_id_count, other_index_id_count
+                FROM main.link_stats
+                WHERE link_id=?
+            """,
+            (link_id,),
+        )
+        row = self._cursor.fetchone()
+        if row is None:
+            self._cursor.execute(
+                """
+                    SELECT
+                        COUNT(DISTINCT CASE WHEN index_id != 0 THEN index_id END),
+                        COUNT(DISTINCT CASE WHEN other_index_id != 0 THEN other_index_id END)
+                    FROM main.mapping
+                    WHERE link_id=?
+                """,
+                (link_id,),
+            )
+            row = self._cursor.fetchone()
+            self._save_cache(
+                """
+                    INSERT OR REPLACE INTO main.link_stats
+                    SELECT link_id, ?, ? FROM main.link WHERE link_id=?
+                """,
+                (*row, link_id),
+            )
+
+        return {
+            'index_id_cardinality': row[0] + 1,
+            'other_index_id_cardinality': row[1] + 1,
+        }
+
+    def get_revision(self, link_id: int) -> Optional[str]:
+        """Return a string that identifies the current revision of the
+        link's mappings or None if the link has no mappings.
+
+        Revisions are random tokens from the 'mapping_revision' table
+        that are replaced by triggers when the link's mappings change.
+        """
+        self._cursor.execute(
+            'SELECT hex(revision) FROM main.mapping_revision WHERE link_id=?',
+            (link_id,),
+        )
+        row = self._cursor.fetchone()
+        return row[0] if row else None
+
+    def _build_proportion_arrays(self, link_id: int) -> ProportionArrays:
+        """Build CSR arrays from the link's mapping records."""
+        self._cursor.execute(
+            """
+                SELECT other_index_id, index_id, proportion
+                FROM main.mapping
+                WHERE link_id=?
+                ORDER BY other_index_id, index_id, mapping_level
+            """,
+            (link_id,),
+        )
+        other_index_ids = array.array('q')
+        offsets = array.array('q', [0])
+        index_ids = array.array('q')
+        proportions = array.array('d')
+        for other_index_id, index_id, proportion in self._cursor:
+            if proportion is None:
+                raise ValueError(
+                    f'link {link_id} has mappings with undefined '
+                    f'proportions, proportions must be refreshed first'
+                )
+            if not other_index_ids or other_index_ids[-1] != other_index_id:
+                if other_index_ids:
+                    offsets.append(len(index_ids))
+                other_index_ids.append(other_index_id)
+            index_ids.append(index_id)
+            proportions.append(proportion)
+        if other_index_ids:
+            offsets.append(len(index_ids))
+        return (other_index_ids, offsets, index_ids, proportions)
+
+    def _store_proportion_arrays(
+        self, link_id: int, arrays: ProportionArrays
+    ) -> None:
+        """Save a link's CSR arrays as little-endian BLOBs."""
+        blobs = []
+        for arr in arrays:
+            if sys.byteorder == 'big':  # Stored as little-endian.
+                arr = array.array(arr.typecode, arr)
+                arr.byteswap()
+            blobs.append(arr.tobytes())
+
+        self._save_cache(
+            """
+                INSERT OR REPLACE INTO main.link_csr
+                SELECT link_id, ?, ?, ?, ? FROM main.link WHERE link_id=?
+            """,
+            (*blobs, link_id),
+        )
+
+    def get_proportion_arrays(self, link_id: int) -> ProportionArrays:
+        """Return a link's proportions as compressed sparse row (CSR)
+        arrays of ``(other_index_ids, offsets, index_ids, proportions)``.
+
+        Arrays are loaded from the 'link_csr' table. If they have not
+        been stored yet, they are built from the mapping records and
+        saved for later calls. Stored arrays are removed when the link's
+        mappings change and saved again when its proportions are fully
+        refreshed.
+        """
+        self._cursor.execute(
+            """
+                SELECT other_index_ids, offsets, index_ids, proportions
+                FROM main.link_csr
+                WHERE link_id=?
+            """,
+            (link_id,),
+        )
+        row = self._cursor.fetchone()
+        if row is None:
+            arrays = self._build_proportion_arrays(link_id)
+            self._store_proportion_arrays(link_id, arrays)
+            return arrays  # <- EXIT!
+
+        other_index_ids = array.array('q', row[0])
+        offsets = array.array('q', row[1])
+        index_ids = array.array('q', row[2])
+        proportions = array.array('d', row[3])
+        if sys.byteorder == 'big':  # Stored as little-endian.
+            other_index_ids.byteswap()
+            offsets.byteswap()
+            index_ids.byteswap()
+            proportions.byteswap()
+        return (other_index_ids, offsets, index_ids, proportions)
+
 
 class PropertyRepository(BasePropertyRepository):
     def __init__(self, cursor: sqlite3.Cursor) -> None:
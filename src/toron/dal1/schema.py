@@ -71,7 +71,7 @@ from toron._typing import (
     Optional,
     Set,
 )
-from toron._utils import BitFlags, SequenceHash
+from toron._utils import BitFlags, ChunkedSequenceHash
 from ..data_models import TORON_MAGIC_NUMBER  # Used as 'application_id'.
 
 
@@ -209,6 +209,80 @@ def create_schema_tables(cur: sqlite3.Cursor) -> None:
             UNIQUE (link_id, other_index_id, index_id, mapping_level)
         );
 
+        /* Index mappings by index_id for foreign key checks when
+           deleting index records (and for lookups by index_id). The
+           link_id column lets coverage triggers check for other
+           mappings of the same index_id and link with an index seek. */
+        CREATE INDEX main.mapping_index_id_idx ON mapping(index_id, link_id);
+
+        /* Compressed sparse row (CSR) form of a link's proportions,
+           stored as little-endian arrays ('q', 'q', 'q', and 'd'
+           types). Rows are removed by triggers when mappings change. */
+        CREATE TABLE main.link_csr(
+            link_id INTEGER PRIMARY KEY,
+            other_index_ids BLOB NOT NULL,
+            offsets BLOB NOT NULL,
+            index_ids BLOB NOT NULL,
+            proportions BLOB NOT NULL,
+            FOREIGN KEY(link_id) REFERENCES link(link_id) ON DELETE CASCADE
+        );
+
+        /* Cached counts of distinct ids in a link's mappings (not
+           including the undefined record). */
+        CREATE TABLE main.link_stats(
+            link_id INTEGER PRIMARY KEY,
+            index_id_count INTEGER NOT NULL,
+            other_index_id_count INTEGER NOT NULL,
+            FOREIGN KEY(link_id) REFERENCES link(link_id) ON DELETE CASCADE
+        );
+
+        /* Random revision token for each link's mappings, replaced by
+           triggers when mappings change (used to detect when composite
+           links built from a link are out of date). A NULL revision
+           marks a link that is being changed by a bulk statement--row
+           triggers skip the link and its caches are invalidated once
+           when the statement is finished. */
+        CREATE TABLE main.mapping_revision(
+            link_id INTEGER PRIMARY KEY,
+            revision BLOB,
+            FOREIGN KEY(link_id) REFERENCES link(link_id) ON DELETE CASCADE
+        );
+
+        /* Counts of distinct index_id values covered by each weight
+           group and each link (not including the undefined record).
+           These are maintained by triggers so that completeness can be
+           checked by comparing a count with the index cardinality. */
+        CREATE TABLE main.weight_group_coverage(
+            weight_group_id INTEGER PRIMARY KEY,
+            index_id_count INTEGER NOT NULL,
+            FOREIGN KEY(weight_group_id) REFERENCES weight_group(weight_group_id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE main.link_coverage(
+            link_id INTEGER PRIMARY KEY,
+            index_id_count INTEGER NOT NULL,
+            FOREIGN KEY(link_id) REFERENCES link(link_id) ON DELETE CASCADE
+        );
+
+        /* Digests of fixed-size ranges of index_id values (used to
+           build the 'index_hash' property). A NULL digest marks a
+           range that has changed and must be re-hashed. */
+        CREATE TABLE main.index_hash_chunk(
+            chunk_id INTEGER PRIMARY KEY,
+            digest BLOB
+        );
+
+        /* Digests of fixed-size ranges of each link's other_index_id
+           values (used to build the link's 'other_index_hash'). A NULL
+           digest marks a range that has changed and must be re-hashed. */
+        CREATE TABLE main.link_hash_chunk(
+            link_id INTEGER NOT NULL,
+            chunk_id INTEGER NOT NULL,
+            digest BLOB,
+            PRIMARY KEY (link_id, chunk_id),
+            FOREIGN KEY(link_id) REFERENCES link(link_id) ON DELETE CASCADE
+        );
+
         CREATE TABLE main.property(
             key TEXT PRIMARY KEY NOT NULL,
             value TEXT_JSON
@@ -218,7 +292,7 @@ def create_schema_tables(cur: sqlite3.Cursor) -> None:
         INSERT INTO main.label_index (index_id) VALUES (0);
 
         /* Set properties for Toron schema and application versions. */
-        INSERT INTO main.property VALUES ('toron_schema_version', '"0.3.1"');
+        INSERT INTO main.property VALUES ('toron_schema_version', '"0.3.2"');
         INSERT INTO main.property VALUES ('toron_app_version', '"0.1.0"');
 
         /* Set initial user_properties (an empty JSON object). */
@@ -236,9 +310,13 @@ def create_schema_tables(cur: sqlite3.Cursor) -> None:
     )
 
     # Set initial index_hash value (hash of the "undefined" record alone).
+    cur.execute(
+        'INSERT INTO main.index_hash_chunk (chunk_id, digest) VALUES (?, ?)',
+        (0, ChunkedSequenceHash.digest_chunk([0])),
+    )
     cur.execute(
         'INSERT INTO main.property (key, value) VALUES (?, ?)',
-        ('index_hash', json_dumps(SequenceHash([0]).get_hexdigest())),
+        ('index_hash', json_dumps(ChunkedSequenceHash([0]).get_hexdigest())),
     )
 
     # Set initial created_date using ISO 8601 UTC format.
@@ -289,7 +367,10 @@ def column_def_structure(column: str) -> str:
 
 def create_schema_constraints(cur: sqlite3.Cursor) -> None:
     """Add indexes and triggers to the 'label_index', 'label_location',
-    and 'label_structure' tables.
+    and 'label_structure' tables and add the triggers that maintain the
+    'index_hash_chunk' and 'link_hash_chunk' digests, the
+    'weight_group_coverage' and 'link_coverage' counts, the 'link_csr'
+    and 'link_stats' caches, and the 'mapping_revision' tokens.
 
     These constraints are persistent and only need to be re-created
     if they were explicitly removed.
@@ -338,10 +419,241 @@ def create_schema_constraints(cur: sqlite3.Cursor) -> None:
         END
     """)
 
+    # Create triggers to mark changed ranges of index_id values (their
+    # digests are rebuilt when the 'index_hash' property is refreshed).
+    chunk_size = ChunkedSequenceHash.chunk_size
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_insert_label_index_for_hash
+        AFTER INSERT ON main.label_index FOR EACH ROW
+        BEGIN
+            INSERT INTO index_hash_chunk VALUES (NEW.index_id / {chunk_size}, NULL)
+            ON CONFLICT (chunk_id) DO UPDATE SET digest=NULL;
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_delete_label_index_for_hash
+        AFTER DELETE ON main.label_index FOR EACH ROW
+        BEGIN
+            UPDATE index_hash_chunk SET digest=NULL
+            WHERE chunk_id=OLD.index_id / {chunk_size};
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_update_label_index_for_hash
+        AFTER UPDATE OF index_id ON main.label_index FOR EACH ROW
+        WHEN OLD.index_id != NEW.index_id
+        BEGIN
+            UPDATE index_hash_chunk SET digest=NULL
+            WHERE chunk_id=OLD.index_id / {chunk_size};
+
+            INSERT INTO index_hash_chunk VALUES (NEW.index_id / {chunk_size}, NULL)
+            ON CONFLICT (chunk_id) DO UPDATE SET digest=NULL;
+        END
+    """)
+
+    # Create triggers to maintain weight group coverage counts (the
+    # UNIQUE constraint on 'weight' means each record covers a distinct
+    # index_id within its group).
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_insert_weight_for_coverage
+        AFTER INSERT ON main.weight FOR EACH ROW
+        WHEN NEW.weight_group_id IS NOT NULL AND NEW.index_id IS NOT NULL
+        BEGIN
+            INSERT INTO weight_group_coverage VALUES (NEW.weight_group_id, 1)
+            ON CONFLICT (weight_group_id)
+                DO UPDATE SET index_id_count=index_id_count + 1;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_delete_weight_for_coverage
+        AFTER DELETE ON main.weight FOR EACH ROW
+        WHEN OLD.index_id IS NOT NULL
+        BEGIN
+            UPDATE weight_group_coverage
+            SET index_id_count=index_id_count - 1
+            WHERE weight_group_id=OLD.weight_group_id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_update_weight_for_coverage
+        AFTER UPDATE OF weight_group_id, index_id ON main.weight FOR EACH ROW
+        WHEN OLD.weight_group_id IS NOT NEW.weight_group_id
+            OR (OLD.index_id IS NULL) != (NEW.index_id IS NULL)
+        BEGIN
+            UPDATE weight_group_coverage
+            SET index_id_count=index_id_count - 1
+            WHERE weight_group_id=OLD.weight_group_id AND OLD.index_id IS NOT NULL;
+
+            INSERT INTO weight_group_coverage
+            SELECT NEW.weight_group_id, 1
+            WHERE NEW.weight_group_id IS NOT NULL AND NEW.index_id IS NOT NULL
+            ON CONFLICT (weight_group_id)
+                DO UPDATE SET index_id_count=index_id_count + 1;
+        END
+    """)
+
+    # Create triggers to maintain link coverage counts (a link can have
+    # many mappings for the same index_id so counts only change when the
+    # first is added or the last is removed).
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_insert_mapping_for_coverage
+        AFTER INSERT ON main.mapping FOR EACH ROW
+        WHEN NEW.index_id != 0 AND NOT EXISTS (
+            SELECT 1 FROM mapping
+            WHERE index_id=NEW.index_id
+                AND link_id=NEW.link_id
+                AND mapping_id != NEW.mapping_id
+        )
+        BEGIN
+            INSERT INTO link_coverage VALUES (NEW.link_id, 1)
+            ON CONFLICT (link_id)
+                DO UPDATE SET index_id_count=index_id_count + 1;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_delete_mapping_for_coverage
+        AFTER DELETE ON main.mapping FOR EACH ROW
+        WHEN OLD.index_id != 0 AND NOT EXISTS (
+            SELECT 1 FROM mapping
+            WHERE index_id=OLD.index_id AND link_id=OLD.link_id
+        )
+        BEGIN
+            UPDATE link_coverage
+            SET index_id_count=index_id_count - 1
+            WHERE link_id=OLD.link_id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_update_mapping_for_coverage
+        AFTER UPDATE OF link_id, index_id ON main.mapping FOR EACH ROW
+        WHEN OLD.link_id IS NOT NEW.link_id OR OLD.index_id IS NOT NEW.index_id
+        BEGIN
+            UPDATE link_coverage
+            SET index_id_count=index_id_count - 1
+            WHERE link_id=OLD.link_id AND OLD.index_id != 0 AND NOT EXISTS (
+                SELECT 1 FROM mapping
+                WHERE index_id=OLD.index_id AND link_id=OLD.link_id
+            );
+
+            INSERT INTO link_coverage
+            SELECT NEW.link_id, 1
+            WHERE NEW.index_id != 0 AND NOT EXISTS (
+                SELECT 1 FROM mapping
+                WHERE index_id=NEW.index_id
+                    AND link_id=NEW.link_id
+                    AND mapping_id != NEW.mapping_id
+            )
+            ON CONFLICT (link_id)
+                DO UPDATE SET index_id_count=index_id_count + 1;
+        END
+    """)
+
+    # Create triggers to mark changed ranges of each link's other_index_id
+    # values (their digests are rebuilt when the link's 'other_index_hash'
+    # is next calculated).
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_insert_mapping_for_hash
+        AFTER INSERT ON main.mapping FOR EACH ROW
+        BEGIN
+            INSERT INTO link_hash_chunk
+            VALUES (NEW.link_id, NEW.other_index_id / {chunk_size}, NULL)
+            ON CONFLICT (link_id, chunk_id) DO UPDATE SET digest=NULL;
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_delete_mapping_for_hash
+        AFTER DELETE ON main.mapping FOR EACH ROW
+        BEGIN
+            UPDATE link_hash_chunk SET digest=NULL
+            WHERE link_id=OLD.link_id
+                AND chunk_id=OLD.other_index_id / {chunk_size};
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_update_mapping_for_hash
+        AFTER UPDATE OF link_id, other_index_id ON main.mapping FOR EACH ROW
+        WHEN OLD.link_id IS NOT NEW.link_id
+            OR OLD.other_index_id IS NOT NEW.other_index_id
+        BEGIN
+            UPDATE link_hash_chunk SET digest=NULL
+            WHERE link_id=OLD.link_id
+                AND chunk_id=OLD.other_index_id / {chunk_size};
+
+            INSERT INTO link_hash_chunk
+            VALUES (NEW.link_id, NEW.other_index_id / {chunk_size}, NULL)
+            ON CONFLICT (link_id, chunk_id) DO UPDATE SET digest=NULL;
+        END
+    """)
+
+    # Create triggers to remove a link's stored CSR arrays and stats
+    # when its mappings change (they are rebuilt when next requested)
+    # and to replace its mapping revision. Changes to 'mapping_value'
+    # alone do not affect any of these. Links with a NULL revision are
+    # skipped (bulk writes invalidate these once per statement, see
+    # ``MappingRepository._deferred_link_caches()``).
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_insert_mapping_for_link_caches
+        AFTER INSERT ON main.mapping FOR EACH ROW
+        WHEN NOT EXISTS (
+            SELECT 1 FROM mapping_revision
+            WHERE link_id=NEW.link_id AND revision IS NULL
+        )
+        BEGIN
+            DELETE FROM link_csr WHERE link_id=NEW.link_id;
+            DELETE FROM link_stats WHERE link_id=NEW.link_id;
+            INSERT INTO mapping_revision VALUES (NEW.link_id, randomblob(16))
+            ON CONFLICT (link_id) DO UPDATE SET revision=excluded.revision;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_delete_mapping_for_link_caches
+        AFTER DELETE ON main.mapping FOR EACH ROW
+        WHEN NOT EXISTS (
+            SELECT 1 FROM mapping_revision
+            WHERE link_id=OLD.link_id AND revision IS NULL
+        )
+        BEGIN
+            DELETE FROM link_csr WHERE link_id=OLD.link_id;
+            DELETE FROM link_stats WHERE link_id=OLD.link_id;
+            UPDATE mapping_revision SET revision=randomblob(16)
+            WHERE link_id=OLD.link_id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS main.trigger_on_update_mapping_for_link_caches
+        AFTER UPDATE OF link_id, other_index_id, index_id, mapping_level, proportion
+            ON main.mapping FOR EACH ROW
+        WHEN (OLD.link_id IS NOT NEW.link_id
+                OR OLD.other_index_id IS NOT NEW.other_index_id
+                OR OLD.index_id IS NOT NEW.index_id
+                OR OLD.mapping_level IS NOT NEW.mapping_level
+                OR OLD.proportion IS NOT NEW.proportion)
+            AND NOT (
+                EXISTS (
+                    SELECT 1 FROM mapping_revision
+                    WHERE link_id=OLD.link_id AND revision IS NULL
+                )
+                AND EXISTS (
+                    SELECT 1 FROM mapping_revision
+                    WHERE link_id=NEW.link_id AND revision IS NULL
+                )
+            )
+        BEGIN
+            DELETE FROM link_csr WHERE link_id IN (OLD.link_id, NEW.link_id);
+            DELETE FROM link_stats WHERE link_id IN (OLD.link_id, NEW.link_id);
+            UPDATE mapping_revision SET revision=randomblob(16)
+            WHERE link_id=OLD.link_id AND revision IS NOT NULL;
+            INSERT INTO mapping_revision VALUES (NEW.link_id, randomblob(16))
+            ON CONFLICT (link_id) DO UPDATE SET revision=excluded.revision
+                WHERE revision IS NOT NULL;
+        END
+    """)
+
 
 def drop_schema_constraints(cur: sqlite3.Cursor) -> None:
     """Remove indexes and triggers from the 'label_index', 'label_location',
-    and 'label_structure' tables.
+    and 'label_structure' tables and remove the index hash, coverage
+    count, and link cache triggers.
 
     .. note::
         This function should remove all of the constraints created by
@@ -352,6 +664,21 @@ def drop_schema_constraints(cur: sqlite3.Cursor) -> None:
     cur.execute('DROP INDEX IF EXISTS main.unique_structure_label_columns')
     cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_update_for_undefined')
     cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_delete_for_undefined')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_insert_label_index_for_hash')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_delete_label_index_for_hash')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_update_label_index_for_hash')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_insert_weight_for_coverage')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_delete_weight_for_coverage')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_update_weight_for_coverage')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_insert_mapping_for_coverage')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_delete_mapping_for_coverage')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_update_mapping_for_coverage')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_insert_mapping_for_hash')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_delete_mapping_for_hash')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_update_mapping_for_hash')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_insert_mapping_for_link_caches')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_delete_mapping_for_link_caches')
+    cur.execute('DROP TRIGGER IF EXISTS main.trigger_on_update_mapping_for_link_caches')
 
 
 def create_node_schema(cur: sqlite3.Cursor) -> None:
@@ -419,15 +746,22 @@ def verify_node_schema(cur: sqlite3.Cursor) -> None:
         tables = {row[0] for row in cur if not row[0].startswith('sqlite_')}
         node_tables = {
             'attribute_group',
+            'index_hash_chunk',
             'label_index',
             'label_location',
             'label_structure',
             'link',
+            'link_coverage',
+            'link_csr',
+            'link_hash_chunk',
+            'link_stats',
             'mapping',
+            'mapping_revision',
             'property',
             'quantity',
             'weight',
             'weight_group',
+            'weight_group_coverage',
         }
         if tables != node_tables:
             raise RuntimeError(msg)
@@ -4,9 +4,12 @@ A compatible back-end for the DataAccessLayer class must implement
 all of the base classes given in this sub-module.
 """
 
+import array
+import hashlib
 import os
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from bisect import bisect_left
+from collections import Counter, defaultdict
 from dataclasses import dataclass, replace
 from itertools import groupby
 
@@ -796,6 +799,29 @@ class BaseWeightRepository(ABC):
                 f"'sum'; got {on_conflict!r}"
             )
 
+    def add_or_resolve_many(
+        self,
+        weight_group_id: int,
+        data: Iterable[Tuple[int, float]],
+        on_conflict: Literal['abort', 'ignore', 'replace', 'sum'] = 'abort',
+    ) -> Dict[str, int]:
+        """Add ``(index_id, value)`` records for the given weight group
+        or resolve conflicts (as described in ``add_or_resolve()``).
+        Records are handled in order and a counter of result codes is
+        returned.
+
+        A concrete DAL should implement an optimized version of this
+        method. But as a stop-gap, this unoptimized base implementation
+        can be called with ``super().add_or_resolve_many()``.
+        """
+        counter: Dict[str, int] = Counter()
+        for index_id, value in data:
+            result_code = self.add_or_resolve(
+                weight_group_id, index_id, value, on_conflict=on_conflict
+            )
+            counter[result_code] += 1
+        return counter
+
     def merge_by_index_id(
         self, index_ids: Union[Iterable[int], int], target: int
     ) -> None:
@@ -1106,6 +1132,30 @@ class MappingRecord(object):
                     )
 
 
+ProportionArrays: TypeAlias = Tuple[
+    'array.array[int]',    # other_index_id values (ascending)
+    'array.array[int]',    # offsets (by position of other_index_id)
+    'array.array[int]',    # index_id values
+    'array.array[float]',  # proportion values
+]
+
+
+def get_proportion_slices(
+    arrays: ProportionArrays, other_index_id: int
+) -> Tuple['array.array[int]', 'array.array[float]']:
+    """Return the ``index_id`` and ``proportion`` values mapped from
+    the given *other_index_id* (empty arrays if it has no mappings).
+    """
+    other_index_ids, offsets, index_ids, proportions = arrays
+    pos = bisect_left(other_index_ids, other_index_id)
+    if pos == len(other_index_ids) or other_index_ids[pos] != other_index_id:
+        return index_ids[:0], proportions[:0]  # <- EXIT!
+
+    start = offsets[pos]
+    stop = offsets[pos + 1]
+    return index_ids[start:stop], proportions[start:stop]
+
+
 class BaseMappingRepository(ABC):
     @abstractmethod
     def __init__(self, cursor: Any) -> None:
@@ -1127,6 +1177,32 @@ class BaseMappingRepository(ABC):
         undefined-to-undefined), a ``ValueError`` is raised.
         """
 
+    def add_many(
+        self,
+        rows: Iterable[Tuple[int, int, int, bytes, float]],
+        *,
+        staged: bool = False,
+    ) -> int:
+        """Add multiple records to the repository and return the count
+        of records added.
+
+        Each row must contain *link_id*, *other_index_id*, *index_id*,
+        *mapping_level*, and *value* items (in that order). When
+        *staged* is True, an implementation may load rows into an
+        intermediate table before merging them into the repository.
+        Staging is intended for large loads into links that have no
+        existing mappings.
+
+        A concrete DAL should implement an optimized version of this
+        method. But as a stop-gap, this unoptimized base implementation
+        can be called with ``super().add_many()``.
+        """
+        count = 0
+        for link_id, other_index_id, index_id, mapping_level, value in rows:
+            self.add(link_id, other_index_id, index_id, mapping_level, value)
+            count += 1
+        return count
+
     @abstractmethod
     def get(self, id: int) -> MappingRecord:
         """Get a record from the repository.
@@ -1138,10 +1214,38 @@ class BaseMappingRepository(ABC):
     def update(self, record: MappingRecord) -> None:
         """Update a record in the repository."""
 
+    def update_many(self, records: Iterable[MappingRecord]) -> int:
+        """Update multiple records in the repository and return the
+        count of records updated.
+
+        A concrete DAL should implement an optimized version of this
+        method. But as a stop-gap, this unoptimized base implementation
+        can be called with ``super().update_many()``.
+        """
+        count = 0
+        for record in records:
+            self.update(record)
+            count += 1
+        return count
+
     @abstractmethod
     def delete(self, id: int) -> None:
         """Delete a record from the repository."""
 
+    def delete_many(self, ids: Iterable[int]) -> int:
+        """Delete multiple records from the repository and return the
+        count of records deleted.
+
+        A concrete DAL should implement an optimized version of this
+        method. But as a stop-gap, this unoptimized base implementation
+        can be called with ``super().delete_many()``.
+        """
+        count = 0
+        for id in ids:
+            self.delete(id)
+            count += 1
+        return count
+
     @abstractmethod
     def find_distinct_other_index_ids(
         self, link_id: int, ordered: bool = False
@@ -1249,6 +1353,107 @@ class BaseMappingRepository(ABC):
 
                 self.update(replace(mapping, proportion=proportion))
 
+    def refresh_proportions_for_link(
+        self, link_id: int, other_index_ids: Optional[Iterable[int]] = None
+    ) -> None:
+        """Refresh proportions for all records with matching link_id.
+
+        If *other_index_ids* is given, only records with matching
+        other_index_id values are refreshed.
+
+        A concrete DAL should implement an optimized version of this
+        method. But as a stop-gap, this unoptimized base implementation
+        can be called with ``super().refresh_proportions_for_link()``.
+        """
+        if other_index_ids is None:
+            other_index_ids = self.find_distinct_other_index_ids(link_id)
+
+        for other_index_id in list(other_index_ids):
+            self.refresh_proportions(link_id, other_index_id)
+
+    def get_mapping_stats(self, link_id: int) -> Dict[str, int]:
+        """Return counts of distinct ``index_id`` and ``other_index_id``
+        values used by the link's mappings (the undefined record is
+        always counted)::
+
+            >>> repository.get_mapping_stats(link_id=1)
+            {'index_id_cardinality': 10, 'other_index_id_cardinality': 8}
+
+        A concrete DAL should implement an optimized version of this
+        method. But as a stop-gap, this unoptimized base implementation
+        can be called with ``super().get_mapping_stats()``.
+        """
+        other_index_ids = self.find_distinct_other_index_ids(link_id)
+        return {
+            'index_id_cardinality': self.get_index_id_cardinality(link_id),
+            'other_index_id_cardinality': sum(1 for _ in other_index_ids),
+        }
+
+    def get_revision(self, link_id: int) -> Optional[str]:
+        """Return a string that identifies the current revision of the
+        link's mappings or None if the link has no mappings.
+
+        The revision changes whenever mappings are added, removed, or
+        have their ids, levels, or proportions changed. It is used to
+        check if composite links built from the link are up to date.
+
+        A concrete DAL should implement an optimized version of this
+        method. But as a stop-gap, this unoptimized base implementation
+        can be called with ``super().get_revision()``.
+        """
+        mappings = sorted(
+            (x.other_index_id, x.index_id, x.mapping_level, x.proportion)
+            for x in self.find(link_id=link_id)
+        )
+        if not mappings:
+            return None
+        return hashlib.sha256(repr(mappings).encode('utf-8')).hexdigest()
+
+    def get_proportion_arrays(self, link_id: int) -> ProportionArrays:
+        """Return a link's proportions as compressed sparse row (CSR)
+        arrays of ``(other_index_ids, offsets, index_ids, proportions)``.
+
+        The *other_index_ids* array contains the distinct ids that have
+        mappings (in ascending order). The mappings for the id at
+        position ``i`` are located at ``offsets[i]`` through
+        ``offsets[i + 1]`` in the *index_ids* and *proportions* arrays
+        (ordered by index_id and mapping_level). Use
+        ``get_proportion_slices()`` to look up the mappings for a
+        given ``other_index_id``.
+
+        If any of the link's proportions are undefined (NULL), a
+        ``ValueError`` is raised.
+
+        A concrete DAL should implement an optimized version of this
+        method. But as a stop-gap, this unoptimized base implementation
+        can be called with ``super().get_proportion_arrays()``.
+        """
+        mappings = sorted(
+            self.find(link_id=link_id),
+            key=lambda x: (x.other_index_id, x.index_id, x.mapping_level),
+        )
+
+        other_index_ids = array.array('q')
+        offsets = array.array('q', [0])
+        index_ids = array.array('q')
+        proportions = array.array('d')
+        for mapping in mappings:
+            if mapping.proportion is None:
+                raise ValueError(
+                    f'link {link_id} has mappings with undefined '
+                    f'proportions, proportions must be refreshed first'
+                )
+            if not other_index_ids or other_index_ids[-1] != mapping.other_index_id:
+                if other_index_ids:
+                    offsets.append(len(index_ids))
+                other_index_ids.append(mapping.other_index_id)
+            index_ids.append(mapping.index_id)
+            proportions.append(mapping.proportion)
+        if other_index_ids:
+            offsets.append(len(index_ids))
+
+        return (other_index_ids, offsets, index_ids, proportions)
+
 
 class BasePropertyRepository(ABC):
     @abstractmethod
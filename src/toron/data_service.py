@@ -1,9 +1,10 @@
 """Application logic functions that interact with repository objects."""
 
 import logging
-from collections import Counter
+from collections import Counter, defaultdict
+from dataclasses import replace
 from itertools import chain, compress, groupby
-from math import log2
+from math import isinf, isnan, log2
 
 import toron._datetime as datetime
 from toron._typing import (
@@ -23,8 +24,12 @@ from toron._typing import (
     Union,
     cast,
     TypeAlias,
+    TYPE_CHECKING,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 from .partitions import (
     make_structure,
     find_minimal_partition_generating_set,
@@ -58,10 +63,11 @@ from .formatters import (
 from .selectors import (
     parse_selector,
     get_greatest_unique_specificity,
+    CachedGreatestUniqueSpecificity,
 )
 from ._utils import (
     check_type,
-    SequenceHash,
+    ChunkedSequenceHash,
     ToronError,
     ToronWarning,
     BitFlags,
@@ -110,19 +116,458 @@ def validate_new_index_columns(
 def refresh_index_hash_property(
     index_repo: BaseIndexRepository,
     prop_repo: BasePropertyRepository,
+    optimizations: Optional[Dict[str, Callable]] = None,
 ) -> None:
     """Update 'index_hash' property to reflect current index_id values."""
-    sequence_hash = SequenceHash()
+    if optimizations and 'refresh_index_hash_property' in optimizations:
+        applogger.debug('using DAL optimized refresh_index_hash_property()')
+        optimizations['refresh_index_hash_property'](index_repo, prop_repo)
+        return  # <- EXIT!
+
+    chunked_hash = ChunkedSequenceHash()
     for index_id in index_repo.find_all_index_ids(ordered=True):
-        sequence_hash.add_value(index_id)
+        chunked_hash.add_value(index_id)
 
-    index_hash = sequence_hash.get_hexdigest()
+    index_hash = chunked_hash.get_hexdigest()
     try:
         prop_repo.add('index_hash', index_hash)
     except Exception:
         prop_repo.update('index_hash', index_hash)
 
 
+def get_other_index_hash(
+    link_id: int,
+    mapping_repo: BaseMappingRepository,
+    optimizations: Optional[Dict[str, Callable]] = None,
+) -> str:
+    """Return the 'other_index_hash' for the other_index_id values
+    currently used by the mappings of the given link.
+    """
+    if optimizations and 'get_other_index_hash' in optimizations:
+        applogger.debug('using DAL optimized get_other_index_hash()')
+        return optimizations['get_other_index_hash'](link_id, mapping_repo)  # <- EXIT!
+
+    other_index_ids = mapping_repo.find_distinct_other_index_ids(
+        link_id,
+        ordered=True,  # <- Must be ordered for `ChunkedSequenceHash`.
+    )
+    return ChunkedSequenceHash(other_index_ids).get_hexdigest()
+
+
+def get_index_frame(
+    index_repo: BaseIndexRepository,
+    optimizations: Optional[Dict[str, Callable]] = None,
+) -> 'pd.DataFrame':
+    """Return a pandas DataFrame of index records with an 'index_id'
+    column followed by the label columns.
+    """
+    if optimizations and 'get_index_frame' in optimizations:
+        applogger.debug('using DAL optimized get_index_frame()')
+        return optimizations['get_index_frame'](index_repo)  # <- EXIT!
+
+    import pandas as pd
+    columns = ['index_id'] + index_repo.get_label_names()
+    return pd.DataFrame.from_records(
+        ((x.id, *x.labels) for x in index_repo.find_all()),
+        columns=columns,
+    )
+
+
+def load_index_records(
+    data: Iterable[Sequence],
+    label_positions: Sequence[int],
+    index_id_position: Optional[int],
+    weight_positions: Dict[int, WeightGroup],
+    index_repo: BaseIndexRepository,
+    weight_repo: BaseWeightRepository,
+    on_label_conflict: Literal['abort', 'ignore', 'replace'] = 'abort',
+    on_weight_conflict: Literal['abort', 'ignore', 'replace'] = 'abort',
+) -> Dict[str, int]:
+    """Load index labels and weights from *data* rows and return a
+    counter of the actions taken.
+
+    Label values are taken from *label_positions* (given in the
+    node's label column order). If *index_id_position* is given,
+    rows with an ``index_id`` value are matched to existing records
+    by id--otherwise, new records are added (rows matching existing
+    labels are resolved to the existing record). The
+    *weight_positions* dict maps column positions to weight groups.
+    """
+    counter: Dict[str, int] = Counter()
+    for row in data:
+        # If empty, skip to next.
+        if not row:
+            continue
+
+        # Get label values by internal column order.
+        labels = tuple(row[pos] for pos in label_positions)
+
+        # If one or more labels are empty strings, skip to next.
+        if '' in labels:
+            counter['empty_labels'] += 1
+            continue
+
+        raw_index_id = '' if index_id_position is None else row[index_id_position]
+        if raw_index_id != '':
+            # Get existing index record by `id`.
+            index_id = int(raw_index_id)
+            index_record = index_repo.get(index_id)
+
+            if labels and labels != index_record.labels:
+                if on_label_conflict == 'abort':
+                    raise ValueError(
+                        f'index_id {index_id} and labels {labels!r} '
+                        f'do not match {index_record!r}'
+                    )
+                elif on_label_conflict == 'ignore':
+                    counter['label_ignored'] += 1
+                elif on_label_conflict == 'replace':
+                    index_repo.update(replace(index_record, labels=labels))
+                    counter['label_replaced'] += 1
+                else:
+                    raise ValueError(
+                        f"on_label_conflict must be 'abort', 'ignore', or "
+                        f"'replace'; got {on_label_conflict!r}"
+                    )
+        else:
+            try:
+                # Insert new index record.
+                index_id = index_repo.add(*labels)
+                counter['label_inserted'] += 1
+                index_record = index_repo.get(index_id)
+            except ValueError as val_err:
+                # Find index if it already exists.
+                criteria = dict(zip(index_repo.get_label_names(), labels))
+                filtered = index_repo.filter_by_label(criteria)
+                try:
+                    index_record = next(filtered)
+                except StopIteration:
+                    raise val_err
+                index_id = index_record.id
+
+        # Insert weight values.
+        for position, group in weight_positions.items():
+            weight_value = row[position]
+            if weight_value is None or weight_value == '':
+                continue  # Skip to next weight group.
+            else:
+                weight_value = float(weight_value)
+
+            if isnan(weight_value) or isinf(weight_value):
+                counter['not_realnum'] += 1
+                continue  # Skip to next weight group.
+
+            try:
+                weight_record = weight_repo.get_by_weight_group_id_and_index_id(
+                    weight_group_id=group.id, index_id=index_id
+                )
+                if on_weight_conflict == 'abort':
+                    raise ValueError(
+                        f'weight group {group.name!r} already has a '
+                        f'value for {index_record!r}'
+                    )
+                elif on_weight_conflict == 'ignore':
+                    counter['weight_ignored'] += 1
+                    continue  # Skip to next weight group.
+                elif on_weight_conflict == 'replace':
+                    weight_repo.update(replace(weight_record, value=weight_value))
+                    counter['weight_replaced'] += 1
+                else:
+                    raise ValueError(
+                        f"on_weight_conflict must be 'abort', 'ignore', or "
+                        f"'replace'; got {on_weight_conflict!r}"
+                    )
+
+            except KeyError:
+                weight_repo.add(
+                    weight_group_id=group.id,
+                    index_id=index_id,
+                    value=weight_value,
+                )
+                counter['weight_inserted'] += 1
+
+    return counter
+
+
+def load_weight_records(
+    data: Iterable[Sequence],
+    columns: Sequence[str],
+    value_column: str,
+    weight_group_id: int,
+    index_repo: BaseIndexRepository,
+    weight_repo: BaseWeightRepository,
+    on_conflict: Literal['abort', 'ignore', 'replace', 'sum'] = 'abort',
+) -> Dict[str, int]:
+    """Load weight values from *data* rows into the given weight
+    group and return a counter of the actions taken.
+
+    Rows are matched to index records by ``index_id`` (if given in
+    *columns*) or by their label values. Rows that cannot be loaded
+    are skipped and counted using the keys ``'not_realnum'``,
+    ``'no_index'``, ``'mismatch'``, ``'no_match'``, and
+    ``'undefined_record'``. The *index_repo* and *weight_repo* must
+    not share a cursor (records are looked up while weights are
+    being written).
+    """
+    label_columns = index_repo.get_label_names()
+    counter: Dict[str, int] = Counter()
+    current_row: Optional[Sequence] = None
+
+    def generate_weights():
+        nonlocal current_row
+        for row in data:
+            current_row = row
+            row_dict = dict(zip(columns, row))
+            weight_value = row_dict.pop(value_column)
+
+            if not isinstance(weight_value, float):
+                try:
+                    weight_value = float(weight_value)
+                except (ValueError, TypeError):
+                    counter['not_realnum'] += 1
+                    continue  # <- Skip to next item.
+
+            if isnan(weight_value) or isinf(weight_value):
+                counter['not_realnum'] += 1
+                continue  # <- Skip to next item.
+
+            if 'index_id' in row_dict:
+                try:
+                    index_record = index_repo.get(row_dict['index_id'])
+                except KeyError:
+                    counter['no_index'] += 1
+                    continue  # <- Skip to next item.
+
+                labels_dict = dict(zip(label_columns, index_record.labels))
+                if any(row_dict[k] != v for k, v in labels_dict.items()):
+                    counter['mismatch'] += 1
+                    continue  # <- Skip to next item.
+            else:
+                index_records = index_repo.filter_by_label(
+                    {k: v for k, v in row_dict.items() if k in label_columns}
+                )
+                try:
+                    index_record = next(index_records)
+                except StopIteration:
+                    counter['no_match'] += 1
+                    continue  # <- Skip to next item.
+
+            if index_record.id == 0:
+                counter['undefined_record'] += 1
+                continue  # <- Skip to next item.
+
+            yield (index_record.id, weight_value)
+
+    try:
+        counter.update(weight_repo.add_or_resolve_many(
+            weight_group_id=weight_group_id,
+            data=generate_weights(),
+            on_conflict=on_conflict,
+        ))
+    except Exception as err:
+        msg = f'{err}; this error occured on record: {current_row!r}'
+        raise Exception(msg)
+
+    return counter
+
+
+def load_quantity_records(
+    data: Iterable[Sequence],
+    columns: Sequence[str],
+    value_column: str,
+    attributes_to_load: Sequence[str],
+    domain: str,
+    index_repo: BaseIndexRepository,
+    location_repo: BaseLocationRepository,
+    attribute_repo: BaseAttributeGroupRepository,
+    quantity_repo: BaseQuantityRepository,
+    structure_repo: BaseStructureRepository,
+    allow_invalid_label: bool = False,
+    allow_invalid_partition: bool = False,
+    on_existing: Literal['abort', 'ignore', 'replace', 'sum'] = 'abort',
+) -> Dict[str, int]:
+    """Load quantity values from *data* rows and return a counter of
+    the actions taken.
+
+    Locations and attribute groups are added as needed. Rows with no
+    values for *attributes_to_load* are skipped and counted as
+    ``'no_attrs'``. Rows whose labels do not match a partition or an
+    index record raise a ValueError unless *allow_invalid_partition*
+    or *allow_invalid_label* is True (they are then loaded and counted
+    as ``'invalid_category'`` or ``'invalid_label'``).
+    """
+    label_names = location_repo.get_label_names()  # In storage order.
+    structure = {BitFlags(x.bits) for x in structure_repo.get_all()}
+    counter: Dict[str, int] = Counter()
+
+    for row in data:
+        row_dict = dict(zip(columns, row))
+
+        # If 'domain' is given, it must match `space.domain`.
+        if 'domain' in row_dict and row_dict['domain'] != domain:
+            raise ValueError(
+                f"domain must be {domain!r}, got: {row_dict['domain']!r}"
+            )
+
+        # Parse row into separate attribute and label dictionaries.
+        attr_dict = {k: row_dict[k] for k in attributes_to_load if row_dict[k]}
+        labels_dict = {k: row_dict[k] for k in label_names}
+
+        # Skip record if it has no attribute values.
+        if not attr_dict:
+            counter['no_attrs'] += 1
+            continue  # Skip to next row.
+
+        # Check for valid partition definitions.
+        bits = BitFlags(labels_dict.values())
+        if bits not in structure:
+            if allow_invalid_partition:
+                counter['invalid_category'] += 1
+            else:
+                # This error message can be user facing so it
+                # includes more context that it otherwise might.
+                formatted_names = ', '.join(
+                    repr(x) for x in compress(label_names, bits)
+                )
+                raise ValueError(
+                    f'no matching partition:\n'
+                    f'   names: {{{formatted_names}}}\n'
+                    f'  record: {list(labels_dict.values())!r}'
+                )
+
+        # Check for valid labels (DAL1 checks these with a single
+        # semi-join in its optimized version of this function).
+        criteria = {k: v for k, v in labels_dict.items() if v}
+        if not any(index_repo.filter_by_label(criteria)):
+            if allow_invalid_label:
+                counter['invalid_label'] += 1
+            else:
+                raise ValueError(
+                    f'invalid labels, not present in index:\n'
+                    f'  record: {list(criteria.values())!r}'
+                )
+
+        # Get `location` and `attribute_group` instances.
+        location = location_repo.get_by_labels_add_if_missing(labels_dict)
+        attribute_group = attribute_repo.get_by_value_add_if_missing(attr_dict)
+
+        try:
+            # Add new quantity record.
+            quantity_repo.add(
+                location_id=location.id,
+                attribute_group_id=attribute_group.id,
+                value=row_dict[value_column],
+            )
+            counter['inserted'] += 1
+        except Exception as err:  # <- Use `Exception` because different
+            try:                  #    backends could raise different types.
+                quantity = quantity_repo.get_by_location_id_and_attribute_group_id(
+                    location_id=location.id,
+                    attribute_group_id=attribute_group.id,
+                )
+            except KeyError:
+                # If we get a KeyError, then a duplicate quantity does
+                # not exist. This means that the original error was for
+                # some other reason.
+                raise err  # Re-raise original error.
+
+            if on_existing == 'abort':
+                raise ValueError(
+                    'data contains quantities for locations and '
+                    'attributes that have already been loaded; use '
+                    '--on-existing to change load behavior'
+                )
+            elif on_existing == 'ignore':
+                counter['existing_ignored'] += 1
+                continue  # Skip to next.
+            elif on_existing == 'replace':
+                quantity_repo.update(replace(quantity, value=row_dict[value_column]))
+                counter['existing_replaced'] += 1
+            elif on_existing == 'sum':
+                summed_value = quantity.value + float(row_dict[value_column])
+                quantity_repo.update(replace(quantity, value=summed_value))
+                counter['existing_summed'] += 1
+            else:
+                raise ValueError(
+                    f"--on-existing must be 'abort', 'ignore', "
+                    f"'replace', or 'sum'; got {on_existing!r}"
+                )
+
+    return counter
+
+
+def update_index_records(
+    data: Iterable[Sequence],
+    columns: Sequence[str],
+    index_repo: BaseIndexRepository,
+    weight_repo: BaseWeightRepository,
+    mapping_repo: BaseMappingRepository,
+    merge_on_conflict: bool = False,
+) -> Dict[str, int]:
+    """Update index records using the ``index_id`` and label values
+    in *data* rows and return a counter of the actions taken.
+
+    When a record's new labels match another existing record, a
+    ``ValueError`` is raised unless *merge_on_conflict* is True.
+    When merging, the weights and mappings of the matching record
+    are merged into the updated record and the matching record is
+    removed. Rows that cannot be applied are skipped and counted
+    using the keys ``'empty_str'`` and ``'no_index'``.
+    """
+    label_columns = index_repo.get_label_names()
+    counter: Dict[str, int] = Counter()
+
+    previously_merged = set()
+    for updated_values in data:
+        if '' in updated_values:
+            counter['empty_str'] += 1
+            continue  # <- Skip to next item.
+
+        # Make a dictionary of updated labels and get existing record.
+        updated_dict = dict(zip(columns, updated_values))
+        try:
+            index_record = index_repo.get(updated_dict['index_id'])
+        except KeyError:
+            if updated_dict['index_id'] not in previously_merged:
+                counter['no_index'] += 1
+                continue  # <- Skip to next item.
+
+            raise ValueError(
+                f"cannot update index_id {updated_dict['index_id']}, "
+                f"it was merged with another record on a previous "
+                f"row"
+            )
+
+        # Make a dictionary of existing labels and apply new labels.
+        label_dict = dict(zip(label_columns, index_record.labels))
+        for key in label_dict.keys():
+            label_dict[key] = updated_dict[key]
+
+        # Check for matching record, raise error or merge if exists.
+        matching = next(index_repo.filter_by_label(label_dict), None)
+        if matching:
+            if not merge_on_conflict:
+                raise ValueError(
+                    f"cannot update index_id {index_record.id}, new labels "
+                    f"conflict with the existing index_id {matching.id}.\n"
+                    f"\n"
+                    f"To merge these records use 'space.update_index(..., "
+                    f"merge_on_conflict=True)'."
+                )
+            weight_repo.merge_by_index_id(matching.id, index_record.id)
+            mapping_repo.merge_by_index_id(matching.id, index_record.id)
+            index_repo.delete(matching.id)
+            counter['merged'] += 1
+            previously_merged.add(matching.id)
+
+        # Assign updated label values and perform update action.
+        index_record.labels = tuple(label_dict.values())
+        index_repo.update(index_record)
+        counter['updated'] += 1
+
+    return counter
+
+
 def delete_index_record(
     index_id: int,
     index_repo: BaseIndexRepository,
@@ -139,7 +584,7 @@ def delete_index_record(
     # Remove associated mapping records.
     mappings = mapping_repo.find(index_id=index_id)
     fully_specified_level = bytes(BitFlags([1] * len(index_repo.get_label_names())))
-    other_index_ids = set()
+    affected_other_ids: Dict[int, Set[int]] = defaultdict(set)
     for mapping in list(mappings):
         if mapping.mapping_level != fully_specified_level:
             # For now, prevent index deletion when there
@@ -155,18 +600,40 @@ def delete_index_record(
                 f'links can be re-added.'
             )
 
-        other_index_ids.add(mapping.other_index_id)
+        affected_other_ids[mapping.link_id].add(mapping.other_index_id)
         mapping_repo.delete(mapping.id)
 
     # Rebuild proportions for remaining mappings.
-    for other_index_id in other_index_ids:
-        for link in link_repo.get_all():
-            mapping_repo.refresh_proportions(link.id, other_index_id)
+    for link_id, other_index_ids in affected_other_ids.items():
+        mapping_repo.refresh_proportions_for_link(link_id, other_index_ids)
 
     # Remove existing Index record.
     index_repo.delete(index_id)
 
 
+def delete_index_records(
+    index_ids: Iterable[int],
+    index_repo: BaseIndexRepository,
+    weight_repo: BaseWeightRepository,
+    link_repo: BaseLinkRepository,
+    mapping_repo: BaseMappingRepository,
+) -> Dict[str, int]:
+    """Delete index records and associated weights and mappings for
+    the given *index_ids* and return a counter of deleted records.
+    """
+    counter: Dict[str, int] = Counter()
+    for index_id in index_ids:
+        delete_index_record(
+            index_id,
+            index_repo,
+            weight_repo,
+            link_repo,
+            mapping_repo,
+        )
+        counter['deleted'] += 1
+    return counter
+
+
 def find_locations_without_index(
     location_repo: BaseLocationRepository,
     aux_index_repo: BaseIndexRepository,
@@ -498,6 +965,50 @@ def get_link(
     )
 
 
+def get_composite_hop(
+    other_unique_id: str,
+    other_index_hash: str,
+    link_repo: BaseLinkRepository,
+    mapping_repo: BaseMappingRepository,
+) -> List[Optional[str]]:
+    """Return a list that identifies one hop of a composite link path.
+
+    The list contains the unique_id and index_hash of the other node
+    followed by the name and mapping revision of the default link
+    that comes from it. When there is no default link, the name and
+    revision are None.
+    """
+    for link in link_repo.find_by_other_unique_id(other_unique_id):
+        if link.is_default:
+            revision = mapping_repo.get_revision(link.id)
+            return [other_unique_id, other_index_hash, link.name, revision]
+    return [other_unique_id, other_index_hash, None, None]
+
+
+def find_composite_link(
+    path: Sequence[Sequence[Optional[str]]],
+    link_repo: BaseLinkRepository,
+) -> Optional[Link]:
+    """Return the composite link built from the given *path* of hops
+    (see :func:`get_composite_hop`) or None if no current composite
+    link exists.
+
+    Composite links are made with :func:`toron.graph.compose_links`
+    and are tagged with the hops along their path. Each hop records
+    the unique_id and index_hash of the node it comes from and the
+    name and mapping revision of the default link that was used.
+    A composite link is only returned when all of these values match
+    *path*.
+    """
+    expected = [list(x) for x in path]
+    other_unique_id = check_type(expected[0][0], str)
+    for link in link_repo.find_by_other_unique_id(other_unique_id):
+        user_properties = link.user_properties or {}
+        if user_properties.get('composite_path') == expected:
+            return link
+    return None
+
+
 def make_get_link_id_func(
     ref: str,
     link_repo: BaseLinkRepository,
@@ -536,18 +1047,12 @@ def make_get_link_id_func(
     func = lambda selectors: [parse_selector(s) for s in selectors]
     selector_dict = {x.id: func(x.selectors) for x in links}
 
-    # Define function to match the link with the greatest unique
-    # specificity (closes over selector_dict and default_link_id).
-    def get_link_id_func(attributes: Dict[str, str]) -> int:
-        """Return link_id that matches with the greatest unique specificity."""
-        link_id = get_greatest_unique_specificity(
-            row_dict=attributes,
-            selector_dict=selector_dict,
-            default=default_link_id,
-        )
-        return link_id
-
-    return get_link_id_func
+    # Build a function to match the link with the greatest unique
+    # specificity (memoized on the distinct attribute sets).
+    return CachedGreatestUniqueSpecificity(
+        selector_dict=selector_dict,
+        default=default_link_id,
+    )
 
 
 MappingElement : TypeAlias = Union[
@@ -603,20 +1108,87 @@ def generate_mapping_elements(
 
     # If source index is different, yield unmatched left-side elements.
     if src_prop_repo.get('index_hash') != link.other_index_hash:
+        matched_other_ids = set(trg_mapping_repo.find_distinct_other_index_ids(link.id))
         for other_index_id in src_index_repo.find_all_index_ids():
             # In a mapping, an undefined record is always considered matched
             # to the other node's undefined record (can never be unmatched).
             if other_index_id == 0:
                 continue
 
-            matches = trg_mapping_repo.find(
-                link_id=link.id,
-                other_index_id=other_index_id,
-            )
-            if not any(matches):  # Yield only if unmatched.
+            if other_index_id not in matched_other_ids:  # Yield only if unmatched.
                 yield (other_index_id, None, None, None)
 
 
+MappingRow : TypeAlias = Tuple[
+    Optional[int],                   # <- Source index_id.
+    Optional[Tuple[str, ...]],       # <- Source labels.
+    Optional[float],                 # <- Mapping value.
+    Optional[int],                   # <- Target index_id.
+    Optional[Tuple[str, ...]],       # <- Target labels.
+    Optional[bytes],                 # <- Mapping level.
+]
+
+def generate_mapping_rows(
+    link_name: Optional[str],
+    trg_index_repo: BaseIndexRepository,
+    trg_link_repo: BaseLinkRepository,
+    trg_mapping_repo: BaseMappingRepository,
+    src_index_repo: BaseIndexRepository,
+    src_prop_repo: BasePropertyRepository,
+    aux_trg_index_repo: BaseIndexRepository,
+    aux_src_index_repo: BaseIndexRepository,
+) -> Generator[MappingRow, None, None]:
+    """Get mapping elements with the labels of their index records.
+
+    Elements are given in the same order as ``generate_mapping_elements()``.
+    When an element's index_id is None or when it refers to a record
+    that no longer exists, its labels are given as None.
+
+    The *aux_trg_index_repo* and *aux_src_index_repo* should use
+    cursors independent of the other repositories.
+    """
+    elements = generate_mapping_elements(
+        link_name=link_name,
+        trg_index_repo=trg_index_repo,
+        trg_link_repo=trg_link_repo,
+        trg_mapping_repo=trg_mapping_repo,
+        src_index_repo=src_index_repo,
+        src_prop_repo=src_prop_repo,
+    )
+
+    src_labels: Optional[Tuple[str, ...]]
+    trg_labels: Optional[Tuple[str, ...]]
+    for src_index_id, trg_index_id, mapping_level, value in elements:
+        src_labels = None
+        if src_index_id is not None:
+            try:
+                src_labels = aux_src_index_repo.get(src_index_id).labels
+            except KeyError:
+                pass  # Orphan reference (source index was deleted).
+
+        trg_labels = None
+        if trg_index_id is not None:
+            try:
+                trg_labels = aux_trg_index_repo.get(trg_index_id).labels
+            except KeyError:
+                pass
+
+        yield (src_index_id, src_labels, value, trg_index_id, trg_labels, mapping_level)
+
+
+def count_stale_other_index_ids(
+    link_id: int,
+    trg_mapping_repo: BaseMappingRepository,
+    src_index_repo: BaseIndexRepository,
+) -> int:
+    """Return the number of distinct 'other_index_id' values used by
+    the link's mappings that no longer exist in the source index.
+    """
+    src_index_ids = set(src_index_repo.find_all_index_ids())
+    other_index_ids = trg_mapping_repo.find_distinct_other_index_ids(link_id)
+    return sum(1 for x in other_index_ids if x not in src_index_ids)
+
+
 def set_default_weight_group(
     weight_group: Union[WeightGroup, None],
     property_repo: BasePropertyRepository,
@@ -647,6 +1219,30 @@ def get_default_weight_group(
     return weight_group_repo.get(weight_group_id)
 
 
+def generate_weight_rows(
+    weight_group_ids: Sequence[int],
+    index_repo: BaseIndexRepository,
+    weight_repo: BaseWeightRepository,
+) -> Generator[Tuple[Index, List[Optional[float]]], None, None]:
+    """Yield index records with a list of their weight values for
+    each of the given *weight_group_ids* (in the same order).
+
+    Missing weights are given as None except for the undefined record
+    (index_id 0) whose missing weights are given as 0.0.
+
+    The *index_repo* and *weight_repo* should use independent cursors.
+    """
+    get_weight = weight_repo.get_by_weight_group_id_and_index_id
+    for index in index_repo.find_all():
+        weight_vals: List[Optional[float]] = []
+        for weight_group_id in weight_group_ids:
+            try:
+                weight_vals.append(get_weight(weight_group_id, index.id).value)
+            except KeyError:
+                weight_vals.append(0.0 if index.id == 0 else None)
+        yield (index, weight_vals)
+
+
 def find_matching_weight_groups(
     attribute_repo: BaseAttributeGroupRepository,
     weight_group_repo: BaseWeightGroupRepository,
@@ -932,8 +1528,9 @@ def refresh_structure_granularity(
     optimizations: Optional[Dict[str, Callable]] = None
 ) -> None:
     # Get granularity function (use optimized version when available).
-    if optimizations and hasattr(optimizations, 'calculate_granularity'):
-        granularity_func = optimizations.calculate_granularity
+    if optimizations and 'calculate_granularity' in optimizations:
+        applogger.debug('using DAL optimized calculate_granularity()')
+        granularity_func = optimizations['calculate_granularity']
     else:
         granularity_func = calculate_granularity
 
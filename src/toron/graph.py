@@ -6,6 +6,8 @@ from json import (
     dumps as _dumps,
     loads as _loads,
 )
+from collections import defaultdict
+from functools import lru_cache
 from itertools import (
     compress,
     groupby,
@@ -42,10 +44,17 @@ from .data_models import (
     AttributesDict,
     QuantityIterator,
     Link,
+    BaseIndexRepository,
+    BaseMappingRepository,
+    ProportionArrays,
+    get_proportion_slices,
 )
 from .data_service import (
+    count_stale_other_index_ids,
     find_links_by_ref,
-    generate_mapping_elements,
+    generate_mapping_rows,
+    generate_weight_rows,
+    get_composite_hop,
     get_domain,
 )
 from .space import DataSpace
@@ -55,7 +64,7 @@ from .mapper import (
 )
 from .selectors import (
     parse_selector,
-    get_greatest_unique_specificity,
+    CachedGreatestUniqueSpecificity,
 )
 from ._xmapper import xMapper
 from .xnode import xNode
@@ -176,6 +185,9 @@ def _get_mapping_stats(
             msg = 'link does not match source node'
             raise Exception(msg)
 
+        # Get cached (or newly counted) stats for the link's mappings.
+        link_stats = trg_rel_repo.get_mapping_stats(link.id)
+
         # Get source-side counts. If the hashes match, we know that all
         # records are matched and these matches are good. If the hashes
         # don't match, we need to verify each 'other_index_id' to
@@ -188,16 +200,18 @@ def _get_mapping_stats(
         if link.other_index_hash == src_prop_repo.get('index_hash'):
             src_index_matched = src_cardinality
         else:
-            other_index_ids = trg_rel_repo.find_distinct_other_index_ids(
-                link.id,
-            )
-            for other_index_id in other_index_ids:
-                try:
-                    src_index_repo.get(other_index_id)
-                    src_index_matched += 1
-                except KeyError:
-                    src_index_stale += 1
+            # Count stale ids (use optimized version when available).
+            if 'count_stale_other_index_ids' in target_node._dal.optimizations:
+                count_stale = target_node._dal.optimizations['count_stale_other_index_ids']
+            else:
+                count_stale = count_stale_other_index_ids
 
+            src_index_stale = count_stale(
+                link_id=link.id,
+                trg_mapping_repo=trg_rel_repo,
+                src_index_repo=src_index_repo,
+            )
+            src_index_matched = link_stats['other_index_id_cardinality'] - src_index_stale
             src_index_missing = src_cardinality - src_index_matched
 
         # Get target-side counts. Note: There is no 'trg_index_stale'
@@ -206,7 +220,7 @@ def _get_mapping_stats(
         # mappings so if an index is deleted from the target node,
         # it should also be deleted from mappings in that node.
         trg_cardinality = trg_index_repo.get_cardinality()
-        trg_index_matched = trg_rel_repo.get_index_id_cardinality(link.id)
+        trg_index_matched = link_stats['index_id_cardinality']
         trg_index_missing = trg_cardinality - trg_index_matched
 
         return {
@@ -352,33 +366,6 @@ def load_mapping(
         )
 
 
-_MappingElementsTuple : TypeAlias = Union[
-    Tuple[int, int, Optional[bytes], float],  # <- Matched elements.
-    Tuple[None, int, None, None],  # <- Unmatched right-side elements.
-    Tuple[int, None, None, None],  # <- Unmatched left-side elements.
-]
-
-def _get_mapping_elements(
-    source_node: DataSpace,
-    target_node: DataSpace,
-    link_name: Optional[str] = None,
-) -> Generator[_MappingElementsTuple, None, None]:
-    """See ``data_service.generate_mapping_elements()`` for details."""
-    with source_node._managed_cursor() as src_cur, \
-            target_node._managed_cursor() as trg_cur:
-
-        generator = generate_mapping_elements(
-            link_name=link_name,
-            trg_index_repo=target_node._dal.IndexRepository(trg_cur),
-            trg_link_repo=target_node._dal.LinkRepository(trg_cur),
-            trg_mapping_repo=target_node._dal.MappingRepository(trg_cur),
-            src_index_repo=source_node._dal.IndexRepository(src_cur),
-            src_prop_repo=source_node._dal.PropertyRepository(src_cur),
-        )
-        for result in generator:
-            yield result
-
-
 def _get_ambiguous_fields(
     mapping_level: Optional[bytes], column_names: Sequence[str]
 ) -> Optional[str]:
@@ -443,16 +430,8 @@ def get_mapping(
     trg_domain_keys = tuple(trg_domain.keys())
     trg_domain_vals = tuple(trg_domain.values())
 
-    mapping_elements = _get_mapping_elements(
-        source_node=source_node,
-        target_node=target_node,
-        link_name=link_name,
-    )
-
-    with source_node._managed_cursor() as src_cur, \
-            target_node._managed_cursor() as trg_cur:
-        src_index_repo = source_node._dal.IndexRepository(src_cur)
-        trg_index_repo = target_node._dal.IndexRepository(trg_cur)
+    with source_node._managed_cursor(n=2) as (src_cur, aux_src_cur), \
+            target_node._managed_cursor(n=2) as (trg_cur, aux_trg_cur):
 
         if header:
             yield (
@@ -466,46 +445,52 @@ def get_mapping(
                 + ('ambiguous_fields',)
             )
 
+        # Get mapping rows (use optimized version when available).
+        if 'generate_mapping_rows' in target_node._dal.optimizations:
+            generate_rows = target_node._dal.optimizations['generate_mapping_rows']
+        else:
+            generate_rows = generate_mapping_rows
+
+        mapping_rows = generate_rows(
+            link_name=link_name,
+            trg_index_repo=target_node._dal.IndexRepository(trg_cur),
+            trg_link_repo=target_node._dal.LinkRepository(trg_cur),
+            trg_mapping_repo=target_node._dal.MappingRepository(trg_cur),
+            src_index_repo=source_node._dal.IndexRepository(src_cur),
+            src_prop_repo=source_node._dal.PropertyRepository(src_cur),
+            aux_trg_index_repo=target_node._dal.IndexRepository(aux_trg_cur),
+            aux_src_index_repo=source_node._dal.IndexRepository(aux_src_cur),
+        )
+
+        src_no_labels = (None,) * len(src_index_cols)
+        trg_no_labels = (None,) * len(trg_index_cols)
+
         src_domain_output: Tuple[Optional[str], ...]
         trg_domain_output: Tuple[Optional[str], ...]
-        src_index_labels: Tuple[Optional[str], ...]
-        trg_index_labels: Tuple[Optional[str], ...]
 
-        for element in mapping_elements:
-            src_index_id, trg_index_id, mapping_level, rel_value = element
+        for row in mapping_rows:
+            (src_index_id, src_labels, rel_value,
+             trg_index_id, trg_labels, mapping_level) = row
 
-            # Set domain output and get source node labels.
+            # Set domain output for source and target nodes.
             if src_index_id is not None:
                 src_domain_output = src_domain_vals
-                try:
-                    src_index = src_index_repo.get(src_index_id)
-                    src_index_labels = src_index.labels
-                except KeyError:
-                    src_index_labels = (None,) * len(src_index_cols)
             else:
                 src_domain_output = (None,) * len(src_domain_vals)
-                src_index_labels = (None,) * len(src_index_cols)
 
-            # Set domain output and get target node labels.
             if trg_index_id is not None:
                 trg_domain_output = trg_domain_vals
-                try:
-                    trg_index = trg_index_repo.get(trg_index_id)
-                    trg_index_labels = trg_index.labels
-                except KeyError:
-                    trg_index_labels = (None,) * len(trg_index_cols)
             else:
                 trg_domain_output = (None,) * len(trg_domain_vals)
-                trg_index_labels = (None,) * len(trg_index_cols)
 
             yield (
                 (src_index_id,)
                 + src_domain_output
-                + src_index_labels
+                + (src_labels or src_no_labels)
                 + (rel_value,)
                 + (trg_index_id,)
                 + trg_domain_output
-                + trg_index_labels
+                + (trg_labels or trg_no_labels)
                 + (_get_ambiguous_fields(mapping_level, trg_index_cols),)
             )
 
@@ -607,24 +592,53 @@ def get_weights(
             group_names = [grp.name for grp in groups]
             yield ['index_id'] + domain_keys + list(label_columns) + group_names
 
-        # Assign shorter func name (also reduces dot lookups).
-        get_weight = weight_repo.get_by_weight_group_id_and_index_id
+        if 'generate_weight_rows' in node._dal.optimizations:
+            generate_rows = node._dal.optimizations['generate_weight_rows']
+        else:
+            generate_rows = generate_weight_rows
 
         # Make and yield record rows.
-        for index in index_repo.find_all():
-            weight_vals: List[Optional[float]] = []
-            for group in groups:
-                try:
-                    weight_value = get_weight(group.id, index.id).value
-                except KeyError:
-                    if index.id == 0:
-                        weight_value = 0.0
-                    else:
-                        weight_value = None
+        weight_rows = generate_rows(
+            weight_group_ids=[grp.id for grp in groups],
+            index_repo=index_repo,
+            weight_repo=weight_repo,
+        )
+        for index, weight_vals in weight_rows:
+            yield [index.id] + domain_vals + list(index.labels) + weight_vals
 
-                weight_vals.append(weight_value)
 
-            yield [index.id] + domain_vals + list(index.labels) + weight_vals
+class _TranslationContext(object):
+    """Cache mappings and target index records used when translating
+    quantities to the index of a node.
+
+    Mappings are loaded lazily--once per distinct link--as compressed
+    sparse row (CSR) arrays of target ``index_id`` values and
+    proportions. Target :class:`Index` records are retrieved through
+    a bounded LRU cache.
+    """
+    label_cache_size: int = 4096
+
+    def __init__(
+        self,
+        mapping_repo: BaseMappingRepository,
+        index_repo: BaseIndexRepository,
+    ) -> None:
+        self._mapping_repo = mapping_repo
+        self._mappings: Dict[int, ProportionArrays] = {}
+        self.get_index = lru_cache(maxsize=self.label_cache_size)(index_repo.get)
+
+    def get_mappings(
+        self, link_id: int, other_index_id: int
+    ) -> Iterator[Tuple[int, float]]:
+        """Return an iterator of ``(index_id, proportion)`` pairs for
+        the given *link_id* and *other_index_id*.
+        """
+        arrays = self._mappings.get(link_id)
+        if arrays is None:
+            arrays = self._mapping_repo.get_proportion_arrays(link_id)
+            self._mappings[link_id] = arrays
+
+        return zip(*get_proportion_slices(arrays, other_index_id))
 
 
 def _translate(
@@ -633,8 +647,12 @@ def _translate(
     """Generator to yield index, attribute, and quantity tuples."""
     with node._managed_cursor() as cursor:
         link_repo = node._dal.LinkRepository(cursor)
-        mapping_repo = node._dal.MappingRepository(cursor)
-        index_repo = node._dal.IndexRepository(cursor)
+        context = _TranslationContext(
+            mapping_repo=node._dal.MappingRepository(cursor),
+            index_repo=node._dal.IndexRepository(cursor),
+        )
+        get_mappings = context.get_mappings  # Assign locally to reduce dot-lookups.
+        get_index = context.get_index
 
         # Get all links.
         links: List = find_links_by_ref(
@@ -662,31 +680,30 @@ def _translate(
         func = lambda selectors: [parse_selector(s) for s in selectors]
         selector_dict = {x.id: func(x.selectors) for x in links}
 
+        # Build function to find the link that matches with greatest
+        # unique specificity (memoized on distinct attribute sets).
+        get_link_id = CachedGreatestUniqueSpecificity(
+            selector_dict=selector_dict,
+            default=default_link_id,
+        )
+
         for index, attributes, quantity_value in quantity_iterator.data:
             if quantity_value is None:
                 continue  # Skip to next record.
 
-            # Find link that matches with greated unique specificity.
-            link_id = get_greatest_unique_specificity(
-                row_dict=attributes,
-                selector_dict=selector_dict,
-                default=default_link_id,
-            )
+            link_id = get_link_id(attributes)
 
-            # Get mappings for matching link and other_index_id
-            # (assign as a tuple to consume the iterator and free-up
-            # the underlying cursor obj for the following yield-loop).
-            mappings = tuple(mapping_repo.find(
-                link_id=link_id,
-                other_index_id=index.id,
-            ))
+            # Yield translated results for each mapping (mappings are
+            # cached by the context so that each link and other_index_id
+            # pair is only queried once).
+            for index_id, proportion in get_mappings(link_id, index.id):
+                yield (get_index(index_id), attributes, quantity_value * proportion)
 
-            # Yield translated results for each mapping.
-            for mapping in mappings:
-                new_proportion = check_type(mapping.proportion, float)
-                new_index = index_repo.get(mapping.index_id)
-                new_quantity_value = quantity_value * new_proportion
-                yield (new_index, attributes, new_quantity_value)
+        cache_info = get_link_id.cache_info()
+        applogger.debug(
+            f'link selection cache: {cache_info.hits} hits, '
+            f'{cache_info.misses} misses'
+        )
 
 
 def translate(
@@ -710,6 +727,183 @@ def translate(
     return new_quantity_iter
 
 
+def _get_index_hash(node: DataSpace) -> str:
+    """Return the current 'index_hash' property of *node*."""
+    with node._managed_cursor() as cursor:
+        property_repo = node._dal.PropertyRepository(cursor)
+        return check_type(property_repo.get('index_hash'), str)
+
+
+def _get_composable_link(
+    node: DataSpace, other: DataSpace, other_index_hash: str
+) -> Link:
+    """Return the default link in *node* that comes from *other*
+    after verifying that it can be used to compose a multi-hop link.
+    """
+    with node._managed_cursor() as cursor:
+        link_repo = node._dal.LinkRepository(cursor)
+        links = list(link_repo.find_by_other_unique_id(other.unique_id))
+
+    for link in links:
+        if link.is_default:
+            break
+    else:  # IF NO BREAK!
+        msg = f'no default link found from {other} to {node}'
+        raise RuntimeError(msg)
+
+    if link.other_index_hash != other_index_hash \
+            or not link.is_locally_complete:
+        msg = f'default link {link.name!r} is not complete'
+        raise RuntimeError(msg)
+
+    if any(x.selectors for x in links):
+        msg = (
+            f'cannot compose links from {other} to {node}, links with '
+            f'attribute selectors are not supported'
+        )
+        raise ValueError(msg)
+
+    return link
+
+
+def _coarsest_level(
+    level1: Optional[bytes], level2: Optional[bytes]
+) -> Optional[bytes]:
+    """Return the mapping level with the fewest bits set."""
+    if level1 is None or level2 is None:
+        return None
+    if sum(BitFlags(level2)) < sum(BitFlags(level1)):
+        return level2
+    return level1
+
+
+def compose_links(*nodes: DataSpace, link_name: Optional[str] = None) -> None:
+    """Build a composite link between the first and last of the given
+    *nodes* by multiplying the proportions of the default links along
+    the path (a sparse matrix product).
+
+    .. code-block:: python
+
+        >>> compose_links(node_a, node_b, node_c)
+
+    The composite link is stored in the last node and is tagged with
+    the unique_id and index_hash of each preceding node and with the
+    name and mapping revision of each default link along the path so
+    that it can be used to translate data from the first node in a
+    single hop. If a composite link with the same name already exists,
+    it is rebuilt when any of the nodes or links along its path have
+    changed.
+
+    Composite links are not used for translations that quantize any
+    hop before the last one--rounding intermediate results to whole
+    numbers cannot be reproduced by a single multi-hop link.
+    """
+    if len(nodes) < 3:
+        raise ValueError('must provide at least three nodes to compose links')
+
+    source, target = nodes[0], nodes[-1]
+    link_name = link_name or 'composite'
+
+    # Verify links and build the path of hops used to tag the composite.
+    links = []
+    composite_path = []
+    for other, node in zip(nodes[:-1], nodes[1:]):
+        other_index_hash = _get_index_hash(other)
+        links.append(_get_composable_link(node, other, other_index_hash))
+        with node._managed_cursor() as cursor:
+            composite_path.append(get_composite_hop(
+                other_unique_id=other.unique_id,
+                other_index_hash=other_index_hash,
+                link_repo=node._dal.LinkRepository(cursor),
+                mapping_repo=node._dal.MappingRepository(cursor),
+            ))
+
+    # Check for an existing composite link with the same name.
+    with target._managed_cursor() as cursor:
+        link_repo = target._dal.LinkRepository(cursor)
+        for link in link_repo.find_by_other_unique_id(source.unique_id):
+            if link.name != link_name:
+                continue  # <- Skip to next item.
+
+            user_properties = link.user_properties or {}
+            if user_properties.get('composite_path') == composite_path:
+                applogger.info(f'composite link {link_name!r} is up to date')
+                return  # <- EXIT!
+
+            if 'composite_path' in user_properties:
+                applogger.info(f'rebuilding composite link {link_name!r}')
+                target.drop_link(source, link_name)
+            break
+
+    # Start with an identity table for the first node and multiply by
+    # each link's proportions. The `composite` dict maps each source
+    # index_id to a dict of `{index_id: (proportion, level)}` items for
+    # the current node along the path.
+    composite: Dict[int, Dict[int, Tuple[float, Optional[bytes]]]] = {}
+    for pos, (node, link) in enumerate(zip(nodes[1:], links)):
+        # Load proportions grouped by other_index_id.
+        table: Dict[int, List[Tuple[int, float, Optional[bytes]]]] = defaultdict(list)
+        with node._managed_cursor() as cursor:
+            for mapping in node._dal.MappingRepository(cursor).find(link_id=link.id):
+                table[mapping.other_index_id].append((
+                    mapping.index_id,
+                    check_type(mapping.proportion, float),
+                    mapping.mapping_level,
+                ))
+
+        if pos == 0:
+            composite = {k: {k: (1.0, None)} for k in table}
+
+        # Undefined records that have no mapping remain undefined.
+        undefined: List[Tuple[int, float, Optional[bytes]]] = \
+            [(0, 1.0, bytes(BitFlags([True] * len(node.index_columns))))]
+
+        # Index_ids reached by several mappings (from several other
+        # index_ids or at several levels) are accumulated.
+        new_composite = {}
+        for source_id, row in composite.items():
+            new_row: Dict[int, Tuple[float, Optional[bytes]]] = {}
+            for other_index_id, (proportion1, _) in row.items():
+                targets = table.get(other_index_id)
+                if not targets:
+                    if other_index_id != 0:
+                        continue  # <- Skip to next item.
+                    targets = undefined
+
+                for index_id, proportion2, level in targets:
+                    if index_id in new_row:
+                        old_proportion, old_level = new_row[index_id]
+                        level = _coarsest_level(old_level, level)
+                    else:
+                        old_proportion = 0.0
+                    new_row[index_id] = (old_proportion + proportion1 * proportion2, level)
+            new_composite[source_id] = new_row
+        composite = new_composite
+
+    # Store composite as a new link in the target node.
+    source_filename_hint, _ = normalize_filename_hints(
+        source.path_hint,
+        target.path_hint,
+    )
+    target.add_link(
+        space=source,
+        link_name=link_name,
+        other_filename_hint=source_filename_hint,
+        description=f'Composite of {len(nodes) - 1} links.',
+        user_properties={'composite_path': composite_path},
+    )
+    target.insert_mappings2(
+        space_or_ref=source,
+        link_name=link_name,
+        data=(
+            (other_index_id, index_id, level, proportion)
+            for other_index_id, row in sorted(composite.items())
+            for index_id, (proportion, level) in sorted(row.items())
+        ),
+        columns=['other_index_id', 'index_id', 'mapping_level', link_name],
+    )
+
+
 def xadd_edge(
     data : TabularData,
     name : str,
@@ -10,6 +10,7 @@ from json import (
     dumps,
     loads,
 )
+from time import perf_counter
 from itertools import (
     compress,
     islice,
@@ -61,6 +62,8 @@ def get_mapping_value_position(
 
 class Mapper(object):
     """A class to build mapping records between two nodes."""
+    chunk_size: int = 5000  # Number of rows loaded per executemany() call.
+
     def __init__(
         self,
         node1: 'DataSpace',
@@ -126,43 +129,69 @@ class Mapper(object):
                 );
             """)
 
-            # Structure bits are determined by a node's partition definitions.
-            node1_allowed_bytes = {bytes(BitFlags(s.bits)) for s in self.node1_structure}
-            node2_allowed_bytes = {bytes(BitFlags(s.bits)) for s in self.node2_structure}
-
-            for row in data:
-                # Unpack row values.
-                node1_index_id, node1_location, node1_bitflags, \
-                node2_index_id, node2_location, node2_bitflags, mapping_value = row
-
-                node1_level = bytes(node1_bitflags)
-                node2_level = bytes(node2_bitflags)
-
-                if node1_level not in node1_allowed_bytes:
-                    bad_definition = compress(self.node1.index_columns, node1_bitflags)
-                    raise RuntimeError(
-                        f'FILE1 has no partition definition {tuple(bad_definition)}; '
-                        f'cannot load values {node1_location!r}'
-                    )
-
-                if node2_level not in node2_allowed_bytes:
-                    bad_definition = compress(self.node2.index_columns, node2_bitflags)
-                    raise RuntimeError(
-                        f'FILE2 has no partition definition {tuple(bad_definition)}; '
-                        f'cannot load values {node2_location!r}'
-                    )
+            # Load data in fixed-size chunks (holds one chunk at a time).
+            start_time = perf_counter()
+            row_count = 0
+            sql = 'INSERT INTO mapping_source VALUES (NULL, ?, ?, ?, ?, ?, ?, ?)'
+            for chunk in self._generate_source_chunks(data):
+                cur.executemany(sql, chunk)
+                row_count += len(chunk)
+            elapsed = perf_counter() - start_time
+
+        applogger.debug(
+            f'loaded {row_count} mapping source rows in {elapsed:.2f} '
+            f'seconds ({row_count / (elapsed or 1e-9):.0f} rows/sec)'
+        )
+
+    def _generate_source_chunks(
+        self, data: Iterable[Sequence]
+    ) -> Generator[List[Tuple], None, None]:
+        """Validate *data* and yield lists of 'mapping_source' rows.
+
+        Each list contains up to ``self.chunk_size`` rows.
+        """
+        # Structure bits are determined by a node's partition definitions.
+        node1_allowed_bytes = {bytes(BitFlags(s.bits)) for s in self.node1_structure}
+        node2_allowed_bytes = {bytes(BitFlags(s.bits)) for s in self.node2_structure}
+
+        chunk = []
+        for row in data:
+            # Unpack row values.
+            node1_index_id, node1_location, node1_bitflags, \
+            node2_index_id, node2_location, node2_bitflags, mapping_value = row
+
+            node1_level = bytes(node1_bitflags)
+            node2_level = bytes(node2_bitflags)
+
+            if node1_level not in node1_allowed_bytes:
+                bad_definition = compress(self.node1.index_columns, node1_bitflags)
+                raise RuntimeError(
+                    f'FILE1 has no partition definition {tuple(bad_definition)}; '
+                    f'cannot load values {node1_location!r}'
+                )
 
-                sql = 'INSERT INTO mapping_source VALUES (NULL, ?, ?, ?, ?, ?, ?, ?)'
-                parameters = (
-                    node1_index_id,
-                    dumps(node1_location),
-                    node1_level,
-                    node2_index_id,
-                    dumps(node2_location),
-                    node2_level,
-                    mapping_value,
+            if node2_level not in node2_allowed_bytes:
+                bad_definition = compress(self.node2.index_columns, node2_bitflags)
+                raise RuntimeError(
+                    f'FILE2 has no partition definition {tuple(bad_definition)}; '
+                    f'cannot load values {node2_location!r}'
                 )
-                cur.execute(sql, parameters)
+
+            chunk.append((
+                node1_index_id,
+                dumps(node1_location),
+                node1_level,
+                node2_index_id,
+                dumps(node2_location),
+                node2_level,
+                mapping_value,
+            ))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
 
     @staticmethod
     def _refresh_proportions(
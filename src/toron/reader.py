@@ -33,8 +33,16 @@ from toron._typing import (
     overload,
     TYPE_CHECKING,
 )
-from toron.data_models import Index
-from toron.data_service import make_get_link_id_func
+from toron.data_models import (
+    Index,
+    ProportionArrays,
+    get_proportion_slices,
+)
+from toron.data_service import (
+    find_composite_link,
+    get_composite_hop,
+    make_get_link_id_func,
+)
 from toron._utils import (
     check_type,
     eagerly_initialize,
@@ -53,6 +61,7 @@ class NodeReader(object):
     _in_memory_connection: Optional[sqlite3.Connection]
     _index_columns: List[str]
     _attr_keys: List[str]
+    _pending_translations: List[Tuple['DataSpace', bool]]
     close: weakref.finalize
 
     def __init__(
@@ -136,6 +145,7 @@ class NodeReader(object):
         self._node = node
         self._index_columns = node.index_columns
         self._attr_keys = sorted(attr_keys)
+        self._pending_translations = []
 
         # Assign `close()` method (gets a callable finalizer object).
         self.close = weakref.finalize(self, self._finalizer)
@@ -172,11 +182,13 @@ class NodeReader(object):
     @property
     def index_columns(self) -> List[str]:
         """The index (row labels) of the NodeReader."""
+        self._apply_pending_translations()
         return list(self._index_columns)
 
     @property
     def columns(self) -> List[str]:
         """All column labels of the NodeReader."""
+        self._apply_pending_translations()
         return self._index_columns + self._attr_keys + ['value']
 
     def to_pandas(self, index: bool = False) -> 'pd.DataFrame':
@@ -209,6 +221,7 @@ class NodeReader(object):
         try:
             return next(self._data)  # type: ignore [arg-type]
         except TypeError:
+            self._apply_pending_translations()
             self._data = self._generate_reader_output()
             return next(self._data)
 
@@ -277,20 +290,87 @@ class NodeReader(object):
         if quantize is None:
             quantize = self.quantize_default
 
+        self._apply_pending_translations()
+        self._translate(node, quantize)
+
+    @staticmethod
+    def _get_index_hash(node: 'DataSpace') -> str:
+        """Return the current 'index_hash' property of *node*."""
+        with node._managed_cursor() as node_cur:
+            property_repo = node._dal.PropertyRepository(node_cur)
+            return check_type(property_repo.get('index_hash'), str)
+
+    def _apply_pending_translations(self) -> None:
+        """Apply translations that were deferred by ``>>`` operations.
+
+        When several translations are pending, look for a composite
+        link (see :func:`toron.graph.compose_links`) that spans as
+        many of them as possible and use it to translate the data
+        in a single hop. Composite links are not used when any hop
+        before the last one is quantized.
+        """
+        pending = self._pending_translations
+        while pending:
+            # Build path of hops leading into each pending node.
+            path = []
+            other = self._node
+            for node, _ in pending:
+                with node._managed_cursor() as node_cur:
+                    path.append(get_composite_hop(
+                        other_unique_id=other.unique_id,
+                        other_index_hash=self._get_index_hash(other),
+                        link_repo=node._dal.LinkRepository(node_cur),
+                        mapping_repo=node._dal.MappingRepository(node_cur),
+                    ))
+                other = node
+
+            # Check for composite links, starting with the longest path.
+            for stop in range(len(pending), 1, -1):
+                if any(quantize for _, quantize in pending[:stop - 1]):
+                    continue  # <- Skip to next item.
+
+                target, quantize = pending[stop - 1]
+                with target._managed_cursor() as node_cur:
+                    link = find_composite_link(
+                        path=path[:stop],
+                        link_repo=target._dal.LinkRepository(node_cur),
+                    )
+                if link:
+                    self._translate(target, quantize, link_id=link.id)
+                    del pending[:stop]
+                    break
+            else:  # IF NO BREAK!
+                target, quantize = pending.pop(0)
+                self._translate(target, quantize)
+
+    def _translate(
+        self,
+        node: 'DataSpace',
+        quantize: bool,
+        link_id: Optional[int] = None,
+    ) -> None:
+        """Translate "quant_data" table to use the index of *node*. If
+        *link_id* is given, it is used for all records instead of the
+        link selected by attributes.
+        """
         # Get `old_index_hash` from source node.
-        with self._node._managed_cursor() as node_cur:
-            property_repo = self._node._dal.PropertyRepository(node_cur)
-            old_index_hash = check_type(property_repo.get('index_hash'), str)
+        old_index_hash = self._get_index_hash(self._node)
 
         # Translate "quant_data" table to use the index of the new *node*.
         with node._managed_cursor() as node_cur:
             mapping_repo = node._dal.MappingRepository(node_cur)
-
-            get_link_id = make_get_link_id_func(
-                ref=self._node.unique_id,
-                link_repo=node._dal.LinkRepository(node_cur),
-                other_index_hash=old_index_hash,
-            )
+            link_arrays: Dict[int, ProportionArrays] = {}  # CSR arrays by link_id.
+
+            get_link_id: Callable[[Dict[str, str]], int]
+            if link_id is None:
+                get_link_id = make_get_link_id_func(
+                    ref=self._node.unique_id,
+                    link_repo=node._dal.LinkRepository(node_cur),
+                    other_index_hash=old_index_hash,
+                )
+            else:
+                fixed_link_id = link_id  # Assign separately, `link_id` is reused below.
+                get_link_id = lambda attributes: fixed_link_id
 
             with self._managed_connection() as con:
                 cur1 = con.cursor()
@@ -330,13 +410,12 @@ class NodeReader(object):
                             continue  # Skip to next record.
 
                         # All other quantities are translated using mappings.
-                        rels = mapping_repo.find(
-                            link_id=link_id,
-                            other_index_id=index_id,
-                        )
-
-                        items = ((rel.index_id, quant_value * rel.proportion)
-                                 for rel in rels)
+                        arrays = link_arrays.get(link_id)
+                        if arrays is None:
+                            arrays = mapping_repo.get_proportion_arrays(link_id)
+                            link_arrays[link_id] = arrays
+                        index_ids, proportions = get_proportion_slices(arrays, index_id)
+                        items = ((x, quant_value * y) for x, y in zip(index_ids, proportions))
 
                         if quantize:
                             items = quantize_values(items, quant_value)
@@ -354,8 +433,13 @@ class NodeReader(object):
         self._index_columns = node.index_columns
 
     def __rshift__(self, other: 'DataSpace') -> 'NodeReader':
-        """Translate quantities to the index of the *other* node."""
-        self.translate(other, quantize=self.quantize_default)
+        """Translate quantities to the index of the *other* node.
+
+        The translation is deferred until the data is accessed so that
+        chained operations (``reader >> node_b >> node_c``) can use a
+        composite link when one is available.
+        """
+        self._pending_translations.append((other, self.quantize_default))
         return self
 
 
@@ -412,6 +496,7 @@ def pivot_reader(
         raise ValueError(msg)
 
     columns = list(columns)
+    reader._apply_pending_translations()
 
     with reader._managed_connection() as con:
         cur1 = con.cursor()
@@ -1,12 +1,15 @@
 """Handling for attribute selectors (using CSS-inspired syntax)."""
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from itertools import groupby
 from json import loads, JSONDecodeError
 from ._typing import (
     Any,
     AnyStr,
     Dict,
+    FrozenSet,
+    Generic,
     Hashable,
     Iterable,
     List,
@@ -684,3 +687,55 @@ class GetMatchingKey(object):
             return hash(self) == hash(other)
         except TypeError:
             return False
+
+
+class CachedGreatestUniqueSpecificity(Generic[_KeyT]):
+    """Makes a memoized function that returns the *selector_dict* key
+    with the greatest unique specificity for a given dictionary row.
+
+    Results are cached using a canonical, hashable form of the row
+    (a frozenset of its items) so that repeated attribute dictionaries
+    only evaluate the selectors once::
+
+        >>> get_key = CachedGreatestUniqueSpecificity(
+        ...     selector_dict={
+        ...         1: [SimpleSelector('A', '=', 'xxx')],
+        ...         2: [SimpleSelector('B', '=', 'yyy')],
+        ...     },
+        ...     default=1,
+        ... )
+        >>> get_key({'B': 'yyy'})
+        2
+        >>> get_key({'B': 'yyy'})
+        2
+        >>> get_key.cache_info()
+        CacheInfo(hits=1, misses=1, maxsize=1024, currsize=1)
+
+    The cache is bounded by *maxsize* and least-recently-used entries
+    are discarded first.
+    """
+    def __init__(
+        self,
+        selector_dict: Mapping[_KeyT, Optional[Iterable[SelectorBase]]],
+        default: _KeyT,
+        maxsize: int = 1024,
+    ) -> None:
+        self._selector_dict = selector_dict
+        self._default = default
+        self._get_key = lru_cache(maxsize=maxsize)(self._get_key_uncached)
+
+    def _get_key_uncached(self, items: FrozenSet[Tuple[str, str]]) -> _KeyT:
+        return get_greatest_unique_specificity(
+            row_dict=dict(items),
+            selector_dict=self._selector_dict,
+            default=self._default,
+        )
+
+    def __call__(self, row_dict: Mapping[str, str]) -> _KeyT:
+        return self._get_key(frozenset(row_dict.items()))
+
+    def cache_info(self) -> Any:
+        """Return a named tuple with ``hits``, ``misses``, ``maxsize``,
+        and ``currsize`` values for the underlying cache.
+        """
+        return self._get_key.cache_info()
@@ -5,13 +5,13 @@ import os
 from collections import Counter, defaultdict
 from contextlib import contextmanager, nullcontext
 from dataclasses import replace
-from itertools import chain, compress, groupby
+from itertools import chain, compress, groupby, islice
 from logging import getLogger
-from math import isnan, isinf
 from pprint import pformat
 
 from toron._typing import (
     Any,
+    Callable,
     Collection,
     Dict,
     Generator,
@@ -26,6 +26,7 @@ from toron._typing import (
     Tuple,
     Union,
     overload,
+    TYPE_CHECKING,
 )
 
 from . import data_access
@@ -47,7 +48,13 @@ from .data_models import (
 from .data_service import (
     validate_new_index_columns,
     refresh_index_hash_property,
-    delete_index_record,
+    get_index_frame,
+    get_other_index_hash,
+    load_index_records,
+    load_weight_records,
+    load_quantity_records,
+    update_index_records,
+    delete_index_records,
     find_locations_without_index,
     find_locations_without_quantity,
     find_nonmatching_locations,
@@ -90,10 +97,14 @@ from ._utils import (
     ToronWarning,
     normalize_tabular,
     verify_columns_set,
+    ChunkedSequenceHash,
     SequenceHash,
     quantize_values,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 applogger = getLogger(f'app-{__name__}')
 
@@ -147,6 +158,35 @@ def warn_if_issues(
     )
 
 
+def get_mapping_positions(columns: Sequence[str]) -> Tuple[int, int, int, int]:
+    """Return the positions of the 'other_index_id', 'index_id', and
+    'mapping_level' columns followed by the position of the value
+    column (the one remaining column) in the given mapping *columns*.
+
+    If *columns* is empty (data with no rows), the default layout
+    ``(0, 1, 2, 3)`` is returned.
+    """
+    if not columns:
+        return (0, 1, 2, 3)  # <- EXIT!
+
+    columns = list(columns)
+    id_columns = ['other_index_id', 'index_id', 'mapping_level']
+    verify_columns_set(columns, id_columns, allow_extras=True)
+
+    value_columns = [x for x in columns if x not in id_columns]
+    if len(value_columns) != 1:
+        raise ValueError(
+            f'mappings must have one value column, got {value_columns!r}'
+        )
+
+    return (
+        columns.index('other_index_id'),
+        columns.index('index_id'),
+        columns.index('mapping_level'),
+        columns.index(value_columns[0]),
+    )
+
+
 class DataSpace(object):
     """Topologically organized dataset of quantities, weights, and edges.
 
@@ -593,7 +633,6 @@ class DataSpace(object):
                 msg = f'weights not in input data: {missing}'
                 raise KeyError(msg)
 
-        counter: Counter = Counter()
         with self._managed_cursor(n=2) as (cursor, aux_cursor), \
                 self._managed_transaction(cursor):
 
@@ -606,12 +645,11 @@ class DataSpace(object):
                 msg = 'cannot insert records, no label columns defined'
                 raise Exception(msg)
 
-            # Define lambda func to get raw index_id value.
+            # Get position of index_id column (if given).
             if 'index_id' in columns:
-                index_position = columns.index('index_id')
-                get_raw_index_id = lambda row: row[index_position]
+                index_id_position: Optional[int] = columns.index('index_id')
             else:
-                get_raw_index_id = lambda row: ''  # <- Dummy function.
+                index_id_position = None
 
             label_names = tuple(x for x in columns if x in all_label_cols)
             if label_names:  # If input labels given, must include all labels.
@@ -648,93 +686,22 @@ class DataSpace(object):
                                                     and x != 'domain')]
 
             # Insert records.
-            for row in data:
-                # If empty, skip to next.
-                if not row:
-                    continue
-
-                # Get label values by internal column order.
-                labels = tuple(row[pos] for pos in label_position_list)
-
-                # If one or more labels are empty strings, skip to next.
-                if '' in labels:
-                    counter['empty_labels'] += 1
-                    continue
-
-                raw_index_id = get_raw_index_id(row)  # Raw id usually str or int.
-                if raw_index_id != '':
-                    # Get existing index record by `id`.
-                    index_id = int(raw_index_id)
-                    index_record = index_repo.get(index_id)
-
-                    if labels and labels != index_record.labels:
-                        if on_label_conflict == 'abort':
-                            raise ValueError(
-                                f'index_id {index_id} and labels {labels!r} '
-                                f'do not match {index_record!r}'
-                            )
-                        elif on_label_conflict == 'ignore':
-                            counter['label_ignored'] += 1
-                        elif on_label_conflict == 'replace':
-                            index_repo.update(replace(index_record, labels=labels))
-                            counter['label_replaced'] += 1
-                        else:
-                            raise ValueError(
-                                f"on_label_conflict must be 'abort', 'ignore', or "
-                                f"'replace'; got {on_weight_conflict!r}"
-                            )
-                else:
-                    try:
-                        # Insert new index record.
-                        index_id = index_repo.add(*labels)
-                        counter['label_inserted'] += 1
-                        index_record = index_repo.get(index_id)
-                    except ValueError as val_err:
-                        # Find index if it already exists.
-                        criteria = dict(zip(all_label_cols, labels))
-                        filtered = index_repo.filter_by_label(criteria)
-                        try:
-                            index_record = next(filtered)
-                        except StopIteration:
-                            raise val_err
-                        index_id = index_record.id
-
-                # Insert weight values.
-                for position, group in positions_to_groups.items():
-                    weight_value = row[position]
-                    if weight_value is None or weight_value == '':
-                        continue  # Skip to next weight group.
-                    else:
-                        weight_value = float(weight_value)
-
-                    try:
-                        weight_record = weight_repo.get_by_weight_group_id_and_index_id(
-                            weight_group_id=group.id, index_id=index_id
-                        )
-                        if on_weight_conflict == 'abort':
-                            raise ValueError(
-                                f'weight group {group.name!r} already has a '
-                                f'value for {index_record!r}'
-                            )
-                        elif on_weight_conflict == 'ignore':
-                            counter['weight_ignored'] += 1
-                            continue  # Skip to next weight group.
-                        elif on_weight_conflict == 'replace':
-                            weight_repo.update(replace(weight_record, value=weight_value))
-                            counter['weight_replaced'] += 1
-                        else:
-                            raise ValueError(
-                                f"on_weight_conflict must be 'abort', 'ignore', or "
-                                f"'replace'; got {on_weight_conflict!r}"
-                            )
+            load_records: Callable[..., Dict[str, int]]
+            if 'load_index_records' in self._dal.optimizations:
+                load_records = self._dal.optimizations['load_index_records']
+            else:
+                load_records = load_index_records
 
-                    except KeyError:
-                        weight_repo.add(
-                            weight_group_id=group.id,
-                            index_id=index_id,
-                            value=float(weight_value),
-                        )
-                        counter['weight_inserted'] += 1
+            counter = load_records(
+                data=data,
+                label_positions=label_position_list,
+                index_id_position=index_id_position,
+                weight_positions=positions_to_groups,
+                index_repo=index_repo,
+                weight_repo=weight_repo,
+                on_label_conflict=on_label_conflict,
+                on_weight_conflict=on_weight_conflict,
+            )
 
             if counter['label_inserted']:
                 prop_repo = self._dal.PropertyRepository(cursor)
@@ -742,6 +709,7 @@ class DataSpace(object):
                 refresh_index_hash_property(
                     index_repo=index_repo,
                     prop_repo=prop_repo,
+                    optimizations=self._dal.optimizations,
                 )
 
                 refresh_or_rebuild_structure_granularity(
@@ -790,6 +758,9 @@ class DataSpace(object):
         if counter['weight_replaced']:
             applogger.info(f"replaced {counter['weight_replaced']} index weights")
 
+        if counter['not_realnum']:
+            applogger.warning(f"skipped {counter['not_realnum']} index weights without real number values")
+
     def insert_index_OLD(
         self,
         data: Union[Iterable[Sequence], Iterable[Dict]],
@@ -836,6 +807,7 @@ class DataSpace(object):
                 refresh_index_hash_property(
                     index_repo=index_repo,
                     prop_repo=prop_repo,
+                    optimizations=self._dal.optimizations,
                 )
 
                 refresh_or_rebuild_structure_granularity(
@@ -910,53 +882,20 @@ class DataSpace(object):
             label_columns = label_manager.get_columns()
             verify_columns_set(columns, label_columns, allow_extras=True)
 
-            previously_merged = set()
-            for updated_values in data:
-                if '' in updated_values:
-                    counter['empty_str'] += 1
-                    continue  # <- Skip to next item.
-
-                # Make a dictionary of updated labels and get existing record.
-                updated_dict = dict(zip(columns, updated_values))
-                try:
-                    index_record = index_repo.get(updated_dict['index_id'])
-                except KeyError:
-                    if updated_dict['index_id'] not in previously_merged:
-                        counter['no_index'] += 1
-                        continue  # <- Skip to next item.
-
-                    raise ValueError(
-                        f"cannot update index_id {updated_dict['index_id']}, "
-                        f"it was merged with another record on a previous "
-                        f"row"
-                    )
-
-                # Make a dictionary of existing labels and apply new labels.
-                label_dict = dict(zip(label_columns, index_record.labels))
-                for key in label_dict.keys():
-                    label_dict[key] = updated_dict[key]
-
-                # Check for matching record, raise error or merge if exists.
-                matching = next(index_repo.filter_by_label(label_dict), None)
-                if matching:
-                    if not merge_on_conflict:
-                        raise ValueError(
-                            f"cannot update index_id {index_record.id}, new labels "
-                            f"conflict with the existing index_id {matching.id}.\n"
-                            f"\n"
-                            f"To merge these records use 'space.update_index(..., "
-                            f"merge_on_conflict=True)'."
-                        )
-                    weight_repo.merge_by_index_id(matching.id, index_record.id)
-                    mapping_repo.merge_by_index_id(matching.id, index_record.id)
-                    index_repo.delete(matching.id)
-                    counter['merged'] += 1
-                    previously_merged.add(matching.id)
+            update_records: Callable[..., Dict[str, int]]
+            if 'update_index_records' in self._dal.optimizations:
+                update_records = self._dal.optimizations['update_index_records']
+            else:
+                update_records = update_index_records
 
-                # Assign updated label values and perform update action.
-                index_record.labels = tuple(label_dict.values())
-                index_repo.update(index_record)
-                counter['updated'] += 1
+            counter.update(update_records(
+                data=data,
+                columns=columns,
+                index_repo=index_repo,
+                weight_repo=weight_repo,
+                mapping_repo=mapping_repo,
+                merge_on_conflict=merge_on_conflict,
+            ))
 
             if counter['merged'] or counter['updated']:
                 refresh_structure_granularity(
@@ -971,6 +910,7 @@ class DataSpace(object):
                 refresh_index_hash_property(
                     index_repo=index_repo,
                     prop_repo=self._dal.PropertyRepository(cursor),
+                    optimizations=self._dal.optimizations,
                 )
 
                 # Merges may have eliminated all unweighted indexes.
@@ -1025,6 +965,7 @@ class DataSpace(object):
                 label_columns = label_manager.get_columns()
                 verify_columns_set(columns, label_columns, allow_extras=True)
 
+                index_ids: Dict[int, None] = {}  # Dict used as an ordered set.
                 for row in data:
                     row_dict = dict(zip(columns, row))
                     try:
@@ -1033,40 +974,46 @@ class DataSpace(object):
                         counter['no_index'] += 1
                         continue  # <- Skip to next item.
 
+                    if existing_record.id in index_ids:
+                        counter['no_index'] += 1  # Deleted on a previous row.
+                        continue  # <- Skip to next item.
+
                     # Check that existing labels match row labels.
                     row_labels = tuple(row_dict[k] for k in label_columns)
                     if existing_record.labels != row_labels:
                         counter['mismatch'] += 1
                         continue  # <- Skip to next item.
 
-                    # Remove existing Index record.
-                    delete_index_record(
-                        existing_record.id,
-                        index_repo,
-                        weight_repo,
-                        link_repo,
-                        mapping_repo,
-                    )
-                    counter['deleted'] += 1
+                    index_ids[existing_record.id] = None
 
             elif criteria:
-                for index_record in aux_index_repo.filter_by_label(criteria):
-                    delete_index_record(
-                        index_record.id,
-                        index_repo,
-                        weight_repo,
-                        link_repo,
-                        mapping_repo,
-                    )
-                    counter['deleted'] += 1
+                index_ids = {
+                    x.id: None for x in aux_index_repo.filter_by_label(criteria)
+                }
 
             else:
                 raise TypeError('expected data or keyword criteria, got neither')
 
+            # Remove existing Index records.
+            delete_records: Callable[..., Dict[str, int]]
+            if 'delete_index_records' in self._dal.optimizations:
+                delete_records = self._dal.optimizations['delete_index_records']
+            else:
+                delete_records = delete_index_records
+
+            counter.update(delete_records(
+                index_ids=index_ids.keys(),
+                index_repo=index_repo,
+                weight_repo=weight_repo,
+                link_repo=link_repo,
+                mapping_repo=mapping_repo,
+            ))
+
             if counter['deleted']:
                 refresh_index_hash_property(
                     index_repo=index_repo,
                     prop_repo=self._dal.PropertyRepository(cursor),
+                    optimizations=self._dal.optimizations,
                 )
 
                 refresh_structure_granularity(
@@ -1089,12 +1036,11 @@ class DataSpace(object):
                     # Rebuild 'other_index_hash'. When all occurances of an
                     # 'other_index_id' are associated with 'index_id' values
                     # that are deleted, this hash will change.
-                    other_index_hash = SequenceHash(
-                        aux_mapping_repo.find_distinct_other_index_ids(
-                            link.id,
-                            ordered=True,
-                        )
-                    ).get_hexdigest()
+                    other_index_hash = get_other_index_hash(
+                        link_id=link.id,
+                        mapping_repo=aux_mapping_repo,
+                        optimizations=self._dal.optimizations,
+                    )
 
                     # Check 'is_locally_complete' status. A link can
                     # become complete if all of the unmapped index_id values
@@ -1283,10 +1229,11 @@ class DataSpace(object):
         data, columns = normalize_tabular(data, columns)
 
         counter: Counter = Counter()
-        with self._managed_transaction() as cursor:
+        with self._managed_cursor(n=2) as (cursor, aux_cursor), \
+                self._managed_transaction(cursor):
             label_manager = self._dal.LabelManager(cursor)
             group_repo = self._dal.WeightGroupRepository(cursor)
-            index_repo = self._dal.IndexRepository(cursor)
+            index_repo = self._dal.IndexRepository(aux_cursor)
             weight_repo = self._dal.WeightRepository(cursor)
 
             label_columns = label_manager.get_columns()
@@ -1302,62 +1249,30 @@ class DataSpace(object):
                 weight_group_id = group.id
 
             value_column = value_column or weight_group_name
-            for row in data:
-                row_dict = dict(zip(columns, row))
-                weight_value = row_dict.pop(value_column)
-
-                if not isinstance(weight_value, float):
-                    try:
-                        weight_value = float(weight_value)
-                    except (ValueError, TypeError):
-                        counter['not_realnum'] += 1
-                        continue  # <- Skip to next item.
-
-                if isnan(weight_value) or isinf(weight_value):
-                    counter['not_realnum'] += 1
-                    continue  # <- Skip to next item.
-
-                if 'index_id' in row_dict:
-                    try:
-                        index_record = index_repo.get(row_dict['index_id'])
-                    except KeyError:
-                        counter['no_index'] += 1
-                        continue  # <- Skip to next item.
-
-                    labels_dict = dict(zip(label_columns, index_record.labels))
-                    if any(row_dict[k] != v for k, v in labels_dict.items()):
-                        counter['mismatch'] += 1
-                        continue  # <- Skip to next item.
-                else:
-                    index_records = index_repo.filter_by_label(
-                        {k: v for k, v in row_dict.items() if k in label_columns}
-                    )
-                    try:
-                        index_record = next(index_records)
-                    except StopIteration:
-                        counter['no_match'] += 1
-                        continue  # <- Skip to next item.
-
-                if index_record.id == 0:
-                    counter['undefined_record'] += 1
-                    continue  # <- Skip to next item.
 
-                try:
-                    result_code = weight_repo.add_or_resolve(
-                        weight_group_id=weight_group_id,
-                        index_id=index_record.id,
-                        value=weight_value,
-                        on_conflict=on_conflict,
-                    )
-                except Exception as err:
-                    msg = f'{err}; this error occured on record: {row!r}'
-                    raise Exception(msg)
+            load_weights: Callable[..., Dict[str, int]]
+            if 'load_weight_records' in self._dal.optimizations:
+                load_weights = self._dal.optimizations['load_weight_records']
+            else:
+                load_weights = load_weight_records
 
-                counter[result_code] += 1
+            counter.update(load_weights(
+                data=data,
+                columns=columns,
+                value_column=value_column,
+                weight_group_id=weight_group_id,
+                index_repo=index_repo,
+                weight_repo=weight_repo,
+                on_conflict=on_conflict,
+            ))
 
-            group_is_complete = weight_repo.weight_group_is_complete(weight_group_id)
-            if counter['inserted'] and group_is_complete:
-                group_repo.update(replace(group, is_complete=True))
+            # Completeness can only change when new records are added.
+            if counter['inserted']:
+                group_is_complete = weight_repo.weight_group_is_complete(weight_group_id)
+                if group_is_complete and not group.is_complete:
+                    group_repo.update(replace(group, is_complete=True))
+            else:
+                group_is_complete = group.is_complete
 
         applogger.info(
             f"loaded {counter['inserted']} new records into {group.name!r}"
@@ -1792,9 +1707,128 @@ class DataSpace(object):
                          for x
                          in self._dal.StructureRepository(cursor).get_all()}
 
-            # Insert records from given `data`.
+            def generate_rows() -> Iterator[Tuple[int, int, int, bytes, float]]:
+                for row in data:
+                    other_index_id, index_id, mapping_level, value = row[:4]
+
+                    # Verify mapping level.
+                    if mapping_level not in structure:
+                        counter['bad_mapping_level'] += 1
+                        continue  # <- Skip to next item.
+
+                    # Skip if undefined-to-undefined.
+                    if other_index_id == 0 and index_id == 0:
+                        counter['undefined_to_undefined'] += 1
+                        continue  # <- Skip to next item.
+
+                    yield (link_id, other_index_id, index_id, mapping_level, value)
+
+            # Insert records from given `data` (use staging for new links).
+            aux_mapping_repo = self._dal.MappingRepository(aux_cursor)
+            is_new_link = next(aux_mapping_repo.find(link_id=link_id), None) is None
+            counter['inserted'] = mapping_repo.add_many(
+                generate_rows(), staged=is_new_link
+            )
+
+            if counter['inserted'] and link:
+                applogger.info(f"loaded {counter['inserted']} mappings")
+
+                # Get ordered sequence of other_index_id values.
+                other_index_ids = aux_mapping_repo.find_distinct_other_index_ids(
+                    link_id,
+                    ordered=True,  # <- Must be ordered for `sequence_hash`.
+                )
+
+                # Build new hash and refresh proportion values.
+                sequence_hash = ChunkedSequenceHash()
+                for other_index_id in other_index_ids:
+                    sequence_hash.add_value(other_index_id)
+                mapping_repo.refresh_proportions_for_link(link_id)
+
+                # Assign new values and update link record.
+                link_repo.update(replace(
+                    link,
+                    other_index_hash=sequence_hash.get_hexdigest(),
+                    is_locally_complete=mapping_repo.mapping_is_complete(link_id),
+                ))
+            else:
+                applogger.warning('no mappings loaded')
+
+            if counter['undefined_to_undefined']:
+                applogger.debug(
+                    f"skipped {counter['undefined_to_undefined']} "
+                    f"undefined-to-undefined mappings"
+                )
+
+            if counter['bad_mapping_level']:
+                applogger.warning(
+                    f"skipped {counter['bad_mapping_level']} mappings with "
+                    f"invalid mapping levels"
+                )
+
+    def update_mappings2(
+        self,
+        space_or_ref: Union['DataSpace', str],
+        link_name: Optional[str],
+        data: Union[Iterable[Sequence], Iterable[Dict]],
+        columns: Optional[Sequence[str]] = None,
+    ) -> None:
+        r"""Update mappings for specified link to match the given data.
+
+        The *data* uses the same layout as :meth:`insert_mappings2`.
+        Incoming rows are compared against the link's existing mappings
+        using the key ``(other_index_id, index_id, mapping_level)``.
+        Only the differences are written: new keys are inserted, keys
+        with changed values are updated, and existing keys that are not
+        in *data* are deleted. Proportions are refreshed only for the
+        affected ``other_index_id`` values.
+
+        .. code-block:: python
+
+            >>> space.update_mappings2(
+            ...     space_or_ref='myfile',
+            ...     link_name='pop2000',
+            ...     data=[
+            ...         ('other_index_id', 'index_id', 'mapping_level', 'pop2000'),
+            ...         (1, 1, b'\xe0', 10.0),
+            ...         (2, 2, b'\xe0', 20.0),
+            ...         (3, 2, b'\xe0',  6.0),
+            ...         (3, 3, b'\xe0', 14.0),
+            ...     ]
+            ... )
+        """
+        data, columns = normalize_tabular(data, columns)
+        other_pos, index_pos, level_pos, value_pos = get_mapping_positions(columns)
+
+        counter: Dict[str, int] = Counter()
+        with self._managed_cursor(n=2) as (cursor, aux_cursor), \
+                self._managed_transaction(cursor):
+            link_repo = self._dal.LinkRepository(cursor)
+            mapping_repo = self._dal.MappingRepository(cursor)
+            aux_mapping_repo = self._dal.MappingRepository(aux_cursor)
+
+            link = self._get_link(space_or_ref, link_name, link_repo)
+            link_id = link.id
+
+            # Get allowed structure values.
+            structure = {bytes(BitFlags(x.bits)) if any(x.bits) else None
+                         for x
+                         in self._dal.StructureRepository(cursor).get_all()}
+
+            # Get existing mappings keyed by (other_index_id, index_id, level).
+            existing = {
+                (x.other_index_id, x.index_id, x.mapping_level): x
+                for x in aux_mapping_repo.find(link_id=link_id)
+            }
+
+            affected_other_ids = set()
+            rows_to_insert = []
+            records_to_update = []
             for row in data:
-                other_index_id, index_id, mapping_level, value = row[:4]
+                other_index_id = row[other_pos]
+                index_id = row[index_pos]
+                mapping_level = row[level_pos]
+                value = row[value_pos]
 
                 # Verify mapping level.
                 if mapping_level not in structure:
@@ -1806,30 +1840,39 @@ class DataSpace(object):
                     counter['undefined_to_undefined'] += 1
                     continue  # <- Skip to next item.
 
-                mapping_repo.add(
-                    link_id=link_id,
-                    other_index_id=other_index_id,
-                    index_id=index_id,
-                    mapping_level=mapping_level,
-                    value=value,
-                )
-                counter['inserted'] += 1
+                mapping = existing.pop((other_index_id, index_id, mapping_level), None)
+                if mapping is None:
+                    rows_to_insert.append(
+                        (link_id, other_index_id, index_id, mapping_level, value)
+                    )
+                    affected_other_ids.add(other_index_id)
+                elif mapping.value != float(value):
+                    records_to_update.append(replace(mapping, value=value))
+                    affected_other_ids.add(other_index_id)
+                else:
+                    counter['unchanged'] += 1
 
-            if counter['inserted'] and link:
-                applogger.info(f"loaded {counter['inserted']} mappings")
+            # Apply changes in bulk, removing existing mappings that are
+            # not present in `data`.
+            affected_other_ids.update(x.other_index_id for x in existing.values())
+            counter['updated'] = mapping_repo.update_many(records_to_update)
+            counter['deleted'] = mapping_repo.delete_many(x.id for x in existing.values())
+            counter['inserted'] = mapping_repo.add_many(rows_to_insert)
+
+            if affected_other_ids:
+                mapping_repo.refresh_proportions_for_link(link_id, affected_other_ids)
 
+            if counter['inserted'] or counter['deleted']:
                 # Get ordered sequence of other_index_id values.
-                aux_mapping_repo = self._dal.MappingRepository(aux_cursor)
                 other_index_ids = aux_mapping_repo.find_distinct_other_index_ids(
                     link_id,
                     ordered=True,  # <- Must be ordered for `sequence_hash`.
                 )
 
-                # Build new hash and refresh proportion values.
-                sequence_hash = SequenceHash()
+                # Build new hash.
+                sequence_hash = ChunkedSequenceHash()
                 for other_index_id in other_index_ids:
                     sequence_hash.add_value(other_index_id)
-                    mapping_repo.refresh_proportions(link_id, other_index_id)
 
                 # Assign new values and update link record.
                 link_repo.update(replace(
@@ -1837,8 +1880,14 @@ class DataSpace(object):
                     other_index_hash=sequence_hash.get_hexdigest(),
                     is_locally_complete=mapping_repo.mapping_is_complete(link_id),
                 ))
+
+            if affected_other_ids:
+                applogger.info(
+                    f"updated {counter['updated']}, inserted {counter['inserted']}, "
+                    f"and deleted {counter['deleted']} mappings"
+                )
             else:
-                applogger.warning('no mappings loaded')
+                applogger.info('mappings are unchanged')
 
             if counter['undefined_to_undefined']:
                 applogger.debug(
@@ -1852,6 +1901,161 @@ class DataSpace(object):
                     f"invalid mapping levels"
                 )
 
+    def relink_appended(
+        self,
+        space: 'DataSpace',
+        link_name: Optional[str],
+        data: Union[Iterable[Sequence], Iterable[Dict]],
+        columns: Optional[Sequence[str]] = None,
+    ) -> None:
+        r"""Update an out-of-date link after index records have been
+        appended to the other *space*--without reloading the mappings.
+
+        The *data* uses the same layout as :meth:`insert_mappings2` and
+        should contain mappings for the newly appended records (rows
+        for other records are skipped).
+
+        .. code-block:: python
+
+            >>> space.relink_appended(
+            ...     space=other_space,
+            ...     link_name='pop2000',
+            ...     data=[
+            ...         ('other_index_id', 'index_id', 'mapping_level', 'pop2000'),
+            ...         (4, 3, b'\xe0', 12.0),
+            ...         (5, 3, b'\xe0',  8.0),
+            ...     ]
+            ... )
+
+        The link's existing mappings remain valid only when the ids it
+        was built from are a prefix of the other space's current index
+        ids (i.e., records were only added, never removed). If this is
+        not the case, a :class:`ToronError` is raised and the mappings
+        must be reloaded. The *data* may leave the last appended records
+        unmapped (the link stays out of date until they are added) but
+        it must not skip a record that is followed by mapped records.
+        """
+        data, columns = normalize_tabular(data, columns)
+
+        with space._managed_cursor() as other_cursor:
+            other_index_hash = check_type(
+                space._dal.PropertyRepository(other_cursor).get('index_hash'), str
+            )
+
+            with self._managed_cursor() as cursor:
+                link = self._get_link(space, link_name, self._dal.LinkRepository(cursor))
+                link_other_ids = list(
+                    self._dal.MappingRepository(cursor).find_distinct_other_index_ids(
+                        link.id, ordered=True
+                    )
+                )
+
+            if link.other_index_hash == other_index_hash:
+                applogger.info(f'link {link.name!r} is already up to date')
+                return  # <- EXIT!
+
+            # Check that the ids the link was built from match its hash
+            # and are a prefix of the other space's current index ids
+            # (links saved before DAL1 schema 0.3.2 can still hold a hash
+            # made with the older SequenceHash, so both are checked).
+            sequence_hash = ChunkedSequenceHash(link_other_ids)
+            matches_hash = link.other_index_hash in (
+                sequence_hash.get_hexdigest(),
+                SequenceHash(link_other_ids).get_hexdigest(),
+            )
+            other_index_repo = space._dal.IndexRepository(other_cursor)
+            other_index_ids = other_index_repo.find_all_index_ids(ordered=True)
+            is_prefix = list(islice(other_index_ids, len(link_other_ids))) == link_other_ids
+            if not matches_hash or not is_prefix:
+                raise ToronError(
+                    f'cannot relink {link.name!r}, the linked index records '
+                    f'have changed (not only appended), mappings must be '
+                    f'reloaded'
+                )
+
+            new_index_ids = list(other_index_ids)  # <- Remaining ids are new.
+
+        counter: Dict[str, int] = Counter()
+        with self._managed_cursor() as cursor, \
+                self._managed_transaction(cursor):
+            link_repo = self._dal.LinkRepository(cursor)
+            mapping_repo = self._dal.MappingRepository(cursor)
+
+            # Get allowed structure values.
+            structure = {bytes(BitFlags(x.bits)) if any(x.bits) else None
+                         for x
+                         in self._dal.StructureRepository(cursor).get_all()}
+
+            other_pos, index_pos, level_pos, value_pos = get_mapping_positions(columns)
+            new_index_id_set = set(new_index_ids)
+            mapped_ids = set()
+            def generate_rows() -> Iterator[Tuple[int, int, int, bytes, float]]:
+                for row in data:
+                    other_index_id = row[other_pos]
+                    mapping_level = row[level_pos]
+
+                    if other_index_id not in new_index_id_set:
+                        counter['existing_record'] += 1
+                        continue  # <- Skip to next item.
+
+                    # Verify mapping level.
+                    if mapping_level not in structure:
+                        counter['bad_mapping_level'] += 1
+                        continue  # <- Skip to next item.
+
+                    mapped_ids.add(other_index_id)
+                    yield (link.id, other_index_id, row[index_pos], mapping_level, row[value_pos])
+
+            counter['inserted'] = mapping_repo.add_many(generate_rows())
+
+            # The mapped ids must directly follow the link's existing ids
+            # (without gaps) so that they remain a prefix of the other
+            # space's index and the link can be relinked again later.
+            mapped_in_order = new_index_ids[:len(mapped_ids)]
+            if not mapped_ids.issuperset(mapped_in_order):
+                first_unmapped = next(x for x in mapped_in_order if x not in mapped_ids)
+                raise ToronError(
+                    f'cannot relink {link.name!r}, appended index_id '
+                    f'{first_unmapped} has no mappings but later appended '
+                    f'records do, mappings must cover appended records '
+                    f'without gaps'
+                )
+
+            mapping_repo.refresh_proportions_for_link(link.id, mapped_in_order)
+
+            # Extend the link's hash with the newly mapped ids.
+            for other_index_id in mapped_in_order:
+                sequence_hash.add_value(other_index_id)
+
+            link_repo.update(replace(
+                link,
+                other_index_hash=sequence_hash.get_hexdigest(),
+                is_locally_complete=mapping_repo.mapping_is_complete(link.id),
+            ))
+
+        applogger.info(
+            f"relinked {link.name!r}, loaded {counter['inserted']} mappings "
+            f"for {len(mapped_ids)} of {len(new_index_ids)} new records"
+        )
+
+        if counter['existing_record']:
+            applogger.debug(
+                f"skipped {counter['existing_record']} mappings for "
+                f"existing records"
+            )
+
+        if counter['bad_mapping_level']:
+            applogger.warning(
+                f"skipped {counter['bad_mapping_level']} mappings with "
+                f"invalid mapping levels"
+            )
+
+        if len(mapped_ids) < len(new_index_ids):
+            applogger.warning(
+                f'missing mappings for {len(new_index_ids) - len(mapped_ids)} '
+                f'new records, link is still out of date'
+            )
+
     def insert_mappings(
         self,
         space_or_ref: Union['DataSpace', str],
@@ -1930,10 +2134,10 @@ class DataSpace(object):
                 )
 
                 # Build new hash and refresh proportion values.
-                sequence_hash = SequenceHash()
+                sequence_hash = ChunkedSequenceHash()
                 for other_index_id in other_index_ids:
                     sequence_hash.add_value(other_index_id)
-                    mapping_repo.refresh_proportions(link_id, other_index_id)
+                mapping_repo.refresh_proportions_for_link(link_id)
 
                 # Assign new values and update link record.
                 link_repo.update(replace(
@@ -2036,10 +2240,10 @@ class DataSpace(object):
                 )
 
                 # Build new hash and refresh proportion values.
-                sequence_hash = SequenceHash()
+                sequence_hash = ChunkedSequenceHash()
                 for other_index_id in other_index_ids:
                     sequence_hash.add_value(other_index_id)
-                    mapping_repo.refresh_proportions(link_id, other_index_id)
+                mapping_repo.refresh_proportions_for_link(link_id)
 
                 # Update link's hash and is-complete status.
                 link_repo.update(replace(
@@ -2049,12 +2253,8 @@ class DataSpace(object):
                 ))
 
             elif counter['updated']:
-                # Get iterator of other_index_id values.
-                other_index_ids = aux_mapping_repo.find_distinct_other_index_ids(link_id)
-
                 # Refresh proportion values.
-                for other_index_id in other_index_ids:
-                    mapping_repo.refresh_proportions(link_id, other_index_id)
+                mapping_repo.refresh_proportions_for_link(link_id)
 
         warn_if_issues(
             counter,
@@ -2194,10 +2394,10 @@ class DataSpace(object):
                 )
 
                 # Build new hash and refresh proportion values.
-                sequence_hash = SequenceHash()
+                sequence_hash = ChunkedSequenceHash()
                 for other_index_id in other_index_ids:
                     sequence_hash.add_value(other_index_id)
-                    mapping_repo.refresh_proportions(link_id, other_index_id)
+                mapping_repo.refresh_proportions_for_link(link_id)
 
                 # Update link's hash and is-complete status.
                 link_repo.update(replace(
@@ -2330,102 +2530,27 @@ class DataSpace(object):
                 allow_extras=True,
             )
 
-            domain = self.domain  # Assign locally to reduce dot-lookups.
-
-            structure = {BitFlags(x.bits) for x in struct_repo.get_all()}
-
-            for row in data:
-                row_dict = dict(zip(columns, row))
-
-                # If 'domain' is given, it must match `space.domain`.
-                if 'domain' in row_dict and row_dict['domain'] != domain:
-                    raise ValueError(
-                        f"domain must be {domain!r}, got: {row_dict['domain']!r}"
-                    )
-
-                # Parse row into separate attribute and label dictionaries.
-                attr_dict = {k: row_dict[k] for k in attributes_to_load if row_dict[k]}
-                labels_dict = {k: row_dict[k] for k in label_names}
-
-                # Skip record if it has no attribute values.
-                if not attr_dict:
-                    counter['no_attrs'] += 1
-                    continue  # Skip to next row.
-
-                # Check for valid partition definitions.
-                if BitFlags(labels_dict.values()) not in structure:
-                    if allow_invalid_partition:
-                        counter['invalid_category'] += 1
-                    else:
-                        # This error message can be user facing so it
-                        # includes more context that it otherwise might.
-                        formatted_names = ', '.join(
-                            repr(x)
-                            for x in compress(label_names,
-                                              BitFlags(labels_dict.values()))
-                        )
-                        raise ValueError(
-                            f'no matching partition:\n'
-                            f'   names: {{{formatted_names}}}\n'
-                            f'  record: {list(labels_dict.values())!r}'
-                        )
-
-                # Check for valid labels.
-                criteria = {k: v for k, v in labels_dict.items() if v}
-                if not any(index_repo.filter_by_label(criteria)):
-                    if allow_invalid_label:
-                        counter['invalid_label'] += 1
-                    else:
-                        raise ValueError(
-                            f'invalid labels, not present in index:\n'
-                            f'  record: {list(criteria.values())!r}'
-                        )
-
-                # Get `location` and `attribute_group` instances.
-                location = location_repo.get_by_labels_add_if_missing(labels_dict)
-                attribute_group = attribute_repo.get_by_value_add_if_missing(attr_dict)
+            load_quantities: Callable[..., Dict[str, int]]
+            if 'load_quantity_records' in self._dal.optimizations:
+                load_quantities = self._dal.optimizations['load_quantity_records']
+            else:
+                load_quantities = load_quantity_records
 
-                try:
-                    # Add new quantity record.
-                    quantity_repo.add(
-                        location_id=location.id,
-                        attribute_group_id=attribute_group.id,
-                        value=row_dict[value_column],
-                    )
-                    counter['inserted'] += 1
-                except Exception as err:  # <- Use `Exception` because different
-                    try:                  #    backends could raise different types.
-                        quantity = quantity_repo.get_by_location_id_and_attribute_group_id(
-                            location_id=location.id,
-                            attribute_group_id=attribute_group.id,
-                        )
-                    except KeyError:
-                        # If we get a KeyError, then a duplicate quantity does
-                        # not exist. This means that the original error was for
-                        # some other reason.
-                        raise err  # Re-raise original error.
-
-                    if on_existing == 'abort':
-                        raise ValueError(
-                            'data contains quantities for locations and '
-                            'attributes that have already been loaded; use '
-                            '--on-existing to change load behavior'
-                        )
-                    elif on_existing == 'ignore':
-                        counter['existing_ignored'] += 1
-                        continue  # Skip to next.
-                    elif on_existing == 'replace':
-                        quantity_repo.update(replace(quantity, value=row_dict[value_column]))
-                        counter['existing_replaced'] += 1
-                    elif on_existing == 'sum':
-                        summed_value = quantity.value + float(row_dict[value_column])
-                        quantity_repo.update(replace(quantity, value=summed_value))
-                        counter['existing_summed'] += 1
-                    else:
-                        raise ValueError(
-                            f"--on-existing must be 'abort', 'ignore', "
-                            f"'replace', or 'sum'; got {on_existing!r}"
-                        )
+            counter.update(load_quantities(
+                data=data,
+                columns=columns,
+                value_column=value_column,
+                attributes_to_load=attributes_to_load,
+                domain=self.domain,
+                index_repo=index_repo,
+                location_repo=location_repo,
+                attribute_repo=attribute_repo,
+                quantity_repo=quantity_repo,
+                structure_repo=struct_repo,
+                allow_invalid_label=allow_invalid_label,
+                allow_invalid_partition=allow_invalid_partition,
+                on_existing=on_existing,
+            ))
 
         if counter['no_attrs']:
             applogger.info(
@@ -2881,6 +3006,160 @@ class DataSpace(object):
                             for index_id, value in disaggregated:
                                 yield (index_id, attributes, value)
 
+    def translate_frame(
+        self,
+        df: 'pd.DataFrame',
+        source: 'DataSpace',
+        value_columns: Sequence[str],
+        link_name: Optional[str] = None,
+    ) -> 'pd.DataFrame':
+        """Translate *value_columns* of a pandas DataFrame from the index
+        of the *source* node to the index of this node.
+
+        The *df* must contain the index columns of *source*. Rows are
+        matched to the source index with a vectorized merge and values
+        are distributed using the proportions of the link from *source*
+        (applied as a sparse matrix product). If *link_name* is not
+        given, the default link is used. Missing values are treated as
+        zero. SciPy is used for the matrix product when it is installed.
+
+        Returns a DataFrame of this node's index columns followed by the
+        translated *value_columns*. It contains a row for each index
+        record that received a share of one or more source rows. As
+        with :meth:`NodeReader.translate`, values of the source node's
+        undefined record remain undefined--they are assigned to this
+        node's undefined record.
+        """
+        try:
+            import numpy as np
+            import pandas as pd
+        except ImportError:
+            msg = (
+                "Missing optional dependency 'pandas'.  Install pandas to "
+                "use this method."
+            )
+            raise ImportError(msg) from None
+
+        value_columns = list(value_columns)
+        if not value_columns:
+            raise ValueError('must provide at least one value column')
+
+        # Get source properties and index records.
+        with source._managed_cursor() as cursor:
+            property_repo = source._dal.PropertyRepository(cursor)
+            source_unique_id = check_type(property_repo.get('unique_id'), str)
+            source_index_hash = check_type(property_repo.get('index_hash'), str)
+            source_columns = list(source._dal.LabelManager(cursor).get_columns())
+            source_index = get_index_frame(
+                index_repo=source._dal.IndexRepository(cursor),
+                optimizations=source._dal.optimizations,
+            )
+
+        verify_columns_set(df.columns, source_columns + value_columns, allow_extras=True)
+
+        # Match rows to source index ids and sum values by index id.
+        merged = df[source_columns + value_columns].astype(
+            {col: source_index[col].dtype for col in source_columns}
+        ).merge(source_index, how='left', on=source_columns, validate='many_to_one')
+
+        unmatched = merged['index_id'].isna()
+        if unmatched.any():
+            raise ValueError(
+                f'{int(unmatched.sum())} rows do not match the index of the '
+                f'source node'
+            )
+
+        grouped = merged.groupby('index_id')[value_columns].sum()
+        source_ids = grouped.index.to_numpy(dtype=np.int64)
+        source_values = grouped.to_numpy(dtype=np.float64)
+
+        # Values of the undefined record are not translated with mappings.
+        is_undefined = source_ids == 0
+        undefined_values = source_values[is_undefined].sum(axis=0)
+        has_undefined = bool(is_undefined.any())
+        source_ids = source_ids[~is_undefined]
+        source_values = source_values[~is_undefined]
+
+        # Get link arrays and target index records.
+        with self._managed_cursor() as cursor:
+            link = self._get_link(
+                source_unique_id,
+                link_name,
+                self._dal.LinkRepository(cursor),
+            )
+            if link.other_index_hash != source_index_hash \
+                    or not link.is_locally_complete:
+                raise RuntimeError(f'link {link.name!r} is not complete')
+
+            mapping_repo = self._dal.MappingRepository(cursor)
+            other_index_ids, offsets, index_ids, proportions = \
+                mapping_repo.get_proportion_arrays(link.id)
+
+            label_columns = list(self._dal.LabelManager(cursor).get_columns())
+            target_index = get_index_frame(
+                index_repo=self._dal.IndexRepository(cursor),
+                optimizations=self._dal.optimizations,
+            ).set_index('index_id')
+
+        other_index_ids_arr = np.frombuffer(other_index_ids, dtype=np.int64)
+        offsets_arr = np.frombuffer(offsets, dtype=np.int64)
+        index_ids_arr = np.frombuffer(index_ids, dtype=np.int64)
+        proportions_arr = np.frombuffer(proportions, dtype=np.float64)
+        num_rows = len(other_index_ids_arr)
+
+        # Get the row position of each source id (ids without mappings
+        # are omitted, they have no share to distribute).
+        positions = np.searchsorted(other_index_ids_arr, source_ids)
+        in_range = positions < num_rows
+        in_range[in_range] = other_index_ids_arr[positions[in_range]] == source_ids[in_range]
+        source_matrix = np.zeros((num_rows, len(value_columns)))
+        source_matrix[positions[in_range]] = source_values[in_range]
+
+        # Get the column position of each target id (ids can be sparse)
+        # and the source row of each mapping (expanded from offsets).
+        target_ids, columns_arr = np.unique(index_ids_arr, return_inverse=True)
+        num_targets = len(target_ids)
+        row_ids = np.repeat(np.arange(num_rows), np.diff(offsets_arr))
+
+        try:
+            from scipy.sparse import csr_matrix  # type: ignore
+        except ImportError:
+            weighted = source_matrix[row_ids] * proportions_arr[:, np.newaxis]
+            result = np.column_stack([
+                np.bincount(columns_arr, weights=weighted[:, i], minlength=num_targets)
+                for i in range(len(value_columns))
+            ])
+        else:
+            matrix = csr_matrix(
+                (proportions_arr, columns_arr, offsets_arr),
+                shape=(num_rows, num_targets),
+            )
+            result = np.asarray(matrix.T @ source_matrix)
+
+        # Keep target ids that received a share of any source row.
+        has_source = np.zeros(num_rows, dtype=bool)
+        has_source[positions[in_range]] = True
+        received = np.zeros(num_targets, dtype=bool)
+        received[columns_arr[has_source[row_ids]]] = True
+
+        result_ids = target_ids[received]
+        result_values = result[received]
+
+        # Assign undefined values to the undefined record (index_id 0
+        # sorts first so it is either the first result id or missing).
+        if has_undefined:
+            if len(result_ids) and result_ids[0] == 0:
+                result_values[0] += undefined_values
+            else:
+                result_ids = np.concatenate([[0], result_ids])
+                result_values = np.vstack([undefined_values, result_values])
+
+        translated = target_index.loc[result_ids].reset_index(drop=True)
+        for col in label_columns:
+            translated[col] = translated[col].astype('string')
+        translated[value_columns] = result_values
+        return translated
+
     def __call__(
         self,
         *selectors: str,
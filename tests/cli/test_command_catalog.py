@@ -0,0 +1,65 @@
+"""Tests for toron/cli/command_catalog.py module."""
+import argparse
+import io
+import os
+import tempfile
+from .. import _unittest as unittest
+from ..test_catalog import make_linked_files
+
+from toron.cli import command_catalog
+from toron.cli.common import ExitCode
+
+
+class TestCatalogCommands(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory(prefix='toron-')
+        self.addCleanup(tmpdir.cleanup)
+        self.directory = tmpdir.name
+        make_linked_files(self.directory)
+
+    def test_build_catalog(self):
+        args = argparse.Namespace(filepath=self.directory)
+
+        with self.assertLogs('app-toron', level='INFO') as logs_cm:
+            exit_code = command_catalog.build_catalog(args)  # <- Function under test.
+
+        self.assertEqual(exit_code, ExitCode.OK)
+        self.assertEqual(
+            logs_cm.output,
+            ['INFO:app-toron:cataloged 3 new, 0 updated, and 0 unchanged files'],
+        )
+
+    def test_build_catalog_not_a_directory(self):
+        filepath = os.path.join(self.directory, 'a.toron')
+        args = argparse.Namespace(filepath=filepath)
+
+        with self.assertLogs('app-toron', level='ERROR') as logs_cm:
+            exit_code = command_catalog.build_catalog(args)
+
+        self.assertEqual(exit_code, ExitCode.ERR)
+        self.assertRegex(logs_cm.output[0], 'is not a directory')
+
+    def test_write_path_to_stdout(self):
+        with self.assertLogs('app-toron', level='INFO'):
+            command_catalog.build_catalog(argparse.Namespace(filepath=self.directory))
+
+        args = argparse.Namespace(
+            filepath=self.directory,
+            source='a.toron',
+            target='c.toron',
+            stdout=io.StringIO(),
+        )
+        exit_code = command_catalog.write_path_to_stdout(args)  # <- Function under test.
+
+        self.assertEqual(exit_code, ExitCode.OK)
+        expected = ''.join(
+            f'{os.path.join(self.directory, x)}\n'
+            for x in ['a.toron', 'sub/b.toron', 'c.toron']
+        )
+        self.assertEqual(args.stdout.getvalue(), expected)
+
+        args.source, args.target = 'c.toron', 'a.toron'
+        with self.assertLogs('app-toron', level='ERROR') as logs_cm:
+            exit_code = command_catalog.write_path_to_stdout(args)
+        self.assertEqual(exit_code, ExitCode.ERR)
+        self.assertRegex(logs_cm.output[0], 'no path found')
@@ -555,6 +555,7 @@ class TestReadFromStdin(DataSpaceFixturesMixin, unittest.TestCase):
             match_limit=1,
             allow_overlapping=False,
             allow_incomplete=False,
+            update=False,
             stdin=DummyRedirection(
                 'index_c,population,index_d\n'
                 '0XF4264876,0,0XDF9B30D7\n'
@@ -614,6 +615,59 @@ class TestReadFromStdin(DataSpaceFixturesMixin, unittest.TestCase):
              (8, 1, 6, 3, b'\x80', 50.0, 1.000)},
         )
 
+    def test_update_existing_mappings(self):
+        self.node_d.add_link(space=self.node_c,
+                             link_name='population',
+                             other_filename_hint='node_c',
+                             is_default=True)
+
+        csv_text = (
+            'index_c,population,index_d\n'
+            '1X73808335,18,1X583DFB94\n'
+            '1X73808335,46,2X0BA7A010\n'
+            '2X201AD8B1,20,3X8C016B53\n'
+            '2X201AD8B1,50,4XAC931718\n'
+            '3XA7BC13F2,30,5X2B35DC5B\n'
+            '3XA7BC13F2,50,6X78AF87DF\n'
+        )
+        args = argparse.Namespace(
+            link='population',
+            direction='right',
+            match_limit=1,
+            allow_overlapping=False,
+            allow_incomplete=True,
+            update=False,
+            stdin=DummyRedirection(csv_text),
+        )
+        with self.assertLogs('app-toron', level='INFO'):
+            command_mapping.read_from_stdin(args, self.node_c, self.node_d)
+
+        args.update = True
+        args.stdin = DummyRedirection(
+            csv_text.replace('1X73808335,46,', '1X73808335,82,')
+        )
+        with self.assertLogs('app-toron', level='INFO') as cm:
+            exit_code = command_mapping.read_from_stdin(  # <- Function under test.
+                args,
+                self.node_c,
+                self.node_d
+            )
+
+        self.assertEqual(exit_code, ExitCode.OK)
+        self.assertIn(
+            'INFO:app-toron.space:updated 1, inserted 0, and deleted 0 mappings',
+            cm.output,
+        )
+        self.assertEqual(
+            self.get_mappings(self.node_c, self.node_d, 'population'),
+            {(1, 1, 1, 1, b'\xc0', 18.0, 0.18),
+             (2, 1, 1, 2, b'\xc0', 82.0, 0.82),
+             (3, 1, 2, 3, b'\xc0', 20.0, 20 / 70),
+             (4, 1, 2, 4, b'\xc0', 50.0, 50 / 70),
+             (5, 1, 3, 5, b'\xc0', 30.0, 0.375),
+             (6, 1, 3, 6, b'\xc0', 50.0, 0.625)},
+        )
+
     def test_insert_both_directions_with_undefined_cases(self):
         self.node_c.add_link(space=self.node_d,
                              link_name='population',
@@ -631,6 +685,7 @@ class TestReadFromStdin(DataSpaceFixturesMixin, unittest.TestCase):
             match_limit=1,
             allow_overlapping=False,
             allow_incomplete=False,
+            update=False,
             stdin=DummyRedirection(
                 'index_c,population,index_d\n'
                 '0XF4264876,0,0XDF9B30D7\n'   # <- From undefined, to undefined.
@@ -705,6 +760,7 @@ class TestReadFromStdin(DataSpaceFixturesMixin, unittest.TestCase):
             match_limit=1,
             allow_overlapping=False,
             allow_incomplete=False,
+            update=False,
             stdin=DummyRedirection(
                 'index_c,population,index_d\n'
                 '1X73808335,10,1X583DFB94\n'
@@ -787,6 +843,7 @@ class TestReadFromStdin(DataSpaceFixturesMixin, unittest.TestCase):
             match_limit=2,  # <- Allow up to one-to-two matches.
             allow_overlapping=False,  # <- Default (no overlapping allowed).
             allow_incomplete=False,
+            update=False,
             stdin=DummyRedirection(
                 'index_c,population,index_d,lbl1,lbl2\n'
                 '1X73808335,90,,A,\n'             # <- Matched to 2 right-side records.
@@ -840,6 +897,7 @@ class TestReadFromStdin(DataSpaceFixturesMixin, unittest.TestCase):
             match_limit=2,  # <- Allow up to one-to-two matches.
             allow_overlapping=True,  # <- Allowing overlaps.
             allow_incomplete=False,
+            update=False,
             stdin=DummyRedirection(
                 'index_c,population,index_d,lbl1,lbl2\n'
                 '1X73808335,90,,A,\n'             # <- Matched to 2 right-side records.
@@ -895,6 +953,7 @@ class TestReadFromStdin(DataSpaceFixturesMixin, unittest.TestCase):
             match_limit=1,
             allow_overlapping=False,
             allow_incomplete=False,  # <- Default (incomplete not allowed).
+            update=False,
             stdin=DummyRedirection(
                 'index_c,population,index_d\n'
                 '0XF4264876,0,0XDF9B30D7\n'
@@ -925,6 +984,7 @@ class TestReadFromStdin(DataSpaceFixturesMixin, unittest.TestCase):
             match_limit=1,
             allow_overlapping=False,
             allow_incomplete=True,  # <- Allowing incomplete matches.
+            update=False,
             stdin=DummyRedirection(
                 'index_c,population,index_d\n'
                 '0XF4264876,0,0XDF9B30D7\n'
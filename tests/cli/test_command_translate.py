@@ -0,0 +1,176 @@
+"""Tests for toron/cli/command_translate.py module."""
+import argparse
+import os
+import tempfile
+from .. import _unittest as unittest
+from toron import DataSpace, bind_file
+
+from toron.cli import command_translate
+from toron.cli.common import ExitCode
+
+
+class TestTranslateFiles(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory(prefix='toron-')
+        self.addCleanup(tmpdir.cleanup)
+        self.directory = tmpdir.name
+        self.output_dir = os.path.join(self.directory, 'out')
+        os.mkdir(self.output_dir)
+
+        source = DataSpace()
+        source.add_index_columns('X')
+        source.insert_index([['X'], ['a1'], ['a2'], ['a3']])
+
+        target = DataSpace()
+        target.add_index_columns('Y', 'Z')
+        target.insert_index([['Y', 'Z'], ['b1', 'z'], ['b2', 'z'], ['b3', 'z']])
+
+        target.add_link(source, 'rel1', is_default=True)
+        target.insert_mappings2(
+            source,
+            'rel1',
+            data=[(1, 1, b'\xc0',  50.0),   # proportion: 0.5
+                  (1, 2, b'\xc0',  50.0),   # proportion: 0.5
+                  (2, 2, b'\xc0', 100.0),   # proportion: 1.0
+                  (3, 3, b'\xc0',  25.0),   # proportion: 0.25
+                  (3, 0, b'\xc0',  75.0)],  # proportion: 0.75
+            columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+        )
+
+        self.source_path = os.path.join(self.directory, 'source.toron')
+        self.target_path = os.path.join(self.directory, 'target.toron')
+        source.to_file(self.source_path)
+        target.to_file(self.target_path)
+
+        self.input_paths = []
+        for name, text in [('county1.csv', 'X,count\na1,10\na2,4\na2,2\n'),
+                           ('county2.csv', 'count,X\n8,a3\n,a1\n5,zz\n')]:
+            path = os.path.join(self.directory, name)
+            with open(path, 'w', newline='') as f:
+                f.write(text)
+            self.input_paths.append(path)
+
+    def make_args(self, **kwds):
+        args = argparse.Namespace(
+            filepath=self.target_path,
+            source=self.source_path,
+            files=self.input_paths,
+            output_dir=self.output_dir,
+            link=None,
+            value_column=None,
+            jobs=1,
+        )
+        vars(args).update(kwds)
+        return args
+
+    def read_output(self, name):
+        with open(os.path.join(self.output_dir, name), newline='') as f:
+            return f.read()
+
+    def test_translate_files(self):
+        with self.assertLogs('app-toron', level='INFO') as logs_cm:
+            exit_code = command_translate.translate_files(self.make_args())
+
+        self.assertEqual(exit_code, ExitCode.OK)
+        self.assertEqual(
+            self.read_output('county1.csv'),
+            'Y,Z,count\nb1,z,5.0\nb2,z,11.0\n',
+        )
+        self.assertEqual(
+            self.read_output('county2.csv'),
+            'Y,Z,count\n-,-,6.0\nb1,z,0.0\nb2,z,0.0\nb3,z,2.0\n',
+        )
+        self.assertEqual(
+            logs_cm.output,
+            ["INFO:app-toron:using link 'rel1'",
+             "WARNING:app-toron:{0}: skipped 1 records not matching the "
+             "source index".format(self.input_paths[1]),
+             'INFO:app-toron:translated 2 files, written 6 records'],
+        )
+
+    def test_multiple_jobs(self):
+        """Should give the same results when using worker processes."""
+        with self.assertLogs('app-toron', level='INFO') as logs_cm:
+            exit_code = command_translate.translate_files(self.make_args(jobs=2))
+
+        self.assertEqual(exit_code, ExitCode.OK)
+        self.assertEqual(
+            self.read_output('county1.csv'),
+            'Y,Z,count\nb1,z,5.0\nb2,z,11.0\n',
+        )
+        self.assertEqual(
+            logs_cm.output[-1],
+            'INFO:app-toron:translated 2 files, written 6 records',
+        )
+
+    def test_overwrite_input(self):
+        args = self.make_args(output_dir=self.directory)
+
+        with self.assertLogs('app-toron', level='ERROR') as logs_cm:
+            exit_code = command_translate.translate_files(args)
+
+        self.assertEqual(exit_code, ExitCode.ERR)
+        self.assertRegex(logs_cm.output[0], 'output would overwrite')
+
+    def test_duplicate_basenames(self):
+        other_dir = os.path.join(self.directory, 'other')
+        os.mkdir(other_dir)
+        other_path = os.path.join(other_dir, 'county1.csv')
+        with open(other_path, 'w', newline='') as f:
+            f.write('X,count\na1,10\n')
+        args = self.make_args(files=self.input_paths + [other_path])
+
+        with self.assertLogs('app-toron', level='ERROR') as logs_cm:
+            exit_code = command_translate.translate_files(args)
+
+        self.assertEqual(exit_code, ExitCode.ERR)
+        self.assertRegex(logs_cm.output[0], "would both be written to 'county1.csv'")
+        self.assertEqual(os.listdir(self.output_dir), [], msg='nothing should be written')
+
+    def test_undefined_record(self):
+        """Values of the undefined record should remain undefined."""
+        path = os.path.join(self.directory, 'county3.csv')
+        with open(path, 'w', newline='') as f:
+            f.write('X,count\n-,3\na1,10\n')
+
+        with self.assertLogs('app-toron', level='INFO'):
+            command_translate.translate_files(self.make_args(files=[path]))
+
+        self.assertEqual(
+            self.read_output('county3.csv'),
+            'Y,Z,count\n-,-,3.0\nb1,z,5.0\nb2,z,5.0\n',
+        )
+
+    def test_value_column_and_selectors(self):
+        """Attributes should select links the same way NodeReader does."""
+        target = bind_file(self.target_path, mode='rw')
+        source = bind_file(self.source_path, mode='ro')
+        target.add_link(source, 'rel2', selectors=['[sex="F"]'])
+        target.insert_mappings2(
+            source,
+            'rel2',
+            data=[(1, 3, b'\xc0', 100.0),
+                  (2, 1, b'\xc0', 100.0),
+                  (3, 2, b'\xc0', 100.0)],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+        )
+        del target, source
+
+        path = os.path.join(self.directory, 'county3.csv')
+        with open(path, 'w', newline='') as f:
+            f.write('X,sex,count\na1,M,10\na1,F,10\na2,F,4\n')
+
+        for jobs in [1, 2]:
+            args = self.make_args(files=[path, self.input_paths[0]], value_column='count', jobs=jobs)
+            with self.assertLogs('app-toron', level='INFO'):
+                exit_code = command_translate.translate_files(args)
+
+            self.assertEqual(exit_code, ExitCode.OK)
+            self.assertEqual(
+                self.read_output('county3.csv'),
+                'Y,Z,sex,count\nb1,z,M,5.0\nb2,z,M,5.0\nb1,z,F,4.0\nb3,z,F,10.0\n',
+            )
+            self.assertEqual(
+                self.read_output('county1.csv'),
+                'Y,Z,count\nb1,z,5.0\nb2,z,11.0\n',
+            )
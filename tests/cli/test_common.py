@@ -1,7 +1,7 @@
 """Tests for toron/cli/common.py module."""
 import logging
 import uuid
-from io import BytesIO, TextIOWrapper
+from io import BytesIO, StringIO, TextIOWrapper
 from .. import _unittest as unittest
 from ..common import (  # <- tests/common.py (not cli/common.py)
     StreamWrapperMixin,
@@ -11,6 +11,7 @@ from ..common import (  # <- tests/common.py (not cli/common.py)
 
 from toron.cli.common import (
     csv_stdout_writer,
+    PipelinedCSVReader,
     normalize_arg_list,
     ansi_codes,
     StyleCodes,
@@ -45,6 +46,42 @@ class TestCsvStdoutWriter(StreamWrapperMixin, unittest.TestCase):
         self.assertStream(dummy_stdout, 'ƒóó,ɓàŕ,Ƅɑž\n')
 
 
+class TestPipelinedCSVReader(unittest.TestCase):
+    def test_rows(self):
+        stream = StringIO('A,B\r\nfoo,1\r\nbar,2\r\n"baz,qux",3\r\n')
+        reader = PipelinedCSVReader(stream, chunk_size=2, max_chunks=1)
+
+        rows = list(reader)
+
+        expected = [['A', 'B'], ['foo', '1'], ['bar', '2'], ['baz,qux', '3']]
+        self.assertEqual(rows, expected)
+        self.assertEqual(reader.stats['rows'], 4)
+        self.assertEqual(
+            set(reader.stats),
+            {'rows', 'parse_time', 'parse_wait', 'write_wait'},
+        )
+
+    def test_parse_error(self):
+        """Errors raised while parsing should be raised in the consumer."""
+        def stream():
+            yield 'A,B\n'
+            raise ValueError('unable to read stream')
+
+        reader = PipelinedCSVReader(stream(), chunk_size=1)
+
+        with self.assertRaisesRegex(ValueError, 'unable to read stream'):
+            list(reader)
+
+    def test_stop_early(self):
+        """Consumer should be able to stop before stream is exhausted."""
+        stream = StringIO(''.join(f'{i},x\n' for i in range(100)))
+        reader = PipelinedCSVReader(stream, chunk_size=1, max_chunks=1)
+
+        iterator = iter(reader)
+        self.assertEqual(next(iterator), ['0', 'x'])
+        iterator.close()  # <- Should not block on full queue.
+
+
 class TestNormalizeArgList(unittest.TestCase):
     def test_unchanged(self):
         self.assertEqual(
@@ -18,6 +18,8 @@ from toron.cli.main import (
     command_quantity,
     command_mapping,
     command_info,
+    command_catalog,
+    command_translate,
     main,
 )
 
@@ -496,6 +498,7 @@ class TestToronArgumentParser(StreamWrapperMixin, unittest.TestCase):
                 match_limit=1,
                 allow_overlapping=False,
                 allow_incomplete=False,
+                update=False,
                 backup=True,
                 func=command_mapping.process_mapping_action,
             ),
@@ -515,6 +518,56 @@ class TestToronArgumentParser(StreamWrapperMixin, unittest.TestCase):
             ),
         )
 
+    def test_subcommand_catalog(self):
+        """Check "catalog" subparsers."""
+        self.assertEqual(
+            self.parser.parse_args(['mydir', 'catalog', 'build']),
+            argparse.Namespace(
+                filepath='mydir',
+                command='catalog',
+                action='build',
+                func=command_catalog.build_catalog,
+            ),
+        )
+
+        self.assertEqual(
+            self.parser.parse_args(['mydir', 'catalog', 'path', 'a.toron', 'c.toron']),
+            argparse.Namespace(
+                filepath='mydir',
+                command='catalog',
+                action='path',
+                source='a.toron',
+                target='c.toron',
+                func=command_catalog.write_path_to_stdout,
+            ),
+        )
+
+    def test_subcommand_translate(self):
+        """Check "translate" subparser."""
+        self.assertEqual(
+            self.parser.parse_args([
+                'target.toron', 'translate', '--from', 'source.toron',
+                'a.csv', 'b.csv', '-o', 'outdir', '--jobs', '4',
+            ]),
+            argparse.Namespace(
+                filepath='target.toron',
+                command='translate',
+                files=['a.csv', 'b.csv'],
+                source='source.toron',
+                output_dir='outdir',
+                link=None,
+                value_column=None,
+                jobs=4,
+                func=command_translate.translate_files,
+            ),
+        )
+
+        with self.assertRaises(SystemExit):
+            self.parser.parse_args([
+                'target.toron', 'translate', '--from', 'source.toron',
+                'a.csv', '-o', 'outdir', '--jobs', '0',
+            ])
+
     def test_subcommand_default(self):
         """When no COMMAND is given, should default to 'info'."""
         self.assertEqual(
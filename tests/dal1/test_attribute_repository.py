@@ -104,3 +104,26 @@ class TestAttributeGroupRepository(unittest.TestCase):
 
         repository.delete_and_cascade(3)  # No attribute_group_id=3, should pass without error.
         self.assertRecords([])
+
+    def test_get_by_value_add_if_missing_cache(self):
+        repository = AttributeGroupRepository(self.cursor)
+
+        self.assertEqual(
+            repository.get_by_value_add_if_missing({'aaa': 'A', 'bbb': 'B'}),
+            AttributeGroup(1, {'aaa': 'A', 'bbb': 'B'}),
+        )
+
+        self.cursor.execute('DELETE FROM attribute_group')  # <- Not seen by cache.
+        self.assertEqual(
+            repository.get_by_value_add_if_missing({'bbb': 'B', 'aaa': 'A'}),
+            AttributeGroup(1, {'aaa': 'A', 'bbb': 'B'}),
+            msg='should return cached record (keys are matched in any order)',
+        )
+
+        repository.delete_and_cascade(1)
+        self.assertEqual(
+            repository.get_by_value_add_if_missing({'aaa': 'A', 'bbb': 'B'}),
+            AttributeGroup(1, {'aaa': 'A', 'bbb': 'B'}),
+            msg='cache should be cleared when records are deleted',
+        )
+        self.assertRecords([(1, {'aaa': 'A', 'bbb': 'B'})])
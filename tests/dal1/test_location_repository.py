@@ -103,3 +103,30 @@ class TestLocationRepository(unittest.TestCase):
             repository.delete_and_cascade(42)
         except Exception as err:
             self.fail(f'deleting non-existant ids should not raise errors, got {err!r}')
+
+    def test_get_by_labels_add_if_missing_cache(self):
+        repository = LocationRepository(self.cursor, cache_size=1)
+
+        location = repository.get_by_labels_add_if_missing({'A': 'foo', 'B': 'x'})
+        self.assertEqual(location, Location(1, 'foo', 'x'))
+
+        self.cursor.execute("UPDATE label_location SET B='y'")  # <- Not seen by cache.
+        self.assertEqual(
+            repository.get_by_labels_add_if_missing({'A': 'foo', 'B': 'x'}),
+            Location(1, 'foo', 'x'),
+            msg='should return cached record',
+        )
+
+        repository.get_by_labels_add_if_missing({'A': 'bar', 'B': 'x'})
+        self.assertEqual(
+            repository.get_by_labels_add_if_missing({'A': 'foo', 'B': 'x'}),
+            Location(3, 'foo', 'x'),
+            msg='oldest record should be removed when cache is full',
+        )
+
+        repository.update(Location(3, 'baz', 'z'))
+        self.assertEqual(
+            repository.get_by_labels_add_if_missing({'A': 'foo', 'B': 'x'}),
+            Location(4, 'foo', 'x'),
+            msg='cache should be cleared when records are updated',
+        )
@@ -1,5 +1,6 @@
 """Tests for MappingRepository class."""
 
+import array
 import sqlite3
 import unittest
 
@@ -62,6 +63,64 @@ class TestMappingRepository(unittest.TestCase):
             (8, 10, 2, 4, b'\xf0',  8.0, None),
         ])
 
+    def test_add_many(self):
+        repository = MappingRepository(self.cursor)
+
+        count = repository.add_many([
+            (9, 1, 1, b'\xf0',  5.0),
+            (9, 1, 2, b'\xf0',  3.0),
+            (9, 2, 3, b'\xf0', 11.0),
+            (9, 2, 4, b'\x10',  7.0),
+        ])
+
+        self.assertEqual(count, 4)
+        self.assertRecords([
+            (1, 9, 1, 1, b'\xf0',  5.0, None),
+            (2, 9, 1, 2, b'\xf0',  3.0, None),
+            (3, 9, 2, 3, b'\xf0', 11.0, None),
+            (4, 9, 2, 4, b'\x10',  7.0, None),
+        ])
+
+        msg = 'should fail, `other_index_id` and `index_id` pairs must be unique per edge'
+        with self.assertRaises(sqlite3.IntegrityError, msg=msg):
+            repository.add_many([(9, 1, 2, b'\xf0', 17.0)])
+
+        msg = 'should fail, undefined-to-undefined mapping is invalid'
+        with self.assertRaises(ValueError, msg=msg):
+            repository.add_many([(9, 0, 0, b'\xf0', 17.0)])
+
+        msg = 'should fail, mapping_level must be bytes'
+        with self.assertRaises(TypeError, msg=msg):
+            repository.add_many([(9, 3, 3, 'F0', 17.0)])
+
+    def test_add_many_staged(self):
+        repository = MappingRepository(self.cursor)
+
+        count = repository.add_many(
+            [(9, 2, 4, b'\x10',  7.0),
+             (9, 1, 2, b'\xf0',  3.0),
+             (9, 2, 3, b'\xf0', 11.0),
+             (9, 1, 1, b'\xf0',  5.0)],
+            staged=True,
+        )
+
+        self.assertEqual(count, 4)
+        self.assertRecords(
+            [(1, 9, 1, 1, b'\xf0',  5.0, None),
+             (2, 9, 1, 2, b'\xf0',  3.0, None),
+             (3, 9, 2, 3, b'\xf0', 11.0, None),
+             (4, 9, 2, 4, b'\x10',  7.0, None)],
+            msg='staged records should be inserted in unique-key order',
+        )
+
+        self.cursor.execute("SELECT name FROM temp.sqlite_master WHERE name='mapping_staging'")
+        self.assertIsNone(self.cursor.fetchone(), msg='staging table should be dropped')
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            repository.add_many([(9, 3, 3, b'\xf0', 1.0), (9, 1, 1, b'\xf0', 1.0)], staged=True)
+        self.cursor.execute("SELECT name FROM temp.sqlite_master WHERE name='mapping_staging'")
+        self.assertIsNone(self.cursor.fetchone(), msg='staging table should be dropped on error')
+
     def test_get(self):
         self.cursor.executescript("""
             INSERT INTO mapping VALUES (1, 9, 1, 1, X'F0', 5.0, NULL);
@@ -137,3 +196,278 @@ class TestMappingRepository(unittest.TestCase):
             repository.mapping_is_complete(link_id=5),
             msg='Mapping is complete, should return True.'
         )
+
+    def test_mapping_is_complete_coverage_counts(self):
+        """Coverage counts should only change when the first mapping
+        for an index_id is added or the last one is removed.
+        """
+        self.cursor.executescript("""
+            ALTER TABLE main.label_index ADD COLUMN
+                A TEXT NOT NULL CHECK (A != '') DEFAULT '-';
+
+            INSERT INTO label_index VALUES (1, 'foo');
+            INSERT INTO label_index VALUES (2, 'bar');
+
+            INSERT INTO mapping VALUES (1, 5, 1, 1, X'80', 125.0, NULL);
+            INSERT INTO mapping VALUES (2, 5, 2, 1, X'80', 100.0, NULL);
+            INSERT INTO mapping VALUES (3, 5, 3, 0, X'80', 50.0, NULL);
+        """)
+        repository = MappingRepository(self.cursor)
+
+        self.cursor.execute('SELECT * FROM link_coverage')
+        self.assertEqual(self.cursor.fetchall(), [(5, 1)])
+
+        # Change index_id of a duplicate mapping (first for index_id 2).
+        self.cursor.execute('UPDATE mapping SET index_id=2 WHERE mapping_id=2')
+        self.assertTrue(repository.mapping_is_complete(link_id=5))
+
+        repository.delete(1)  # Removes last mapping for index_id 1.
+        self.assertFalse(repository.mapping_is_complete(link_id=5))
+
+        self.cursor.execute('SELECT * FROM link_coverage')
+        self.assertEqual(self.cursor.fetchall(), [(5, 1)])
+
+    def test_get_proportion_arrays(self):
+        self.cursor.executescript("""
+            INSERT INTO link (link_id, other_unique_id, name) VALUES (5, 'aaa', 'x');
+            INSERT INTO mapping VALUES (1, 5, 1, 2, X'F0', 375.0, 0.75);
+            INSERT INTO mapping VALUES (2, 5, 1, 1, X'F0', 125.0, 0.25);
+            INSERT INTO mapping VALUES (3, 5, 3, 3, X'10', 620.0, 1.00);
+            INSERT INTO mapping VALUES (4, 5, 9000000000, 3, X'10', 5.0, 1.00);
+            INSERT INTO mapping VALUES (5, 6, 1, 1, X'F0', 100.0, 1.00);
+        """)
+        repository = MappingRepository(self.cursor)
+
+        def stored_links():
+            self.cursor.execute('SELECT link_id FROM link_csr')
+            return self.cursor.fetchall()
+
+        arrays = repository.get_proportion_arrays(5)
+        other_index_ids, offsets, index_ids, proportions = arrays
+        self.assertEqual(other_index_ids, array.array('q', [1, 3, 9000000000]))
+        self.assertEqual(offsets, array.array('q', [0, 2, 3, 4]))
+        self.assertEqual(index_ids, array.array('q', [1, 2, 3, 3]))
+        self.assertEqual(proportions, array.array('d', [0.25, 0.75, 1.0, 1.0]))
+        self.assertEqual(stored_links(), [(5,)], msg='saved outside of a transaction')
+
+        self.cursor.execute('DELETE FROM link_csr')
+        self.cursor.execute('BEGIN TRANSACTION')
+        self.assertEqual(repository.get_proportion_arrays(5), arrays)
+        self.assertEqual(stored_links(), [(5,)], msg='saved inside a transaction')
+        self.cursor.execute('COMMIT TRANSACTION')
+
+        self.assertEqual(
+            repository.get_proportion_arrays(5),
+            arrays,
+            msg='stored arrays should round-trip',
+        )
+
+        self.assertEqual(
+            repository.get_proportion_arrays(7),
+            (array.array('q'), array.array('q', [0]), array.array('q'), array.array('d')),
+            msg='link with no mappings',
+        )
+
+    def test_get_proportion_arrays_undefined_proportion(self):
+        self.cursor.executescript("""
+            INSERT INTO mapping VALUES (1, 5, 1, 1, X'F0', 125.0, 0.25);
+            INSERT INTO mapping VALUES (2, 5, 1, 2, X'F0', 375.0, NULL);
+        """)
+        repository = MappingRepository(self.cursor)
+
+        regex = 'link 5 has mappings with undefined proportions'
+        with self.assertRaisesRegex(ValueError, regex):
+            repository.get_proportion_arrays(5)
+
+    def test_proportion_arrays_invalidation(self):
+        self.cursor.executescript("""
+            INSERT INTO link (link_id, other_unique_id, name) VALUES (5, 'aaa', 'x');
+            INSERT INTO link (link_id, other_unique_id, name) VALUES (6, 'bbb', 'x');
+            INSERT INTO mapping VALUES (1, 5, 1, 1, X'F0', 125.0, 0.25);
+            INSERT INTO mapping VALUES (2, 5, 1, 2, X'F0', 375.0, 0.75);
+            INSERT INTO mapping VALUES (3, 6, 1, 1, X'F0', 100.0, 1.00);
+        """)
+        repository = MappingRepository(self.cursor)
+
+        def stored_links():
+            self.cursor.execute('SELECT link_id FROM link_csr ORDER BY link_id')
+            return [row[0] for row in self.cursor.fetchall()]
+
+        self.cursor.execute('BEGIN TRANSACTION')
+        repository.get_proportion_arrays(5)
+        repository.get_proportion_arrays(6)
+
+        repository.update(MappingRecord(1, 5, 1, 1, b'\xf0', 500.0, 0.25))
+        self.assertEqual(stored_links(), [5, 6], msg='value change should keep arrays')
+
+        repository.refresh_proportions_for_link(5, [1])
+        self.assertEqual(stored_links(), [6], msg='partial refresh should discard arrays')
+
+        repository.refresh_proportions_for_link(5)
+        self.assertEqual(stored_links(), [5, 6], msg='full refresh should save new arrays')
+        _, _, _, proportions = repository.get_proportion_arrays(5)
+        self.assertEqual(proportions, array.array('d', [0.5714285714285714, 0.42857142857142855]))
+
+        repository.add(6, 2, 2, b'\xf0', 50.0, 1.0)
+        self.assertEqual(stored_links(), [5], msg='add should discard arrays')
+
+        repository.delete(1)
+        self.assertEqual(stored_links(), [], msg='delete should discard arrays')
+
+        repository.get_proportion_arrays(6)
+        repository.add_many([(6, 3, 3, b'\xf0', 5.0)])
+        self.assertEqual(stored_links(), [], msg='add_many should discard arrays')
+        self.cursor.execute('COMMIT TRANSACTION')
+
+    def test_get_revision(self):
+        self.cursor.executescript("""
+            INSERT INTO link (link_id, other_unique_id, name) VALUES (5, 'aaa', 'x');
+            INSERT INTO mapping VALUES (1, 5, 1, 1, X'F0', 125.0, 0.25);
+            INSERT INTO mapping VALUES (2, 5, 1, 2, X'F0', 375.0, 0.75);
+        """)
+        repository = MappingRepository(self.cursor)
+
+        revision = repository.get_revision(5)
+        self.assertRegex(revision, '^[0-9A-F]{32}$')
+
+        repository.update(MappingRecord(1, 5, 1, 1, b'\xf0', 500.0, 0.25))
+        self.assertEqual(repository.get_revision(5), revision, msg='value change should keep revision')
+
+        repository.refresh_proportions_for_link(5)
+        new_revision = repository.get_revision(5)
+        self.assertNotEqual(new_revision, revision, msg='proportion change should replace revision')
+
+        repository.delete(2)
+        self.assertNotEqual(repository.get_revision(5), new_revision, msg='delete should replace revision')
+
+        self.assertIsNone(repository.get_revision(6), msg='no mappings')
+
+    def test_deferred_link_caches(self):
+        self.cursor.executescript("""
+            INSERT INTO link (link_id, other_unique_id, name) VALUES (5, 'aaa', 'x');
+            INSERT INTO link (link_id, other_unique_id, name) VALUES (6, 'bbb', 'x');
+            INSERT INTO mapping VALUES (1, 5, 1, 1, X'F0', 125.0, 0.25);
+            INSERT INTO mapping VALUES (2, 6, 1, 1, X'F0', 100.0, 1.00);
+        """)
+        repository = MappingRepository(self.cursor)
+
+        def stored_links():
+            self.cursor.execute('SELECT link_id FROM link_csr ORDER BY link_id')
+            return [row[0] for row in self.cursor.fetchall()]
+
+        def revisions():
+            self.cursor.execute('SELECT * FROM mapping_revision ORDER BY link_id')
+            return dict(self.cursor.fetchall())
+
+        self.cursor.execute('BEGIN TRANSACTION')
+        repository.get_proportion_arrays(5)
+        repository.get_proportion_arrays(6)
+        before = revisions()
+
+        with repository._deferred_link_caches([5, 5]):
+            self.cursor.execute("INSERT INTO mapping VALUES (3, 5, 2, 2, X'F0', 50.0, NULL)")
+            self.cursor.execute("INSERT INTO mapping VALUES (4, 5, 3, 3, X'F0', 50.0, NULL)")
+            self.assertEqual(stored_links(), [5, 6], msg='row triggers should skip deferred link')
+            self.assertIsNone(revisions()[5], msg='revision is NULL while deferred')
+
+        self.assertEqual(stored_links(), [6], msg='arrays discarded on exit')
+        after = revisions()
+        self.assertIsNotNone(after[5])
+        self.assertNotEqual(after[5], before[5], msg='new revision assigned on exit')
+        self.assertEqual(after[6], before[6], msg='other links unchanged')
+
+        repository.add(6, 2, 2, b'\xf0', 50.0)
+        self.assertEqual(stored_links(), [], msg='single-row add still fires triggers')
+        self.assertNotEqual(revisions()[6], before[6])
+        self.cursor.execute('COMMIT TRANSACTION')
+
+    def test_bulk_writes_invalidate_once(self):
+        self.cursor.executescript("""
+            INSERT INTO link (link_id, other_unique_id, name) VALUES (5, 'aaa', 'x');
+            INSERT INTO link (link_id, other_unique_id, name) VALUES (6, 'bbb', 'x');
+            INSERT INTO mapping VALUES (1, 5, 1, 1, X'F0', 125.0, 0.25);
+            INSERT INTO mapping VALUES (2, 6, 1, 1, X'F0', 100.0, 1.00);
+        """)
+        repository = MappingRepository(self.cursor)
+
+        # Count revision changes made while the statement runs.
+        self.cursor.executescript("""
+            CREATE TEMP TABLE revision_log (link_id INTEGER, revision BLOB);
+            CREATE TEMP TRIGGER log_revision_update
+            AFTER UPDATE OF revision ON main.mapping_revision
+            BEGIN
+                INSERT INTO revision_log VALUES (NEW.link_id, NEW.revision);
+            END;
+        """)
+
+        def logged_revisions():
+            self.cursor.execute('SELECT link_id, revision IS NULL FROM revision_log')
+            rows = self.cursor.fetchall()
+            self.cursor.execute('DELETE FROM revision_log')
+            return rows
+
+        repository.add_many([(5, n, n, b'\xf0', 1.0) for n in range(2, 12)])
+        self.assertEqual(logged_revisions(), [(5, 1), (5, 0)], msg='deferred then bumped once')
+
+        repository.delete_many(range(3, 13))
+        self.assertEqual(logged_revisions(), [(5, 1), (5, 0)], msg='deferred then bumped once')
+
+        self.cursor.execute('SELECT mapping_id FROM mapping ORDER BY mapping_id')
+        self.assertEqual(self.cursor.fetchall(), [(1,), (2,)])
+
+    def test_get_mapping_stats(self):
+        self.cursor.executescript("""
+            INSERT INTO link (link_id, other_unique_id, name) VALUES (5, 'aaa', 'x');
+            INSERT INTO mapping VALUES (1, 5, 1, 1, X'F0', 125.0, 0.25);
+            INSERT INTO mapping VALUES (2, 5, 1, 2, X'F0', 375.0, 0.75);
+            INSERT INTO mapping VALUES (3, 5, 2, 2, X'F0', 100.0, 1.00);
+            INSERT INTO mapping VALUES (4, 5, 0, 3, X'F0',   0.0, 0.00);
+            INSERT INTO mapping VALUES (5, 6, 1, 1, X'F0', 100.0, 1.00);
+        """)
+        repository = MappingRepository(self.cursor)
+
+        expected = {'index_id_cardinality': 4, 'other_index_id_cardinality': 3}
+        self.assertEqual(repository.get_mapping_stats(5), expected)
+        self.cursor.execute('SELECT * FROM link_stats')
+        self.assertEqual(self.cursor.fetchall(), [(5, 3, 2)], msg='saved outside of a transaction')
+
+        self.cursor.execute('DELETE FROM link_stats')
+        self.cursor.execute('BEGIN TRANSACTION')
+        self.assertEqual(repository.get_mapping_stats(5), expected)
+        self.cursor.execute('SELECT * FROM link_stats')
+        self.assertEqual(self.cursor.fetchall(), [(5, 3, 2)], msg='saved inside a transaction')
+        self.assertEqual(repository.get_mapping_stats(5), expected)
+
+        repository.add(5, 3, 4, b'\xf0', 50.0)
+        self.cursor.execute('SELECT * FROM link_stats')
+        self.assertEqual(self.cursor.fetchall(), [], msg='add should discard stats')
+        self.assertEqual(
+            repository.get_mapping_stats(5),
+            {'index_id_cardinality': 5, 'other_index_id_cardinality': 4},
+        )
+        self.cursor.execute('COMMIT TRANSACTION')
+
+    def test_read_only_cache(self):
+        """Derived values should be returned but not saved when the
+        database cannot be written.
+        """
+        self.cursor.executescript("""
+            INSERT INTO link (link_id, other_unique_id, name) VALUES (5, 'aaa', 'x');
+            INSERT INTO mapping VALUES (1, 5, 1, 1, X'F0', 125.0, 0.25);
+            INSERT INTO mapping VALUES (2, 5, 1, 2, X'F0', 375.0, 0.75);
+            PRAGMA query_only=ON;
+        """)
+        self.addCleanup(self.cursor.execute, 'PRAGMA query_only=OFF')
+        repository = MappingRepository(self.cursor)
+
+        self.assertEqual(
+            repository.get_mapping_stats(5),
+            {'index_id_cardinality': 3, 'other_index_id_cardinality': 2},
+        )
+        _, _, _, proportions = repository.get_proportion_arrays(5)
+        self.assertEqual(proportions, array.array('d', [0.25, 0.75]))
+
+        self.cursor.execute('SELECT COUNT(*) FROM link_stats')
+        self.assertEqual(self.cursor.fetchone(), (0,))
+        self.cursor.execute('SELECT COUNT(*) FROM link_csr')
+        self.assertEqual(self.cursor.fetchone(), (0,))
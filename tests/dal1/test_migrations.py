@@ -2,6 +2,7 @@
 import sqlite3
 import unittest
 
+from toron._utils import ChunkedSequenceHash
 from toron.dal1.migrations import (
     v020_to_v030_step01_link_table,
     v020_to_v030_step02_relation_table,
@@ -9,6 +10,11 @@ from toron.dal1.migrations import (
     v020_to_v030_step04_rename_label_tables,
     v020_to_v030_step05_properties,
     v030_to_v031_step01_properties,
+    v031_to_v032_step01_link_csr_table,
+    v031_to_v032_step02_link_stats_table,
+    v031_to_v032_step03_mapping_index,
+    v031_to_v032_step04_coverage_tables,
+    v031_to_v032_step05_index_hash_chunks,
     apply_migrations,
 )
 
@@ -449,6 +455,127 @@ class TestApplyMigrations(unittest.TestCase):
         self.cur.execute("SELECT value from property where key='user_properties'")
         self.assertEqual(self.cur.fetchone()[0], '{}')
 
+    def test_v031_to_v032_step01_link_csr_table(self):
+        self.cur.executescript("""
+            CREATE TABLE link(link_id INTEGER PRIMARY KEY);
+        """)
+
+        v031_to_v032_step01_link_csr_table(self.cur)  # <- Function under test.
+
+        self.cur.execute('PRAGMA main.table_info(link_csr)')
+        columns = [row[1] for row in self.cur.fetchall()]
+        self.assertEqual(columns, ['link_id', 'other_index_ids', 'offsets', 'index_ids', 'proportions'])
+
+    def test_v031_to_v032_step02_link_stats_table(self):
+        self.cur.executescript("""
+            CREATE TABLE link(link_id INTEGER PRIMARY KEY);
+            CREATE TABLE mapping(mapping_id INTEGER PRIMARY KEY, link_id INTEGER);
+            INSERT INTO link VALUES (1), (2);
+            INSERT INTO mapping VALUES (1, 2);
+        """)
+
+        v031_to_v032_step02_link_stats_table(self.cur)  # <- Function under test.
+
+        self.cur.execute('PRAGMA main.table_info(link_stats)')
+        columns = [row[1] for row in self.cur.fetchall()]
+        self.assertEqual(columns, ['link_id', 'index_id_count', 'other_index_id_count'])
+
+        self.cur.execute('SELECT link_id, length(revision) FROM mapping_revision')
+        self.assertEqual(self.cur.fetchall(), [(2, 16)], msg='only links with mappings')
+
+    def test_v031_to_v032_step03_mapping_index(self):
+        self.cur.executescript("""
+            CREATE TABLE mapping(
+                mapping_id INTEGER PRIMARY KEY,
+                link_id INTEGER,
+                index_id INTEGER
+            );
+        """)
+
+        v031_to_v032_step03_mapping_index(self.cur)  # <- Function under test.
+
+        self.cur.execute('PRAGMA main.index_list(mapping)')
+        indexes = [row[1] for row in self.cur.fetchall()]
+        self.assertEqual(indexes, ['mapping_index_id_idx'])
+
+        self.cur.execute('PRAGMA main.index_info(mapping_index_id_idx)')
+        columns = [row[2] for row in self.cur.fetchall()]
+        self.assertEqual(columns, ['index_id', 'link_id'])
+
+    def test_v031_to_v032_step04_coverage_tables(self):
+        self.cur.executescript("""
+            CREATE TABLE weight_group(weight_group_id INTEGER PRIMARY KEY);
+            CREATE TABLE weight(
+                weight_id INTEGER PRIMARY KEY,
+                weight_group_id INTEGER,
+                index_id INTEGER
+            );
+            CREATE TABLE link(link_id INTEGER PRIMARY KEY);
+            CREATE TABLE mapping(
+                mapping_id INTEGER PRIMARY KEY,
+                link_id INTEGER,
+                index_id INTEGER
+            );
+            INSERT INTO weight_group VALUES (1), (2);
+            INSERT INTO weight VALUES (1, 1, 1), (2, 1, 2), (3, 1, 3);
+            INSERT INTO link VALUES (1), (2);
+            INSERT INTO mapping VALUES (1, 1, 1), (2, 1, 1), (3, 1, 2), (4, 1, 0);
+        """)
+
+        v031_to_v032_step04_coverage_tables(self.cur)  # <- Function under test.
+
+        self.cur.execute('SELECT * FROM weight_group_coverage')
+        self.assertEqual(self.cur.fetchall(), [(1, 3), (2, 0)])
+
+        self.cur.execute('SELECT * FROM link_coverage')
+        self.assertEqual(self.cur.fetchall(), [(1, 2), (2, 0)])
+
+    def test_v031_to_v032_step05_index_hash_chunks(self):
+        self.cur.executescript("""
+            CREATE TABLE label_index(index_id INTEGER PRIMARY KEY);
+            CREATE TABLE link(link_id INTEGER PRIMARY KEY, other_index_hash TEXT);
+            CREATE TABLE mapping(
+                mapping_id INTEGER PRIMARY KEY,
+                link_id INTEGER,
+                other_index_id INTEGER
+            );
+            CREATE TABLE property(
+                key TEXT PRIMARY KEY NOT NULL,
+                value TEXT_JSON
+            );
+            INSERT INTO label_index VALUES (0), (1), (2), (3), (4097);
+            INSERT INTO link VALUES
+                (1, '5dfadd0e50910f561636c47335ecf8316251cbd85964eadb5c00103502edf177'),
+                (2, 'unknown hash value');
+            INSERT INTO mapping VALUES (1, 1, 1), (2, 1, 2), (3, 1, 2), (4, 2, 1);
+            INSERT INTO "property" VALUES('toron_schema_version', '"0.3.1"');
+            INSERT INTO "property" VALUES('index_hash', '"old hash value"');
+        """)
+
+        v031_to_v032_step05_index_hash_chunks(self.cur)  # <- Function under test.
+
+        self.cur.execute("SELECT value from property where key='toron_schema_version'")
+        self.assertEqual(self.cur.fetchone()[0], '"0.3.2"')
+
+        self.cur.execute('SELECT chunk_id FROM index_hash_chunk')
+        self.assertEqual(self.cur.fetchall(), [(0,), (1,)])
+
+        self.cur.execute('SELECT * FROM link_hash_chunk')
+        self.assertEqual(self.cur.fetchall(), [(1, 0, None), (2, 0, None)])
+
+        self.cur.execute("SELECT value from property where key='index_hash'")
+        self.assertEqual(
+            self.cur.fetchone()[0],
+            '"{0}"'.format(ChunkedSequenceHash([0, 1, 2, 3, 4097]).get_hexdigest()),
+        )
+
+        self.cur.execute('SELECT * FROM link')
+        self.assertEqual(
+            self.cur.fetchall(),
+            [(1, ChunkedSequenceHash([0, 1, 2]).get_hexdigest()),  # <- Converted.
+             (2, 'unknown hash value')],  # <- Unchanged, did not match mappings.
+        )
+
     def test_apply_migrations(self):
         self.cur.executescript(FULL_NODE_SCHEMA_V_020)
 
@@ -456,11 +583,23 @@ class TestApplyMigrations(unittest.TestCase):
             apply_migrations(self.cur)  # <- Function under test.
 
         self.cur.execute("SELECT value from property where key='toron_schema_version'")
-        self.assertEqual(self.cur.fetchone()[0], '"0.3.1"')
+        self.assertEqual(self.cur.fetchone()[0], '"0.3.2"')
 
         self.cur.execute("SELECT value from property where key='domain'")
         self.assertEqual(self.cur.fetchone()[0], '"baz_qux_foo_bar"')
 
+        self.cur.execute("SELECT value from property where key='index_hash'")
+        self.assertEqual(
+            self.cur.fetchone()[0],
+            '"c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6"',
+        )
+
+        self.cur.execute('SELECT other_index_hash FROM link')
+        self.assertEqual(
+            self.cur.fetchone()[0],
+            '2dc005b857984c5d8808f9a97472bd3547062c9258a7d28902cf02ab6270f3d6',
+        )
+
         self.cur.execute("SELECT value from property where key='registered_attributes'")
         self.assertEqual(self.cur.fetchone()[0], '["category"]')
 
@@ -59,15 +59,22 @@ class TestCreateNodeSchema(unittest.TestCase):
         tables = self.get_tables(self.cur)
         expected = {
             'attribute_group',
+            'index_hash_chunk',
             'label_index',
             'label_location',
             'label_structure',
             'link',
+            'link_coverage',
+            'link_csr',
+            'link_hash_chunk',
+            'link_stats',
             'property',
             'quantity',
             'mapping',
+            'mapping_revision',
             'weight',
             'weight_group',
+            'weight_group_coverage',
             'sqlite_sequence',  # <- Table added by SQLite.
         }
         self.assertSetEqual(tables, expected)
@@ -85,6 +92,23 @@ class TestCreateNodeSchema(unittest.TestCase):
         with self.assertRaisesRegex(RuntimeError, regex):
             create_node_schema(self.cur)
 
+    def test_coverage_probe_uses_index(self):
+        """The link coverage triggers check for other mappings of the
+        same index_id and link for every row written. This check must
+        use an index led by index_id--if it searches by link_id alone,
+        it scans all of the link's mappings and bulk writes become
+        quadratic.
+        """
+        create_node_schema(self.cur)
+
+        self.cur.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT 1 FROM mapping WHERE index_id=1 AND link_id=1
+        """)
+        details = [row[-1] for row in self.cur.fetchall()]
+        self.assertEqual(len(details), 1)
+        self.assertIn('mapping_index_id_idx (index_id=? AND link_id=?)', details[0])
+
     def test_unique_id(self):
         """Each node should get its own 'unique_id' value."""
         make_connection = \
@@ -134,3 +134,31 @@ class TestWeightRepository(unittest.TestCase):
             repository.weight_group_is_complete(weight_group_id=1),
             msg='Weight group is complete, should return True.'
         )
+
+    def test_weight_group_is_complete_coverage_counts(self):
+        """Coverage counts should follow inserts, updates, and deletes."""
+        repository = WeightRepository(self.cursor)
+
+        self.cursor.executescript("""
+            ALTER TABLE main.label_index ADD COLUMN
+                A TEXT NOT NULL CHECK (A != '') DEFAULT '-';
+
+            INSERT INTO label_index VALUES (1, 'foo');
+            INSERT INTO label_index VALUES (2, 'bar');
+
+            INSERT INTO weight VALUES (1, 1, 1, 3.0);
+            INSERT INTO weight VALUES (2, 2, 2, 7.0);
+        """)
+        self.assertFalse(repository.weight_group_is_complete(1))
+        self.assertFalse(repository.weight_group_is_complete(2))
+
+        # Move weight from group 2 into group 1.
+        repository.update(Weight(id=2, weight_group_id=1, index_id=2, value=7.0))
+        self.assertTrue(repository.weight_group_is_complete(1))
+        self.assertFalse(repository.weight_group_is_complete(2))
+
+        repository.delete(1)
+        self.assertFalse(repository.weight_group_is_complete(1))
+
+        self.cursor.execute('SELECT * FROM weight_group_coverage')
+        self.assertEqual(self.cursor.fetchall(), [(1, 1), (2, 0)])
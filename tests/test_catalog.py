@@ -0,0 +1,125 @@
+"""Tests for toron/catalog.py module."""
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+
+from toron import DataSpace
+from toron.catalog import Catalog, CATALOG_FILENAME
+
+
+def make_linked_files(directory):
+    """Make three linked node files in *directory* (a -> b -> c)."""
+    node_a = DataSpace()
+    node_a.set_domain('a')
+    node_a.add_index_columns('X')
+    node_a.insert_index([['X'], ['a1'], ['a2']])
+
+    node_b = DataSpace()
+    node_b.set_domain('b')
+    node_b.add_index_columns('Y')
+    node_b.insert_index([['Y'], ['b1'], ['b2']])
+
+    node_c = DataSpace()
+    node_c.set_domain('c')
+    node_c.add_index_columns('Z')
+    node_c.insert_index([['Z'], ['c1']])
+
+    columns = ['other_index_id', 'index_id', 'mapping_level', 'value']
+    node_b.add_link(node_a, 'ab', is_default=True)
+    node_b.insert_mappings2(node_a, 'ab', [(1, 1, b'\x80', 1.0), (2, 2, b'\x80', 1.0)], columns)
+    node_c.add_link(node_b, 'bc', is_default=True)
+    node_c.insert_mappings2(node_b, 'bc', [(1, 1, b'\x80', 1.0), (2, 1, b'\x80', 1.0)], columns)
+
+    os.mkdir(os.path.join(directory, 'sub'))
+    node_a.to_file(os.path.join(directory, 'a.toron'))
+    node_b.to_file(os.path.join(directory, 'sub', 'b.toron'))
+    node_c.to_file(os.path.join(directory, 'c.toron'))
+    return node_a, node_b, node_c
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory(prefix='toron-')
+        self.addCleanup(tmpdir.cleanup)
+        self.directory = tmpdir.name
+        self.node_a, self.node_b, self.node_c = make_linked_files(self.directory)
+
+    def test_refresh(self):
+        catalog = Catalog(self.directory)
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, CATALOG_FILENAME)))
+
+        counter = catalog.refresh()
+        self.assertEqual(counter, {'added': 3})
+
+        with closing(sqlite3.connect(catalog.catalog_path)) as con:
+            nodes = con.execute('SELECT path, unique_id, domain FROM node ORDER BY path').fetchall()
+            links = con.execute('SELECT name, other_unique_id FROM link ORDER BY name').fetchall()
+
+        self.assertEqual(nodes, [
+            ('a.toron', self.node_a.unique_id, 'a'),
+            ('c.toron', self.node_c.unique_id, 'c'),
+            ('sub/b.toron', self.node_b.unique_id, 'b'),
+        ])
+        self.assertEqual(links, [
+            ('ab', self.node_a.unique_id),
+            ('bc', self.node_b.unique_id),
+        ])
+
+    def test_incremental_refresh(self):
+        catalog = Catalog(self.directory)
+        catalog.refresh()
+
+        counter = catalog.refresh()
+        self.assertEqual(counter, {'unchanged': 3}, msg='files should not be re-read')
+
+        # Modify one file and remove another.
+        self.node_a.insert_index([['X'], ['a3']])
+        self.node_a.to_file(os.path.join(self.directory, 'a.toron'))
+        os.remove(os.path.join(self.directory, 'c.toron'))
+
+        counter = catalog.refresh()
+        self.assertEqual(counter, {'updated': 1, 'unchanged': 1, 'removed': 1})
+
+    def test_unreadable_file(self):
+        with open(os.path.join(self.directory, 'bad.toron'), 'w') as f:
+            f.write('not a toron file')
+
+        catalog = Catalog(self.directory)
+        with self.assertLogs('app-toron.catalog', level='WARNING'):
+            counter = catalog.refresh()
+        self.assertEqual(counter, {'added': 3, 'failed': 1})
+
+    def test_find_path(self):
+        catalog = Catalog(self.directory)
+        catalog.refresh()
+
+        path_a = os.path.join(self.directory, 'a.toron')
+        path_b = os.path.join(self.directory, 'sub/b.toron')
+        path_c = os.path.join(self.directory, 'c.toron')
+
+        self.assertEqual(catalog.find_path(path_a, path_c), [path_a, path_b, path_c])
+        self.assertEqual(
+            catalog.find_path(self.node_a.unique_id, 'c.toron'),
+            [path_a, path_b, path_c],
+            msg='should accept unique_id and relative path values',
+        )
+        self.assertEqual(catalog.find_path(path_a, path_a), [path_a])
+        self.assertIsNone(catalog.find_path(path_c, path_a), msg='links are directional')
+
+        with self.assertRaises(KeyError):
+            catalog.find_path(path_a, 'missing.toron')
+
+    def test_find_path_stale_link(self):
+        """Links whose other_index_hash is out of date are not usable."""
+        self.node_a.insert_index([['X'], ['a3']])  # <- Changes index_hash.
+        self.node_a.to_file(os.path.join(self.directory, 'a.toron'))
+
+        catalog = Catalog(self.directory)
+        catalog.refresh()
+        self.assertIsNone(catalog.find_path('a.toron', 'c.toron'))
+
+    def test_not_a_directory(self):
+        with self.assertRaises(NotADirectoryError):
+            Catalog(os.path.join(self.directory, 'a.toron'))
@@ -6,6 +6,7 @@ future, it may be best to move or adapt relevant tests to this module
 as well.
 """
 
+import array
 import os
 import tempfile
 import unittest
@@ -32,7 +33,7 @@ from toron.data_models import (
     AttributeGroup, BaseAttributeGroupRepository,
     Quantity, BaseQuantityRepository,
     Link, BaseLinkRepository,
-    MappingRecord, BaseMappingRepository,
+    MappingRecord, BaseMappingRepository, get_proportion_slices,
     BasePropertyRepository,
     QuantityIterator,
 )
@@ -837,11 +838,12 @@ class WeightRepositoryBaseTest(ABC):
         with self.assertRaises(KeyError):
             self.repository.get_by_weight_group_id_and_index_id(2, 0)
 
-    def test_add_or_resolve(self):
+    def _helper_add_or_resolve(self, method_under_test):
+        """Helper method to check ``add_or_resolve()``."""
         self.weight_group_repo.add('alt_weight')  # Adds weight_group_id 3.
 
         # Default behavior with no conflict (on_conflict='abort').
-        code = self.repository.add_or_resolve(3, 1, 1111)
+        code = method_under_test(3, 1, 1111)
         self.assertEqual(code, 'inserted')
         self.assertEqual(
             self.get_weights_helper(weight_group_id=3),
@@ -851,7 +853,7 @@ class WeightRepositoryBaseTest(ABC):
 
         # Default behavior with conflicting record (on_conflict='abort').
         with self.assertRaises(Exception):
-            self.repository.add_or_resolve(3, 1, 2222)
+            method_under_test(3, 1, 2222)
 
         self.assertEqual(
             self.get_weights_helper(weight_group_id=3),
@@ -860,7 +862,7 @@ class WeightRepositoryBaseTest(ABC):
         )
 
         # Ignore value of conflicting record (keeps 1111).
-        code = self.repository.add_or_resolve(3, 1, 2222, on_conflict='ignore')
+        code = method_under_test(3, 1, 2222, on_conflict='ignore')
         self.assertEqual(code, 'skipped')
         self.assertEqual(
             self.get_weights_helper(weight_group_id=3),
@@ -869,7 +871,7 @@ class WeightRepositoryBaseTest(ABC):
         )
 
         # Replace value of conflicting record (replaces with 2222).
-        code = self.repository.add_or_resolve(3, 1, 2222, on_conflict='replace')
+        code = method_under_test(3, 1, 2222, on_conflict='replace')
         self.assertEqual(code, 'overwritten')
         self.assertEqual(
             self.get_weights_helper(weight_group_id=3),
@@ -878,7 +880,7 @@ class WeightRepositoryBaseTest(ABC):
         )
 
         # Combine values of conflicting record (sums 2222 and 3333).
-        code = self.repository.add_or_resolve(3, 1, 3333, on_conflict='sum')
+        code = method_under_test(3, 1, 3333, on_conflict='sum')
         self.assertEqual(code, 'summed')
         self.assertEqual(
             self.get_weights_helper(weight_group_id=3),
@@ -889,7 +891,7 @@ class WeightRepositoryBaseTest(ABC):
         # Passes invalid `on_conflict` value.
         regex = r"on_conflict must be 'abort', 'ignore', 'replace', or 'sum'; got 'bad_option'"
         with self.assertRaisesRegex(ValueError, regex):
-            self.repository.add_or_resolve(3, 1, 3333, on_conflict='bad_option')
+            method_under_test(3, 1, 3333, on_conflict='bad_option')
 
         self.assertEqual(
             self.get_weights_helper(weight_group_id=3),
@@ -897,6 +899,65 @@ class WeightRepositoryBaseTest(ABC):
             msg='value should be unchanged',
         )
 
+        # Values without conflicts are inserted when replacing or summing.
+        self.assertEqual(method_under_test(3, 2, 10, on_conflict='replace'), 'inserted')
+        self.assertEqual(method_under_test(3, 3, 20, on_conflict='sum'), 'inserted')
+        self.assertEqual(
+            self.get_weights_helper(weight_group_id=3),
+            [(7, 3, 1, 5555.0), (8, 3, 2, 10.0), (9, 3, 3, 20.0)],
+        )
+
+    def test_add_or_resolve_abstract(self):
+        """Test BaseWeightRepository.add_or_resolve() method."""
+        obj_type = self.dal.WeightRepository
+        obj_instance = self.repository
+        method_under_test = super(obj_type, obj_instance).add_or_resolve
+        self._helper_add_or_resolve(method_under_test)
+
+    def test_add_or_resolve_concrete(self):
+        """Test WeightRepository.add_or_resolve() method."""
+        method_under_test = self.repository.add_or_resolve
+        self._helper_add_or_resolve(method_under_test)
+
+    def _helper_add_or_resolve_many(self, method_under_test):
+        """Helper method to check ``add_or_resolve_many()``."""
+        self.weight_group_repo.add('alt_weight')  # Adds weight_group_id 3.
+
+        counter = method_under_test(3, [(1, 1111), (2, 2222)])
+        self.assertEqual(dict(counter), {'inserted': 2})
+
+        with self.assertRaisesRegex(Exception, 'weight_group_id 3 and index_id 2'):
+            method_under_test(3, [(2, 2222)])
+
+        counter = method_under_test(3, [(2, 10), (3, 30), (3, 40)], on_conflict='ignore')
+        self.assertEqual(dict(counter), {'inserted': 1, 'skipped': 2})
+
+        counter = method_under_test(3, [(1, 10), (2, 20)], on_conflict='replace')
+        self.assertEqual(dict(counter), {'overwritten': 2})
+
+        counter = method_under_test(3, [(1, 5), (1, 5)], on_conflict='sum')
+        self.assertEqual(dict(counter), {'summed': 2})
+
+        self.assertEqual(
+            sorted(self.get_weights_helper(weight_group_id=3)),
+            [(7, 3, 1, 20.0), (8, 3, 2, 20.0), (9, 3, 3, 30.0)],
+        )
+
+        with self.assertRaisesRegex(ValueError, 'undefined record'):
+            method_under_test(3, [(0, 10)], on_conflict='ignore')
+
+    def test_add_or_resolve_many_abstract(self):
+        """Test BaseWeightRepository.add_or_resolve_many() method."""
+        obj_type = self.dal.WeightRepository
+        obj_instance = self.repository
+        method_under_test = super(obj_type, obj_instance).add_or_resolve_many
+        self._helper_add_or_resolve_many(method_under_test)
+
+    def test_add_or_resolve_many_concrete(self):
+        """Test WeightRepository.add_or_resolve_many() method."""
+        method_under_test = self.repository.add_or_resolve_many
+        self._helper_add_or_resolve_many(method_under_test)
+
     def test_merge_one_and_two(self):
         self.repository.merge_by_index_id(index_ids={1, 2}, target=1)
         results = self.get_weights_helper()
@@ -1682,6 +1743,48 @@ class MappingRepositoryBaseTest(ABC):
         }
         self.assertEqual(results, expected)
 
+    def _helper_update_many(self, method_under_test):
+        count = method_under_test([
+            MappingRecord(2, 1, 2, 1, b'\x40', 50000.0, 0.625),
+            MappingRecord(6, 2, 2, 2, b'\xc0', 500.0, 1.0),
+        ])
+        self.assertEqual(count, 2)
+        self.assertEqual(self.repository.get(2).value, 50000.0)
+        self.assertEqual(self.repository.get(6).value, 500.0)
+        self.assertEqual(method_under_test([]), 0)
+
+    def test_update_many_abstract(self):
+        """Test BaseMappingRepository.update_many() method."""
+        obj_type = self.dal.MappingRepository
+        obj_instance = self.repository
+        method_under_test = super(obj_type, obj_instance).update_many
+        self._helper_update_many(method_under_test)
+
+    def test_update_many_concrete(self):
+        """Test MappingRepository.update_many() method."""
+        method_under_test = self.repository.update_many
+        self._helper_update_many(method_under_test)
+
+    def _helper_delete_many(self, method_under_test):
+        self.assertEqual(method_under_test(iter([2, 9])), 2)
+        self.assertEqual(
+            {row[0] for row in self.get_mappings_helper()},
+            {1, 3, 4, 5, 6, 7, 8},
+        )
+        self.assertEqual(method_under_test([]), 0)
+
+    def test_delete_many_abstract(self):
+        """Test BaseMappingRepository.delete_many() method."""
+        obj_type = self.dal.MappingRepository
+        obj_instance = self.repository
+        method_under_test = super(obj_type, obj_instance).delete_many
+        self._helper_delete_many(method_under_test)
+
+    def test_delete_many_concrete(self):
+        """Test MappingRepository.delete_many() method."""
+        method_under_test = self.repository.delete_many
+        self._helper_delete_many(method_under_test)
+
     def test_find_distinct_other_index_ids(self):
         results = self.repository.find_distinct_other_index_ids(1)
         self.assertEqual(set(results), {0, 1, 2, 3})
@@ -1812,6 +1915,137 @@ class MappingRepositoryBaseTest(ABC):
              MappingRecord(16, 3, 3, 3, b'\xc0',  90.0, 0.45)],
         )
 
+    def test_refresh_proportions_for_link(self):
+        # Delete some mappings to introduce inconsistent proportions.
+        self.repository.delete(2)
+        self.repository.delete(9)
+
+        self.repository.refresh_proportions_for_link(link_id=1)
+        self.repository.refresh_proportions_for_link(link_id=2, other_index_ids=[3])
+
+        results = self.get_mappings_helper()
+        expected = {
+            # First link.
+            (1, 1, 1, 1, b'\xc0', 131250.00, 1.00),
+            (3, 1, 2, 2, b'\x40',  24576.00, 1.00),  # <- Proportion was 0.375
+            (4, 1, 3, 3, b'\xc0', 100000.00, 1.00),
+            # Second link.
+            (5, 2, 1, 1, b'\xc0',    583.75, 1.00),
+            (6, 2, 2, 2, b'\xc0',    416.25, 1.00),
+            (7, 2, 3, 1, b'\xc0',    336.00, 0.75),  # <- Proportion was 0.328125
+            (8, 2, 3, 2, b'\xc0',    112.00, 0.25),  # <- Proportion was 0.109375
+        }
+        self.assertEqual(results, expected)
+
+    def test_refresh_proportions_for_link_undefined_handling(self):
+        self.link.add('333-33-3333', None, 'other3')  # Adds link_id 3.
+        self.repository.add(3, 0, 2, b'\xc0', 100.0, None)
+        self.repository.add(3, 1, 0, b'\xc0', 100.0, None)
+        self.repository.add(3, 1, 1, b'\xc0', 100.0, None)
+        self.repository.add(3, 2, 0, b'\xc0',   0.0, None)
+        self.repository.add(3, 2, 1, b'\xc0',   0.0, None)
+        self.repository.add(3, 3, 0, b'\xc0',  10.0, None)
+        self.repository.add(3, 3, 1, b'\xc0', 100.0, None)
+        self.repository.add(3, 3, 3, b'\xc0',  90.0, None)
+
+        self.repository.refresh_proportions_for_link(link_id=3)
+
+        self.assertEqual(
+            list(self.repository.find(link_id=3)),
+            [MappingRecord(10, 3, 0, 2, b'\xc0', 100.0, 0.00),
+             MappingRecord(11, 3, 1, 0, b'\xc0', 100.0, 0.50),
+             MappingRecord(12, 3, 1, 1, b'\xc0', 100.0, 0.50),
+             MappingRecord(13, 3, 2, 0, b'\xc0',   0.0, 0.50),  # <- Zero sum.
+             MappingRecord(14, 3, 2, 1, b'\xc0',   0.0, 0.50),  # <- Zero sum.
+             MappingRecord(15, 3, 3, 0, b'\xc0',  10.0, 0.05),
+             MappingRecord(16, 3, 3, 1, b'\xc0', 100.0, 0.50),
+             MappingRecord(17, 3, 3, 3, b'\xc0',  90.0, 0.45)],
+        )
+
+    def _helper_get_proportion_arrays(self, method_under_test):
+        arrays = method_under_test(2)
+        other_index_ids, offsets, index_ids, proportions = arrays
+        self.assertEqual(other_index_ids, array.array('q', [1, 2, 3]))
+        self.assertEqual(offsets, array.array('q', [0, 1, 2, 5]))
+        self.assertEqual(index_ids, array.array('q', [1, 2, 1, 2, 3]))
+        self.assertEqual(
+            proportions,
+            array.array('d', [1.0, 1.0, 0.328125, 0.109375, 0.5625]),
+        )
+
+        self.assertEqual(
+            get_proportion_slices(arrays, 3),
+            (array.array('q', [1, 2, 3]), array.array('d', [0.328125, 0.109375, 0.5625])),
+        )
+        self.assertEqual(
+            get_proportion_slices(arrays, 0),
+            (array.array('q'), array.array('d')),
+            msg='no mappings for id',
+        )
+
+        other_index_ids, offsets, index_ids, proportions = method_under_test(9)
+        self.assertEqual(len(other_index_ids), 0, msg='no mappings')
+        self.assertEqual(offsets, array.array('q', [0]))
+        self.assertEqual(len(index_ids), 0)
+        self.assertEqual(len(proportions), 0)
+
+    def test_get_proportion_arrays_abstract(self):
+        """Test BaseMappingRepository.get_proportion_arrays() method."""
+        obj_type = self.dal.MappingRepository
+        obj_instance = self.repository
+        method_under_test = super(obj_type, obj_instance).get_proportion_arrays
+        self._helper_get_proportion_arrays(method_under_test)
+
+    def test_get_proportion_arrays_concrete(self):
+        """Test MappingRepository.get_proportion_arrays() method."""
+        method_under_test = self.repository.get_proportion_arrays
+        self._helper_get_proportion_arrays(method_under_test)
+
+    def _helper_get_revision(self, method_under_test):
+        revision = method_under_test(2)
+        self.assertIsInstance(revision, str)
+        self.assertEqual(method_under_test(2), revision, msg='unchanged mappings')
+
+        self.repository.add(2, 1, 2, b'\xc0', 5.0, None)
+        self.assertNotEqual(method_under_test(2), revision, msg='mappings changed')
+
+        self.assertIsNone(method_under_test(9), msg='no mappings')
+
+    def test_get_revision_abstract(self):
+        """Test BaseMappingRepository.get_revision() method."""
+        obj_type = self.dal.MappingRepository
+        obj_instance = self.repository
+        method_under_test = super(obj_type, obj_instance).get_revision
+        self._helper_get_revision(method_under_test)
+
+    def test_get_revision_concrete(self):
+        """Test MappingRepository.get_revision() method."""
+        method_under_test = self.repository.get_revision
+        self._helper_get_revision(method_under_test)
+
+    def _helper_get_mapping_stats(self, method_under_test):
+        self.assertEqual(
+            method_under_test(2),
+            {'index_id_cardinality': 4, 'other_index_id_cardinality': 4},
+        )
+        self.repository.delete(9)  # <- Removes mapping 3 -> 3.
+        self.assertEqual(
+            method_under_test(2),
+            {'index_id_cardinality': 3, 'other_index_id_cardinality': 4},
+        )
+
+    def test_get_mapping_stats_abstract(self):
+        """Test BaseMappingRepository.get_mapping_stats() method."""
+        obj_type = self.dal.MappingRepository
+        obj_instance = self.repository
+        method_under_test = super(obj_type, obj_instance).get_mapping_stats
+        self._helper_get_mapping_stats(method_under_test)
+
+    def test_get_mapping_stats_concrete(self):
+        """Test MappingRepository.get_mapping_stats() method."""
+        method_under_test = self.repository.get_mapping_stats
+        self._helper_get_mapping_stats(method_under_test)
+
     def test_get_distinct_mapping_levels(self):
         self.link.add('333-33-3333', None, 'other3')
         self.repository.add(3, 1, 1, b'\xc0', 131250, 1.0)
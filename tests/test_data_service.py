@@ -1,10 +1,17 @@
 """Tests for toron/data_service.py module."""
 
 import array
+import os
+import tempfile
 from dataclasses import replace
 from . import _unittest as unittest
 from .common import normalize_structures, DataSpaceFixturesMixin
 
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 from toron.data_models import (
     Index,
     Location,
@@ -13,12 +20,20 @@ from toron.data_models import (
     Link,
     AttributeGroup,
 )
-from toron import data_access, ToronError
-from toron._utils import ToronWarning, BitFlags
+from toron import data_access, bind_file, ToronError
+from toron._utils import ToronWarning, BitFlags, ChunkedSequenceHash
 from toron.data_service import (
     IntegrityError,
     validate_new_index_columns,
+    load_index_records,
+    load_weight_records,
+    load_quantity_records,
+    update_index_records,
     delete_index_record,
+    delete_index_records,
+    refresh_index_hash_property,
+    get_index_frame,
+    get_other_index_hash,
     find_locations_without_index,
     find_locations_without_structure,
     find_nonmatching_locations,
@@ -31,6 +46,9 @@ from toron.data_service import (
     get_links_by_ref,
     get_link,
     generate_mapping_elements,
+    generate_mapping_rows,
+    count_stale_other_index_ids,
+    generate_weight_rows,
     set_default_weight_group,
     get_default_weight_group,
     find_matching_weight_groups,
@@ -136,6 +154,516 @@ class TestValidateNewLabelColumns(unittest.TestCase):
             )
 
 
+class TestLoadIndexRecords(unittest.TestCase):
+    def setUp(self):
+        self.dal = data_access.get_data_access_layer()
+
+    def load(self, load_func, data, **kwds):
+        """Helper to call *load_func* using a new set of repositories
+        and return the counter, index records, and weight rows.
+        """
+        connector = self.dal.DataConnector()
+        con = connector.acquire_connection()
+        self.addCleanup(connector.release_connection, con)
+        cur = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, cur)
+
+        self.dal.LabelManager(cur).add_columns('A', 'B')
+        index_repo = self.dal.IndexRepository(cur)
+        index_repo.add('foo', 'x')
+        weight_group_repo = self.dal.WeightGroupRepository(cur)
+        weight_group_repo.add('wt1')
+        weight_group_repo.add('wt2')
+        weight_repo = self.dal.WeightRepository(cur)
+        weight_repo.add(1, 1, 10.0)
+
+        counter = load_func(
+            data=data,
+            weight_positions={
+                3: weight_group_repo.get_by_name('wt1'),
+                4: weight_group_repo.get_by_name('wt2'),
+            },
+            index_repo=index_repo,
+            weight_repo=weight_repo,
+            **kwds,
+        )
+        index_records = list(index_repo.find_all())
+        cur.execute('SELECT * FROM main.weight ORDER BY weight_id')
+        return dict(counter), index_records, cur.fetchall()
+
+    def test_unoptimized(self):
+        data = [
+            ('', 'foo', 'x', '', '1.0'),
+            ('', 'bar', 'y', '20.0', '2.0'),
+            (),                              # <- Empty row.
+            ('', 'baz', '', '30.0', ''),     # <- Empty label.
+            ('', 'bar', 'y', '25.0', ''),    # <- Duplicate label.
+            ('1', 'qux', 'w', '15.0', ''),   # <- Mismatched label.
+        ]
+        counter, index_records, weights = self.load(
+            load_index_records,
+            data,
+            label_positions=[1, 2],
+            index_id_position=0,
+            on_label_conflict='replace',
+            on_weight_conflict='ignore',
+        )
+
+        self.assertEqual(
+            counter,
+            {'label_inserted': 1, 'label_replaced': 1, 'empty_labels': 1,
+             'weight_inserted': 3, 'weight_ignored': 2},
+        )
+        self.assertEqual(
+            index_records,
+            [Index(0, '-', '-'), Index(1, 'qux', 'w'), Index(2, 'bar', 'y')],
+        )
+        self.assertEqual(
+            weights,
+            [(1, 1, 1, 10.0), (2, 2, 1, 1.0), (3, 1, 2, 20.0), (4, 2, 2, 2.0)],
+        )
+
+    def test_optimized(self):
+        optimized_func = self.dal.optimizations['load_index_records']
+
+        data = [
+            ('', 'foo', 'x', '', '1.0'),
+            ('', 'bar', 'y', '20.0', '2.0'),
+            (),
+            ('', 'baz', '', '30.0', ''),
+            ('', 'bar', 'y', '25.0', ''),
+            ('1', 'qux', 'w', '15.0', ''),
+            ('', 'quux', 'v', '', ''),
+        ]
+        for on_label_conflict in ['ignore', 'replace']:
+            for on_weight_conflict in ['ignore', 'replace']:
+                kwds = {
+                    'label_positions': [1, 2],
+                    'index_id_position': 0,
+                    'on_label_conflict': on_label_conflict,
+                    'on_weight_conflict': on_weight_conflict,
+                }
+                with self.subTest(**kwds):
+                    self.assertEqual(
+                        self.load(optimized_func, data, **kwds),
+                        self.load(load_index_records, data, **kwds),
+                    )
+
+    def test_optimized_order_dependent(self):
+        """Rows whose outcome depends on the order in which they are
+        applied should give the same results as the normal function.
+        """
+        optimized_func = self.dal.optimizations['load_index_records']
+        kwds = {
+            'label_positions': [1, 2],
+            'index_id_position': 0,
+            'on_label_conflict': 'replace',
+            'on_weight_conflict': 'replace',
+        }
+
+        data_sets = [
+            # Old labels of replaced record are added as a new record.
+            [('1', 'qux', 'w', '', ''), ('', 'foo', 'x', '5.0', '')],
+            # New labels of replaced record are given without index_id.
+            [('1', 'qux', 'w', '', ''), ('', 'qux', 'w', '5.0', '')],
+            # Labels of an index_id are replaced more than once.
+            [('1', 'qux', 'w', '', ''), ('1', 'foo', 'x', '5.0', '')],
+        ]
+        for data in data_sets:
+            with self.subTest(data=data):
+                self.assertEqual(
+                    self.load(optimized_func, data, **kwds),
+                    self.load(load_index_records, data, **kwds),
+                )
+
+    def test_not_realnum_weights(self):
+        data = [
+            ('', 'bar', 'y', 'nan', '2.0'),
+            ('', 'baz', 'z', '3.0', 'inf'),
+        ]
+        kwds = {'label_positions': [1, 2], 'index_id_position': 0}
+        expected = (
+            {'label_inserted': 2, 'weight_inserted': 2, 'not_realnum': 2},
+            [Index(0, '-', '-'), Index(1, 'foo', 'x'), Index(2, 'bar', 'y'), Index(3, 'baz', 'z')],
+            [(1, 1, 1, 10.0), (2, 2, 2, 2.0), (3, 1, 3, 3.0)],
+        )
+        self.assertEqual(self.load(load_index_records, data, **kwds), expected)
+
+        optimized_func = self.dal.optimizations['load_index_records']
+        self.assertEqual(self.load(optimized_func, data, **kwds), expected)
+
+    def test_optimized_abort(self):
+        optimized_func = self.dal.optimizations['load_index_records']
+        kwds = {'label_positions': [1, 2], 'index_id_position': 0}
+
+        data = [('', 'bar', 'y', '20.0', ''), ('1', 'qux', 'w', '', '')]
+        regex = r"index_id 1 and labels \('qux', 'w'\) do not match"
+        with self.assertRaisesRegex(ValueError, regex):
+            self.load(optimized_func, data, **kwds)
+
+        data = [('', 'bar', 'y', '20.0', ''), ('', 'foo', 'x', '15.0', '')]
+        regex = r"weight group 'wt1' already has a value for Index\(id=1"
+        with self.assertRaisesRegex(ValueError, regex):
+            self.load(optimized_func, data, **kwds)
+
+        data = [('', 'bar', 'y', '20.0', ''), ('', 'bar', 'y', '25.0', '')]
+        regex = r"weight group 'wt1' already has a value for Index\(id=2"
+        with self.assertRaisesRegex(ValueError, regex):
+            self.load(optimized_func, data, **kwds)
+
+        data = [('9', 'bar', 'y', '20.0', '')]
+        with self.assertRaisesRegex(KeyError, 'no index with id of 9'):
+            self.load(optimized_func, data, **kwds)
+
+
+class TestLoadWeightRecords(unittest.TestCase):
+    def setUp(self):
+        self.dal = data_access.get_data_access_layer()
+
+    def load(self, load_func, data, columns, **kwds):
+        """Helper to call *load_func* using a new set of repositories
+        and return the counter and weight rows.
+        """
+        connector = self.dal.DataConnector()
+        con = connector.acquire_connection()
+        self.addCleanup(connector.release_connection, con)
+        cur = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, cur)
+        aux_cur = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, aux_cur)
+
+        self.dal.LabelManager(cur).add_columns('A', 'B')
+        index_repo = self.dal.IndexRepository(aux_cur)
+        index_repo.add('foo', 'x')
+        index_repo.add('bar', 'y')
+        index_repo.add('baz', 'z')
+        self.dal.WeightGroupRepository(cur).add('wt1')
+        weight_repo = self.dal.WeightRepository(cur)
+        weight_repo.add(1, 1, 10.0)
+
+        counter = load_func(
+            data=data,
+            columns=columns,
+            value_column='wt1',
+            weight_group_id=1,
+            index_repo=index_repo,
+            weight_repo=weight_repo,
+            **kwds,
+        )
+        cur.execute('SELECT * FROM main.weight ORDER BY weight_id')
+        return dict(counter), cur.fetchall()
+
+    def test_unoptimized(self):
+        data = [
+            ('foo', 'x', '15.0'),
+            ('bar', 'y', '20.0'),
+            ('bar', 'y', '5.0'),   # <- Duplicate labels.
+            ('qux', 'w', '30.0'),  # <- No matching labels.
+            ('baz', 'z', 'nan'),   # <- Not a real number.
+            ('-', '-', '40.0'),    # <- Undefined record.
+        ]
+        counter, weights = self.load(
+            load_weight_records,
+            data,
+            columns=['A', 'B', 'wt1'],
+            on_conflict='sum',
+        )
+
+        self.assertEqual(
+            counter,
+            {'inserted': 1, 'summed': 2, 'no_match': 1,
+             'not_realnum': 1, 'undefined_record': 1},
+        )
+        self.assertEqual(weights, [(1, 1, 1, 25.0), (2, 1, 2, 25.0)])
+
+    def test_optimized(self):
+        optimized_func = self.dal.optimizations['load_weight_records']
+
+        data = [
+            ('foo', 'x', '15.0'),
+            ('bar', 'y', '20.0'),
+            ('bar', 'y', '5.0'),
+            ('qux', 'w', '30.0'),
+            ('baz', 'z', 'nan'),
+            ('-', '-', '40.0'),
+            ('baz', 'z', ''),
+        ]
+        for on_conflict in ['ignore', 'replace', 'sum']:
+            kwds = {'columns': ['A', 'B', 'wt1'], 'on_conflict': on_conflict}
+            with self.subTest(**kwds):
+                self.assertEqual(
+                    self.load(optimized_func, data, **kwds),
+                    self.load(load_weight_records, data, **kwds),
+                )
+
+        data = [
+            ('30.0', 'y', 2, 'bar'),
+            ('35.0', 'z', 3, 'baz'),
+            ('40.0', 'z', 2, 'baz'),  # <- Mismatched labels.
+            ('45.0', 'w', 9, 'qux'),  # <- No index_id.
+            ('50.0', '-', 0, '-'),    # <- Undefined record.
+        ]
+        kwds = {'columns': ['wt1', 'B', 'index_id', 'A'], 'on_conflict': 'abort'}
+        self.assertEqual(
+            self.load(optimized_func, data, **kwds),
+            self.load(load_weight_records, data, **kwds),
+        )
+
+    def test_optimized_abort(self):
+        optimized_func = self.dal.optimizations['load_weight_records']
+        columns = ['A', 'B', 'wt1']
+
+        data = [('bar', 'y', '20.0'), ('foo', 'x', '15.0')]
+        regex = (r"weight record already exists for weight_group_id 1 and "
+                 r"index_id 1.*occured on record: \('foo', 'x', 15.0\)")
+        with self.assertRaisesRegex(Exception, regex):
+            self.load(optimized_func, data, columns)
+
+        data = [('bar', 'y', '20.0'), ('bar', 'y', '25.0')]
+        regex = r'weight record already exists for weight_group_id 1 and index_id 2'
+        with self.assertRaisesRegex(Exception, regex):
+            self.load(optimized_func, data, columns)
+
+        data = [('bar', 'y', '-20.0')]
+        with self.assertRaisesRegex(Exception, 'value cannot be negative'):
+            self.load(optimized_func, data, columns, on_conflict='replace')
+
+
+class TestLoadQuantityRecords(unittest.TestCase):
+    def setUp(self):
+        self.dal = data_access.get_data_access_layer()
+
+    def load(self, load_func, data, **kwds):
+        """Helper to call *load_func* using a new set of repositories
+        and return the counter and the location, attribute group, and
+        quantity rows.
+        """
+        connector = self.dal.DataConnector()
+        con = connector.acquire_connection()
+        self.addCleanup(connector.release_connection, con)
+        cur = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, cur)
+
+        self.dal.LabelManager(cur).add_columns('A', 'B')
+        index_repo = self.dal.IndexRepository(cur)
+        index_repo.add('foo', 'x')
+        index_repo.add('foo', 'y')
+        index_repo.add('bar', 'x')
+        structure_repo = self.dal.StructureRepository(cur)
+        structure_repo.add(None, 0, 0)
+        structure_repo.add(None, 1, 0)
+        structure_repo.add(None, 1, 1)
+        location_repo = self.dal.LocationRepository(cur)
+        location_repo.add('foo', 'x')
+        attribute_repo = self.dal.AttributeGroupRepository(cur)
+        attribute_repo.add({'attr1': 'a'})
+        quantity_repo = self.dal.QuantityRepository(cur)
+        quantity_repo.add(1, 1, 10.0)
+
+        counter = load_func(
+            data=data,
+            columns=['A', 'B', 'attr1', 'attr2', 'counts'],
+            value_column='counts',
+            attributes_to_load=['attr1', 'attr2'],
+            domain='',
+            index_repo=index_repo,
+            location_repo=location_repo,
+            attribute_repo=attribute_repo,
+            quantity_repo=quantity_repo,
+            structure_repo=structure_repo,
+            **kwds,
+        )
+        results = [dict(counter)]
+        for table in ['label_location', 'attribute_group', 'quantity']:
+            cur.execute(f'SELECT * FROM main.{table} ORDER BY 1')
+            results.append(cur.fetchall())
+        return results
+
+    def test_unoptimized(self):
+        data = [
+            ('foo', 'x', 'a', '', 15),
+            ('foo', '',  'a', 'b', 20),
+            ('',    'x', 'a', '', 25),    # <- Invalid partition.
+            ('bar', 'y', 'a', '', 30),    # <- Invalid labels.
+            ('foo', 'y', '',  '', 35),    # <- No attributes.
+            ('foo', '',  'a', 'b', 40),   # <- Duplicate location and attributes.
+        ]
+        counter, locations, attributes, quantities = self.load(
+            load_quantity_records,
+            data,
+            allow_invalid_label=True,
+            allow_invalid_partition=True,
+            on_existing='sum',
+        )
+
+        self.assertEqual(
+            counter,
+            {'inserted': 3, 'existing_summed': 2, 'no_attrs': 1,
+             'invalid_category': 1, 'invalid_label': 1},
+        )
+        self.assertEqual(
+            locations,
+            [(1, 'foo', 'x'), (2, 'foo', ''), (3, '', 'x'), (4, 'bar', 'y')],
+        )
+        self.assertEqual(
+            [x[:1] for x in attributes],
+            [(1,), (2,)],
+        )
+        self.assertEqual(
+            quantities,
+            [(1, 1, 1, 25), (2, 2, 2, 60), (3, 3, 1, 25), (4, 4, 1, 30)],
+        )
+
+    def test_optimized(self):
+        optimized_func = self.dal.optimizations['load_quantity_records']
+
+        data = [
+            ('foo', 'x', 'a', '', 15),
+            ('foo', '',  'a', 'b', 20),
+            ('',    'x', 'a', '', 25),
+            ('bar', 'y', 'a', '', 30),
+            ('foo', 'y', '',  '', 35),
+            ('foo', '',  'a', 'b', 40.5),
+            ('bar', 'x', '',  'b', 45),
+        ]
+        for on_existing in ['ignore', 'replace', 'sum']:
+            kwds = {
+                'allow_invalid_label': True,
+                'allow_invalid_partition': True,
+                'on_existing': on_existing,
+            }
+            with self.subTest(**kwds):
+                self.assertEqual(
+                    self.load(optimized_func, data, **kwds),
+                    self.load(load_quantity_records, data, **kwds),
+                )
+
+    def test_optimized_errors(self):
+        optimized_func = self.dal.optimizations['load_quantity_records']
+
+        data = [('foo', '', 'a', '', 15), ('', 'x', 'a', '', 20)]
+        regex = r"no matching partition:\n   names: \{'B'\}\n  record: \['', 'x'\]"
+        with self.assertRaisesRegex(ValueError, regex):
+            self.load(optimized_func, data)
+
+        data = [('foo', '', 'a', '', 15), ('bar', 'y', 'a', '', 20)]
+        regex = r"invalid labels, not present in index:\n  record: \['bar', 'y'\]"
+        with self.assertRaisesRegex(ValueError, regex):
+            self.load(optimized_func, data)
+
+        data = [('foo', 'x', 'a', '', 15)]
+        regex = 'data contains quantities for locations and attributes'
+        with self.assertRaisesRegex(ValueError, regex):
+            self.load(optimized_func, data)
+
+
+class TestUpdateIndexRecords(unittest.TestCase):
+    def setUp(self):
+        self.dal = data_access.get_data_access_layer()
+
+    def update(self, update_func, data, **kwds):
+        """Helper to call *update_func* using a new set of repositories
+        and return the counter and the index, weight, and mapping rows.
+        """
+        connector = self.dal.DataConnector()
+        con = connector.acquire_connection()
+        self.addCleanup(connector.release_connection, con)
+        cur = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, cur)
+
+        self.dal.LabelManager(cur).add_columns('A', 'B')
+        index_repo = self.dal.IndexRepository(cur)
+        index_repo.add('foo', 'x')
+        index_repo.add('bar', 'y')
+        index_repo.add('baz', 'z')
+        index_repo.add('qux', 'w')
+        self.dal.WeightGroupRepository(cur).add('wt1')
+        weight_repo = self.dal.WeightRepository(cur)
+        weight_repo.add(1, 1, 10.0)
+        weight_repo.add(1, 2, 20.0)
+        weight_repo.add(1, 3, 30.0)
+        self.dal.LinkRepository(cur).add('111-11-1111', None, 'other1')
+        mapping_repo = self.dal.MappingRepository(cur)
+        mapping_repo.add(1, 1, 1, b'\xc0', 50.0, 0.5)
+        mapping_repo.add(1, 1, 2, b'\xc0', 50.0, 0.5)
+        mapping_repo.add(1, 2, 3, b'\xc0', 80.0, 1.0)
+
+        counter = update_func(
+            data=data,
+            columns=['index_id', 'A', 'B'],
+            index_repo=index_repo,
+            weight_repo=weight_repo,
+            mapping_repo=mapping_repo,
+            **kwds,
+        )
+        results = [dict(counter)]
+        for table in ['label_index', 'weight', 'mapping']:
+            cur.execute(f'SELECT * FROM main.{table} ORDER BY 1')
+            results.append(cur.fetchall())
+        return results
+
+    def test_unoptimized(self):
+        data = [
+            (1, 'foo', 'xx'),
+            (2, 'baz', 'z'),   # <- Conflicts with index_id 3.
+            (4, 'qux', ''),    # <- Empty string.
+            (9, 'quux', 'v'),  # <- No index_id.
+        ]
+        counter, index, weights, mappings = \
+            self.update(update_index_records, data, merge_on_conflict=True)
+
+        self.assertEqual(
+            counter,
+            {'updated': 2, 'merged': 1, 'empty_str': 1, 'no_index': 1},
+        )
+        self.assertEqual(
+            index,
+            [(0, '-', '-'), (1, 'foo', 'xx'), (2, 'baz', 'z'), (4, 'qux', 'w')],
+        )
+        self.assertEqual(weights, [(1, 1, 1, 10.0), (2, 1, 2, 50.0)])
+        self.assertEqual(
+            mappings,
+            [(1, 1, 1, 1, b'\xc0', 50.0, 0.5), (2, 1, 1, 2, b'\xc0', 50.0, 0.5),
+             (3, 1, 2, 2, b'\xc0', 80.0, 1.0)],
+        )
+
+    def test_optimized(self):
+        optimized_func = self.dal.optimizations['update_index_records']
+
+        data = [
+            (1, 'foo', 'xx'),
+            (2, 'baz', 'z'),
+            (4, 'qux', ''),
+            (9, 'quux', 'v'),
+        ]
+        self.assertEqual(
+            self.update(optimized_func, data, merge_on_conflict=True),
+            self.update(update_index_records, data, merge_on_conflict=True),
+        )
+
+        data = [
+            (1, 'bar', 'y'),  # <- Conflicts with index_id 2.
+            (4, 'foo', 'x'),  # <- Conflicts with index_id 1 (updated above).
+        ]
+        self.assertEqual(
+            self.update(optimized_func, data, merge_on_conflict=True),
+            self.update(update_index_records, data, merge_on_conflict=True),
+        )
+
+    def test_optimized_errors(self):
+        optimized_func = self.dal.optimizations['update_index_records']
+
+        data = [(1, 'foo', 'xx'), (2, 'baz', 'z')]
+        regex = 'cannot update index_id 2, new labels conflict with the existing index_id 3'
+        with self.assertRaisesRegex(ValueError, regex):
+            self.update(optimized_func, data)
+
+        data = [(1, 'bar', 'y'), (2, 'baz', 'zz')]
+        regex = 'cannot update index_id 2, it was merged with another record'
+        with self.assertRaisesRegex(ValueError, regex):
+            self.update(optimized_func, data, merge_on_conflict=True)
+
+
 class TestDeleteIndexRecord(unittest.TestCase):
     def setUp(self):
         dal = data_access.get_data_access_layer()
@@ -195,6 +723,195 @@ class TestDeleteIndexRecord(unittest.TestCase):
         self.assertEqual(self.index_repo.get(1), Index(1, 'foo', 'qux'), msg=msg)
 
 
+class TestDeleteIndexRecords(unittest.TestCase):
+    def setUp(self):
+        self.dal = data_access.get_data_access_layer()
+
+    def delete(self, delete_func, index_ids, ambiguous=False):
+        """Helper to call *delete_func* using a new set of repositories
+        and return the counter and the index, weight, mapping, and
+        stored CSR rows.
+        """
+        connector = self.dal.DataConnector()
+        con = connector.acquire_connection()
+        self.addCleanup(connector.release_connection, con)
+        cur = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, cur)
+
+        self.dal.LabelManager(cur).add_columns('A', 'B')
+        index_repo = self.dal.IndexRepository(cur)
+        index_repo.add('foo', 'x')
+        index_repo.add('bar', 'y')
+        index_repo.add('baz', 'z')
+        self.dal.WeightGroupRepository(cur).add('wt1')
+        weight_repo = self.dal.WeightRepository(cur)
+        weight_repo.add(1, 1, 10.0)
+        weight_repo.add(1, 2, 20.0)
+        link_repo = self.dal.LinkRepository(cur)
+        link_repo.add('111-11-1111', None, 'other1')
+        link_repo.add('222-22-2222', None, 'other2')
+        mapping_repo = self.dal.MappingRepository(cur)
+        level = b'\x80' if ambiguous else b'\xc0'
+        mapping_repo.add(1, 1, 1, b'\xc0', 25.0, 0.25)
+        mapping_repo.add(1, 1, 2, level, 75.0, 0.75)
+        mapping_repo.add(1, 2, 3, b'\xc0', 40.0, 1.0)
+        mapping_repo.add(1, 0, 2, b'\xc0', 10.0, 0.0)
+        mapping_repo.add(2, 1, 2, b'\xc0', 30.0, 0.5)
+        mapping_repo.add(2, 1, 3, b'\xc0', 0.0, 0.0)
+        mapping_repo.add(2, 1, 1, b'\xc0', 30.0, 0.5)
+
+        counter = delete_func(
+            index_ids=index_ids,
+            index_repo=index_repo,
+            weight_repo=weight_repo,
+            link_repo=link_repo,
+            mapping_repo=mapping_repo,
+        )
+        results = [dict(counter)]
+        for table in ['label_index', 'weight', 'mapping', 'link_csr']:
+            cur.execute(f'SELECT * FROM main.{table} ORDER BY 1')
+            results.append(cur.fetchall())
+        return results
+
+    def test_unoptimized(self):
+        counter, index, weights, mappings, _ = \
+            self.delete(delete_index_records, [2, 3])
+
+        self.assertEqual(counter, {'deleted': 2})
+        self.assertEqual(index, [(0, '-', '-'), (1, 'foo', 'x')])
+        self.assertEqual(weights, [(1, 1, 1, 10.0)])
+        self.assertEqual(
+            mappings,
+            [(1, 1, 1, 1, b'\xc0', 25.0, 1.0), (7, 2, 1, 1, b'\xc0', 30.0, 1.0)],
+        )
+
+    def test_optimized(self):
+        optimized_func = self.dal.optimizations['delete_index_records']
+        for index_ids in [[2, 3], [1], [1, 2], [3, 1, 2], []]:
+            with self.subTest(index_ids=index_ids):
+                self.assertEqual(
+                    self.delete(optimized_func, index_ids),
+                    self.delete(delete_index_records, index_ids),
+                )
+
+    def test_optimized_ambiguous(self):
+        optimized_func = self.dal.optimizations['delete_index_records']
+        regex = 'cannot delete index_id 2, some associated mappings are ambiguous'
+        with self.assertRaisesRegex(ValueError, regex):
+            self.delete(optimized_func, [3, 2, 1], ambiguous=True)
+
+
+class TestRefreshIndexHashProperty(unittest.TestCase):
+    def setUp(self):
+        dal = data_access.get_data_access_layer()
+        connector = dal.DataConnector()
+        con = connector.acquire_connection()
+        self.addCleanup(connector.release_connection, con)
+        self.cursor = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, self.cursor)
+
+        dal.LabelManager(self.cursor).add_columns('A')
+        self.index_repo = dal.IndexRepository(self.cursor)
+        self.prop_repo = dal.PropertyRepository(self.cursor)
+        self.optimized_func = dal.optimizations['refresh_index_hash_property']
+
+    def assertIndexHash(self, index_ids):
+        expected = ChunkedSequenceHash(index_ids).get_hexdigest()
+
+        refresh_index_hash_property(self.index_repo, self.prop_repo)
+        self.assertEqual(self.prop_repo.get('index_hash'), expected)
+
+        self.prop_repo.update('index_hash', None)
+        self.optimized_func(self.index_repo, self.prop_repo)
+        self.assertEqual(self.prop_repo.get('index_hash'), expected)
+
+    def test_insert_and_delete(self):
+        self.assertIndexHash([0])
+
+        self.index_repo.add('foo')
+        self.index_repo.add('bar')
+        self.cursor.execute("INSERT INTO main.label_index VALUES (9000, 'baz')")
+        self.assertIndexHash([0, 1, 2, 9000])
+
+        self.index_repo.delete(1)
+        self.assertIndexHash([0, 2, 9000])
+
+        self.index_repo.delete(9000)
+        self.assertIndexHash([0, 2])
+
+        self.cursor.execute('SELECT chunk_id FROM main.index_hash_chunk')
+        self.assertEqual(self.cursor.fetchall(), [(0,)], msg='empty chunks are removed')
+
+
+class TestGetOtherIndexHash(unittest.TestCase):
+    def setUp(self):
+        dal = data_access.get_data_access_layer()
+        connector = dal.DataConnector()
+        con = connector.acquire_connection()
+        self.addCleanup(connector.release_connection, con)
+        self.cursor = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, self.cursor)
+
+        dal.LabelManager(self.cursor).add_columns('A')
+        dal.IndexRepository(self.cursor).add('foo')
+        dal.LinkRepository(self.cursor).add('111-111-1111', None, 'link1')
+        self.mapping_repo = dal.MappingRepository(self.cursor)
+        self.optimized_func = dal.optimizations['get_other_index_hash']
+
+    def assertOtherIndexHash(self, other_index_ids):
+        expected = ChunkedSequenceHash(other_index_ids).get_hexdigest()
+        self.assertEqual(get_other_index_hash(1, self.mapping_repo), expected)
+        self.assertEqual(self.optimized_func(1, self.mapping_repo), expected)
+
+    def test_insert_and_delete(self):
+        self.assertOtherIndexHash([0])
+
+        self.mapping_repo.add(1, 1, 1, b'\x80', 10.0)
+        self.mapping_repo.add(1, 2, 1, b'\x80', 10.0)
+        self.mapping_repo.add(1, 9000, 1, b'\x80', 10.0)
+        self.assertOtherIndexHash([0, 1, 2, 9000])
+
+        self.cursor.execute('SELECT chunk_id FROM main.link_hash_chunk WHERE digest IS NULL')
+        self.assertEqual(self.cursor.fetchall(), [], msg='changed chunks are re-hashed')
+
+        self.cursor.execute('DELETE FROM main.mapping WHERE other_index_id=1')
+        self.assertOtherIndexHash([0, 2, 9000])
+
+        self.cursor.execute('DELETE FROM main.mapping WHERE other_index_id IN (2, 9000)')
+        self.assertOtherIndexHash([0])
+
+        self.cursor.execute('SELECT chunk_id FROM main.link_hash_chunk')
+        self.assertEqual(self.cursor.fetchall(), [(0,)], msg='empty chunks are removed')
+
+
+@unittest.skipUnless(pd, 'requires pandas')
+class TestGetIndexFrame(unittest.TestCase):
+    def setUp(self):
+        dal = data_access.get_data_access_layer()
+        connector = dal.DataConnector()
+        con = connector.acquire_connection()
+        self.addCleanup(connector.release_connection, con)
+        cursor = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, cursor)
+
+        dal.LabelManager(cursor).add_columns('A', 'B')
+        self.index_repo = dal.IndexRepository(cursor)
+        self.index_repo.add('foo', 'x')
+        self.index_repo.add('bar', 'y')
+        self.optimized_func = dal.optimizations['get_index_frame']
+
+    def test_get_index_frame(self):
+        expected = [(0, '-', '-'), (1, 'foo', 'x'), (2, 'bar', 'y')]
+
+        df = get_index_frame(self.index_repo)
+        self.assertEqual(list(df.columns), ['index_id', 'A', 'B'])
+        self.assertEqual(list(df.itertuples(index=False, name=None)), expected)
+
+        df = self.optimized_func(self.index_repo)
+        self.assertEqual(list(df.columns), ['index_id', 'A', 'B'])
+        self.assertEqual(list(df.itertuples(index=False, name=None)), expected)
+
+
 class TestFindLocationFunctions(unittest.TestCase):
     """Tests for functions to find nonmatching location objects."""
     def setUp(self):
@@ -1014,6 +1731,143 @@ class TestGenerateMappingElements(DataSpaceFixturesMixin, unittest.TestCase):
         )
 
 
+
+class TestGenerateMappingRows(DataSpaceFixturesMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.node_f.add_link(self.node_e, 'population', is_default=True)
+        self.node_f.insert_mappings2(
+            space_or_ref=self.node_e,
+            link_name='population',
+            data=[(1, 1, b'\xe0', 25.0),
+                  (1, 2, b'\xe0', 25.0),
+                  (2, 3, b'\xc0', 50.0),
+                  (3, 3, b'\xe0', 50.0)],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'mapping_value'],
+        )
+
+        # Bind a copy of the source node directly to its file on drive.
+        tempdir = self.enterContext(tempfile.TemporaryDirectory())
+        src_path = os.path.join(tempdir, 'node_e.toron')
+        self.node_e.to_file(src_path)
+        self.bound_node_e = bind_file(src_path, mode='rw')
+
+    def get_rows(self, source_node, generate_func):
+        """Helper to call *generate_func* with repositories."""
+        trg_cur, aux_trg_cur = self.enterContext(self.node_f._managed_cursor(n=2))
+        src_cur, aux_src_cur = self.enterContext(source_node._managed_cursor(n=2))
+        rows = generate_func(
+            'population',
+            trg_index_repo=self.node_f._dal.IndexRepository(trg_cur),
+            trg_link_repo=self.node_f._dal.LinkRepository(trg_cur),
+            trg_mapping_repo=self.node_f._dal.MappingRepository(trg_cur),
+            src_index_repo=source_node._dal.IndexRepository(src_cur),
+            src_prop_repo=source_node._dal.PropertyRepository(src_cur),
+            aux_trg_index_repo=self.node_f._dal.IndexRepository(aux_trg_cur),
+            aux_src_index_repo=source_node._dal.IndexRepository(aux_src_cur),
+        )
+        return list(rows)
+
+    def test_unoptimized(self):
+        rows = self.get_rows(self.node_e, generate_mapping_rows)
+        self.assertEqual(
+            rows[:6],
+            [(0, ('-', '-', '-'),  0.0,  0, ('-', '-', '-'), None),
+             (1, ('A', 'z', 'a'), 25.0,  1, ('A', 'z', 'a'), b'\xe0'),
+             (1, ('A', 'z', 'a'), 25.0,  2, ('A', 'z', 'b'), b'\xe0'),
+             (2, ('B', 'x', 'b'), 50.0,  3, ('B', 'x', 'c'), b'\xc0'),
+             (3, ('B', 'y', 'c'), 50.0,  3, ('B', 'x', 'c'), b'\xe0'),
+             (None, None,         None,  4, ('C', 'x', 'd'), None)],
+        )
+        self.assertEqual(rows[-1], (9, ('D', 'y', 'i'), None, None, None, None))
+        self.assertEqual(len(rows), 17)
+
+    def test_optimized(self):
+        dal = data_access.get_data_access_layer()
+        optimized_func = dal.optimizations['generate_mapping_rows']
+
+        expected = self.get_rows(self.node_e, generate_mapping_rows)
+        self.assertEqual(
+            self.get_rows(self.bound_node_e, optimized_func),
+            expected,
+            msg='should use ATTACH-based queries when source is on drive',
+        )
+        self.assertEqual(
+            self.get_rows(self.node_e, optimized_func),
+            expected,
+            msg='should fall back to unoptimized version for in-memory source',
+        )
+
+    def test_optimized_orphan_reference(self):
+        """Mappings to deleted source records should have no labels."""
+        dal = data_access.get_data_access_layer()
+        optimized_func = dal.optimizations['generate_mapping_rows']
+
+        self.bound_node_e.delete_index(idx1='A')
+        rows = self.get_rows(self.bound_node_e, optimized_func)
+        self.assertEqual(rows[1], (1, None, 25.0, 1, ('A', 'z', 'a'), b'\xe0'))
+        self.assertEqual(rows[2], (1, None, 25.0, 2, ('A', 'z', 'b'), b'\xe0'))
+
+class TestCountStaleOtherIndexIds(DataSpaceFixturesMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.node_f.add_link(self.node_e, 'population', is_default=True)
+        self.node_f.insert_mappings2(
+            space_or_ref=self.node_e,
+            link_name='population',
+            data=[(1, 1, b'\xe0', 25.0),
+                  (1, 2, b'\xe0', 25.0),
+                  (2, 3, b'\xc0', 50.0),
+                  (3, 3, b'\xe0', 50.0)],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'mapping_value'],
+        )
+        self.link_id = self.node_f.get_link(self.node_e, 'population').id
+
+        # Bind a copy of the source node directly to its file on drive.
+        tempdir = self.enterContext(tempfile.TemporaryDirectory())
+        src_path = os.path.join(tempdir, 'node_e.toron')
+        self.node_e.to_file(src_path)
+        self.bound_node_e = bind_file(src_path, mode='rw')
+
+    def count_stale(self, source_node, count_func):
+        """Helper to call *count_func* with repositories."""
+        trg_cur = self.enterContext(self.node_f._managed_cursor())
+        src_cur = self.enterContext(source_node._managed_cursor())
+        return count_func(
+            link_id=self.link_id,
+            trg_mapping_repo=self.node_f._dal.MappingRepository(trg_cur),
+            src_index_repo=source_node._dal.IndexRepository(src_cur),
+        )
+
+    def test_unoptimized(self):
+        self.assertEqual(self.count_stale(self.node_e, count_stale_other_index_ids), 0)
+
+        self.node_e.delete_index(idx1='A')  # Deletes index_id 1.
+        self.assertEqual(self.count_stale(self.node_e, count_stale_other_index_ids), 1)
+
+    def test_optimized(self):
+        dal = data_access.get_data_access_layer()
+        optimized_func = dal.optimizations['count_stale_other_index_ids']
+
+        self.assertEqual(self.count_stale(self.bound_node_e, optimized_func), 0)
+
+        self.bound_node_e.delete_index(idx1='A')  # Deletes index_id 1.
+        self.bound_node_e.delete_index(idx2='y')  # Deletes index_id 3, etc.
+        self.assertEqual(
+            self.count_stale(self.bound_node_e, optimized_func),
+            self.count_stale(self.bound_node_e, count_stale_other_index_ids),
+            msg='should use ATTACH-based query when source is on drive',
+        )
+        self.assertEqual(self.count_stale(self.bound_node_e, optimized_func), 2)
+
+        self.node_e.delete_index(idx1='A')
+        self.assertEqual(
+            self.count_stale(self.node_e, optimized_func),
+            1,
+            msg='should fall back to unoptimized version for in-memory source',
+        )
+
+
 class TestGetAndSetDefaultWeightGroup(unittest.TestCase):
     def setUp(self):
         dal = data_access.get_data_access_layer()
@@ -1078,6 +1932,64 @@ class TestGetAndSetDefaultWeightGroup(unittest.TestCase):
             )
 
 
+class TestGenerateWeightRows(unittest.TestCase):
+    def setUp(self):
+        self.dal = data_access.get_data_access_layer()
+
+        connector = self.dal.DataConnector()
+        con = connector.acquire_connection()
+        self.addCleanup(connector.release_connection, con)
+        cur1 = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, cur1)
+        cur2 = connector.acquire_cursor(con)
+        self.addCleanup(connector.release_cursor, cur2)
+
+        self.dal.LabelManager(cur1).add_columns('A', 'B')
+        self.index_repo = self.dal.IndexRepository(cur1)
+        self.index_repo.add('foo', 'x')
+        self.index_repo.add('bar', 'y')
+        self.index_repo.add('baz', 'z')
+
+        weight_group_repo = self.dal.WeightGroupRepository(cur1)
+        weight_group_repo.add('wt1')  # Adds weight_group_id 1.
+        weight_group_repo.add('wt2')  # Adds weight_group_id 2.
+
+        self.weight_repo = self.dal.WeightRepository(cur2)
+        self.weight_repo.add(1, 1, 10.0)
+        self.weight_repo.add(1, 2, 20.0)
+        self.weight_repo.add(2, 2, 25.0)
+        self.weight_repo.add(2, 3, 35.0)
+
+    def get_rows(self, generate_func, weight_group_ids):
+        """Helper to call *generate_func* with repositories."""
+        rows = generate_func(
+            weight_group_ids=weight_group_ids,
+            index_repo=self.index_repo,
+            weight_repo=self.weight_repo,
+        )
+        return list(rows)
+
+    def test_unoptimized(self):
+        rows = self.get_rows(generate_weight_rows, [2, 1])
+        self.assertEqual(
+            rows,
+            [(Index(0, '-', '-'), [0.0, 0.0]),
+             (Index(1, 'foo', 'x'), [None, 10.0]),
+             (Index(2, 'bar', 'y'), [25.0, 20.0]),
+             (Index(3, 'baz', 'z'), [35.0, None])],
+        )
+
+    def test_optimized(self):
+        optimized_func = self.dal.optimizations['generate_weight_rows']
+
+        for weight_group_ids in ([2, 1], [1], []):
+            with self.subTest(weight_group_ids=weight_group_ids):
+                self.assertEqual(
+                    self.get_rows(optimized_func, weight_group_ids),
+                    self.get_rows(generate_weight_rows, weight_group_ids),
+                )
+
+
 class TestFindMatchingWeightGroups(unittest.TestCase):
     def setUp(self):
         dal = data_access.get_data_access_layer()
@@ -1602,12 +2514,17 @@ class TestRefreshStructureGranularity(unittest.TestCase):
         self.assertEqual(self.structure_repo.get_all(), expected)
 
         # Calculate and assign granularity (using optimizations).
-        refresh_structure_granularity(
-            label_manager=self.label_manager,
-            structure_repo=self.structure_repo,
-            index_repo=self.index_repo,
-            aux_index_repo=self.alt_index_repo,
-            optimizations=self.optimizations,
+        with self.assertLogs('app-toron', level='DEBUG') as logs_cm:
+            refresh_structure_granularity(
+                label_manager=self.label_manager,
+                structure_repo=self.structure_repo,
+                index_repo=self.index_repo,
+                aux_index_repo=self.alt_index_repo,
+                optimizations=self.optimizations,
+            )
+        self.assertIn(
+            'DEBUG:app-toron:using DAL optimized calculate_granularity()',
+            logs_cm.output,
         )
         self.assertEqual(normalize_structures(self.structure_repo.get_all()), expected)
 
@@ -23,8 +23,10 @@ from toron.graph import (
     load_mapping,
     get_mapping,
     get_weights,
+    _TranslationContext,
     _translate,
     translate,
+    compose_links,
     xadd_edge,
 )
 
@@ -350,6 +352,35 @@ class TestdGetMappingStats(TwoNodesBaseTestCase):
         }
         self.assertEqual(stats, expected)
 
+    def test_saves_link_stats(self):
+        """Counts should be saved by the write and by the first read."""
+        self.node2.add_link(self.node1, 'population', other_filename_hint='file1')
+        self.node2.insert_mappings2(
+            space_or_ref=self.node1,
+            link_name='population',
+            data=[
+                (1, 1, b'\xe0',  25.0),
+                (2, 3, b'\xe0',  50.0),
+                (3, 3, b'\xe0',  50.0),
+            ],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'population'],
+        )
+        link = self.node2.get_link(self.node1, 'population')
+
+        def stored_stats():
+            with self.node2._managed_cursor() as cur:
+                cur.execute('SELECT * FROM main.link_stats')
+                return cur.fetchall()
+
+        self.assertEqual(stored_stats(), [(link.id, 2, 3)], msg='saved by the write')
+
+        with self.node2._managed_cursor() as cur:
+            cur.execute('DELETE FROM main.link_stats')  # <- Not yet saved.
+
+        stats = _get_mapping_stats(self.node1, self.node2, link)
+        self.assertEqual(stored_stats(), [(link.id, 2, 3)], msg='saved by the read')
+        self.assertEqual(_get_mapping_stats(self.node1, self.node2, link), stats)
+
 
 class TestLoadMapping(TwoNodesBaseTestCase):
     def test_all_exact(self):
@@ -921,7 +952,7 @@ class TestTranslate(unittest.TestCase):
     def test_translate_generator(self):
         quantities = QuantityIterator(
             unique_id='00000000-0000-0000-0000-000000000000',
-            index_hash='55e56a09c8793714d050eb888d945ca3b66d10ce5c5b489946df6804dd60324e',
+            index_hash='1915c377cb8c9047b34805783f14acf8b2afc7406d1705f46228fe8f8959db78',
             domain='',
             data=[(Index(1, 'aaa'), {'foo': 'bar'}, 100),
                   (Index(2, 'bbb'), {'foo': 'bar'}, 100),
@@ -947,10 +978,33 @@ class TestTranslate(unittest.TestCase):
              (Index(id=4, labels=('a1', 'b2', 'c4')), {'foo': 'bar'}, 62.0)],
         )
 
+    def test_translation_context_caching(self):
+        """Mappings should be loaded once per link and indexes once per id."""
+        with self.node._managed_cursor() as cursor:
+            mapping_repo = self.node._dal.MappingRepository(cursor)
+            index_repo = self.node._dal.IndexRepository(cursor)
+            wrapped = mapping_repo.get_proportion_arrays
+            with unittest.mock.patch.object(mapping_repo, 'get_proportion_arrays', wraps=wrapped) as get_arrays, \
+                    unittest.mock.patch.object(index_repo, 'get', wraps=index_repo.get) as get:
+                context = _TranslationContext(mapping_repo, index_repo)
+
+                for _ in range(3):
+                    self.assertEqual(
+                        list(context.get_mappings(1, 3)),
+                        [(2, 0.25), (3, 0.125), (4, 0.625)],
+                    )
+                    self.assertEqual(context.get_index(2), Index(2, 'a1', 'b1', 'c2'))
+
+                self.assertEqual(get_arrays.call_count, 1)
+                self.assertEqual(get.call_count, 1)
+
+                self.assertEqual(list(context.get_mappings(1, 99)), [], msg='no matching mappings')
+                self.assertEqual(get_arrays.call_count, 1, msg='arrays are loaded once per link')
+
     def test_simple_case(self):
         quantities = QuantityIterator(
             unique_id='00000000-0000-0000-0000-000000000000',
-            index_hash='55e56a09c8793714d050eb888d945ca3b66d10ce5c5b489946df6804dd60324e',
+            index_hash='1915c377cb8c9047b34805783f14acf8b2afc7406d1705f46228fe8f8959db78',
             domain='',
             data=[(Index(1, 'aaa'), {'foo': 'bar'}, 100),
                   (Index(2, 'bbb'), {'foo': 'bar'}, 100),
@@ -1006,7 +1060,7 @@ class TestTranslate(unittest.TestCase):
         """
         quantities = QuantityIterator(
             unique_id='00000000-0000-0000-0000-000000000000',
-            index_hash='55e56a09c8793714d050eb888d945ca3b66d10ce5c5b489946df6804dd60324e',
+            index_hash='1915c377cb8c9047b34805783f14acf8b2afc7406d1705f46228fe8f8959db78',
             domain='',
             data=[
                 # Attributes {'foo': 'bar'} match 'edge 1' ([foo="bar"])
@@ -1073,7 +1127,7 @@ class TestTranslate(unittest.TestCase):
 
         quantities = QuantityIterator(
             unique_id='00000000-0000-0000-0000-000000000000',
-            index_hash='55e56a09c8793714d050eb888d945ca3b66d10ce5c5b489946df6804dd60324e',
+            index_hash='1915c377cb8c9047b34805783f14acf8b2afc7406d1705f46228fe8f8959db78',
             domain='',
             data=[(Index(1, 'aaa'), {'foo': 'bar'}, 100),
                   (Index(2, 'bbb'), {'foo': 'bar'}, 100),
@@ -1107,6 +1161,185 @@ class TestTranslate(unittest.TestCase):
         # ('a1', 'b2', 'c4', 'bar', 124.5)]
 
 
+class TestComposeLinks(unittest.TestCase):
+    def setUp(self):
+        self.node_a = DataSpace()
+        self.node_a.add_index_columns('X')
+        self.node_a.insert_index([['X'], ['a1'], ['a2']])
+
+        self.node_b = DataSpace()
+        self.node_b.add_index_columns('Y')
+        self.node_b.insert_index([['Y'], ['b1'], ['b2'], ['b3']])
+
+        self.node_c = DataSpace()
+        self.node_c.add_index_columns('Z')
+        self.node_c.insert_index([['Z'], ['c1'], ['c2']])
+
+        columns = ['other_index_id', 'index_id', 'mapping_level', 'value']
+        self.node_b.add_link(self.node_a, 'ab', is_default=True)
+        self.node_b.insert_mappings2(
+            self.node_a,
+            'ab',
+            data=[(1, 1, b'\x80',  50.0),   # proportion: 0.5
+                  (1, 2, b'\x80',  50.0),   # proportion: 0.5
+                  (2, 3, b'\x80', 100.0)],  # proportion: 1.0
+            columns=columns,
+        )
+        self.node_c.add_link(self.node_b, 'bc', is_default=True)
+        self.node_c.insert_mappings2(
+            self.node_b,
+            'bc',
+            data=[(1, 1, b'\x80', 100.0),   # proportion: 1.0
+                  (2, 1, b'\x80',  25.0),   # proportion: 0.25
+                  (2, 2, b'\x80',  75.0),   # proportion: 0.75
+                  (3, 2, b'\x80', 100.0)],  # proportion: 1.0
+            columns=columns,
+        )
+
+    def get_composite_mappings(self):
+        link = self.node_c.get_link(self.node_a, 'composite')
+        with self.node_c._managed_cursor() as cur:
+            cur.execute("""
+                SELECT other_index_id, index_id, mapping_level, proportion
+                FROM mapping
+                WHERE link_id=?
+                ORDER BY other_index_id, index_id
+            """, (link.id,))
+            return cur.fetchall()
+
+    def test_compose_links(self):
+        compose_links(self.node_a, self.node_b, self.node_c)
+
+        link = self.node_c.get_link(self.node_a, 'composite')
+        self.assertTrue(link.is_default, msg='first link from node_a should be default')
+        self.assertTrue(link.is_locally_complete)
+        composite_path = link.user_properties['composite_path']
+        self.assertEqual(
+            [x[:3] for x in composite_path],
+            [[self.node_a.unique_id, link.other_index_hash, 'ab'],
+             [self.node_b.unique_id, self.node_c.get_link(self.node_b, 'bc').other_index_hash, 'bc']],
+            msg='each hop should have unique_id, index_hash, and link name',
+        )
+        self.assertTrue(all(isinstance(x[3], str) for x in composite_path),
+                        msg='each hop should have a mapping revision')
+
+        expected = [
+            (1, 1, b'\x80', 0.625),  # 0.5 * 1.0 + 0.5 * 0.25
+            (1, 2, b'\x80', 0.375),  # 0.5 * 0.75
+            (2, 2, b'\x80', 1.0),    # 1.0 * 1.0
+        ]
+        self.assertEqual(self.get_composite_mappings(), expected)
+
+    def test_existing_composite_link(self):
+        compose_links(self.node_a, self.node_b, self.node_c)
+        link = self.node_c.get_link(self.node_a, 'composite')
+
+        compose_links(self.node_a, self.node_b, self.node_c)
+        self.assertEqual(
+            self.node_c.get_link(self.node_a, 'composite'),
+            link,
+            msg='should be unchanged when nodes along the path are unchanged',
+        )
+
+        # Change the index of node_b, then rebuild the composite link.
+        self.node_b.insert_index([['Y'], ['b4']])
+        self.node_b.insert_mappings2(
+            self.node_a,
+            'ab',
+            data=[(2, 4, b'\x80', 100.0)],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+        )
+        self.node_c.insert_mappings2(
+            self.node_b,
+            'bc',
+            data=[(4, 1, b'\x80', 100.0)],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+        )
+        compose_links(self.node_a, self.node_b, self.node_c)
+
+        new_link = self.node_c.get_link(self.node_a, 'composite')
+        self.assertNotEqual(new_link.user_properties, link.user_properties)
+        expected = [
+            (1, 1, b'\x80', 0.625),
+            (1, 2, b'\x80', 0.375),
+            (2, 1, b'\x80', 0.5),
+            (2, 2, b'\x80', 0.5),
+        ]
+        self.assertEqual(self.get_composite_mappings(), expected)
+
+    def test_mapping_change_rebuilds_composite(self):
+        compose_links(self.node_a, self.node_b, self.node_c)
+        link = self.node_c.get_link(self.node_a, 'composite')
+
+        # Change proportions of the 'bc' link without changing any index.
+        self.node_c.update_mappings2(
+            self.node_b,
+            'bc',
+            data=[(1, 1, b'\x80', 100.0),
+                  (2, 1, b'\x80',  50.0),   # proportion: 0.5
+                  (2, 2, b'\x80',  50.0),   # proportion: 0.5
+                  (3, 2, b'\x80', 100.0)],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+        )
+        compose_links(self.node_a, self.node_b, self.node_c)
+
+        new_link = self.node_c.get_link(self.node_a, 'composite')
+        self.assertNotEqual(new_link.user_properties, link.user_properties)
+        expected = [
+            (1, 1, b'\x80', 0.75),  # 0.5 * 1.0 + 0.5 * 0.5
+            (1, 2, b'\x80', 0.25),  # 0.5 * 0.5
+            (2, 2, b'\x80', 1.0),
+        ]
+        self.assertEqual(self.get_composite_mappings(), expected)
+
+    def test_first_hop_multiple_levels(self):
+        node_b = DataSpace()
+        node_b.add_index_columns('Y1', 'Y2')
+        node_b.insert_index([['Y1', 'Y2'], ['b1', 'x'], ['b2', 'x'], ['b3', 'y']])
+        node_b.add_partition_definition({'Y1'})
+
+        columns = ['other_index_id', 'index_id', 'mapping_level', 'value']
+        node_b.add_link(self.node_a, 'ab', is_default=True)
+        node_b.insert_mappings2(
+            self.node_a,
+            'ab',
+            data=[(1, 1, b'\xc0', 30.0),   # proportion: 0.3
+                  (1, 1, b'\x80', 20.0),   # proportion: 0.2 (same index_id, other level)
+                  (1, 2, b'\xc0', 50.0),   # proportion: 0.5
+                  (2, 3, b'\xc0', 100.0)],
+            columns=columns,
+        )
+        self.node_c.drop_link(self.node_b, 'bc')
+        self.node_c.add_link(node_b, 'bc', is_default=True)
+        self.node_c.insert_mappings2(
+            node_b,
+            'bc',
+            data=[(1, 1, b'\x80', 100.0),
+                  (2, 1, b'\x80',  25.0),
+                  (2, 2, b'\x80',  75.0),
+                  (3, 2, b'\x80', 100.0)],
+            columns=columns,
+        )
+
+        compose_links(self.node_a, node_b, self.node_c)
+
+        expected = [
+            (1, 1, b'\x80', 0.625),  # (0.3 + 0.2) * 1.0 + 0.5 * 0.25
+            (1, 2, b'\x80', 0.375),  # 0.5 * 0.75
+            (2, 2, b'\x80', 1.0),
+        ]
+        self.assertEqual(self.get_composite_mappings(), expected)
+
+    def test_too_few_nodes(self):
+        with self.assertRaises(ValueError):
+            compose_links(self.node_a, self.node_b)
+
+    def test_selectors_not_supported(self):
+        self.node_c.add_link(self.node_b, 'other', selectors=['[foo]'])
+        with self.assertRaisesRegex(ValueError, 'attribute selectors'):
+            compose_links(self.node_a, self.node_b, self.node_c)
+
+
 class TestXAddEdge(unittest.TestCase):
     def setUp(self):
         node1_data = [
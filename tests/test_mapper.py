@@ -41,6 +41,27 @@ class TestMapperInit(DataSpaceFixturesMixin, unittest.TestCase):
         }
         self.assertEqual(result, expected)
 
+    def test_chunked_loading(self):
+        """Rows should be loaded in chunks and throughput logged."""
+        data = [
+            [0, ['-',   '-',   '-'],   BitFlags(1, 1, 1), 0, ['-',   '-'],   BitFlags(1, 1),   0.0],
+            [1, ['A-1', 'X-1', '1-1'], BitFlags(1, 1, 1), 1, ['A-2', 'X-2'], BitFlags(1, 1), 100.0],
+            [2, ['B-1', 'Y-1', '2-1'], BitFlags(1, 1, 1), 2, ['B-2', 'Y-2'], BitFlags(1, 1), 200.0],
+        ]
+
+        with unittest.mock.patch.object(Mapper, 'chunk_size', 2):
+            with self.assertLogs('app-toron.mapper', level='DEBUG') as cm:
+                mapper = Mapper(self.node_a, self.node_b, data)  # <- Init under test.
+            chunks = list(mapper._generate_source_chunks(data))
+
+        self.assertEqual(len(self.get_mapping_source(mapper)), 3)
+        self.assertEqual(len(cm.output), 1)
+        self.assertRegex(
+            cm.output[0],
+            r'^DEBUG:app-toron.mapper:loaded 3 mapping source rows in [\d.]+ seconds',
+        )
+        self.assertEqual([len(x) for x in chunks], [2, 1])
+
     def test_different_levels(self):
         self.node_a.add_partition_definitions(('foo', 'bar'), ('foo',))
         self.node_b.add_partition_definitions(('foo',))
@@ -17,6 +17,7 @@ from textwrap import dedent
 from unittest.mock import (
     Mock,
     call,
+    patch,
     sentinel,
 )
 if sys.version_info >= (3, 8):
@@ -24,11 +25,23 @@ if sys.version_info >= (3, 8):
 else:
     from typing_extensions import get_args
 
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
 
 from .common import normalize_structures
 
-from toron._utils import ToronError, ToronWarning, BitFlags
+from toron._utils import (
+    ToronError,
+    ToronWarning,
+    BitFlags,
+    ChunkedSequenceHash,
+    SequenceHash,
+)
 from toron.data_models import (
+    BaseLocationRepository,
+    BaseAttributeGroupRepository,
     Link,
     MappingRecord,
     Index,
@@ -1353,14 +1366,14 @@ class TestIndexMethods(unittest.TestCase):
             node.insert_index_OLD([('A', 'B'), ('foo', 'a'), ('bar', 'b')])
             self.assertEqual(
                 prop_repo.get('index_hash'),
-                '5dfadd0e50910f561636c47335ecf8316251cbd85964eadb5c00103502edf177',
+                'f55e26f0f5c04290d35ccf72def905d8000fc483ec25c92f57690120b9f4d502',
                 msg='hash for index_ids 0, 1, and 2',
             )
 
             node.insert_index_OLD([('A', 'B'), ('baz', 'z')])
             self.assertEqual(
                 prop_repo.get('index_hash'),
-                'c4c96cd71102046c61ec8326b2566d9e48ef2ba26d4252ba84db28ba352a0079',
+                'c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6',
                 msg='hash for index_ids 0, 1, 2, and 3',
             )
 
@@ -1632,14 +1645,14 @@ class TestInsertIndex(unittest.TestCase):
             node.insert_index([('A', 'B'), ('foo', 'a'), ('bar', 'b')])
             self.assertEqual(
                 prop_repo.get('index_hash'),
-                '5dfadd0e50910f561636c47335ecf8316251cbd85964eadb5c00103502edf177',
+                'f55e26f0f5c04290d35ccf72def905d8000fc483ec25c92f57690120b9f4d502',
                 msg='hash for index_ids 0, 1, and 2',
             )
 
             node.insert_index([('A', 'B'), ('baz', 'z')])
             self.assertEqual(
                 prop_repo.get('index_hash'),
-                'c4c96cd71102046c61ec8326b2566d9e48ef2ba26d4252ba84db28ba352a0079',
+                'c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6',
                 msg='hash for index_ids 0, 1, 2, and 3',
             )
 
@@ -1989,7 +2002,7 @@ class TestDataSpaceUpdateIndex(unittest.TestCase):
             repository.add('bar', 'y')
 
             prop_repo = node._dal.PropertyRepository(cursor)
-            prop_repo.update('index_hash', '5dfadd0e50910f561636c47335ecf8316251cbd85964eadb5c00103502edf177')
+            prop_repo.update('index_hash', 'f55e26f0f5c04290d35ccf72def905d8000fc483ec25c92f57690120b9f4d502')
 
             weight_group_repo = node._dal.WeightGroupRepository(cursor)
             weight_group_repo.add('group1')  # Adds weight_group_id 1.
@@ -2223,7 +2236,7 @@ class TestDataSpaceUpdateIndex(unittest.TestCase):
             # Check starting 'index_hash' property.
             self.assertEqual(
                 prop_repo.get('index_hash'),
-                '5dfadd0e50910f561636c47335ecf8316251cbd85964eadb5c00103502edf177',
+                'f55e26f0f5c04290d35ccf72def905d8000fc483ec25c92f57690120b9f4d502',
                 msg='hash for index_ids 0, 1, and 2',
             )
 
@@ -2235,7 +2248,7 @@ class TestDataSpaceUpdateIndex(unittest.TestCase):
             # Check modified 'index_hash' property.
             self.assertEqual(
                 prop_repo.get('index_hash'),
-                '7c3ccd10bb7ec37b46d37926ae6274267f007a34aeaf15c882a715a7f3300529',
+                'a26eb0c44220500e6597181ab8cf8fcb7d3a59faa1a46d9d1f6a0294025b3431',
                 msg='hash for index_ids 0 and 1 (index_id 2 was merged into 1)',
             )
 
@@ -2281,7 +2294,7 @@ class TestDataSpaceDeleteIndex(unittest.TestCase):
 
         with node._managed_cursor() as cursor:
             prop_repo = node._dal.PropertyRepository(cursor)
-            prop_repo.update('index_hash', '5dfadd0e50910f561636c47335ecf8316251cbd85964eadb5c00103502edf177')
+            prop_repo.update('index_hash', 'f55e26f0f5c04290d35ccf72def905d8000fc483ec25c92f57690120b9f4d502')
 
         self.node = node
 
@@ -2420,7 +2433,7 @@ class TestDataSpaceDeleteIndex(unittest.TestCase):
         with self.node._managed_cursor() as cursor:
             link_repo = self.node._dal.LinkRepository(cursor)
             link_repo.add('111-11-1111', None, 'other1',
-                               other_index_hash='5dfadd0e50910f561636c47335ecf8316251cbd85964eadb5c00103502edf177',
+                               other_index_hash='f55e26f0f5c04290d35ccf72def905d8000fc483ec25c92f57690120b9f4d502',
                                is_locally_complete=True)  # Adds link_id 1.
             mapping_repo = self.node._dal.MappingRepository(cursor)
             mapping_repo.add(1, 1, 1, fully_specified_level, 16350, 0.75)
@@ -2428,7 +2441,7 @@ class TestDataSpaceDeleteIndex(unittest.TestCase):
             mapping_repo.add(1, 2, 2, fully_specified_level,  7500, 1.00)
 
             link_repo.add('222-22-2222', None, 'other2',
-                               other_index_hash='e3caec9886aebd933cf3f095e9ce6312744090daea159425654c09b593d6cc66',
+                               other_index_hash='d817a01ff2625e8c8f7da11262a87df754085a5e0e3e1a75d7d338713c5191d1',
                                is_locally_complete=False)  # Adds link_id 2.
             mapping_repo = self.node._dal.MappingRepository(cursor)
             mapping_repo.add(2, 7, 1, fully_specified_level, 6000, 1.00)
@@ -2442,7 +2455,7 @@ class TestDataSpaceDeleteIndex(unittest.TestCase):
             self.assertTrue(link.is_locally_complete, msg='should be unchanged')
             self.assertEqual(
                 link.other_index_hash,
-                '7c3ccd10bb7ec37b46d37926ae6274267f007a34aeaf15c882a715a7f3300529',
+                'a26eb0c44220500e6597181ab8cf8fcb7d3a59faa1a46d9d1f6a0294025b3431',
                 msg='should be changed (different set of other_index_id values)',
 
             )
@@ -2451,7 +2464,7 @@ class TestDataSpaceDeleteIndex(unittest.TestCase):
             self.assertTrue(link.is_locally_complete, msg='should be changed (was False)')
             self.assertEqual(
                 link.other_index_hash,
-                'e3caec9886aebd933cf3f095e9ce6312744090daea159425654c09b593d6cc66',
+                'd817a01ff2625e8c8f7da11262a87df754085a5e0e3e1a75d7d338713c5191d1',
                 msg='should be unchanged (same set of other_index_id values)',
             )
 
@@ -2496,7 +2509,7 @@ class TestDataSpaceDeleteIndex(unittest.TestCase):
             # Check starting 'index_hash' property.
             self.assertEqual(
                 prop_repo.get('index_hash'),
-                '5dfadd0e50910f561636c47335ecf8316251cbd85964eadb5c00103502edf177',
+                'f55e26f0f5c04290d35ccf72def905d8000fc483ec25c92f57690120b9f4d502',
                 msg='hash for index_ids 0, 1, and 2',
             )
 
@@ -2507,7 +2520,7 @@ class TestDataSpaceDeleteIndex(unittest.TestCase):
             # Check modified 'index_hash' property.
             self.assertEqual(
                 prop_repo.get('index_hash'),
-                '692865c9a376a1a82d161b0f9578595554873797fa9ebbb068b797828122e61d',
+                'e8c1c34d23c3629e726c84a55f68ea66f6cbd4b288a6d27845f12e998a5308d7',
                 msg='hash for index_ids 0 and 2 (index_id 1 was deleted)',
             )
 
@@ -2718,7 +2731,7 @@ class TestDataSpaceSelectWeights(unittest.TestCase):
             # Add index hash (needed for QuantityIterator).
             node._dal.PropertyRepository(cursor).update(
                 'index_hash',
-                'c4c96cd71102046c61ec8326b2566d9e48ef2ba26d4252ba84db28ba352a0079',
+                'c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6',
             )
 
         self.node = node
@@ -3753,7 +3766,7 @@ class TestDataSpaceInsertMappings2(unittest.TestCase):
             self.assertFalse(link.is_locally_complete)
             self.assertEqual(
                 link.other_index_hash,
-                'c4c96cd71102046c61ec8326b2566d9e48ef2ba26d4252ba84db28ba352a0079',
+                'c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6',
                 msg='hash for other_index_ids 0, 1, 2, and 3',
             )
 
@@ -3767,11 +3780,289 @@ class TestDataSpaceInsertMappings2(unittest.TestCase):
             self.assertTrue(link.is_locally_complete)
             self.assertEqual(
                 link.other_index_hash,
-                'ed545f6c1652e1c90b517e9f653bafc0cf0f7214fb2dd58e3864c1522b089982',
+                'db94219cb1868d37509b68d92e3c914af17259aed11314aab883162664f0ea49',
                 msg='hash for other_index_ids 0, 1, 2, 3, and 4',
             )
 
 
+class TestDataSpaceUpdateMappings2(unittest.TestCase):
+    def setUp(self):
+        # Build DataSpace fixture to use in test cases.
+        node = DataSpace()
+        with node._managed_cursor() as cursor:
+            label_manager = node._dal.LabelManager(cursor)
+            index_repo = node._dal.IndexRepository(cursor)
+            link_repo = node._dal.LinkRepository(cursor)
+
+            # Add index columns and records.
+            label_manager.add_columns('A', 'B')
+            index_repo.add('foo', 'x')
+            index_repo.add('bar', 'y')
+            index_repo.add('bar', 'z')
+
+            # Add link_id 1.
+            link_repo.add('111-111-1111', 'myfile.toron', 'rel1')
+
+        node.add_partition_definitions({'A', 'B'}, {'A'})
+        node.insert_mappings2('myfile', 'rel1', [
+            ('other_index_id', 'index_id', 'mapping_level', 'rel1'),
+            (1, 1, b'\xc0', 10.0),
+            (2, 2, b'\xc0', 20.0),
+            (3, 2, b'\xc0',  5.0),
+            (3, 3, b'\xc0', 15.0),
+        ])
+        self.node = node
+
+    def get_mappings_helper(self):  # <- Helper function.
+        with self.node._managed_cursor() as cursor:
+            mapping_repo = self.node._dal.MappingRepository(cursor)
+            return list(mapping_repo.find(link_id=1))
+
+    def get_link_helper(self):  # <- Helper function.
+        with self.node._managed_cursor() as cursor:
+            return self.node._dal.LinkRepository(cursor).get(1)
+
+    def test_update_changed_records_only(self):
+        data = [
+            ('other_index_id', 'index_id', 'mapping_level', 'rel1'),
+            (1, 1, b'\xc0', 10.0),  # <- Unchanged.
+            (2, 2, b'\xc0', 20.0),  # <- Unchanged.
+            (3, 2, b'\xc0', 15.0),  # <- Value changed.
+            (3, 3, b'\xc0', 15.0),  # <- Unchanged (proportion changes).
+        ]
+        with self.assertLogs('app-toron', level='INFO') as cm:
+            self.node.update_mappings2('myfile', 'rel1', data)
+
+        self.assertEqual(
+            cm.output,
+            ['INFO:app-toron.space:updated 1, inserted 0, and deleted 0 mappings'],
+        )
+        self.assertEqual(
+            self.get_mappings_helper(),
+            [
+                MappingRecord(1, 1, 1, 1, mapping_level=b'\xc0', value=10.0, proportion=1.0),
+                MappingRecord(2, 1, 2, 2, mapping_level=b'\xc0', value=20.0, proportion=1.0),
+                MappingRecord(3, 1, 3, 2, mapping_level=b'\xc0', value=15.0, proportion=0.5),
+                MappingRecord(4, 1, 3, 3, mapping_level=b'\xc0', value=15.0, proportion=0.5),
+            ],
+        )
+
+    def test_insert_and_delete(self):
+        data = [
+            ('other_index_id', 'index_id', 'mapping_level', 'rel1'),
+            (1, 1, b'\xc0', 10.0),
+            # <- Record (2, 2) is removed.
+            (3, 2, b'\xc0',  5.0),
+            (3, 3, b'\xc0', 15.0),
+            (4, 2, b'\xc0', 20.0),  # <- New record.
+        ]
+        with self.assertLogs('app-toron', level='INFO') as cm:
+            self.node.update_mappings2('myfile', 'rel1', data)
+
+        self.assertEqual(
+            cm.output,
+            ['INFO:app-toron.space:updated 0, inserted 1, and deleted 1 mappings'],
+        )
+        self.assertEqual(
+            self.get_mappings_helper(),
+            [
+                MappingRecord(1, 1, 1, 1, mapping_level=b'\xc0', value=10.0, proportion=1.00),
+                MappingRecord(3, 1, 3, 2, mapping_level=b'\xc0', value=5.0,  proportion=0.25),
+                MappingRecord(4, 1, 3, 3, mapping_level=b'\xc0', value=15.0, proportion=0.75),
+                MappingRecord(5, 1, 4, 2, mapping_level=b'\xc0', value=20.0, proportion=1.00),
+            ],
+        )
+
+        link = self.get_link_helper()
+        sequence_hash = ChunkedSequenceHash()
+        for other_index_id in [0, 1, 3, 4]:
+            sequence_hash.add_value(other_index_id)
+        self.assertEqual(link.other_index_hash, sequence_hash.get_hexdigest())
+        self.assertTrue(link.is_locally_complete)
+
+    def test_columns(self):
+        data = [
+            (2.0, 1, 1, b'\xc0'),  # <- Value changed.
+            (20.0, 2, 2, b'\xc0'),
+            (5.0, 3, 2, b'\xc0'),
+            (15.0, 3, 3, b'\xc0'),
+        ]
+        columns = ['value', 'other_index_id', 'index_id', 'mapping_level']
+        with self.assertLogs('app-toron', level='INFO') as cm:
+            self.node.update_mappings2('myfile', 'rel1', data, columns=columns)
+
+        self.assertEqual(
+            cm.output,
+            ['INFO:app-toron.space:updated 1, inserted 0, and deleted 0 mappings'],
+        )
+        self.assertEqual(
+            self.get_mappings_helper()[0],
+            MappingRecord(1, 1, 1, 1, mapping_level=b'\xc0', value=2.0, proportion=1.0),
+        )
+
+        regex = "missing required columns: 'mapping_level'"
+        with self.assertRaisesRegex(ValueError, regex):
+            self.node.update_mappings2(
+                'myfile', 'rel1', data, columns=['value', 'other_index_id', 'index_id', 'level']
+            )
+
+    def test_unchanged(self):
+        link_before = self.get_link_helper()
+        data = [
+            ('other_index_id', 'index_id', 'mapping_level', 'rel1'),
+            (1, 1, b'\xc0', 10.0),
+            (2, 2, b'\xc0', 20.0),
+            (3, 2, b'\xc0',  5.0),
+            (3, 3, b'\xc0', 15.0),
+        ]
+        with self.assertLogs('app-toron', level='INFO') as cm:
+            self.node.update_mappings2('myfile', 'rel1', data)
+
+        self.assertEqual(cm.output, ['INFO:app-toron.space:mappings are unchanged'])
+        self.assertEqual(self.get_link_helper(), link_before)
+
+
+class TestDataSpaceRelinkAppended(unittest.TestCase):
+    def setUp(self):
+        self.source = DataSpace()
+        self.source.add_index_columns('X')
+        self.source.insert_index([['X'], ['a1'], ['a2']])
+
+        self.node = DataSpace()
+        self.node.add_index_columns('Y')
+        self.node.insert_index([['Y'], ['b1'], ['b2']])
+
+        self.node.add_link(self.source, 'rel1', is_default=True)
+        self.node.insert_mappings2(
+            self.source,
+            'rel1',
+            data=[(1, 1, b'\x80', 10.0),
+                  (2, 2, b'\x80', 20.0)],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+        )
+
+    def get_mappings_helper(self):  # <- Helper function.
+        link = self.node.get_link(self.source, 'rel1')
+        with self.node._managed_cursor() as cursor:
+            mapping_repo = self.node._dal.MappingRepository(cursor)
+            return [
+                (x.other_index_id, x.index_id, x.proportion)
+                for x in mapping_repo.find(link_id=link.id)
+            ]
+
+    def test_relink_appended(self):
+        self.source.insert_index([['X'], ['a3'], ['a4']])  # <- Adds ids 3 and 4.
+
+        with self.assertLogs('app-toron', level='INFO') as cm:
+            self.node.relink_appended(
+                self.source,
+                'rel1',
+                data=[(2, 1, b'\x80', 99.0),  # <- Existing record, skipped.
+                      (3, 1, b'\x80',  5.0),
+                      (3, 2, b'\x80', 15.0),
+                      (4, 2, b'\x80',  8.0)],
+                columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+            )
+        self.assertIn("relinked 'rel1', loaded 3 mappings for 2 of 2 new records", cm.output[0])
+
+        self.assertEqual(
+            self.get_mappings_helper(),
+            [(1, 1, 1.0), (2, 2, 1.0), (3, 1, 0.25), (3, 2, 0.75), (4, 2, 1.0)],
+        )
+
+        link = self.node.get_link(self.source, 'rel1')
+        with self.source._managed_cursor() as cursor:
+            index_hash = self.source._dal.PropertyRepository(cursor).get('index_hash')
+        self.assertEqual(link.other_index_hash, index_hash, msg='link should be up to date')
+        self.assertTrue(link.is_locally_complete)
+
+    def test_legacy_link_hash(self):
+        """Should accept a link hash made with the older SequenceHash
+        (from before schema 0.3.2) and replace it with a current hash.
+        """
+        with self.node._managed_cursor() as cursor:
+            link_repo = self.node._dal.LinkRepository(cursor)
+            link = self.node.get_link(self.source, 'rel1')
+            legacy_hash = SequenceHash([0, 1, 2]).get_hexdigest()
+            link_repo.update(replace(link, other_index_hash=legacy_hash))
+
+        self.source.insert_index([['X'], ['a3']])  # <- Adds id 3.
+
+        with self.assertLogs('app-toron', level='INFO') as cm:
+            self.node.relink_appended(
+                self.source,
+                'rel1',
+                data=[(3, 1, b'\x80', 5.0)],
+                columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+            )
+        self.assertIn("relinked 'rel1', loaded 1 mappings for 1 of 1 new records", cm.output[0])
+
+        link = self.node.get_link(self.source, 'rel1')
+        self.assertEqual(link.other_index_hash, ChunkedSequenceHash([0, 1, 2, 3]).get_hexdigest())
+
+    def test_missing_mappings(self):
+        self.source.insert_index([['X'], ['a3'], ['a4']])
+
+        with self.assertLogs('app-toron', level='WARNING') as cm:
+            self.node.relink_appended(
+                self.source,
+                'rel1',
+                data=[('other_index_id', 'index_id', 'mapping_level', 'value'),
+                      (3, 1, b'\x80', 5.0)],
+            )
+        self.assertIn('missing mappings for 1 new records', cm.output[0])
+
+        link = self.node.get_link(self.source, 'rel1')
+        self.assertEqual(link.other_index_hash, ChunkedSequenceHash([0, 1, 2, 3]).get_hexdigest())
+
+    def test_gap_in_mappings(self):
+        self.source.insert_index([['X'], ['a3'], ['a4']])
+
+        regex = 'appended index_id 3 has no mappings but later appended records do'
+        with self.assertRaisesRegex(ToronError, regex):
+            self.node.relink_appended(
+                self.source,
+                'rel1',
+                data=[('other_index_id', 'index_id', 'mapping_level', 'value'),
+                      (4, 1, b'\x80', 5.0)],
+            )
+
+        self.assertEqual(
+            self.get_mappings_helper(),
+            [(1, 1, 1.0), (2, 2, 1.0)],
+            msg='changes should be rolled back',
+        )
+
+    def test_columns(self):
+        self.source.insert_index([['X'], ['a3']])
+
+        self.node.relink_appended(
+            self.source,
+            'rel1',
+            data=[(5.0, b'\x80', 2, 3)],
+            columns=['value', 'mapping_level', 'index_id', 'other_index_id'],
+        )
+        self.assertEqual(
+            self.get_mappings_helper(),
+            [(1, 1, 1.0), (2, 2, 1.0), (3, 2, 1.0)],
+        )
+
+    def test_already_up_to_date(self):
+        with self.assertLogs('app-toron', level='INFO') as cm:
+            self.node.relink_appended(self.source, 'rel1', data=[])
+        self.assertEqual(
+            cm.output, ["INFO:app-toron.space:link 'rel1' is already up to date"]
+        )
+
+    def test_removed_records(self):
+        self.source.delete_index(X='a1')
+        self.source.insert_index([['X'], ['a3']])
+
+        regex = 'have changed \\(not only appended\\), mappings must be reloaded'
+        with self.assertRaisesRegex(ToronError, regex):
+            self.node.relink_appended(self.source, 'rel1', data=[(3, 1, b'\x80', 5.0)])
+
+
 class TestDataSpaceMappingMethods(unittest.TestCase):
     def setUp(self):
         node = DataSpace()
@@ -4047,7 +4338,7 @@ class TestDataSpaceMappingMethods(unittest.TestCase):
             self.assertFalse(link.is_locally_complete)
             self.assertEqual(
                 link.other_index_hash,
-                'c4c96cd71102046c61ec8326b2566d9e48ef2ba26d4252ba84db28ba352a0079',
+                'c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6',
                 msg='hash for other_index_ids 0, 1, 2, and 3',
             )
 
@@ -4061,7 +4352,7 @@ class TestDataSpaceMappingMethods(unittest.TestCase):
             self.assertTrue(link.is_locally_complete)
             self.assertEqual(
                 link.other_index_hash,
-                'ed545f6c1652e1c90b517e9f653bafc0cf0f7214fb2dd58e3864c1522b089982',
+                'db94219cb1868d37509b68d92e3c914af17259aed11314aab883162664f0ea49',
                 msg='hash for other_index_ids 0, 1, 2, 3, and 4',
             )
 
@@ -4089,7 +4380,7 @@ class TestDataSpaceUpdateMappings(unittest.TestCase):
 
             # Add link and mappings.
             link_repo.add('111-111-1111', 'myfile.toron', 'rel1',
-                other_index_hash='c4c96cd71102046c61ec8326b2566d9e48ef2ba26d4252ba84db28ba352a0079')  # link_id 1
+                other_index_hash='c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6')  # link_id 1
             mapping_repo.add(1, 1, 1, b'\xc0', 10.0, 1.00)  # mapping_id 1 (foo, x)
             mapping_repo.add(1, 2, 2, b'\xc0', 20.0, 1.00)  # mapping_id 2 (bar, y)
             mapping_repo.add(1, 3, 3, b'\xc0', 15.0, 1.00)  # mapping_id 3 (bar, z)
@@ -4244,7 +4535,7 @@ class TestDataSpaceUpdateMappings(unittest.TestCase):
             link = link_repo.get(1)
             self.assertEqual(
                 link.other_index_hash,
-                'c4c96cd71102046c61ec8326b2566d9e48ef2ba26d4252ba84db28ba352a0079',
+                'c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6',
                 msg='hash for other_index_ids 0, 1, 2, and 3',
             )
 
@@ -4261,7 +4552,7 @@ class TestDataSpaceUpdateMappings(unittest.TestCase):
             self.assertTrue(link.is_locally_complete)
             self.assertEqual(
                 link.other_index_hash,
-                'ed545f6c1652e1c90b517e9f653bafc0cf0f7214fb2dd58e3864c1522b089982',
+                'db94219cb1868d37509b68d92e3c914af17259aed11314aab883162664f0ea49',
                 msg='hash for other_index_ids 0, 1, 2, 3, and 4',
             )
 
@@ -4292,7 +4583,7 @@ class TestDataSpaceDeleteMappings(unittest.TestCase):
                 other_unique_id='111-111-1111',
                 other_filename_hint='myfile.toron',
                 name='rel1',
-                other_index_hash='c4c96cd71102046c61ec8326b2566d9e48ef2ba26d4252ba84db28ba352a0079',
+                other_index_hash='c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6',
                 is_locally_complete=True
             )
             mapping_repo.add(1, 1, 1, b'\xc0', 10.0, 1.00)  # mapping_id 1 (foo, x)
@@ -4458,7 +4749,7 @@ class TestDataSpaceDeleteMappings(unittest.TestCase):
             self.assertTrue(link.is_locally_complete)
             self.assertEqual(
                 link.other_index_hash,
-                'c4c96cd71102046c61ec8326b2566d9e48ef2ba26d4252ba84db28ba352a0079',
+                'c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6',
                 msg='hash for other_index_ids 0, 1, 2, and 3',
             )
 
@@ -4473,7 +4764,7 @@ class TestDataSpaceDeleteMappings(unittest.TestCase):
             self.assertFalse(link.is_locally_complete)
             self.assertEqual(
                 link.other_index_hash,
-                'a07d14c1929fe9ef2d5276645e7133d165e0e7b7065ae9f33bd0718f593d774f',
+                '4e93a6e745e6cb7959d7c26a313dfe054879fba9e3c162ae05f4d17d98248d49',
                 msg='hash for other_index_ids 0, 1, and 3',
             )
 
@@ -4568,7 +4859,7 @@ class TestDataSpaceRefiyMappings(unittest.TestCase):
                 other_unique_id='111-111-1111',
                 other_filename_hint='myfile.toron',
                 name='rel1',
-                other_index_hash='c4c96cd71102046c61ec8326b2566d9e48ef2ba26d4252ba84db28ba352a0079',
+                other_index_hash='c4e75ea11c4e2d774dcc7ba8e3d1f767b2e1cc3773babe420886d9fcedfa06c6',
                 is_locally_complete=True
             )
 
@@ -5354,6 +5645,44 @@ class TestDataSpaceInsertQuantities(unittest.TestCase):
              Quantity(4, 2, 2, 596915)],
         )
 
+    def test_insert_quantities_cached_lookups(self):
+        """Repeated labels and attributes should use the repository
+        caches rather than querying the database for every row.
+        """
+        data = [
+            ('state', 'county', 'category', 'sex', 'counts'),
+            ('OH', 'BUTLER', 'TOTAL', 'MALE', 180140),
+            ('OH', 'BUTLER', 'TOTAL', 'FEMALE', 187990),
+            ('OH', 'FRANKLIN', 'TOTAL', 'MALE', 566499),
+            ('OH', 'FRANKLIN', 'TOTAL', 'FEMALE', 596915),
+        ]
+
+        base_location = BaseLocationRepository.get_by_labels_add_if_missing
+        base_attribute = BaseAttributeGroupRepository.get_by_value_add_if_missing
+        with patch.object(BaseLocationRepository,
+                          'get_by_labels_add_if_missing',
+                          autospec=True,
+                          side_effect=base_location) as location_mock, \
+                patch.object(BaseAttributeGroupRepository,
+                             'get_by_value_add_if_missing',
+                             autospec=True,
+                             side_effect=base_attribute) as attribute_mock:
+            self.node.insert_quantities(
+                value='counts',
+                attributes=['category', 'sex'],
+                data=data,
+            )
+
+        self.assertEqual(location_mock.call_count, 2, msg='one per location')
+        self.assertEqual(attribute_mock.call_count, 2, msg='one per attribute group')
+        self.assertEqual(
+            self.get_quantities_helper(self.node),
+            [Quantity(1, 1, 1, 180140),
+             Quantity(2, 1, 2, 187990),
+             Quantity(3, 2, 1, 566499),
+             Quantity(4, 2, 2, 596915)],
+        )
+
     def test_insert_quantities_some_attr_empty(self):
         """Attribute keys with empty values should be omitted."""
         data = [
@@ -6126,6 +6455,116 @@ class TestDataSpaceDisaggregate(unittest.TestCase):
                 self.assertRegex(text, regex)
 
 
+@unittest.skipUnless(pd, 'requires pandas')
+class TestDataSpaceTranslateFrame(unittest.TestCase):
+    def setUp(self):
+        self.source = DataSpace()
+        self.source.add_index_columns('X')
+        self.source.insert_index([['X'], ['a1'], ['a2'], ['a3']])
+
+        self.node = DataSpace()
+        self.node.add_index_columns('Y', 'Z')
+        self.node.insert_index([['Y', 'Z'], ['b1', 'z'], ['b2', 'z'], ['b3', 'z']])
+
+        self.node.add_link(self.source, 'rel1', is_default=True)
+        self.node.insert_mappings2(
+            self.source,
+            'rel1',
+            data=[(1, 1, b'\xc0',  50.0),   # proportion: 0.5
+                  (1, 2, b'\xc0',  50.0),   # proportion: 0.5
+                  (2, 2, b'\xc0', 100.0),   # proportion: 1.0
+                  (3, 3, b'\xc0',  25.0),   # proportion: 0.25
+                  (3, 0, b'\xc0',  75.0)],  # proportion: 0.75
+            columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+        )
+
+    def test_translate_frame(self):
+        df = pd.DataFrame({
+            'X': ['a1', 'a2', 'a2'],
+            'count': [10.0, 4.0, 2.0],
+            'total': [100.0, 40.0, 20.0],
+            'other': ['foo', 'bar', 'baz'],  # <- Extra columns are ignored.
+        })
+
+        result = self.node.translate_frame(df, self.source, value_columns=['count', 'total'])
+
+        self.assertEqual(list(result.columns), ['Y', 'Z', 'count', 'total'])
+        self.assertEqual(
+            list(result.itertuples(index=False, name=None)),
+            [('b1', 'z', 5.0, 50.0), ('b2', 'z', 11.0, 110.0)],
+        )
+
+    def test_saves_proportion_arrays(self):
+        """Arrays built by the first call should be read by later calls."""
+        with self.node._managed_cursor() as cur:
+            cur.execute('DELETE FROM main.link_csr')  # <- Not yet saved.
+
+        df = pd.DataFrame({'X': ['a1', 'a2'], 'count': [10.0, 4.0]})
+        expected = [('b1', 'z', 5.0), ('b2', 'z', 9.0)]
+
+        result = self.node.translate_frame(df, self.source, value_columns=['count'])
+        self.assertEqual(list(result.itertuples(index=False, name=None)), expected)
+
+        with self.node._managed_cursor() as cur:
+            cur.execute('SELECT COUNT(*) FROM main.link_csr')
+            self.assertEqual(cur.fetchone()[0], 1, msg='arrays should be saved')
+
+        mapping_repo_class = self.node._dal.MappingRepository
+        with patch.object(mapping_repo_class, '_build_proportion_arrays') as build:
+            result = self.node.translate_frame(df, self.source, value_columns=['count'])
+        build.assert_not_called()
+        self.assertEqual(list(result.itertuples(index=False, name=None)), expected)
+
+    def test_numpy_fallback(self):
+        """Should give the same results without SciPy."""
+        df = pd.DataFrame({'X': ['a1', 'a2', 'a3'], 'count': [10.0, 4.0, 8.0]})
+
+        expected = [('-', '-', 6.0), ('b1', 'z', 5.0), ('b2', 'z', 9.0), ('b3', 'z', 2.0)]
+
+        result = self.node.translate_frame(df, self.source, value_columns=['count'])
+        self.assertEqual(list(result.itertuples(index=False, name=None)), expected)
+
+        with patch.dict(sys.modules, {'scipy': None, 'scipy.sparse': None}):
+            result = self.node.translate_frame(df, self.source, value_columns=['count'])
+        self.assertEqual(list(result.itertuples(index=False, name=None)), expected)
+
+    def test_undefined_record(self):
+        """Values of the undefined record should remain undefined."""
+        df = pd.DataFrame({'X': ['-', 'a1', '-'], 'count': [3.0, 10.0, 4.0]})
+        result = self.node.translate_frame(df, self.source, value_columns=['count'])
+        self.assertEqual(
+            list(result.itertuples(index=False, name=None)),
+            [('-', '-', 7.0), ('b1', 'z', 5.0), ('b2', 'z', 5.0)],
+        )
+
+        df = pd.DataFrame({'X': ['-', 'a3'], 'count': [3.0, 8.0]})
+        result = self.node.translate_frame(df, self.source, value_columns=['count'])
+        self.assertEqual(
+            list(result.itertuples(index=False, name=None)),
+            [('-', '-', 9.0), ('b3', 'z', 2.0)],
+            msg='undefined values are added to mapped share of undefined record',
+        )
+
+    def test_unmatched_labels(self):
+        df = pd.DataFrame({'X': ['a1', 'zzz'], 'count': [10.0, 4.0]})
+
+        with self.assertRaisesRegex(ValueError, '1 rows do not match'):
+            self.node.translate_frame(df, self.source, value_columns=['count'])
+
+    def test_missing_columns(self):
+        df = pd.DataFrame({'X': ['a1', 'a2'], 'count': [10.0, 4.0]})
+
+        with self.assertRaisesRegex(ValueError, "missing required columns: 'total'"):
+            self.node.translate_frame(df, self.source, value_columns=['total'])
+
+    def test_incomplete_link(self):
+        self.source.insert_index([['X'], ['a4']])  # <- Changes index_hash.
+        df = pd.DataFrame({'X': ['a1'], 'count': [10.0]})
+
+        with self.assertRaisesRegex(RuntimeError, "link 'rel1' is not complete"):
+            self.node.translate_frame(df, self.source, value_columns=['count'])
+
+
 class TestDataSpaceRepr(unittest.TestCase):
     def assertTextEqual(self, first, second, ignore_top=0, ignore_bottom=0, msg=None):
         """Compare text optionally ignoring a number of top and bottom lines."""
@@ -13,6 +13,7 @@ except ImportError:
     pd = None
 
 from toron.space import DataSpace
+from toron.graph import compose_links
 from toron.reader import (
     NodeReader,
     format_column,
@@ -451,6 +452,146 @@ class TestNodeReaderTranslate(unittest.TestCase):
         self.assertEqual(set(reader), expected)
 
 
+class TestNodeReaderCompositeLinks(unittest.TestCase):
+    def setUp(self):
+        self.node_a = DataSpace()
+        self.node_a.add_index_columns('X')
+        self.node_a.insert_index([['X'], ['a1'], ['a2']])
+
+        self.node_b = DataSpace()
+        self.node_b.add_index_columns('Y')
+        self.node_b.insert_index([['Y'], ['b1'], ['b2'], ['b3']])
+
+        self.node_c = DataSpace()
+        self.node_c.add_index_columns('Z')
+        self.node_c.insert_index([['Z'], ['c1'], ['c2']])
+
+        columns = ['other_index_id', 'index_id', 'mapping_level', 'value']
+        self.node_b.add_link(self.node_a, 'ab', is_default=True)
+        self.node_b.insert_mappings2(
+            self.node_a,
+            'ab',
+            data=[(1, 1, b'\x80',  50.0),   # proportion: 0.5
+                  (1, 2, b'\x80',  50.0),   # proportion: 0.5
+                  (2, 3, b'\x80', 100.0)],  # proportion: 1.0
+            columns=columns,
+        )
+        self.node_c.add_link(self.node_b, 'bc', is_default=True)
+        self.node_c.insert_mappings2(
+            self.node_b,
+            'bc',
+            data=[(1, 1, b'\x80', 100.0),   # proportion: 1.0
+                  (2, 1, b'\x80',  25.0),   # proportion: 0.25
+                  (2, 2, b'\x80',  75.0),   # proportion: 0.75
+                  (3, 2, b'\x80', 100.0)],  # proportion: 1.0
+            columns=columns,
+        )
+
+    def test_deferred_translation(self):
+        data = [(1, {'foo': 'bar'}, 100), (2, {'foo': 'bar'}, 40)]
+        reader = NodeReader(data, self.node_a)
+
+        with unittest.mock.patch.object(NodeReader, '_translate', autospec=True,
+                                        side_effect=NodeReader._translate) as translate:
+            reader = reader >> self.node_b >> self.node_c
+            self.assertEqual(translate.call_count, 0, msg='should be deferred')
+
+            self.assertEqual(reader.index_columns, ['Z'])
+            self.assertEqual(translate.call_count, 2, msg='should translate one hop at a time')
+
+        expected = {('c1', 'bar', 62.5), ('c2', 'bar', 77.5)}
+        self.assertEqual(set(reader), expected)
+
+    def test_composite_link(self):
+        compose_links(self.node_a, self.node_b, self.node_c)
+
+        data = [(1, {'foo': 'bar'}, 100), (2, {'foo': 'bar'}, 40)]
+        reader = NodeReader(data, self.node_a)
+
+        with unittest.mock.patch.object(NodeReader, '_translate', autospec=True,
+                                        side_effect=NodeReader._translate) as translate:
+            reader = reader >> self.node_b >> self.node_c
+            expected = {('c1', 'bar', 62.5), ('c2', 'bar', 77.5)}
+            self.assertEqual(set(reader), expected)
+            self.assertEqual(translate.call_count, 1, msg='should use composite link')
+
+    def test_stale_composite_link(self):
+        compose_links(self.node_a, self.node_b, self.node_c)
+        self.node_b.insert_index([['Y'], ['b4']])  # <- Changes index_hash of node_b.
+        self.node_b.insert_mappings2(
+            self.node_a,
+            'ab',
+            data=[(2, 4, b'\x80', 100.0)],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+        )
+        self.node_c.insert_mappings2(
+            self.node_b,
+            'bc',
+            data=[(4, 1, b'\x80', 100.0)],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+        )
+
+        data = [(1, {'foo': 'bar'}, 100), (2, {'foo': 'bar'}, 40)]
+        reader = NodeReader(data, self.node_a)
+
+        with unittest.mock.patch.object(NodeReader, '_translate', autospec=True,
+                                        side_effect=NodeReader._translate) as translate:
+            reader = reader >> self.node_b >> self.node_c
+            list(reader)
+            self.assertEqual(translate.call_count, 2, msg='should not use stale link')
+
+    def test_composite_link_mapping_change(self):
+        compose_links(self.node_a, self.node_b, self.node_c)
+        self.node_c.update_mappings2(  # <- Changes proportions, not index.
+            self.node_b,
+            'bc',
+            data=[(1, 1, b'\x80', 100.0),
+                  (2, 1, b'\x80',  50.0),
+                  (2, 2, b'\x80',  50.0),
+                  (3, 2, b'\x80', 100.0)],
+            columns=['other_index_id', 'index_id', 'mapping_level', 'value'],
+        )
+
+        data = [(1, {'foo': 'bar'}, 100), (2, {'foo': 'bar'}, 40)]
+        reader = NodeReader(data, self.node_a)
+
+        with unittest.mock.patch.object(NodeReader, '_translate', autospec=True,
+                                        side_effect=NodeReader._translate) as translate:
+            reader = reader >> self.node_b >> self.node_c
+            expected = {('c1', 'bar', 75.0), ('c2', 'bar', 65.0)}
+            self.assertEqual(set(reader), expected)
+            self.assertEqual(translate.call_count, 2, msg='should not use stale link')
+
+    def test_composite_link_quantize(self):
+        compose_links(self.node_a, self.node_b, self.node_c)
+
+        data = [(1, {'foo': 'bar'}, 100), (2, {'foo': 'bar'}, 40)]
+
+        with unittest.mock.patch.object(NodeReader, '_translate', autospec=True,
+                                        side_effect=NodeReader._translate) as translate:
+            reader = NodeReader(data, self.node_a, quantize_default=True)
+            reader = reader >> self.node_b >> self.node_c
+            list(reader)
+            self.assertEqual(
+                translate.call_count,
+                2,
+                msg='should translate one hop at a time when intermediate hops are quantized',
+            )
+
+        with unittest.mock.patch.object(NodeReader, '_translate', autospec=True,
+                                        side_effect=NodeReader._translate) as translate:
+            reader = NodeReader(data, self.node_a)
+            reader = reader >> self.node_b
+            reader.quantize_default = True
+            reader = reader >> self.node_c
+            list(reader)
+            self.assertEqual(
+                translate.call_count,
+                1,
+                msg='should use composite link when only the last hop is quantized',
+            )
+
+
 class TestPivotReader(unittest.TestCase):
     def setUp(self):
         node = DataSpace()
@@ -17,6 +17,7 @@ from toron.selectors import (
     SelectorSyntaxError,
     get_greatest_unique_specificity,
     GetMatchingKey,
+    CachedGreatestUniqueSpecificity,
 )
 
 
@@ -1146,3 +1147,52 @@ class TestGetMatchingKey(unittest.TestCase):
 
         msg = 'default should still be 1 despite not have a selector'
         self.assertEqual(get_matching_key._default, 1, msg=msg)
+
+
+class TestCachedGreatestUniqueSpecificity(unittest.TestCase):
+    def setUp(self):
+        self.selector_dict = {
+            1: [SimpleSelector('A', '=', 'xxx')],
+            2: [SimpleSelector('B', '=', 'yyy')],
+            3: [SimpleSelector('B'), SimpleSelector('C')],
+        }
+
+    def test_matching(self):
+        """Results should match get_greatest_unique_specificity()."""
+        get_key = CachedGreatestUniqueSpecificity(self.selector_dict, default=1)
+        rows = [
+            {'A': 'xxx'},
+            {'B': 'yyy'},
+            {'B': 'zzz'},
+            {'C': 'zzz'},
+            {'D': 'zzz'},
+            {'B': 'yyy', 'C': 'zzz'},
+        ]
+        for row in rows:
+            with self.subTest(row=row):
+                expected = get_greatest_unique_specificity(row, self.selector_dict, default=1)
+                self.assertEqual(get_key(row), expected)
+
+    def test_cache_counters(self):
+        """Repeated attribute sets should be served from the cache."""
+        get_key = CachedGreatestUniqueSpecificity(self.selector_dict, default=1)
+
+        get_key({'A': 'xxx', 'B': 'yyy'})
+        get_key({'B': 'yyy', 'A': 'xxx'})  # <- Same items, different order.
+        get_key({'A': 'xxx', 'B': 'yyy'})
+        get_key({'B': 'zzz'})
+
+        info = get_key.cache_info()
+        self.assertEqual(info.hits, 2)
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.currsize, 2)
+
+    def test_bounded_cache(self):
+        get_key = CachedGreatestUniqueSpecificity(self.selector_dict, default=1, maxsize=2)
+
+        for value in ['a', 'b', 'c', 'd']:
+            get_key({'B': value})
+
+        info = get_key.cache_info()
+        self.assertEqual(info.maxsize, 2)
+        self.assertEqual(info.currsize, 2)
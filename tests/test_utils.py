@@ -15,6 +15,7 @@ from toron._utils import (
     wide_to_narrow,
     make_hash,
     SequenceHash,
+    ChunkedSequenceHash,
     splitmix64,
     quantize_values,
     eagerly_initialize,
@@ -685,6 +686,70 @@ class TestSequenceHash(unittest.TestCase):
             sequence_hash.add_value(18446744073709551616)
 
 
+class TestChunkedSequenceHash(unittest.TestCase):
+    def test_sequence(self):
+        chunked_hash = ChunkedSequenceHash()
+        for n in [0, 1, 2]:
+            chunked_hash.add_value(n)
+
+        self.assertEqual(
+            chunked_hash.get_hexdigest(),
+            'f55e26f0f5c04290d35ccf72def905d8000fc483ec25c92f57690120b9f4d502',
+        )
+
+    def test_multiple_chunks(self):
+        chunked_hash = ChunkedSequenceHash(iter([0, 1, 2, 4096, 9000]))
+        self.assertEqual(
+            chunked_hash.get_hexdigest(),
+            'ec4219ec0e29f1773864a1aa5c00b6a0d02603fd95ac7551e1a4e2bd30323ec7',
+        )
+
+    def test_get_hexdigest_prefix(self):
+        """Getting a digest should not change later digests."""
+        chunked_hash = ChunkedSequenceHash([0, 1, 2])
+        self.assertEqual(
+            chunked_hash.get_hexdigest(),
+            ChunkedSequenceHash([0, 1, 2]).get_hexdigest(),
+        )
+
+        chunked_hash.add_value(4096)
+        chunked_hash.add_value(9000)
+        self.assertEqual(
+            chunked_hash.get_hexdigest(),
+            ChunkedSequenceHash([0, 1, 2, 4096, 9000]).get_hexdigest(),
+        )
+
+    def test_combine_digests(self):
+        """Combined chunk digests should match the sequence digest."""
+        chunk_digests = [
+            (0, ChunkedSequenceHash.digest_chunk([0, 1, 2])),
+            (1, ChunkedSequenceHash.digest_chunk([4096])),
+            (2, ChunkedSequenceHash.digest_chunk([9000])),
+        ]
+        self.assertEqual(
+            ChunkedSequenceHash.combine_digests(chunk_digests),
+            ChunkedSequenceHash([0, 1, 2, 4096, 9000]).get_hexdigest(),
+        )
+
+    def test_error_conditions(self):
+        regex = (
+            r'illegal value - values must be a strictly increasing '
+            r'sequence starting at 0 or greater'
+        )
+
+        chunked_hash = ChunkedSequenceHash([1, 2])
+        with self.assertRaisesRegex(ValueError, regex):
+            chunked_hash.add_value(2)  # <- Same as previous, not increasing!
+
+        chunked_hash = ChunkedSequenceHash()
+        with self.assertRaisesRegex(ValueError, regex):
+            chunked_hash.add_value(-5)  # <- Not 0 or greater!
+
+        chunked_hash = ChunkedSequenceHash()
+        with self.assertRaisesRegex(ValueError, 'int too big'):
+            chunked_hash.add_value(18446744073709551616)
+
+
 class TestQuantizeValues(unittest.TestCase):
     def test_splitmix64(self):
         """Test SplitMix64 pseudo-random number generation."""